@@ -1,10 +1,11 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import authorize, get_current_user
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.pagination import InvalidCursorError, set_next_cursor
 from app.schemas.blog_post import BlogPostCreate, BlogPostRead
 from app.services.blog_post import (
     create_blog_post,
@@ -56,23 +57,31 @@ def create_blog_post_endpoint(
     response_model=list[BlogPostRead],
 )
 def list_blog_posts_endpoint(
-    offset: int = Query(0, ge=0, description="Смещение"),
-    limit: int = Query(10, ge=1, description="Размер страницы"),
-    db: Session = Depends(get_db),
+    response: Response,
+    cursor: str | None = Query(None, description="Курсор следующей страницы (заголовок X-Next-Cursor)"),
+    limit: int = Query(10, ge=1, le=100, description="Размер страницы"),
+    db: Session = Depends(get_read_db),
 ):
     """
     Возвращает список блог постов (BlogPostRead)
-    Пагинация реализована через параметры offset и limit
+    Пагинация реализована через параметры cursor и limit, курсор следующей страницы ..
+    .. возвращается в заголовке X-Next-Cursor
 
     Args:
-        offset (int): смещение для выборки (по умолчанию 0)
+        response (Response): ответ, в заголовок которого пишется курсор
+        cursor (optional, str): курсор следующей страницы
         limit (int): максимальное число постов на страницу (по умолчанию 10)
         db (Session): сессия для работы с базой данных
 
     Returns:
         List[BlogPostRead] - список постов
     """
-    return list_blog_posts(db, offset, limit)
+    try:
+        posts, next_cursor = list_blog_posts(db, cursor, limit)
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    set_next_cursor(response, next_cursor)
+    return posts
 
 
 @router.get(
@@ -1,19 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.api.deps import authorize, get_current_user
 from app.api.endpoints.users import get_user_or_404
-from app.core.database import get_db
-from app.schemas.comment import CommentCreate, CommentRead, CommentReadWithReaction
+from app.core.database import get_async_read_db, get_db, get_read_db
+from app.core.pagination import InvalidCursorError, set_next_cursor
+from app.schemas.comment import CommentCreate, CommentNode, CommentRead, CommentReadWithReaction
 from app.services.comment import (
+    COMMENT_TREE_MAX_DEPTH,
     create_comment,
     get_comment,
     list_comments_by_post,
     list_comments_by_user,
-    list_enriched_comments_by_post,
+    list_comment_tree_async,
+    list_enriched_comments_by_post_async,
     update_comment,
 )
-from app.services.reaction import get_user_reaction
+from app.services.reaction import get_user_reactions_async
 
 router = APIRouter(prefix="/comments", tags=["comments"])
 
@@ -96,7 +102,7 @@ def update_comment_endpoint(
 
 
 @router.get("/post/{post_id}", response_model=list[CommentRead])
-def list_comments_by_post_endpoint(post_id: str, db: Session = Depends(get_db)):
+def list_comments_by_post_endpoint(post_id: str, db: Session = Depends(get_read_db)):
     """
     Возвращает список комментариев для указанного поста
 
@@ -111,7 +117,7 @@ def list_comments_by_post_endpoint(post_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/user/{user_id}", response_model=list[CommentRead])
-def list_comments_by_user_endpoint(user_id: str, db: Session = Depends(get_db)):
+def list_comments_by_user_endpoint(user_id: str, db: Session = Depends(get_read_db)):
     """
     Возвращает список комментариев, оставленных указанным пользователем
 
@@ -130,42 +136,88 @@ def list_comments_by_user_endpoint(user_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/post/enriched/{post_id}", response_model=list[CommentReadWithReaction])
-def list_enriched_comments_by_post_endpoint(
-    post_id: str,
-    offset: int = Query(0, ge=0, description="Смещение для пагинации"),
+async def list_enriched_comments_by_post_endpoint(
+    post_id: UUID,
+    response: Response,
+    cursor: str | None = Query(None, description="Курсор следующей страницы (заголовок X-Next-Cursor)"),
     limit: int = Query(
-        10, ge=1, description="Максимальное число комментариев на страницу"
+        10, ge=1, le=100, description="Максимальное число комментариев на страницу"
     ),
     current_user_id: str | None = Query(
         None,
         description="Опциональный Keycloak ID пользователя для поиска его реакции на комментарии",
     ),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """
     Возвращает список комментариев (CommentReadExtended) для указанного поста
-    Пагинация реализована через параметры offset и limit
+    Пагинация реализована через параметры cursor и limit, курсор следующей страницы ..
+    .. возвращается в заголовке X-Next-Cursor
 
     Args:
-        post_id (str): идентификатор поста
-        offset (int): смещение для выборки (по умолчанию 0)
+        post_id (UUID): идентификатор поста
+        response (Response): ответ, в заголовок которого пишется курсор
+        cursor (optional, str): курсор следующей страницы
         limit (int): максимальное число задач на страницу (по умолчанию 10)
         current_user_id (optional, str): идентификатор пользователя
-        db (Session): сессия для работы с базой данных
+        db (AsyncSession): асинхронная сессия для работы с базой данных
 
     Returns:
         List[ProblemReadExtended]: список задач.
     """
-    enriched_comments = list_enriched_comments_by_post(db, post_id, offset, limit)
+    try:
+        enriched_comments, next_cursor = await list_enriched_comments_by_post_async(db, post_id, cursor, limit)
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    set_next_cursor(response, next_cursor)
 
     if current_user_id:
+        reactions = await get_user_reactions_async(
+            db, [comment.id for comment in enriched_comments], "comment", current_user_id
+        )
         for comment in enriched_comments:
-            reaction = get_user_reaction(
-                db, str(comment.id), "comment", current_user_id
-            )
-            if reaction:
-                setattr(comment, "user_reaction", reaction.reaction_type)
-            else:
-                setattr(comment, "user_reaction", None)
+            setattr(comment, "user_reaction", reactions.get(comment.id))
 
     return [CommentReadWithReaction.from_orm(comment) for comment in enriched_comments]
+
+
+@router.get("/post/tree/{post_id}", response_model=list[CommentNode])
+async def list_comment_tree_endpoint(
+    post_id: UUID,
+    response: Response,
+    cursor: str | None = Query(None, description="Курсор следующей страницы (заголовок X-Next-Cursor)"),
+    limit: int = Query(10, ge=1, le=50, description="Максимальное число веток на страницу"),
+    max_depth: int = Query(
+        COMMENT_TREE_MAX_DEPTH, ge=0, le=COMMENT_TREE_MAX_DEPTH, description="Максимальная глубина ответов"
+    ),
+    current_user_id: str | None = Query(
+        None,
+        description="Опциональный Keycloak ID пользователя для поиска его реакции на комментарии",
+    ),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Возвращает дерево комментариев (CommentNode) указанного поста, постранично по веткам верхнего уровня
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor
+
+    Args:
+        post_id (UUID): идентификатор поста
+        response (Response): ответ, в заголовок которого пишется курсор
+        cursor (optional, str): курсор следующей страницы
+        limit (int): максимальное число веток на страницу (по умолчанию 10)
+        max_depth (int): глубина ответов; у комментариев последнего уровня has_more_replies ..
+            .. показывает, есть ли ответы глубже
+        current_user_id (optional, str): идентификатор пользователя
+        db (AsyncSession): асинхронная сессия для работы с базой данных
+
+    Returns:
+        list[CommentNode]: ветки комментариев
+    """
+    try:
+        threads, next_cursor = await list_comment_tree_async(
+            db, post_id, cursor, limit, max_depth, current_user_id
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    set_next_cursor(response, next_cursor)
+    return threads
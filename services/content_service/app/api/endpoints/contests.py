@@ -1,23 +1,33 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import authorize, get_current_user
-from app.core.database import get_db
+from app.core.database import get_async_read_db, get_db, get_read_db
+from app.core.pagination import InvalidCursorError, set_next_cursor
 from app.models.contest import Contest
-from app.schemas.contest import ContestCreate, ContestJoin, ContestRead
+from app.schemas.contest import (
+    ContestCreate,
+    ContestJoin,
+    ContestParticipantsImport,
+    ContestParticipantsImportResult,
+    ContestRead,
+)
 from app.schemas.problem import ProblemRead
 from app.schemas.user import UserRead
 from app.services.contest import (
     add_user_to_contest_by_username,
+    add_users_to_contest_bulk,
     create_contest,
     delete_contest,
     get_contest,
+    get_contest_async,
     join_public_contest,
     list_contest_participants,
-    list_contest_tasks,
+    list_contest_tasks_async,
     list_owner_contests,
-    list_public_contests,
+    list_public_contests_async,
     list_user_contests,
     update_contest,
 )
@@ -38,10 +48,18 @@ def get_contest_or_404(contest_id: UUID, db=Depends(get_db)):
     status_code=status.HTTP_200_OK,
 )
 def list_my_participate_contests_endpoint(
+    response: Response,
+    cursor: str | None = Query(None),
+    limit: int = Query(10, ge=1, le=100),
     user_claims: dict = Depends(get_current_user),
-    db=Depends(get_db),
+    db=Depends(get_read_db),
 ):
-    return list_user_contests(db, user_claims["sub"])
+    try:
+        contests, next_cursor = list_user_contests(db, user_claims["sub"], cursor, limit)
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    set_next_cursor(response, next_cursor)
+    return contests
 
 
 @router.post("/", response_model=ContestRead, status_code=status.HTTP_201_CREATED)
@@ -62,7 +80,10 @@ def list_my_contests_endpoint(
 
 
 @router.get("/{contest_id}", response_model=ContestRead)
-def read_contest_endpoint(contest: Contest = Depends(get_contest_or_404)):
+async def read_contest_endpoint(contest_id: UUID, db: AsyncSession = Depends(get_async_read_db)):
+    contest = await get_contest_async(db, contest_id)
+    if not contest:
+        raise HTTPException(status_code=404, detail="Contest not found")
     return contest
 
 
@@ -88,12 +109,18 @@ def delete_contest_endpoint(
 
 
 @router.get("/", response_model=list[ContestRead])
-def list_contests_endpoint(
-    offset: int = Query(0, ge=0),
-    limit: int = Query(10, ge=1),
-    db=Depends(get_db),
+async def list_contests_endpoint(
+    response: Response,
+    cursor: str | None = Query(None),
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    return list_public_contests(db, offset, limit)
+    try:
+        contests, next_cursor = await list_public_contests_async(db, cursor, limit)
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    set_next_cursor(response, next_cursor)
+    return contests
 
 
 @router.post("/{contest_id}/join", status_code=status.HTTP_204_NO_CONTENT)
@@ -118,16 +145,35 @@ def add_participant_endpoint(
     )
 
 
+@router.post("/{contest_id}/participants/bulk", response_model=ContestParticipantsImportResult)
+@authorize(required_role="admin", owner_param="contest", owner_field="created_by")
+def import_participants_endpoint(
+    payload: ContestParticipantsImport,
+    contest=Depends(get_contest_or_404),
+    db=Depends(get_db),
+    user_claims: dict = Depends(get_current_user),
+):
+    return add_users_to_contest_bulk(db, str(contest.id), payload.usernames)
+
+
 @router.get(
     "/{contest_id}/participants",
     response_model=list[UserRead],
     status_code=status.HTTP_200_OK,
 )
 def list_participants_endpoint(
+    response: Response,
+    cursor: str | None = Query(None),
+    limit: int = Query(50, ge=1, le=200),
     contest=Depends(get_contest_or_404),
-    db=Depends(get_db),
+    db=Depends(get_read_db),
 ):
-    return list_contest_participants(db, str(contest.id))
+    try:
+        participants, next_cursor = list_contest_participants(db, str(contest.id), cursor, limit)
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    set_next_cursor(response, next_cursor)
+    return participants
 
 
 @router.get(
@@ -135,8 +181,8 @@ def list_participants_endpoint(
     response_model=list[ProblemRead],
     status_code=status.HTTP_200_OK,
 )
-def list_tasks_endpoint(
-    contest_id: str,
-    db=Depends(get_db),
+async def list_tasks_endpoint(
+    contest_id: UUID,
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    return list_contest_tasks(db, str(contest_id))
+    return await list_contest_tasks_async(db, contest_id)
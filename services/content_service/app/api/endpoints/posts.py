@@ -1,11 +1,13 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.api.deps import authorize, get_current_user
 from app.api.endpoints.users import get_user_or_404
-from app.core.database import get_db
+from app.core.database import get_async_read_db, get_db, get_read_db
+from app.core.pagination import InvalidCursorError, set_next_cursor
 from app.models.post import Post
 from app.schemas.post import (
     PostCreate,
@@ -17,7 +19,7 @@ from app.services.post import (
     create_post,
     delete_post,
     get_post,
-    list_enriched_posts_by_problem,
+    list_enriched_posts_by_problem_async,
     list_posts,
     list_posts_by_problem,
     list_posts_by_tag,
@@ -230,22 +232,34 @@ def detach_tag_from_post(
 
 
 @router.get("/", response_model=list[PostRead])
-def list_all_posts(db: Session = Depends(get_db)):
+def list_all_posts(
+    response: Response,
+    cursor: str | None = Query(None, description="Курсор следующей страницы (заголовок X-Next-Cursor)"),
+    limit: int = Query(50, ge=1, le=200, description="Размер страницы"),
+    db: Session = Depends(get_read_db),
+):
     """
-    Возвращает список всех постов
+    Возвращает страницу постов от новых к старым, курсор следующей страницы - в заголовке X-Next-Cursor
 
     Args:
+        response (Response): ответ, в заголовок которого пишется курсор
+        cursor (optional, str): курсор следующей страницы
+        limit (int): размер страницы
         db (Session): объект сессии БД
 
     Returns:
         list[PostRead] - список постов
     """
-    posts = list_posts(db)
+    try:
+        posts, next_cursor = list_posts(db, cursor, limit)
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    set_next_cursor(response, next_cursor)
     return posts
 
 
 @router.get("/by-user/{user_id}", response_model=list[PostRead])
-def list_posts_by_user_endpoint(user_id: str, db: Session = Depends(get_db)):
+def list_posts_by_user_endpoint(user_id: str, db: Session = Depends(get_read_db)):
     """
     Возвращает список постов, созданных указанным пользователем
 
@@ -265,7 +279,7 @@ def list_posts_by_user_endpoint(user_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/by-problem/{problem_id}", response_model=list[PostRead])
-def list_posts_by_problem_endpoint(problem_id: str, db: Session = Depends(get_db)):
+def list_posts_by_problem_endpoint(problem_id: str, db: Session = Depends(get_read_db)):
     """
     Возвращает список постов, связанных с указанной задачей
 
@@ -281,7 +295,7 @@ def list_posts_by_problem_endpoint(problem_id: str, db: Session = Depends(get_db
 
 
 @router.get("/by-tag/{tag_id}", response_model=list[PostRead])
-def list_posts_by_tag_endpoint(tag_id: str, db: Session = Depends(get_db)):
+def list_posts_by_tag_endpoint(tag_id: str, db: Session = Depends(get_read_db)):
     """
     Возвращает список постов по указанному тегу.
 
@@ -297,35 +311,42 @@ def list_posts_by_tag_endpoint(tag_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/by-problem/enriched/{problem_id}", response_model=list[PostReadExtended])
-def list_enriched_posts_by_problem_endpoint(
-    problem_id: str,
-    offset: int = Query(0, ge=0, description="Смещение для выборки"),
-    limit: int = Query(10, ge=1, description="Максимальное число постов на страницу"),
-    tag_id: str | None = Query(None, description="Фильтр по идентификатору тега"),
+async def list_enriched_posts_by_problem_endpoint(
+    problem_id: UUID,
+    response: Response,
+    cursor: str | None = Query(None, description="Курсор следующей страницы (заголовок X-Next-Cursor)"),
+    limit: int = Query(10, ge=1, le=100, description="Максимальное число постов на страницу"),
+    tag_id: UUID | None = Query(None, description="Фильтр по идентификатору тега"),
     sort_by_rating: bool = Query(False, description="Сортировать по рейтингу"),
     sort_order: str = Query(
         "desc", description="Направление сортировки: 'asc' или 'desc'"
     ),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """
     Возвращает список задач (PostReadExtended) для указанной задачи
-    Пагинация реализована через параметры offset и limit
+    Пагинация реализована через параметры cursor и limit, курсор следующей страницы ..
+    .. возвращается в заголовке X-Next-Cursor
     Дополнительно можно фильтровать посты по тегу, сортировать по рейтингу
 
     Args:
-        problem_id (str): идентификатор задачи
-        offset (int): смещение для выборки (по умолчанию 0)
+        problem_id (UUID): идентификатор задачи
+        response (Response): ответ, в заголовок которого пишется курсор
+        cursor (optional, str): курсор следующей страницы
         limit (int): максимальное число задач на страницу (по умолчанию 10)
-        tag_id (optional, str): фильтр по идентификатору тега
+        tag_id (optional, UUID): фильтр по идентификатору тега
         sort_by_rating (bool): если True, сортирует задачи по рейтингу (reaction_balance)
         sort_order (str): направление сортировки ("asc", "desc")
-        db (Session): сессия для работы с базой данных
+        db (AsyncSession): асинхронная сессия для работы с базой данных
 
     Returns:
         List[ProblemReadExtended]: список задач.
     """
-    enriched_posts = list_enriched_posts_by_problem(
-        db, problem_id, offset, limit, tag_id, sort_by_rating, sort_order
-    )
+    try:
+        enriched_posts, next_cursor = await list_enriched_posts_by_problem_async(
+            db, problem_id, cursor, limit, tag_id, sort_by_rating, sort_order
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    set_next_cursor(response, next_cursor)
     return enriched_posts
@@ -1,32 +1,44 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.api.deps import authorize, get_current_user
 from app.api.endpoints.users import get_user_or_404
-from app.core.database import get_db
+from app.core.cache import CACHE_PROBLEMS, invalidate_responses
+from app.core.database import get_async_read_db, get_db, get_read_db
+from app.core.pagination import InvalidCursorError, set_next_cursor
 from app.models.problem import Problem
 from app.schemas.problem import (
     ProblemCreate,
+    ProblemFacets,
     ProblemRead,
     ProblemReadExtended,
     ProblemReadWithReaction,
+    ProblemSolvedItem,
+    ProblemSolvedResult,
+    ProblemsSolvedBulk,
+    SolvedMarkStatus,
+    TagMatch,
 )
 from app.services.problem import (
     create_problem,
     delete_problem,
     get_problem,
-    list_enriched_problems_filtered,
+    get_problem_async,
+    list_enriched_problems_filtered_async,
     list_problems,
     list_problems_by_difficulty,
     list_problems_by_tag,
     list_problems_by_user,
+    mark_problems_solved,
+    problem_facets_async,
     update_problem,
 )
-from app.services.reaction import compute_reaction_balance, get_user_reaction
+from app.services.reaction import compute_reaction_balances_async, get_user_reactions_async
 from app.services.tag import get_tag
-from app.services.user import get_user
+from app.services.user import get_user_async
 
 router = APIRouter(prefix="/problems", tags=["problems"])
 
@@ -43,9 +55,29 @@ def get_problem_or_404(problem_id: str, db: Session = Depends(get_db)) -> Proble
     return problem
 
 
+@router.post("/solved/bulk", response_model=list[ProblemSolvedResult])
+def mark_problems_solved_bulk_endpoint(
+    solved_in: ProblemsSolvedBulk,
+    db: Session = Depends(get_db),
+) -> list[ProblemSolvedResult]:
+    """
+    Помечает задачи решёнными для пар (задача, пользователь) одним INSERT ... ON CONFLICT DO NOTHING.
+    Вызывается диспетчером outbox tester_service, повторная доставка пачки безопасна.
+
+    Args:
+        solved_in (ProblemsSolvedBulk): пары (задача, пользователь)
+        db (Session): сессия для работы с базой данных
+
+    Returns:
+        list[ProblemSolvedResult]: результат по каждой уникальной паре
+            (created, already_solved, user_not_found, problem_not_found)
+    """
+    return mark_problems_solved(db, solved_in.items)
+
+
 @router.post("/solved/{problem_id}", status_code=status.HTTP_204_NO_CONTENT)
 def mark_problem_as_solved_endpoint(
-    problem_id: str,
+    problem_id: UUID,
     user_id: str = Query(..., description="ID пользователя, который решил задачу"),
     db: Session = Depends(get_db),
 ) -> None:
@@ -54,7 +86,7 @@ def mark_problem_as_solved_endpoint(
     Добавляет запись в таблицу solved_problems
 
     Args:
-        problem_id (str): идентификатор задачи
+        problem_id (UUID): идентификатор задачи
         user_id (str): User.keycloak_id пользователя, который решил задачу
         db (Session): сессия для работы с базой данных
 
@@ -64,15 +96,11 @@ def mark_problem_as_solved_endpoint(
     Raises:
         HTTPException 404: если пользователь или задача не найдены.
     """
-    user = get_user(db, user_id)
-
-    problem = get_problem(db, problem_id)
-    if problem in user.solved_problems:
-        return
-
-    user.solved_problems.append(problem)
-    db.commit()
-    return
+    [result] = mark_problems_solved(db, [ProblemSolvedItem(problem_id=problem_id, user_id=user_id)])
+    if result["status"] == SolvedMarkStatus.USER_NOT_FOUND:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User can't be found")
+    if result["status"] == SolvedMarkStatus.PROBLEM_NOT_FOUND:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Problem can't be found")
 
 
 @router.post("/", response_model=ProblemRead)
@@ -97,46 +125,102 @@ def create_problem_endpoint(
 
 
 @router.get("/enriched", response_model=list[ProblemReadExtended])
-def list_enriched_problems_endpoint(
-    offset: int = Query(0, ge=0, description="Смещение для выборки"),
-    limit: int = Query(10, ge=1, description="Количество задач на страницу"),
+async def list_enriched_problems_endpoint(
+    response: Response,
+    cursor: str | None = Query(None, description="Курсор следующей страницы (заголовок X-Next-Cursor)"),
+    limit: int = Query(10, ge=1, le=100, description="Количество задач на страницу"),
     difficulty: str | None = Query(
         None, description="Фильтр по сложности (EASY, MEDIUM, HARD)"
     ),
-    tag_id: str | None = Query(None, description="Фильтр по идентификатору тега"),
+    tag_id: list[UUID] = Query(
+        [], description="Фильтр по тегам, параметр повторяется: ?tag_id=...&tag_id=..."
+    ),
+    tag_match: TagMatch = Query(
+        TagMatch.all, description="all - задачи со всеми тегами, any - хотя бы с одним"
+    ),
     sort_by_rating: bool = Query(False, description="Сортировать по рейтингу"),
     sort_order: str = Query(
         "desc", description="Направление сортировки: 'asc' или 'desc'"
     ),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """
     Возвращает список задач (ProblemReadExtended)
-    Пагинация реализована через параметры offset и limit
-    Дополнительно можно фильтровать задачи по сложности и тегу, сортировать по рейтингу
+    Пагинация реализована через параметры cursor и limit, курсор следующей страницы ..
+    .. возвращается в заголовке X-Next-Cursor
+    Дополнительно можно фильтровать задачи по сложности и тегам, сортировать по рейтингу
 
     Args:
-        offset (int): смещение для выборки (по умолчанию 0)
+        response (Response): ответ, в заголовок которого пишется курсор
+        cursor (optional, str): курсор следующей страницы
         limit (int): максимальное число задач на страницу (по умолчанию 10)
         difficulty (optional, str): фильтр по сложности ("EASY", "MEDIUM", "HARD")
-        tag_id (optional, str): фильтр по идентификатору тега
+        tag_id (list[UUID]): фильтр по идентификаторам тегов
+        tag_match (TagMatch): задачи со всеми тегами из tag_id (all) или хотя бы с одним (any)
         sort_by_rating (bool): если True, сортирует задачи по рейтингу (reaction_balance)
         sort_order (str): направление сортировки ("asc", "desc")
-        db (Session): сессия для работы с базой данных
+        db (AsyncSession): асинхронная сессия для работы с базой данных
 
     Returns:
         List[ProblemReadExtended]: список задач.
     """
-    enriched_problems = list_enriched_problems_filtered(
-        db, offset, limit, difficulty, tag_id, sort_by_rating, sort_order
-    )
+    try:
+        enriched_problems, next_cursor = await list_enriched_problems_filtered_async(
+            db, cursor, limit, difficulty, tag_id, sort_by_rating, sort_order, tag_match
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    set_next_cursor(response, next_cursor)
     return enriched_problems
 
 
+@router.get("/facets", response_model=ProblemFacets)
+async def problem_facets_endpoint(
+    difficulty: str | None = Query(
+        None, description="Фильтр по сложности (EASY, MEDIUM, HARD)"
+    ),
+    tag_id: list[UUID] = Query([], description="Выбранные теги, параметр повторяется"),
+    tag_match: TagMatch = Query(TagMatch.all, description="all или any, как в /problems/enriched"),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Счетчики для боковой панели фильтров каталога: число задач по сложности и по тегам
+    при тех же фильтрах, что и /problems/enriched
+
+    Args:
+        difficulty (optional, str): выбранная сложность
+        tag_id (list[UUID]): выбранные теги
+        tag_match (TagMatch): all или any
+        db (AsyncSession): асинхронная сессия для работы с базой данных
+
+    Returns:
+        ProblemFacets: {"difficulty": [...], "tags": [...]}
+    """
+    return await problem_facets_async(db, difficulty, tag_id, tag_match)
+
+
+@router.get("/{problem_id}/judging", response_model=ProblemRead)
+def read_problem_for_judging_endpoint(problem: Problem = Depends(get_problem_or_404)):
+    """
+    Возвращает тест-кейсы и лимиты задачи для проверки решений в tester_service.
+    Читает основную БД и не кэшируется: правка тестов сразу видна проверке и перепроверке
+
+    Args:
+        problem (Problem): объект задачи, полученный из основной БД
+
+    Returns:
+        ProblemRead: задача с тест-кейсами и лимитами
+
+    Raises:
+        HTTPException: 404, если задача не найдена
+    """
+    return problem
+
+
 @router.get("/{problem_id}", response_model=ProblemReadWithReaction)
-def read_problem_with_reaction_endpoint(
-    problem_id: str,
-    db: Session = Depends(get_db),
+async def read_problem_with_reaction_endpoint(
+    problem_id: UUID,
+    db: AsyncSession = Depends(get_async_read_db),
     user_id: str | None = Query(
         None,
         description="Опционально, ID пользователя для получения его реакции на задачу",
@@ -146,8 +230,8 @@ def read_problem_with_reaction_endpoint(
     Возвращает информацию о задаче в виде ProblemReadWithReaction
 
     Args:
-        problem_id (str): идентификатор задачи
-        db (Session): сессия для работы с базой данных
+        problem_id (UUID): идентификатор задачи
+        db (AsyncSession): асинхронная сессия для работы с базой данных
         user_id (str, optional): User.keycloak_ID пользователя для поиска его реакции
 
     Returns:
@@ -156,22 +240,25 @@ def read_problem_with_reaction_endpoint(
     Raises:
         HTTPException: 404, если задача не найдена
     """
-    problem = get_problem_or_404(problem_id, db)
+    problem = await get_problem_async(db, problem_id)
+    if not problem:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Problem can't be found"
+        )
 
-    user_obj = get_user(db, problem.created_by)
+    user_obj = await get_user_async(db, problem.created_by)
     author_display_name = user_obj.display_name if user_obj else None
 
-    reaction_balance = compute_reaction_balance(db, problem_id, "problem")
+    balances = await compute_reaction_balances_async(db, [problem.id], "problem")
 
     user_reaction = None
     if user_id:
-        reaction = get_user_reaction(db, problem_id, "problem", user_id)
-        if reaction:
-            user_reaction = reaction.reaction_type
+        reactions = await get_user_reactions_async(db, [problem.id], "problem", user_id)
+        user_reaction = reactions.get(problem.id)
 
     response = ProblemReadWithReaction.from_orm(problem)
     response.author_display_name = author_display_name
-    response.reaction_balance = reaction_balance
+    response.reaction_balance = balances[problem.id]
     response.user_reaction = user_reaction
     return response
 
@@ -258,6 +345,7 @@ def attach_tag_to_problem(
         )
     problem.tags.append(tag)
     db.commit()
+    invalidate_responses(CACHE_PROBLEMS)
     return None
 
 
@@ -291,26 +379,39 @@ def detach_tag_from_problem(
         )
     problem.tags.remove(tag)
     db.commit()
+    invalidate_responses(CACHE_PROBLEMS)
     return None
 
 
 @router.get("/", response_model=list[ProblemRead])
-def list_problems_endpoint(db: Session = Depends(get_db)):
+def list_problems_endpoint(
+    response: Response,
+    cursor: str | None = Query(None, description="Курсор следующей страницы (заголовок X-Next-Cursor)"),
+    limit: int = Query(50, ge=1, le=200, description="Размер страницы"),
+    db: Session = Depends(get_read_db),
+):
     """
-    Возвращает список всех задач
+    Возвращает страницу задач от новых к старым, курсор следующей страницы - в заголовке X-Next-Cursor
 
     Args:
+        response (Response): ответ, в заголовок которого пишется курсор
+        cursor (optional, str): курсор следующей страницы
+        limit (int): размер страницы
         db (Session): объект сессии БД
 
     Returns:
         list[ProblemRead] - список задач
     """
-    problems = list_problems(db)
+    try:
+        problems, next_cursor = list_problems(db, cursor, limit)
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    set_next_cursor(response, next_cursor)
     return problems
 
 
 @router.get("/by-tag/{tag_id}", response_model=list[ProblemRead])
-def list_problems_by_tag_endpoint(tag_id: str, db: Session = Depends(get_db)):
+def list_problems_by_tag_endpoint(tag_id: str, db: Session = Depends(get_read_db)):
     """
     Возвращает список задач, связанных с указанным тегом
 
@@ -326,7 +427,7 @@ def list_problems_by_tag_endpoint(tag_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/by-user/{user_id}", response_model=list[ProblemRead])
-def list_problems_by_user_endpoint(user_id: str, db: Session = Depends(get_db)):
+def list_problems_by_user_endpoint(user_id: str, db: Session = Depends(get_read_db)):
     """
     Возвращает список задач, созданных указанным пользователем
 
@@ -347,7 +448,7 @@ def list_problems_by_user_endpoint(user_id: str, db: Session = Depends(get_db)):
 
 @router.get("/by-difficulty/{difficulty}", response_model=list[ProblemRead])
 def list_problems_by_difficulty_endpoint(
-    difficulty: str, db: Session = Depends(get_db)
+    difficulty: str, db: Session = Depends(get_read_db)
 ):
     """
     Возвращает список задач заданной сложности.
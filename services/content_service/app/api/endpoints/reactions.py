@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.schemas.reaction import (
     ReactionCreate,
     ReactionListResponse,
@@ -27,7 +27,7 @@ def list_reactions_for_target_endpoint(
     target_type: TargetType = Query(
         ..., description="Тип целевого объекта ('post', 'comment')"
     ),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     Возвращает список реакций для указанного target и суммарный баланс.
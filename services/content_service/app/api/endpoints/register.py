@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.schemas.user import UserCreate, UserRead, UserRegistration
-from app.services.keycloak import get_keycloak_admin_token, register_user_in_keycloak
+from app.services.keycloak import register_user_in_keycloak
 from app.services.user import create_user
 
 router = APIRouter(prefix="/register", tags=["registration"])
@@ -41,8 +41,7 @@ def register_user(user_in: UserRegistration, db: Session = Depends(get_db)):
             {"type": "password", "value": user_in.password, "temporary": False}
         ],
     }
-    admin_token = get_keycloak_admin_token()
-    keycloak_id = register_user_in_keycloak(keycloak_payload, admin_token)
+    keycloak_id = register_user_in_keycloak(keycloak_payload)
 
     user_create = UserCreate(
         username=user_in.username,
@@ -0,0 +1,62 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_read_db
+from app.core.pagination import NEXT_CURSOR_HEADER, InvalidCursorError, set_next_cursor
+from app.schemas.problem import DifficultyEnum
+from app.schemas.search import SearchFacets, SearchResults, SearchTarget
+from app.services.search import search_async, search_facets_async
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get(
+    "/",
+    response_model=SearchResults,
+    summary="Полнотекстовый поиск",
+    description="Поиск по задачам, постам или блог постам, от более релевантных к менее. "
+    "Строка поиска: слова через пробел, \"фраза\", or, -слово. Фасеты по сложности и тегам "
+    f"возвращаются только для первой страницы, курсор следующей - в заголовке {NEXT_CURSOR_HEADER}.",
+)
+async def search_endpoint(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Поисковая строка"),
+    target: SearchTarget = Query(SearchTarget.problem, alias="type", description="Где искать"),
+    difficulty: DifficultyEnum | None = Query(None, description="Фильтр по сложности (только задачи)"),
+    tag_id: UUID | None = Query(None, description="Фильтр по тегу (задачи и посты)"),
+    cursor: str | None = Query(None, description="Курсор следующей страницы"),
+    limit: int = Query(20, ge=1, le=50, description="Размер страницы"),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> SearchResults:
+    """
+    Ищет задачи, посты или блог посты по строке q
+
+    Args:
+        response (Response): ответ, в заголовок которого пишется курсор
+        q (str): поисковая строка
+        target (SearchTarget): где искать (problem, post, blog_post)
+        difficulty (DifficultyEnum, optional): фильтр по сложности
+        tag_id (UUID, optional): фильтр по тегу
+        cursor (str, optional): курсор следующей страницы
+        limit (int): размер страницы
+        db (AsyncSession): асинхронная сессия БД
+
+    Returns:
+        SearchResults: найденные объекты и, для первой страницы, фасеты
+
+    Raises:
+        HTTPException: 400, если курсор поврежден
+    """
+    difficulty = difficulty.value if difficulty else None
+    try:
+        hits, next_cursor = await search_async(db, q, target, cursor, limit, difficulty, tag_id)
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    set_next_cursor(response, next_cursor)
+
+    facets = None
+    if cursor is None:
+        facets = SearchFacets(**await search_facets_async(db, q, target, difficulty, tag_id))
+    return SearchResults(hits=hits, facets=facets)
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import authorize, get_current_user
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.pagination import InvalidCursorError, set_next_cursor
 from app.schemas.tag import TagCreate, TagRead
 from app.services.tag import create_tag, delete_tag, get_tag, get_tags, update_tag
 
@@ -118,15 +119,27 @@ def delete_tag_endpoint(
 
 
 @router.get("/", response_model=list[TagRead])
-def list_tags_endpoint(db: Session = Depends(get_db)) -> list[TagRead]:
+def list_tags_endpoint(
+    response: Response,
+    cursor: str | None = Query(None, description="Курсор следующей страницы (заголовок X-Next-Cursor)"),
+    limit: int = Query(200, ge=1, le=1000, description="Размер страницы"),
+    db: Session = Depends(get_read_db),
+) -> list[TagRead]:
     """
-    Возвращает список всех тегов.
+    Возвращает страницу тегов по алфавиту, курсор следующей страницы - в заголовке X-Next-Cursor.
 
     Args:
+        response (Response): ответ, в заголовок которого пишется курсор
+        cursor (optional, str): курсор следующей страницы
+        limit (int): размер страницы
         db (Session): объект сессии БД
 
     Returns:
-        list[TagRead] - список всех тегов
+        list[TagRead] - список тегов
     """
-    tags = get_tags(db)
+    try:
+        tags, next_cursor = get_tags(db, cursor, limit)
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    set_next_cursor(response, next_cursor)
     return tags
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import authorize, get_current_user
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.pagination import InvalidCursorError, set_next_cursor
 from app.models.user import User
 from app.schemas.user import UserCreate, UserRead, UserReadExtended
 from app.services.user import (
@@ -203,15 +204,27 @@ def delete_user_endpoint(
 
 
 @router.get("/", response_model=list[UserRead])
-def list_users_endpoint(db: Session = Depends(get_db)) -> list[UserRead]:
+def list_users_endpoint(
+    response: Response,
+    cursor: str | None = Query(None, description="Курсор следующей страницы (заголовок X-Next-Cursor)"),
+    limit: int = Query(50, ge=1, le=200, description="Размер страницы"),
+    db: Session = Depends(get_read_db),
+) -> list[UserRead]:
     """
-    Возвращает список всех пользователей
+    Возвращает страницу пользователей по username, курсор следующей страницы - в заголовке X-Next-Cursor
 
     Args:
+        response (Response): ответ, в заголовок которого пишется курсор
+        cursor (optional, str): курсор следующей страницы
+        limit (int): размер страницы
         db (Session): объект сессии БД
 
     Returns:
         list[UserRead] - список пользователей
     """
-    users = get_users(db)
+    try:
+        users, next_cursor = get_users(db, cursor, limit)
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    set_next_cursor(response, next_cursor)
     return users
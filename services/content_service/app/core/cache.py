@@ -0,0 +1,364 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.metrics import RESPONSE_CACHE_INVALIDATIONS, RESPONSE_CACHE_REQUESTS
+
+# группы кэшируемых ответов: изменение данных сбрасывает всю группу
+CACHE_PROBLEMS = "problems"
+CACHE_CONTESTS = "contests"
+CACHE_BLOG_POSTS = "blog_posts"
+CACHE_TAGS = "tags"
+
+UUID_PATTERN = r"[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}"
+
+# заголовки ответа, которые не сохраняются в кэше
+SKIPPED_HEADERS = frozenset({"content-length", "set-cookie", "date", "server", "etag", "x-cache"})
+
+
+class MemoryCacheBackend:
+    """
+    LRU + TTL в памяти процесса. Сброс группы виден только этому процессу:
+    остальные воркеры uvicorn отдают старый ответ до истечения TTL
+    """
+
+    blocking = False
+
+    def __init__(self, max_entries: int = 5000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + ttl, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def counter(self, key: str) -> int:
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+
+class RedisCacheBackend:
+    """
+    Общий для всех процессов кэш в Redis: сброс группы сразу виден всем воркерам
+    """
+
+    blocking = True
+
+    def __init__(self, url: str):
+        import redis  # нужен только при RESPONSE_CACHE_BACKEND=redis
+
+        self.client = redis.Redis.from_url(
+            url, socket_timeout=settings.RESPONSE_CACHE_REDIS_TIMEOUT,
+            socket_connect_timeout=settings.RESPONSE_CACHE_REDIS_TIMEOUT,
+        )
+
+    def get(self, key: str) -> bytes | None:
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.client.set(key, value, px=max(int(ttl * 1000), 1))
+
+    def counter(self, key: str) -> int:
+        return int(self.client.get(key) or 0)
+
+    def incr(self, key: str) -> int:
+        return self.client.incr(key)
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(f"{settings.RESPONSE_CACHE_PREFIX}:*"):
+            self.client.delete(key)
+
+
+@dataclass(frozen=True)
+class CacheRule:
+    """
+    Кэшируемый GET-эндпоинт
+
+    Args:
+        name: метка маршрута в метриках,
+        path: регулярное выражение пути,
+        group: группа, которую сбрасывают изменения данных,
+        ttl: время жизни ответа в секундах,
+        params: query-параметры, входящие в ключ, со значениями по умолчанию
+            (параметр со значением по умолчанию не отличается от отсутствующего),
+        bypass_params: параметры, при которых ответ персональный и не кэшируется,
+        multi_params: параметры-списки (?tag_id=a&tag_id=b) из params, в ключ входят все значения
+    """
+
+    name: str
+    path: re.Pattern
+    group: str
+    ttl: float
+    params: dict[str, str | None] = field(default_factory=dict)
+    bypass_params: tuple[str, ...] = ()
+    multi_params: tuple[str, ...] = ()
+
+    def cache_key(self, request: Request) -> str:
+        """
+        Нормализованный ключ: путь и только известные параметры, отсортированные по имени,
+        без пустых значений и значений по умолчанию. Повторенный параметр - последнее значение,
+        у параметров-списков - все различные значения в отсортированном порядке
+        """
+        values = {}
+        lists = {}
+        for name, value in request.query_params.multi_items():
+            if name in self.multi_params:
+                if value.strip():
+                    lists.setdefault(name, set()).add(value.strip().lower())
+            elif name in self.params:
+                values[name] = value.strip()
+        query = sorted(
+            (name, value) for name, value in values.items()
+            if value and value.lower() != (self.params[name] or "").lower()
+        )
+        query += [(name, value) for name in sorted(lists) for value in sorted(lists[name])]
+        query.sort(key=lambda item: item[0])
+        return f"{request.url.path}?{urlencode(query)}" if query else request.url.path
+
+
+CACHE_RULES = (
+    CacheRule(
+        "problems_enriched", re.compile(r"/problems/enriched"), CACHE_PROBLEMS,
+        settings.RESPONSE_CACHE_PROBLEMS_TTL,
+        params={"cursor": None, "limit": "10", "difficulty": None, "tag_id": None, "tag_match": "all",
+                "sort_by_rating": "false", "sort_order": "desc"},
+        multi_params=("tag_id",),
+    ),
+    CacheRule(
+        "problems_facets", re.compile(r"/problems/facets"), CACHE_PROBLEMS,
+        settings.RESPONSE_CACHE_PROBLEMS_TTL,
+        params={"difficulty": None, "tag_id": None, "tag_match": "all"},
+        multi_params=("tag_id",),
+    ),
+    CacheRule(
+        "problem", re.compile(rf"/problems/{UUID_PATTERN}"), CACHE_PROBLEMS,
+        settings.RESPONSE_CACHE_PROBLEM_TTL,
+        bypass_params=("user_id",),
+    ),
+    CacheRule(
+        "contests", re.compile(r"/contests/"), CACHE_CONTESTS,
+        settings.RESPONSE_CACHE_CONTESTS_TTL,
+        params={"cursor": None, "limit": "10"},
+    ),
+    CacheRule(
+        "blog_posts", re.compile(r"/blogposts/"), CACHE_BLOG_POSTS,
+        settings.RESPONSE_CACHE_BLOG_POSTS_TTL,
+        params={"cursor": None, "limit": "10"},
+    ),
+    CacheRule(
+        "tags", re.compile(r"/tags/"), CACHE_TAGS,
+        settings.RESPONSE_CACHE_TAGS_TTL,
+        params={"cursor": None, "limit": "200"},
+    ),
+)
+
+
+@dataclass
+class CachedResponse:
+    status_code: int
+    headers: dict[str, str]
+    body: bytes
+    etag: str
+
+    def to_bytes(self) -> bytes:
+        meta = json.dumps({"status_code": self.status_code, "headers": self.headers, "etag": self.etag})
+        return meta.encode() + b"\n" + self.body
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CachedResponse":
+        meta, body = data.split(b"\n", 1)
+        return cls(body=body, **json.loads(meta))
+
+
+def make_etag(body: bytes) -> str:
+    """
+    Сильный ETag: хэш тела ответа
+    """
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Проверяет If-None-Match (список ETag через запятую или *) против etag
+    """
+    if not if_none_match:
+        return False
+    candidates = [c.strip().removeprefix("W/") for c in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class ResponseCache:
+    """
+    Кэш ответов анонимных GET-запросов: ключ - группа, ее поколение и нормализованный URL.
+    Сброс группы увеличивает поколение, и старые записи больше не читаются, а вытесняются по TTL/LRU.
+    """
+
+    def __init__(self, backend, rules: tuple[CacheRule, ...] = CACHE_RULES):
+        self.backend = backend
+        self.rules = rules
+
+    def match(self, request: Request) -> CacheRule | None:
+        if self.backend is None or request.method != "GET" or "authorization" in request.headers:
+            return None
+        for rule in self.rules:
+            if rule.path.fullmatch(request.url.path):
+                if any(name in request.query_params for name in rule.bypass_params):
+                    return None
+                return rule
+        return None
+
+    def _group_key(self, group: str) -> str:
+        return f"{settings.RESPONSE_CACHE_PREFIX}:group:{group}"
+
+    def entry_key(self, rule: CacheRule, request: Request) -> str:
+        generation = self.backend.counter(self._group_key(rule.group))
+        return f"{settings.RESPONSE_CACHE_PREFIX}:{rule.group}:{generation}:{rule.cache_key(request)}"
+
+    def load(self, key: str) -> CachedResponse | None:
+        data = self.backend.get(key)
+        return CachedResponse.from_bytes(data) if data is not None else None
+
+    def store(self, key: str, rule: CacheRule, cached: CachedResponse) -> None:
+        self.backend.set(key, cached.to_bytes(), rule.ttl)
+
+    def invalidate(self, *groups: str) -> None:
+        """
+        Сбрасывает кэш ответов групп groups. Ошибка бэкенда не прерывает запись данных:
+        ответы устареют не дольше чем на TTL
+        """
+        if self.backend is None:
+            return
+        for group in groups:
+            try:
+                self.backend.incr(self._group_key(group))
+            except Exception:
+                logger.exception("response_cache_invalidate_failed", extra={'group': group})
+                continue
+            RESPONSE_CACHE_INVALIDATIONS.labels(group=group).inc()
+            logger.debug("response_cache_invalidate", extra={'group': group})
+
+    def clear(self) -> None:
+        if self.backend is not None:
+            self.backend.clear()
+
+
+def build_backend():
+    """
+    Создает бэкенд кэша ответов по RESPONSE_CACHE_BACKEND (memory, redis, none)
+    """
+    kind = settings.RESPONSE_CACHE_BACKEND.lower()
+    if kind == "memory":
+        return MemoryCacheBackend(settings.RESPONSE_CACHE_MAX_ENTRIES)
+    if kind == "redis":
+        return RedisCacheBackend(settings.RESPONSE_CACHE_REDIS_URL)
+    if kind == "none":
+        return None
+    raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {settings.RESPONSE_CACHE_BACKEND}")
+
+
+response_cache = ResponseCache(build_backend())
+
+
+def invalidate_responses(*groups: str) -> None:
+    """
+    Хук для сервисных функций create/update/delete: сбрасывает кэш ответов групп groups
+
+    Args:
+        groups (str): группы кэша (CACHE_PROBLEMS, CACHE_CONTESTS, CACHE_BLOG_POSTS, CACHE_TAGS)
+    """
+    response_cache.invalidate(*groups)
+
+
+def _cached_response(cached: CachedResponse, request: Request, result: str) -> Response:
+    headers = {**cached.headers, "ETag": cached.etag, "Cache-Control": "no-cache", "X-Cache": result}
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        headers.pop("content-type", None)
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, status_code=cached.status_code, headers=headers)
+
+
+async def _call(func, *args):
+    # запросы к Redis блокирующие и не выполняются в event loop
+    if response_cache.backend.blocking:
+        return await run_in_threadpool(func, *args)
+    return func(*args)
+
+
+async def response_cache_middleware(request: Request, call_next):
+    """
+    HTTP middleware: отдает анонимные GET-ответы из CACHE_RULES из кэша, ставит сильный ETag
+    и отвечает 304 на совпадающий If-None-Match. Недоступность кэша не ломает запрос
+    """
+    rule = response_cache.match(request)
+    if rule is None:
+        return await call_next(request)
+
+    key = None
+    try:
+        key = await _call(response_cache.entry_key, rule, request)
+        cached = await _call(response_cache.load, key)
+    except Exception:
+        logger.exception("response_cache_get_failed", extra={'route': rule.name})
+        cached = None
+    if cached is not None:
+        response = _cached_response(cached, request, "HIT")
+        result = "not_modified" if response.status_code == 304 else "hit"
+        RESPONSE_CACHE_REQUESTS.labels(route=rule.name, result=result).inc()
+        return response
+
+    response = await call_next(request)
+    if response.status_code != 200:
+        RESPONSE_CACHE_REQUESTS.labels(route=rule.name, result="skip").inc()
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    cached = CachedResponse(
+        status_code=response.status_code,
+        headers={k: v for k, v in response.headers.items() if k not in SKIPPED_HEADERS},
+        body=body,
+        etag=make_etag(body),
+    )
+    if key is not None:
+        try:
+            await _call(response_cache.store, key, rule, cached)
+        except Exception:
+            logger.exception("response_cache_set_failed", extra={'route': rule.name})
+    RESPONSE_CACHE_REQUESTS.labels(route=rule.name, result="miss").inc()
+    return _cached_response(cached, request, "MISS")
@@ -13,6 +13,18 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = "DEBUG"
 
     DATABASE_URL: str = "12345"
+    # URL для асинхронного движка; по умолчанию DATABASE_URL с драйвером asyncpg
+    ASYNC_DATABASE_URL: str | None = None
+
+    # пул соединений SQLAlchemy (app.core.database), на каждый процесс uvicorn/celery
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT: float = 10.0  # секунд ожидания свободного соединения
+    DB_POOL_RECYCLE: int = 1800  # секунд, после которых соединение пересоздается
+    DB_POOL_PRE_PING: bool = True  # проверять соединение перед выдачей из пула
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # 0 - без ограничения
+    # реплика для read-only запросов (списки, просмотр); по умолчанию - DATABASE_URL
+    DATABASE_REPLICA_URL: str | None = None
 
     KEYCLOAK_URL: str = "http://keycloak:8080"
     KEYCLOAK_REALM: str = "myrealm"
@@ -21,6 +33,41 @@ class Settings(BaseSettings):
 
     KEYCLOAK_ADMIN: str = "admin"
     KEYCLOAK_ADMIN_PASSWORD: str = "admin"
+    KEYCLOAK_ADMIN_TOKEN_LEEWAY: int = 30  # секунд до истечения admin token, когда он обновляется
+
+    # проверка JWT (app.core.security)
+    JWT_CACHE_SIZE: int = 10000  # проверенных токенов в LRU-кэше claims, 0 - без кэша
+    JWKS_REFRESH_INTERVAL: float = 30.0  # секунд, не чаще перезагружать JWKS при неизвестном kid
+    JWKS_REFRESH_WAIT: float = 3.0  # секунд, сколько запрос ждет перезагрузку JWKS
+
+    TESTER_SERVICE_URL: str = "http://tester_service:8001"
+
+    # HTTP-клиент к tester_service и Keycloak (app.core.http)
+    HTTP_CONNECT_TIMEOUT: float = 1.0
+    HTTP_READ_TIMEOUT: float = 5.0
+    HTTP_RETRIES: int = 2  # повторы GET после ошибки соединения, таймаута или 502/503/504
+    HTTP_RETRY_BACKOFF: float = 0.2  # секунд, удваивается с каждой попыткой
+    HTTP_POOL_SIZE: int = 20
+    HTTP_CIRCUIT_FAILURES: int = 5  # сбоев подряд до размыкания цепи
+    HTTP_CIRCUIT_RESET: float = 30.0  # секунд до пробного запроса
+
+    # кэш ответов анонимных GET-запросов (app.core.cache)
+    RESPONSE_CACHE_BACKEND: str = "memory"  # memory, redis, none
+    RESPONSE_CACHE_REDIS_URL: str = "redis://redis:6379/0"
+    RESPONSE_CACHE_REDIS_TIMEOUT: float = 0.2  # секунд; при недоступности Redis запрос идет в БД
+    RESPONSE_CACHE_PREFIX: str = "content:responses"
+    RESPONSE_CACHE_MAX_ENTRIES: int = 5000  # только для memory
+    # TTL в секундах по маршрутам
+    RESPONSE_CACHE_PROBLEMS_TTL: float = 30.0  # GET /problems/enriched
+    RESPONSE_CACHE_PROBLEM_TTL: float = 60.0  # GET /problems/{id}
+    RESPONSE_CACHE_CONTESTS_TTL: float = 30.0  # GET /contests/
+    RESPONSE_CACHE_BLOG_POSTS_TTL: float = 60.0  # GET /blog_posts/
+    RESPONSE_CACHE_TAGS_TTL: float = 300.0  # GET /tags/
+
+    TRACING_SERVICE_NAME: str = "content_service"
+    TRACING_EXPORTER: str = "none"  # otlp, console, file, none
+    TRACING_OTLP_ENDPOINT: str = "http://otel-collector:4318/v1/traces"
+    TRACING_FILE_PATH: str = "traces.jsonl"
 
 
 settings = Settings()
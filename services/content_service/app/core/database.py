@@ -1,15 +1,99 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
+from app.core.tracing import instrument_engine
 from app.models import comment, post, problem, reaction, solved_problems, tag, user, blog_post, contest
 from app.models.base import Base
 
-engine = create_engine(settings.DATABASE_URL, future=True, echo=False)
+
+def engine_options(url: str) -> dict:
+    """
+    Возвращает параметры пула соединений и statement_timeout для create_engine / create_async_engine
+    из настроек DB_*. SQLite (локальный запуск, тесты) пул не настраивается.
+
+    Args:
+        url (str): URL базы данных
+
+    Returns:
+        dict: именованные аргументы create_engine
+    """
+    url = make_url(url)
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if url.get_backend_name() == "sqlite":
+        return options
+
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if url.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+
+def async_database_url(url: str) -> str:
+    """
+    Возвращает URL той же БД с асинхронным драйвером (postgresql -> postgresql+asyncpg, sqlite -> sqlite+aiosqlite)
+    """
+    url = make_url(url)
+    if url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+    elif url.get_backend_name() == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url.render_as_string(hide_password=False)
+
+
+class ReadOnlySession(Session):
+    """
+    Сессия к реплике: flush запрещен, запись идет только через SessionLocal / AsyncSessionLocal
+    """
+
+
+@event.listens_for(ReadOnlySession, "before_flush")
+def _forbid_writes(session, flush_context, instances) -> None:
+    raise RuntimeError("Read-only session: writes must go through SessionLocal")
+
+
+engine = create_engine(settings.DATABASE_URL, future=True, echo=False, **engine_options(settings.DATABASE_URL))
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
 
+# асинхронный движок для горячих read-эндпоинтов: запрос к БД не занимает поток из threadpool
+ASYNC_URL = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(ASYNC_URL, echo=False, **engine_options(ASYNC_URL))
+instrument_engine(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# read-only запросы (списки, просмотр) идут в реплику; без DATABASE_REPLICA_URL - в основную БД
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_engine(
+        settings.DATABASE_REPLICA_URL, future=True, echo=False, **engine_options(settings.DATABASE_REPLICA_URL)
+    )
+    instrument_engine(replica_engine)
+    ASYNC_REPLICA_URL = async_database_url(settings.DATABASE_REPLICA_URL)
+    async_replica_engine = create_async_engine(ASYNC_REPLICA_URL, echo=False, **engine_options(ASYNC_REPLICA_URL))
+    instrument_engine(async_replica_engine.sync_engine)
+else:
+    replica_engine = engine
+    async_replica_engine = async_engine
+ReadSessionLocal = sessionmaker(
+    class_=ReadOnlySession, autocommit=False, autoflush=False, bind=replica_engine, future=True
+)
+AsyncReadSessionLocal = async_sessionmaker(
+    async_replica_engine, sync_session_class=ReadOnlySession, autoflush=False, expire_on_commit=False
+)
+
 
 def get_db() -> Generator:
     db = SessionLocal()
@@ -17,3 +101,25 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+
+def get_read_db() -> Generator:
+    """
+    Сессия для эндпоинтов, которые только читают: запросы уходят в реплику, запись запрещена.
+    Реплика может отставать, поэтому то, что читается сразу после записи, берется из get_db
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -0,0 +1,175 @@
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.metrics import HTTP_CLIENT_CIRCUIT_OPENED, HTTP_CLIENT_RETRIES, HTTP_CLIENT_SECONDS
+from app.core.tracing import inject_headers
+
+# ответы, после которых запрос имеет смысл повторить, и которые считаются сбоем сервиса
+RETRY_STATUSES = frozenset({502, 503, 504})
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """
+    Запрос не отправлялся: сервис недавно подряд отвечал ошибками
+    """
+
+
+class CircuitBreaker:
+    """
+    Размыкается после failure_threshold сбоев подряд и отклоняет запросы reset_timeout секунд,
+    затем пропускает одну пробную попытку: успех замыкает цепь, сбой размыкает снова.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if not self._probing and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> bool:
+        """
+        Returns:
+            bool: цепь только что разомкнулась
+        """
+        with self._lock:
+            self._failures += 1
+            was_open = self._opened_at is not None
+            if was_open or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+            return not was_open and self._opened_at is not None
+
+
+class ServiceClient:
+    """
+    HTTP-клиент к одному внутреннему сервису: keep-alive пул соединений, таймаут на каждый
+    запрос, повторы с экспоненциальной задержкой и jitter, circuit breaker и метрики задержки.
+    Повторяются только ошибки соединения, таймауты и 502/503/504; по умолчанию - только для GET.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str = "",
+        timeout: float = settings.HTTP_READ_TIMEOUT,
+        retries: int = settings.HTTP_RETRIES,
+        backoff: float = settings.HTTP_RETRY_BACKOFF,
+        pool_size: int = settings.HTTP_POOL_SIZE,
+    ):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker(settings.HTTP_CIRCUIT_FAILURES, settings.HTTP_CIRCUIT_RESET)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        endpoint: str,
+        timeout: float | None = None,
+        retries: int | None = None,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        Выполняет запрос к сервису
+
+        Args:
+            method (str): HTTP-метод,
+            url (str): путь относительно base_url или абсолютный URL,
+            endpoint (str): имя эндпоинта для метрик,
+            timeout (float | None): таймаут чтения, по умолчанию таймаут клиента,
+            retries (int | None): число повторов, по умолчанию retries клиента для GET и 0 для остальных,
+            kwargs: параметры requests (params, json, data, headers)
+
+        Returns:
+            requests.Response: ответ сервиса (в том числе 4xx/5xx)
+
+        Raises:
+            CircuitOpenError: цепь разомкнута, запрос не отправлялся
+            requests.RequestException: ошибка соединения или таймаут после всех повторов
+        """
+        if not url.startswith(("http://", "https://")):
+            url = f"{self.base_url}{url}"
+        if retries is None:
+            retries = self.retries if method.upper() == "GET" else 0
+        headers = {**inject_headers(), **(kwargs.pop("headers", None) or {})}
+        timeout = (settings.HTTP_CONNECT_TIMEOUT, timeout or self.timeout)
+
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                HTTP_CLIENT_SECONDS.labels(service=self.name, endpoint=endpoint, outcome="circuit_open").observe(0)
+                raise CircuitOpenError(f"{self.name} circuit is open")
+
+            start = time.perf_counter()
+            error = None
+            response = None
+            try:
+                response = self.session.request(method, url, timeout=timeout, headers=headers, **kwargs)
+                outcome = f"{response.status_code // 100}xx"
+            except requests.RequestException as e:
+                error = e
+                outcome = "timeout" if isinstance(e, requests.Timeout) else "error"
+            HTTP_CLIENT_SECONDS.labels(service=self.name, endpoint=endpoint, outcome=outcome).observe(
+                time.perf_counter() - start
+            )
+
+            failed = response is None or response.status_code in RETRY_STATUSES
+            if not failed:
+                self.breaker.record_success()
+                return response
+            if self.breaker.record_failure():
+                HTTP_CLIENT_CIRCUIT_OPENED.labels(service=self.name).inc()
+                logger.warning("http_circuit_opened", extra={'service': self.name, 'endpoint': endpoint})
+
+            if attempt >= retries:
+                if error is not None:
+                    raise error
+                return response
+            attempt += 1
+            HTTP_CLIENT_RETRIES.labels(service=self.name, endpoint=endpoint).inc()
+            # full jitter: параллельные клиенты не повторяют запросы синхронно
+            time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+
+    def get(self, url: str, endpoint: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, endpoint, **kwargs)
+
+    def post(self, url: str, endpoint: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, endpoint, **kwargs)
+
+
+tester_client = ServiceClient("tester_service", settings.TESTER_SERVICE_URL)
+keycloak_client = ServiceClient("keycloak", settings.KEYCLOAK_URL)
@@ -0,0 +1,34 @@
+from prometheus_client import Counter, Histogram
+
+HTTP_CLIENT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+HTTP_CLIENT_SECONDS = Histogram(
+    "http_client_request_seconds",
+    "Задержка запросов к внутренним сервисам (outcome: 2xx..5xx, timeout, error, circuit_open)",
+    ["service", "endpoint", "outcome"],
+    buckets=HTTP_CLIENT_BUCKETS,
+)
+
+HTTP_CLIENT_RETRIES = Counter(
+    "http_client_retries_total",
+    "Повторы запросов к внутренним сервисам",
+    ["service", "endpoint"],
+)
+
+HTTP_CLIENT_CIRCUIT_OPENED = Counter(
+    "http_client_circuit_opened_total",
+    "Размыкания circuit breaker клиента внутреннего сервиса",
+    ["service"],
+)
+
+RESPONSE_CACHE_REQUESTS = Counter(
+    "response_cache_requests_total",
+    "Запросы к кэшируемым эндпоинтам (result: hit, not_modified, miss, skip); hit rate = (hit + not_modified) / все",
+    ["route", "result"],
+)
+
+RESPONSE_CACHE_INVALIDATIONS = Counter(
+    "response_cache_invalidations_total",
+    "Сбросы групп кэша ответов",
+    ["group"],
+)
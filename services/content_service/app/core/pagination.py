@@ -0,0 +1,164 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable
+from uuid import UUID
+
+from fastapi import Response
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, UUID):
+        return {"$uuid": str(value)}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "$dt" in value:
+            return datetime.fromisoformat(value["$dt"])
+        if "$uuid" in value:
+            return UUID(value["$uuid"])
+    return value
+
+
+def encode_cursor(*values) -> str:
+    """
+    Упаковывает значения ключа сортировки последней записи страницы в непрозрачный курсор
+    """
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """
+    Распаковывает курсор encode_cursor
+
+    Raises:
+        InvalidCursorError: курсор поврежден или не подходит к сортировке
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = [_decode_value(v) for v in values]
+    except Exception as e:
+        raise InvalidCursorError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursorError("Invalid cursor")
+    return values
+
+
+def keyset_paginate(
+    query: Query,
+    columns: tuple,
+    cursor: str | None,
+    limit: int,
+    descending: bool = True,
+    key: Callable[[Any], tuple] | None = None,
+) -> tuple[list, str | None]:
+    """
+    Keyset-пагинация по кортежу колонок (ключ сортировки, ..., id).
+    Последняя колонка должна быть уникальной, чтобы порядок был строгим.
+
+    Args:
+        query (Query): запрос с уже примененными фильтрами,
+        columns (tuple): колонки или выражения сортировки, например (Solution.created_at, Solution.id),
+        cursor (str | None): курсор предыдущей страницы или None для первой,
+        limit (int): размер страницы,
+        descending (bool): направление сортировки,
+        key (Callable | None): значения columns для строки результата; по умолчанию
+            берутся атрибуты строки с именами колонок (нужен для выражений и запросов из нескольких сущностей)
+
+    Returns:
+        tuple[list, str | None]: записи страницы и курсор следующей (None, если страница последняя)
+
+    Raises:
+        InvalidCursorError: курсор поврежден
+    """
+    items = _keyset_query(query, columns, cursor, limit, descending).all()
+    return _keyset_page(items, columns, limit, key)
+
+
+async def keyset_paginate_async(
+    db: AsyncSession,
+    stmt: Select,
+    columns: tuple,
+    cursor: str | None,
+    limit: int,
+    descending: bool = True,
+    key: Callable[[Any], tuple] | None = None,
+) -> tuple[list, str | None]:
+    """
+    keyset_paginate для select() в асинхронной сессии. Для запроса одной сущности
+    возвращает объекты, для нескольких - строки (Row)
+
+    Raises:
+        InvalidCursorError: курсор поврежден
+    """
+    result = await db.execute(_keyset_query(stmt, columns, cursor, limit, descending))
+    return _keyset_page(_select_items(stmt, result), columns, limit, key)
+
+
+def keyset_paginate_select(
+    db: Session,
+    stmt: Select,
+    columns: tuple,
+    cursor: str | None,
+    limit: int,
+    descending: bool = True,
+    key: Callable[[Any], tuple] | None = None,
+) -> tuple[list, str | None]:
+    """
+    keyset_paginate_async для синхронной сессии: сервисы строят один select() для обоих путей
+
+    Raises:
+        InvalidCursorError: курсор поврежден
+    """
+    result = db.execute(_keyset_query(stmt, columns, cursor, limit, descending))
+    return _keyset_page(_select_items(stmt, result), columns, limit, key)
+
+
+def _select_items(stmt: Select, result) -> list:
+    # для запроса одной сущности - объекты, для нескольких - строки (Row)
+    result = result.unique()
+    return result.scalars().all() if len(stmt.column_descriptions) == 1 else result.all()
+
+
+def _keyset_query(query, columns: tuple, cursor: str | None, limit: int, descending: bool):
+    # Query и Select одинаково поддерживают filter/order_by/limit
+    if cursor:
+        values = decode_cursor(cursor, len(columns))
+        sort_key = tuple_(*columns)
+        query = query.filter(sort_key < tuple_(*values) if descending else sort_key > tuple_(*values))
+
+    order = [c.desc() if descending else c.asc() for c in columns]
+    return query.order_by(*order).limit(limit + 1)
+
+
+def _keyset_page(items: list, columns: tuple, limit: int, key: Callable[[Any], tuple] | None):
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        values = key(last) if key else tuple(getattr(last, c.key) for c in columns)
+        next_cursor = encode_cursor(*values)
+    return items, next_cursor
+
+
+def set_next_cursor(response: Response, next_cursor: str | None) -> None:
+    """
+    Передает курсор следующей страницы в заголовке ответа, тело остается списком
+    """
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -1,9 +1,13 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from typing import Optional
 
-import requests
 from jose import JWTError, jwt
 
 from app.core.config import settings
+from app.core.http import keycloak_client
 from app.core.logger import logger
 from app.schemas.security import Jwks, KeycloakWellKnown
 
@@ -12,7 +16,14 @@ class KeycloakService:
     def __init__(self):
         self.realm_url = f"{settings.KEYCLOAK_URL}/realms/{settings.KEYCLOAK_REALM}"
         self._well_known: Optional[KeycloakWellKnown] = None
-        self._jwks: Optional[Jwks] = None
+        # публичные ключи по kid
+        self._jwks: dict[str, dict] = {}
+        self._jwks_requested_at: Optional[float] = None
+        self._jwks_refresh: Optional[threading.Event] = None
+        self._jwks_lock = threading.Lock()
+        # sha256(токен) -> (exp, kid, claims) уже проверенных токенов, в порядке использования
+        self._claims: OrderedDict[bytes, tuple[float, str, dict]] = OrderedDict()
+        self._claims_lock = threading.Lock()
 
     def load_config(self):
         """
@@ -21,21 +32,51 @@ class KeycloakService:
         """
         try:
             # 1) well-known
-            well_known_url = f"{self.realm_url}/.well-known/openid-configuration"
-            r = requests.get(well_known_url)
-            r.raise_for_status()
-            data = r.json()
-            self._well_known = KeycloakWellKnown(
-                issuer=data["issuer"], jwks_uri=data["jwks_uri"]
-            )
+            if not self._well_known:
+                well_known_url = f"{self.realm_url}/.well-known/openid-configuration"
+                r = keycloak_client.get(well_known_url, endpoint="well_known")
+                r.raise_for_status()
+                data = r.json()
+                self._well_known = KeycloakWellKnown(
+                    issuer=data["issuer"], jwks_uri=data["jwks_uri"]
+                )
 
             # 2) JWKS
-            r = requests.get(self._well_known.jwks_uri)
+            r = keycloak_client.get(self._well_known.jwks_uri, endpoint="jwks")
             r.raise_for_status()
-            self._jwks = Jwks(keys=r.json()["keys"])
+            keys = Jwks(keys=r.json()["keys"]).keys
+            self._jwks = {jwk["kid"]: jwk for jwk in keys if "kid" in jwk}
         except Exception as e:
             logger.error(f"Error loading keycloak configuration: {str(e)}")
 
+    def refresh_jwks(self, wait: float = 0) -> None:
+        """
+        Перезагружает JWKS в фоновом потоке, не чаще раза в JWKS_REFRESH_INTERVAL секунд.
+        Параллельные вызовы не запускают второй загрузки, а ждут уже идущую.
+
+        Args:
+            wait (float): сколько секунд ждать окончания загрузки
+        """
+        with self._jwks_lock:
+            done = self._jwks_refresh
+            if done is None or done.is_set():
+                now = time.monotonic()
+                if self._jwks_requested_at is not None and \
+                        now - self._jwks_requested_at < settings.JWKS_REFRESH_INTERVAL:
+                    return
+                self._jwks_requested_at = now
+                done = self._jwks_refresh = threading.Event()
+                threading.Thread(target=self._refresh_jwks_worker, args=(done,), daemon=True).start()
+        if wait:
+            done.wait(wait)
+
+    def _refresh_jwks_worker(self, done: threading.Event) -> None:
+        try:
+            self.load_config()
+            logger.debug("keycloak_jwks_refreshed", extra={'keys': len(self._jwks)})
+        finally:
+            done.set()
+
     @property
     def issuer(self) -> str:
         """
@@ -47,35 +88,68 @@ class KeycloakService:
         return self._well_known.issuer
 
     @property
-    def jwks(self) -> list:
+    def jwks(self) -> dict[str, dict]:
         """
-        Возвращает список JWKS (публичных ключей) Keycloak.
+        Возвращает публичные ключи Keycloak по kid.
         Если набор ключей не загружен, выполняется загрузка конфигурации.
         """
         if not self._jwks:
-            self.load_config()
-        return self._jwks.keys
+            self.refresh_jwks(wait=settings.JWKS_REFRESH_WAIT)
+        return self._jwks
+
+    def _public_key(self, kid: str) -> Optional[dict]:
+        public_key = self.jwks.get(kid)
+        if public_key is None:
+            # неизвестный kid - ключи в Keycloak могли смениться (key rotation)
+            self.refresh_jwks(wait=settings.JWKS_REFRESH_WAIT)
+            public_key = self._jwks.get(kid)
+        return public_key
+
+    def _cached_claims(self, key: bytes) -> Optional[dict]:
+        with self._claims_lock:
+            entry = self._claims.get(key)
+            if entry is None:
+                return None
+            exp, kid, claims = entry
+            # ключ, которым подписан токен, мог быть отозван при обновлении JWKS
+            if exp <= time.time() or kid not in self._jwks:
+                del self._claims[key]
+                return None
+            self._claims.move_to_end(key)
+            return dict(claims)
+
+    def _cache_claims(self, key: bytes, kid: str, claims: dict) -> None:
+        exp = claims.get("exp")
+        if not settings.JWT_CACHE_SIZE or not isinstance(exp, (int, float)):
+            return
+        with self._claims_lock:
+            self._claims[key] = (exp, kid, dict(claims))
+            self._claims.move_to_end(key)
+            while len(self._claims) > settings.JWT_CACHE_SIZE:
+                self._claims.popitem(last=False)
 
     def decode_token(self, token: str) -> dict:
         """
         Проверяет подпись и валидирует JWT-токен.
 
-        1. Извлекает заголовок токена и получает идентификатор ключа (kid).
-        2. Ищет соответствующий публичный ключ в JWKS.
-        3. Декодирует токен, проверяя подпись с использованием найденного ключа.
+        1. Возвращает claims из кэша, если токен уже проверялся и еще не истек.
+        2. Извлекает заголовок токена и получает идентификатор ключа (kid).
+        3. Берет публичный ключ из JWKS; при неизвестном kid перезагружает JWKS.
+        4. Декодирует токен, проверяя подпись с использованием найденного ключа,
+           и кэширует claims до exp токена.
         """
+        cache_key = hashlib.sha256(token.encode()).digest()
+        claims = self._cached_claims(cache_key)
+        if claims is not None:
+            return claims
+
         header = jwt.get_unverified_header(token)
         kid = header.get("kid")
         if not kid:
             logger.error("Token header does not contain kid")
             raise JWTError("Token header 'kid' missing")
 
-        public_key = None
-        for jwk in self.jwks:
-            if jwk["kid"] == kid:
-                public_key = jwk
-                break
-
+        public_key = self._public_key(kid)
         if not public_key:
             logger.error(f"Public key with kid {kid} not found in JWKS")
             raise JWTError("Public key not found in JWKS")
@@ -89,10 +163,11 @@ class KeycloakService:
                 options={"verify_aud": False, "verify_iss": False},
                 algorithms=["RS256"],
             )
-            return payload
         except JWTError as e:
             logger.error(f"Error decoking token: {str(e)}")
             raise
+        self._cache_claims(cache_key, kid, payload)
+        return payload
 
 
 keycloak_service = KeycloakService()
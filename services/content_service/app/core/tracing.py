@@ -0,0 +1,161 @@
+import json
+import threading
+from typing import Mapping, Sequence
+
+from opentelemetry import context as otel_context
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SpanExporter,
+    SpanExportResult,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.requests import Request
+
+from app.core.config import settings
+
+TRACE_HEADERS = ("traceparent", "tracestate")
+
+tracer = trace.get_tracer("content_service")
+
+_setup_lock = threading.Lock()
+_configured = False
+
+
+class JsonFileSpanExporter(SpanExporter):
+    """
+    Пишет завершенные спаны в файл, по одному JSON-объекту на строку.
+    Нужен для офлайн-разбора трасс без коллектора.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = [json.dumps(json.loads(span.to_json()), ensure_ascii=False) for span in spans]
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            for line in lines:
+                f.write(line + "\n")
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+def _build_exporter(kind: str) -> SpanExporter | None:
+    if kind == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+    if kind == "console":
+        return ConsoleSpanExporter()
+    if kind == "file":
+        return JsonFileSpanExporter(settings.TRACING_FILE_PATH)
+    return None
+
+
+def setup_tracing() -> None:
+    """
+    Настраивает TracerProvider процесса и экспортер из settings.TRACING_EXPORTER
+    (otlp, console, file, none). Для none трассы не экспортируются, но trace_id
+    все равно генерируются и попадают в логи и заголовки межсервисных вызовов.
+    """
+    global _configured
+    with _setup_lock:
+        if _configured:
+            return
+        provider = TracerProvider(
+            resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME})
+        )
+        exporter = _build_exporter(settings.TRACING_EXPORTER.lower())
+        if exporter is not None:
+            provider.add_span_processor(BatchSpanProcessor(exporter))
+        trace.set_tracer_provider(provider)
+        _configured = True
+
+
+def inject_headers(headers: dict | None = None) -> dict:
+    """
+    Добавляет в headers заголовки W3C trace context текущего спана
+    """
+    headers = dict(headers or {})
+    propagate.inject(headers)
+    return headers
+
+
+def extract_context(carrier: Mapping | None) -> otel_context.Context:
+    """
+    Восстанавливает контекст трассы из заголовков (HTTP или Celery)
+    """
+    return propagate.extract(dict(carrier or {}))
+
+
+def current_trace_ids() -> dict:
+    """
+    Возвращает trace_id/span_id текущего спана для корреляции с логами
+    """
+    span_context = trace.get_current_span().get_span_context()
+    if not span_context.is_valid:
+        return {}
+    return {
+        "trace_id": format(span_context.trace_id, "032x"),
+        "span_id": format(span_context.span_id, "016x"),
+    }
+
+
+async def tracing_middleware(request: Request, call_next):
+    """
+    HTTP middleware: продолжает трассу из входящих заголовков (traceparent)
+    и оборачивает обработку запроса в серверный спан
+    """
+    ctx = extract_context(request.headers)
+    with tracer.start_as_current_span(
+        f"{request.method} {request.url.path}",
+        context=ctx,
+        kind=trace.SpanKind.SERVER,
+        attributes={
+            "http.method": request.method,
+            "http.target": request.url.path,
+            "http.request_id": request.headers.get("x-request-id", ""),
+        },
+    ) as span:
+        response = await call_next(request)
+        route = request.scope.get("route")
+        if route is not None:
+            span.update_name(f"{request.method} {route.path}")
+        span.set_attribute("http.status_code", response.status_code)
+        return response
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Оборачивает каждый SQL-запрос движка в спан db.query
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        span = tracer.start_span(
+            "db.query",
+            kind=trace.SpanKind.CLIENT,
+            attributes={"db.system": engine.dialect.name, "db.statement": statement[:500]},
+        )
+        context._otel_span = span
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_otel_span", None)
+        if span is not None:
+            span.end()
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        span = getattr(exception_context.execution_context, "_otel_span", None)
+        if span is not None:
+            span.record_exception(exception_context.original_exception)
+            span.set_status(trace.Status(trace.StatusCode.ERROR))
+            span.end()
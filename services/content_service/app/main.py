@@ -1,4 +1,3 @@
-import uvicorn
 from fastapi import FastAPI
 from prometheus_fastapi_instrumentator import Instrumentator
 
@@ -10,12 +9,20 @@ from app.api.endpoints import (
     problems,
     reactions,
     register,
+    search,
     tags,
     users,
 )
+from app.core.cache import response_cache_middleware
 from app.core.config import settings
+from app.core.tracing import setup_tracing, tracing_middleware
+
+setup_tracing()
 
 app = FastAPI(title=settings.PROJECT_NAME)
+# кэш внутри трассировки: попадания в кэш тоже попадают в трассы
+app.middleware("http")(response_cache_middleware)
+app.middleware("http")(tracing_middleware)
 
 Instrumentator(
     should_group_status_codes=False,
@@ -31,6 +38,9 @@ app.include_router(tags.router)
 app.include_router(register.router)
 app.include_router(blog_posts.router)
 app.include_router(contests.router)
+app.include_router(search.router)
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run("app.main:app", host="0.0.0.0", port=8001, reload=True)
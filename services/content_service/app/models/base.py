@@ -1,4 +1,10 @@
+from sqlalchemy import Text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import declarative_base
 
 
 Base = declarative_base()
+
+# tsvector полнотекстового поиска; заполняется триггером БД (миграция full_text_search),
+# в SQLite (локальные тесты) - обычная пустая колонка
+SearchVector = TSVECTOR().with_variant(Text(), "sqlite")
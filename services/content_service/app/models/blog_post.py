@@ -1,17 +1,25 @@
 import uuid
 
-from sqlalchemy import Column, DateTime, String, Text
+from sqlalchemy import Column, DateTime, Index, String, Text
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 
-from app.models.base import Base
+from app.models.base import Base, SearchVector
 
 
 class BlogPost(Base):
     __tablename__ = "blog_posts"
+    __table_args__ = (
+        # keyset-пагинация ленты блога по (created_at, id)
+        Index("ix_blog_posts_created", "created_at", "id"),
+        Index("ix_blog_posts_search", "search_vector", postgresql_using="gin"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String, nullable=False)
     description = Column(Text, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # title (вес A) + description (вес B), см. app.services.search
+    search_vector = deferred(Column(SearchVector, nullable=True))
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, DateTime, ForeignKey, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, String, Text, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 
@@ -9,6 +9,16 @@ from app.models.base import Base
 
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (
+        # keyset-пагинация комментариев к посту по (created_at, id)
+        Index("ix_comments_post_created", "post_id", "created_at", "id"),
+        # дерево комментариев: ветки поста по (created_at, id) и ответы на комментарий
+        Index(
+            "ix_comments_post_roots", "post_id", "created_at", "id",
+            postgresql_where=text("parent_comment_id IS NULL"),
+        ),
+        Index("ix_comments_parent", "parent_comment_id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     post_id = Column(UUID(as_uuid=True), ForeignKey("posts.id"), nullable=False)
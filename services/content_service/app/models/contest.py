@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Table, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, String, Table, Text, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -11,16 +11,25 @@ contest_participants = Table(
     Column("contest_id", UUID(as_uuid=True), ForeignKey("contests.id", ondelete="CASCADE"), primary_key=True),
     Column("user_keycloak_id", String, ForeignKey("users.keycloak_id", ondelete="CASCADE"), primary_key=True),
     Column("joined_at", DateTime(timezone=True), server_default=func.now()),
+    # keyset-пагинация участников контеста и контестов пользователя по (joined_at, ...)
+    Index("ix_contest_participants_contest_joined", "contest_id", "joined_at", "user_keycloak_id"),
+    Index("ix_contest_participants_user_joined", "user_keycloak_id", "joined_at", "contest_id"),
 )
 
 
 class Contest(Base):
     __tablename__ = "contests"
+    __table_args__ = (
+        # keyset-пагинация публичных контестов по (created_at, id)
+        Index("ix_contests_public_created", "is_public", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     is_public = Column(Boolean, nullable=False, server_default="true")
+    # повторно отправленный идентичный код получает уже выставленный вердикт без перезапуска
+    dedupe_submissions = Column(Boolean, nullable=False, server_default="true")
     created_by = Column(String, ForeignKey("users.keycloak_id", ondelete="CASCADE"), nullable=False)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -28,9 +37,10 @@ class Contest(Base):
 
     owner = relationship("User", back_populates="owned_contests")
     problems = relationship("Problem", back_populates="contest", cascade="all, delete-orphan")
+    # участников может быть тысячи: не загружаются вместе с контестом, список -
+    # app.services.contest.list_contest_participants с пагинацией
     participants = relationship(
         "User",
         secondary=contest_participants,
         back_populates="contests_joined",
-        lazy="joined",
     )
\ No newline at end of file
@@ -1,16 +1,22 @@
 import uuid
 
-from sqlalchemy import Column, DateTime, ForeignKey, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, String, Text
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 
-from app.models.base import Base
+from app.models.base import Base, SearchVector
 from app.models.tag import post_tags
 
 
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        # keyset-пагинация общего списка и постов к задаче по (created_at, id)
+        Index("ix_posts_created", "created_at", "id"),
+        Index("ix_posts_problem_created", "problem_id", "created_at", "id"),
+        Index("ix_posts_search", "search_vector", postgresql_using="gin"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     problem_id = Column(UUID(as_uuid=True), ForeignKey("problems.id"), nullable=False)
@@ -21,5 +27,7 @@ class Post(Base):
     status = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # title (вес A) + content (вес B), см. app.services.search
+    search_vector = deferred(Column(SearchVector, nullable=True))
 
     tags = relationship("Tag", secondary=post_tags, back_populates="posts")
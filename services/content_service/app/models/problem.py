@@ -1,12 +1,12 @@
 import enum
 import uuid
 
-from sqlalchemy import JSON, Column, DateTime, Enum, ForeignKey, Integer, String, Text
+from sqlalchemy import JSON, Column, DateTime, Enum, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 
-from app.models.base import Base
+from app.models.base import Base, SearchVector
 from app.models.solved_problems import solved_problems
 from app.models.tag import problem_tags
 
@@ -19,6 +19,11 @@ class DifficultyEnum(str, enum.Enum):
 
 class Problem(Base):
     __tablename__ = "problems"
+    __table_args__ = (
+        # keyset-пагинация списков задач по (created_at, id)
+        Index("ix_problems_created", "created_at", "id"),
+        Index("ix_problems_search", "search_vector", postgresql_using="gin"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String, nullable=False)
@@ -30,6 +35,8 @@ class Problem(Base):
     test_cases = Column(JSON, nullable=True)
     time_limit = Column(Integer, nullable=True)
     memory_limit = Column(Integer, nullable=True)
+    # title (вес A) + description (вес B), см. app.services.search
+    search_vector = deferred(Column(SearchVector, nullable=True))
 
     contest_id = Column(
         UUID(as_uuid=True),
@@ -44,3 +51,13 @@ class Problem(Base):
     solved_by = relationship(
         "User", secondary=solved_problems, back_populates="solved_problems"
     )
+
+    @property
+    def dedupe_submissions(self) -> bool:
+        """
+        Разрешено ли tester_service переиспользовать вердикты идентичных посылок.
+        Вне контестов - всегда, в контесте - согласно Contest.dedupe_submissions
+        """
+        if self.contest is None:
+            return True
+        return bool(self.contest.dedupe_submissions)
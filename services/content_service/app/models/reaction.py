@@ -1,7 +1,7 @@
 import enum
 import uuid
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, String
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 
@@ -21,6 +21,10 @@ class ReactionType(str, enum.Enum):
 
 class Reaction(Base):
     __tablename__ = "reactions"
+    __table_args__ = (
+        # балансы реакций страницы объектов (reaction_balance_subquery)
+        Index("ix_reactions_target", "target_type", "target_id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     created_by = Column(String, ForeignKey("users.keycloak_id"), nullable=False)
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, ForeignKey, String, Table
+from sqlalchemy import Column, ForeignKey, Index, String, Table
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -13,6 +13,8 @@ problem_tags = Table(
         "problem_id", UUID(as_uuid=True), ForeignKey("problems.id"), primary_key=True
     ),
     Column("tag_id", UUID(as_uuid=True), ForeignKey("tags.id"), primary_key=True),
+    # фильтр каталога по тегам и фасет тегов идут от tag_id (первичный ключ начинается с problem_id)
+    Index("ix_problem_tags_tag", "tag_id", "problem_id"),
 )
 
 post_tags = Table(
@@ -26,9 +26,9 @@ class User(Base):
     )
 
     owned_contests = relationship("Contest", back_populates="owner")
+    # не загружаются вместе с пользователем, список - app.services.contest.list_user_contests
     contests_joined = relationship(
         "Contest",
         secondary="contest_participants",
         back_populates="participants",
-        lazy="joined",
     )
\ No newline at end of file
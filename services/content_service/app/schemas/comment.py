@@ -30,3 +30,9 @@ class CommentReadExtended(CommentRead):
 
 class CommentReadWithReaction(CommentReadExtended):
     user_reaction: str | None = None
+
+
+class CommentNode(CommentReadWithReaction):
+    depth: int = 0
+    has_more_replies: bool = False  # ответы глубже max_depth не загружены
+    replies: list["CommentNode"] = []
@@ -1,13 +1,14 @@
 from datetime import datetime
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ContestBase(BaseModel):
     name: str
     description: str | None = None
     is_public: bool = True
+    dedupe_submissions: bool = True
 
 
 class ContestCreate(ContestBase):
@@ -25,3 +26,13 @@ class ContestRead(ContestBase):
 
 class ContestJoin(BaseModel):
     username: str
+
+
+class ContestParticipantsImport(BaseModel):
+    usernames: list[str] = Field(..., max_length=5000)
+
+
+class ContestParticipantsImportResult(BaseModel):
+    added: list[str]
+    already_joined: list[str]
+    unknown: list[str]
@@ -3,8 +3,9 @@ from enum import Enum
 from typing import Optional
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
+from app.schemas.search import FacetCount
 from app.schemas.tag import TagRead
 
 
@@ -14,6 +15,11 @@ class DifficultyEnum(str, Enum):
     HARD = "HARD"
 
 
+class TagMatch(str, Enum):
+    all = "all"  # задача имеет все выбранные теги
+    any = "any"  # задача имеет хотя бы один из выбранных тегов
+
+
 class TestCase(BaseModel):
     input_data: str
     output_data: str
@@ -44,6 +50,7 @@ class ProblemRead(ProblemBase):
     created_at: datetime
     updated_at: datetime | None = None
     tags: list[TagRead]
+    dedupe_submissions: bool = True
 
 
 class ProblemReadExtended(ProblemRead):
@@ -53,3 +60,28 @@ class ProblemReadExtended(ProblemRead):
 
 class ProblemReadWithReaction(ProblemReadExtended):
     user_reaction: str | None = None
+
+
+class ProblemFacets(BaseModel):
+    difficulty: list[FacetCount] = []
+    tags: list[FacetCount] = []
+
+
+class ProblemSolvedItem(BaseModel):
+    problem_id: UUID
+    user_id: str
+
+
+class ProblemsSolvedBulk(BaseModel):
+    items: list[ProblemSolvedItem] = Field(..., max_length=1000)
+
+
+class SolvedMarkStatus(str, Enum):
+    CREATED = "created"
+    ALREADY_SOLVED = "already_solved"
+    USER_NOT_FOUND = "user_not_found"
+    PROBLEM_NOT_FOUND = "problem_not_found"
+
+
+class ProblemSolvedResult(ProblemSolvedItem):
+    status: SolvedMarkStatus
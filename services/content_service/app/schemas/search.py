@@ -0,0 +1,37 @@
+from datetime import datetime
+from enum import Enum
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class SearchTarget(str, Enum):
+    problem = "problem"
+    post = "post"
+    blog_post = "blog_post"
+
+
+class SearchHit(BaseModel):
+    id: UUID
+    type: SearchTarget
+    title: str | None = None
+    rank: float
+    created_at: datetime | None = None
+    difficulty: str | None = None  # только для задач
+    problem_id: UUID | None = None  # только для постов
+
+
+class FacetCount(BaseModel):
+    value: str
+    label: str | None = None
+    count: int
+
+
+class SearchFacets(BaseModel):
+    difficulty: list[FacetCount] = []
+    tags: list[FacetCount] = []
+
+
+class SearchResults(BaseModel):
+    hits: list[SearchHit]
+    facets: SearchFacets | None = None
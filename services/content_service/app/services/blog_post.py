@@ -1,6 +1,8 @@
 from sqlalchemy.orm import Session
 
+from app.core.cache import CACHE_BLOG_POSTS, invalidate_responses
 from app.core.logger import logger
+from app.core.pagination import keyset_paginate
 from app.models.blog_post import BlogPost
 from app.schemas.blog_post import BlogPostCreate
 
@@ -29,6 +31,7 @@ def create_blog_post(db: Session, data: BlogPostCreate) -> BlogPost:
     else:
         logger.debug("blogpost_created",
                     extra={"title": data.title})
+    invalidate_responses(CACHE_BLOG_POSTS)
     return post
 
 
@@ -84,6 +87,7 @@ def update_blog_post(db: Session, post: BlogPost, data: dict) -> BlogPost:
     else:
         logger.debug("blogpost_update",
                     extra={'blogpost_id': str(post.id)})
+    invalidate_responses(CACHE_BLOG_POSTS)
     return post
 
 
@@ -109,27 +113,26 @@ def delete_blog_post(db: Session, post: BlogPost) -> None:
         logger.debug("blogpost_delete",
                      extra={'blogpost_title': post.title})
     db.commit()
+    invalidate_responses(CACHE_BLOG_POSTS)
 
 
-def list_blog_posts(db: Session, offset: int = 0, limit: int = 10) -> list[BlogPost]:
+def list_blog_posts(
+    db: Session, cursor: str | None = None, limit: int = 10
+) -> tuple[list[BlogPost], str | None]:
     """
-    Возвращает страницы блог‑постов с `offset` и `limit`
+    Возвращает страницу блог‑постов от новых к старым
 
     Args:
         db (Session): объект сессии БД
-        offset (int): отступ от начала
+        cursor (str | None): курсор предыдущей страницы или None для первой
         limit (int): максимальное количество постов в результате
 
     Returns:
-        list[BlogPost] - список найденных постов с указанными параметрами
+        tuple[list[BlogPost], str | None] - посты страницы и курсор следующей страницы
     """
     try:
-        result = (
-            db.query(BlogPost)
-            .order_by(BlogPost.created_at.desc())
-            .offset(offset)
-            .limit(limit)
-            .all()
+        result, next_cursor = keyset_paginate(
+            db.query(BlogPost), (BlogPost.created_at, BlogPost.id), cursor, limit
         )
     except Exception:
         logger.exception("blogpost_list_failed")
@@ -137,4 +140,4 @@ def list_blog_posts(db: Session, offset: int = 0, limit: int = 10) -> list[BlogP
     else:
         logger.debug("blogpost_list",
                      extra={'length':len(result)})
-    return result
+    return result, next_cursor
@@ -1,10 +1,23 @@
-from sqlalchemy.orm import Session
+from uuid import UUID
+
+from sqlalchemy import Select, and_, exists, literal, null, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
 
 from app.core.logger import logger
+from app.core.pagination import decode_cursor, encode_cursor, keyset_paginate_async, keyset_paginate_select
 from app.models.comment import Comment
+from app.models.reaction import Reaction
 from app.models.user import User
 from app.schemas.comment import CommentCreate
-from app.services.reaction import compute_reaction_balance
+from app.services.reaction import (
+    compute_reaction_balances,
+    compute_reaction_balances_async,
+    reaction_balance_subquery,
+)
+
+# максимальная глубина ответов в дереве комментариев (0 - только комментарии верхнего уровня)
+COMMENT_TREE_MAX_DEPTH = 10
 
 
 def create_comment(db: Session, comment_in: CommentCreate, user_id: str) -> Comment:
@@ -166,42 +179,187 @@ def list_comments_by_user(db: Session, keycloak_id: str) -> list[Comment]:
     return comments
 
 
+def _enriched_comments_query(post_id) -> tuple[Select, dict]:
+    """
+    Запрос комментариев поста с именем автора и параметры его keyset-пагинации
+    (columns, descending, key) - общие для синхронной и асинхронной сессии
+    """
+    stmt = (
+        select(Comment, User.display_name)
+        .join(User, Comment.created_by == User.keycloak_id)
+        .where(Comment.post_id == post_id)
+    )
+    order = {
+        "columns": (Comment.created_at, Comment.id),
+        "descending": False,
+        "key": lambda row: (row[0].created_at, row[0].id),
+    }
+    return stmt, order
+
+
+def _enrich_comments(results: list, balances: dict, post_id, limit: int) -> list[Comment]:
+    enriched = []
+    for comment, display_name in results:
+        setattr(comment, "author_display_name", display_name)
+        setattr(comment, "reaction_balance", balances[comment.id])
+        enriched.append(comment)
+    logger.debug("comment_listenriched",
+                 extra={'post_id': str(post_id), 'limit': limit, 'length': len(enriched)})
+    return enriched
+
+
 def list_enriched_comments_by_post(
-    db: Session, post_id: str, offset: int = 0, limit: int = 10
-) -> list[Comment]:
+    db: Session, post_id: str, cursor: str | None = None, limit: int = 10
+) -> tuple[list[Comment], str | None]:
     """
     Возвращает список комментариев для указанного поста post_id с дополнительными полями author_display_name, ..
-    .. reaction_balance; с использованием пагинации
+    .. reaction_balance; в хронологическом порядке с keyset-пагинацией. Балансы реакций всей страницы
+    считаются одним запросом
 
     Args:
         db (Session): сессия базы данных
         post_id (str): идентификатор данного поста
-        offset (int): смещение для пагинации
+        cursor (str | None): курсор предыдущей страницы или None для первой
         limit (int): количество комментариев на страницу
 
     Returns:
-        List[Comment] - список комментариев к указанной задаче
+        tuple[list[Comment], str | None] - комментарии к указанному посту и курсор следующей страницы
     """
+    stmt, order = _enriched_comments_query(post_id)
     try:
-        results = (
-            db.query(Comment, User.display_name)
-            .join(User, Comment.created_by == User.keycloak_id)
-            .filter(Comment.post_id == post_id)
-            .offset(offset)
-            .limit(limit)
-            .all()
-        )
+        results, next_cursor = keyset_paginate_select(db, stmt, cursor=cursor, limit=limit, **order)
     except Exception:
         logger.exception("comment_listenriched_failed",
-                         extra={'post_id': post_id, 'offset': offset, 'limit': limit})
+                         extra={'post_id': post_id, 'limit': limit})
         raise
 
-    enriched = []
-    for comment, display_name in results:
+    balances = compute_reaction_balances(db, [comment.id for comment, _ in results], "comment")
+    return _enrich_comments(results, balances, post_id, limit), next_cursor
+
+
+async def list_enriched_comments_by_post_async(
+    db: AsyncSession, post_id: UUID, cursor: str | None = None, limit: int = 10
+) -> tuple[list[Comment], str | None]:
+    """
+    list_enriched_comments_by_post для асинхронной сессии: тот же запрос (_enriched_comments_query),
+    балансы реакций всей страницы считаются одним запросом
+
+    Args:
+        db (AsyncSession): асинхронная сессия БД
+        post_id (UUID): идентификатор данного поста
+        cursor (str | None): курсор предыдущей страницы или None для первой
+        limit (int): количество комментариев на страницу
+
+    Returns:
+        tuple[list[Comment], str | None] - комментарии к указанному посту и курсор следующей страницы
+    """
+    stmt, order = _enriched_comments_query(post_id)
+    try:
+        results, next_cursor = await keyset_paginate_async(db, stmt, cursor=cursor, limit=limit, **order)
+    except Exception:
+        logger.exception("comment_listenriched_failed",
+                         extra={'post_id': str(post_id), 'limit': limit})
+        raise
+
+    balances = await compute_reaction_balances_async(db, [comment.id for comment, _ in results], "comment")
+    return _enrich_comments(results, balances, post_id, limit), next_cursor
+
+
+async def list_comment_tree_async(
+    db: AsyncSession,
+    post_id: UUID,
+    cursor: str | None = None,
+    limit: int = 10,
+    max_depth: int = COMMENT_TREE_MAX_DEPTH,
+    user_id: str | None = None,
+) -> tuple[list[Comment], str | None]:
+    """
+    Возвращает страницу веток комментариев поста: limit комментариев верхнего уровня ..
+    .. в хронологическом порядке (keyset-пагинация по (created_at, id)) вместе со всеми ответами до глубины max_depth.
+    Ветки, имена авторов, балансы реакций и реакция пользователя user_id загружаются одним запросом ..
+    .. (рекурсивный CTE по parent_comment_id)
+
+    Args:
+        db (AsyncSession): асинхронная сессия БД
+        post_id (UUID): идентификатор поста
+        cursor (str | None): курсор предыдущей страницы или None для первой
+        limit (int): количество веток на страницу
+        max_depth (int): глубина, ниже которой ответы не загружаются
+        user_id (str | None): опционально, Keycloak ID пользователя для поиска его реакций
+
+    Returns:
+        tuple[list[Comment], str | None] - комментарии верхнего уровня с полями author_display_name, ..
+        .. reaction_balance, user_reaction, depth, has_more_replies и replies (ответы в хронологическом порядке) ..
+        .. и курсор следующей страницы
+
+    Raises:
+        InvalidCursorError: курсор поврежден
+    """
+    roots = select(Comment.id).where(Comment.post_id == post_id, Comment.parent_comment_id.is_(None))
+    if cursor:
+        roots = roots.where(tuple_(Comment.created_at, Comment.id) > tuple_(*decode_cursor(cursor, 2)))
+    # лишняя ветка показывает, что есть следующая страница
+    roots = roots.order_by(Comment.created_at, Comment.id).limit(limit + 1).subquery("root_page")
+
+    tree = select(roots.c.id, literal(0).label("depth")).cte("comment_tree", recursive=True)
+    tree = tree.union_all(
+        select(Comment.id, tree.c.depth + 1)
+        .join(tree, Comment.parent_comment_id == tree.c.id)
+        .where(Comment.post_id == post_id, tree.c.depth < max_depth)
+    )
+
+    reply = aliased(Comment)
+    balance = reaction_balance_subquery("comment", select(tree.c.id))
+    stmt = (
+        select(
+            Comment,
+            tree.c.depth,
+            User.display_name,
+            balance.c.balance,
+            # на последнем уровне - есть ли ответы, которые не загружены
+            and_(tree.c.depth >= max_depth, exists().where(reply.parent_comment_id == Comment.id)),
+            Reaction.reaction_type if user_id else null(),
+        )
+        .join(tree, tree.c.id == Comment.id)
+        .join(User, Comment.created_by == User.keycloak_id)
+        .outerjoin(balance, balance.c.target_id == Comment.id)
+        .order_by(Comment.created_at, Comment.id)
+    )
+    if user_id:
+        stmt = stmt.outerjoin(
+            Reaction,
+            and_(Reaction.target_id == Comment.id, Reaction.target_type == "comment", Reaction.created_by == user_id),
+        )
+
+    try:
+        rows = (await db.execute(stmt)).all()
+    except Exception:
+        logger.exception("comment_tree_failed",
+                         extra={'post_id': str(post_id), 'limit': limit})
+        raise
+
+    nodes = {}
+    threads = []
+    for comment, depth, display_name, reaction_balance, has_more_replies, user_reaction in rows:
         setattr(comment, "author_display_name", display_name)
-        balance = compute_reaction_balance(db, str(comment.id), "comment")
-        setattr(comment, "reaction_balance", balance)
-        enriched.append(comment)
-    logger.debug("comment_listenriched",
-                 extra={'post_id': post_id, 'offset': offset, 'limit': limit, 'length': len(enriched)})
-    return enriched
\ No newline at end of file
+        setattr(comment, "reaction_balance", reaction_balance or 0)
+        setattr(comment, "user_reaction", getattr(user_reaction, "value", user_reaction))
+        setattr(comment, "depth", depth)
+        setattr(comment, "has_more_replies", bool(has_more_replies))
+        setattr(comment, "replies", [])
+        nodes[comment.id] = comment
+        if depth == 0:
+            threads.append(comment)
+    # строки упорядочены по времени, поэтому ответы добавляются в хронологическом порядке
+    for comment in nodes.values():
+        parent = nodes.get(comment.parent_comment_id)
+        if parent is not None and comment.depth > 0:
+            parent.replies.append(comment)
+
+    next_cursor = None
+    if len(threads) > limit:
+        threads = threads[:limit]
+        next_cursor = encode_cursor(threads[-1].created_at, threads[-1].id)
+    logger.debug("comment_tree",
+                 extra={'post_id': str(post_id), 'limit': limit, 'length': len(nodes)})
+    return threads, next_cursor
@@ -1,11 +1,20 @@
-from sqlalchemy.orm import Session
+from uuid import UUID
 
+from sqlalchemy import exists, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, raiseload
+
+from app.core.cache import CACHE_CONTESTS, CACHE_PROBLEMS, invalidate_responses
 from app.core.logger import logger
-from app.models.contest import Contest
+from app.core.pagination import keyset_paginate, keyset_paginate_async, keyset_paginate_select
+from app.models.contest import Contest, contest_participants
 from app.models.problem import Problem
 from app.models.user import User
 from app.schemas.contest import ContestCreate
-from app.services.user import get_user, get_user_by_username
+from app.services.problem import problem_read_options
+from app.services.tester import invalidate_contest_cache
+from app.services.user import get_user_by_username
 
 
 def create_contest(db: Session, data: ContestCreate, owner_id: str) -> Contest:
@@ -13,6 +22,7 @@ def create_contest(db: Session, data: ContestCreate, owner_id: str) -> Contest:
         name=data.name,
         description=data.description,
         is_public=data.is_public,
+        dedupe_submissions=data.dedupe_submissions,
         created_by=owner_id,
     )
     try:
@@ -26,6 +36,7 @@ def create_contest(db: Session, data: ContestCreate, owner_id: str) -> Contest:
         raise
     logger.debug("contest_create",
                  extra={'owner_id': owner_id})
+    invalidate_responses(CACHE_CONTESTS)
     return contest
 
 
@@ -40,6 +51,20 @@ def get_contest(db: Session, contest_id: str) -> Contest | None:
     return contest
 
 
+async def get_contest_async(db: AsyncSession, contest_id: UUID) -> Contest | None:
+    # участники в ContestRead не входят - не подгружаем их join-ом
+    contest = await db.scalar(
+        select(Contest).where(Contest.id == contest_id).options(raiseload(Contest.participants))
+    )
+    if not contest:
+        logger.warning("contest_get_notfound",
+                       extra={'contest_id': str(contest_id)})
+    else:
+        logger.debug("contest_get",
+                     extra={'contest_id': str(contest_id)})
+    return contest
+
+
 def update_contest(db: Session, contest: Contest, data: dict) -> Contest:
     for k, v in data.items():
         setattr(contest, k, v)
@@ -53,6 +78,8 @@ def update_contest(db: Session, contest: Contest, data: dict) -> Contest:
         raise
     logger.debug("contest_update",
                  extra={'contest_id': str(contest.id)})
+    # dedupe_submissions задачи берется из контеста
+    invalidate_responses(CACHE_CONTESTS, CACHE_PROBLEMS)
     return contest
 
 
@@ -67,28 +94,55 @@ def delete_contest(db: Session, contest: Contest) -> None:
         raise
     logger.debug("contest_delete",
                  extra={'contest_id': str(contest.id)})
+    invalidate_responses(CACHE_CONTESTS, CACHE_PROBLEMS)
+    invalidate_contest_cache(contest.id)
+
+
+def _public_contests_query():
+    # общий для синхронной и асинхронной сессии; участники ContestRead не нужны
+    return select(Contest).where(Contest.is_public).options(raiseload(Contest.participants))
 
 
 def list_public_contests(
-    db: Session, offset: int = 0, limit: int = 10
-) -> list[Contest]:
+    db: Session, cursor: str | None = None, limit: int = 10
+) -> tuple[list[Contest], str | None]:
     try:
-        result = (
-            db.query(Contest)
-            .filter(Contest.is_public)
-            .order_by(Contest.created_at.desc())
-            .offset(offset)
-            .limit(limit)
-            .all()
+        result, next_cursor = keyset_paginate_select(
+            db,
+            _public_contests_query(),
+            (Contest.created_at, Contest.id),
+            cursor,
+            limit,
         )
     except Exception:
         logger.exception("contest_publiclist_failed",
-                         extra={'offset': offset, 'limit': limit})
+                         extra={'limit': limit})
         raise
     else:
         logger.debug("contest_publiclist",
                      extra={'length': len(result)})
-    return result
+    return result, next_cursor
+
+
+async def list_public_contests_async(
+    db: AsyncSession, cursor: str | None = None, limit: int = 10
+) -> tuple[list[Contest], str | None]:
+    try:
+        result, next_cursor = await keyset_paginate_async(
+            db,
+            _public_contests_query(),
+            (Contest.created_at, Contest.id),
+            cursor,
+            limit,
+        )
+    except Exception:
+        logger.exception("contest_publiclist_failed",
+                         extra={'limit': limit})
+        raise
+    else:
+        logger.debug("contest_publiclist",
+                     extra={'length': len(result)})
+    return result, next_cursor
 
 
 def list_owner_contests(db: Session, owner_id: str) -> list[Contest]:
@@ -103,6 +157,42 @@ def list_owner_contests(db: Session, owner_id: str) -> list[Contest]:
     return result
 
 
+def is_contest_participant(db: Session, contest_id: str, user_id: str) -> bool:
+    """
+    Проверяет участие пользователя в контесте запросом EXISTS по первичному ключу
+    contest_participants, не загружая список участников
+
+    Args:
+        db (Session): объект сессии БД
+        contest_id (str): идентификатор контеста
+        user_id (str): Keycloak ID пользователя
+
+    Returns:
+        bool - True, если пользователь участвует в контесте
+    """
+    return bool(
+        db.query(
+            exists().where(
+                contest_participants.c.contest_id == contest_id,
+                contest_participants.c.user_keycloak_id == user_id,
+            )
+        ).scalar()
+    )
+
+
+def _insert_participants(db: Session, contest_id: str, user_ids: list[str]) -> set[str]:
+    # ON CONFLICT DO NOTHING: одновременное вступление не приводит к ошибке уникальности
+    stmt = (
+        insert(contest_participants)
+        .values([{"contest_id": contest_id, "user_keycloak_id": user_id} for user_id in user_ids])
+        .on_conflict_do_nothing()
+        .returning(contest_participants.c.user_keycloak_id)
+    )
+    inserted = {row[0] for row in db.execute(stmt)}
+    db.commit()
+    return inserted
+
+
 def join_public_contest(db: Session, contest_id: str, user_id: str):
     contest = get_contest(db, contest_id)
 
@@ -111,14 +201,12 @@ def join_public_contest(db: Session, contest_id: str, user_id: str):
                      extra={'user_id': user_id, 'contest_id': contest_id})
         return
 
-    if any(user.keycloak_id == user_id for user in contest.participants):
+    if is_contest_participant(db, contest_id, user_id):
         logger.error("contest_join_failed",
                      extra={'detail': 'user already joined', 'user_id': user_id, 'contest_id': contest_id})
         return
-    user = get_user(db, user_id)
-    contest.participants.append(user)
     try:
-        db.commit()
+        _insert_participants(db, contest_id, [user_id])
     except Exception:
         db.rollback()
         logger.exception("contest_join_failed",
@@ -126,20 +214,22 @@ def join_public_contest(db: Session, contest_id: str, user_id: str):
         raise
     logger.debug("contest_join",
                 extra={'user_id': user_id, 'contest_id': contest_id})
+    invalidate_contest_cache(contest_id)
 
 
 def add_user_to_contest_by_username(db: Session, contest_id: str, target_username: str):
-    contest = get_contest(db, contest_id)
     user = get_user_by_username(db, target_username)
-    target_user_id = user.keycloak_id
+    if user is None:
+        logger.error('contest_addusername_failed',
+                     extra={'detail': 'user not found', 'target_username': target_username, 'contest_id': contest_id})
+        return
 
-    if any(user.username == target_user_id for user in contest.participants):
+    if is_contest_participant(db, contest_id, user.keycloak_id):
         logger.error('contest_addusername_failed',
                      extra={'detail': 'user already in contest', 'target_id': target_username, 'contest_id': contest_id})
         return
-    contest.participants.append(user)
     try:
-        db.commit()
+        _insert_participants(db, contest_id, [user.keycloak_id])
     except Exception:
         db.rollback()
         logger.exception("contest_addusername_failed",
@@ -147,18 +237,102 @@ def add_user_to_contest_by_username(db: Session, contest_id: str, target_usernam
         raise
     logger.debug("contest_addusername",
                  extra={'target_username': target_username, 'contest_id': contest_id})
+    invalidate_contest_cache(contest_id)
 
 
-def list_contest_participants(db: Session, contest_id: str) -> list[User]:
-    contest = get_contest(db, contest_id)
+def add_users_to_contest_bulk(db: Session, contest_id: str, usernames: list[str]) -> dict:
+    """
+    Добавляет в контест пользователей по списку username: все имена разрешаются одним запросом,
+    участники добавляются одним INSERT ... ON CONFLICT DO NOTHING, поэтому повтор импорта безопасен
+
+    Args:
+        db (Session): объект сессии БД
+        contest_id (str): идентификатор контеста
+        usernames (list[str]): имена пользователей, повторы игнорируются
+
+    Returns:
+        dict - {"added": [...], "already_joined": [...], "unknown": [...]}, username в порядке запроса
+    """
+    usernames = list(dict.fromkeys(usernames))
+    try:
+        known = dict(db.query(User.username, User.keycloak_id).filter(User.username.in_(usernames)).all())
+    except Exception:
+        logger.exception("contest_addbulk_failed",
+                         extra={'contest_id': contest_id, 'items': len(usernames)})
+        raise
+
+    inserted = set()
+    if known:
+        try:
+            inserted = _insert_participants(db, contest_id, list(known.values()))
+        except Exception:
+            db.rollback()
+            logger.exception("contest_addbulk_failed",
+                             extra={'contest_id': contest_id, 'items': len(known)})
+            raise
+
+    result = {"added": [], "already_joined": [], "unknown": []}
+    for username in usernames:
+        if username not in known:
+            result["unknown"].append(username)
+        elif known[username] in inserted:
+            result["added"].append(username)
+        else:
+            result["already_joined"].append(username)
+    logger.debug("contest_addbulk",
+                 extra={'contest_id': contest_id, 'items': len(usernames), 'inserted': len(inserted)})
+    if inserted:
+        invalidate_contest_cache(contest_id)
+    return result
+
+
+def list_contest_participants(
+    db: Session, contest_id: str, cursor: str | None = None, limit: int = 50
+) -> tuple[list[User], str | None]:
+    """
+    Участники контеста в порядке вступления с keyset-пагинацией по (joined_at, keycloak_id);
+    контест и остальные участники не загружаются
+
+    Args:
+        db (Session): объект сессии БД
+        contest_id (str): идентификатор контеста
+        cursor (str | None): курсор предыдущей страницы или None для первой
+        limit (int): количество участников на страницу
+
+    Returns:
+        tuple[list[User], str | None] - участники страницы и курсор следующей страницы
+
+    Raises:
+        InvalidCursorError: курсор поврежден
+    """
+    try:
+        results, next_cursor = keyset_paginate(
+            db.query(User, contest_participants.c.joined_at)
+            .join(contest_participants, contest_participants.c.user_keycloak_id == User.keycloak_id)
+            .filter(contest_participants.c.contest_id == contest_id),
+            (contest_participants.c.joined_at, User.keycloak_id),
+            cursor,
+            limit,
+            descending=False,
+            key=lambda row: (row[1], row[0].keycloak_id),
+        )
+    except Exception:
+        logger.exception("contest_listparticipants_failed",
+                         extra={'contest_id': contest_id})
+        raise
     logger.debug('contest_listparticipants',
-                 extra={'length': len(contest.participants)})
-    return contest.participants
+                 extra={'contest_id': contest_id, 'length': len(results)})
+    return [user for user, _ in results], next_cursor
+
+
+def _contest_tasks_query(contest_id):
+    # общий для синхронной и асинхронной сессии
+    return select(Problem).where(Problem.contest_id == contest_id).options(*problem_read_options())
 
 
 def list_contest_tasks(db: Session, contest_id: str) -> list[Problem]:
     try:
-        problems = db.query(Problem).filter(Problem.contest_id == contest_id).all()
+        problems = db.scalars(_contest_tasks_query(contest_id)).all()
     except Exception:
         logger.exception("contest_listtasks_failed",
                          extra={'contest_id': contest_id})
@@ -169,14 +343,53 @@ def list_contest_tasks(db: Session, contest_id: str) -> list[Problem]:
     return problems
 
 
-def list_user_contests(db: Session, user_id: str) -> list[Contest]:
+async def list_contest_tasks_async(db: AsyncSession, contest_id: UUID) -> list[Problem]:
     try:
-        user = get_user(db, user_id)
+        problems = (await db.scalars(_contest_tasks_query(contest_id))).all()
+    except Exception:
+        logger.exception("contest_listtasks_failed",
+                         extra={'contest_id': str(contest_id)})
+        raise
+    else:
+        logger.debug("contest_listtasks",
+                     extra={'contest_id': str(contest_id), 'length': len(problems)})
+    return problems
+
+
+def list_user_contests(
+    db: Session, user_id: str, cursor: str | None = None, limit: int = 10
+) -> tuple[list[Contest], str | None]:
+    """
+    Контесты, в которых участвует пользователь, от последнего вступления к первому,
+    с keyset-пагинацией по (joined_at, id)
+
+    Args:
+        db (Session): объект сессии БД
+        user_id (str): Keycloak ID пользователя
+        cursor (str | None): курсор предыдущей страницы или None для первой
+        limit (int): количество контестов на страницу
+
+    Returns:
+        tuple[list[Contest], str | None] - контесты страницы и курсор следующей страницы
+
+    Raises:
+        InvalidCursorError: курсор поврежден
+    """
+    try:
+        results, next_cursor = keyset_paginate(
+            db.query(Contest, contest_participants.c.joined_at)
+            .join(contest_participants, contest_participants.c.contest_id == Contest.id)
+            .filter(contest_participants.c.user_keycloak_id == user_id),
+            (contest_participants.c.joined_at, Contest.id),
+            cursor,
+            limit,
+            key=lambda row: (row[1], row[0].id),
+        )
     except Exception:
         logger.exception("contest_listuser_failed",
                          extra={'user_id': user_id})
         raise
     else:
         logger.debug("contest_listuser",
-                     extra={"user_id": user_id, 'length': len(user.contests_joined)})
-    return user.contests_joined
+                     extra={"user_id": user_id, 'length': len(results)})
+    return [contest for contest, _ in results], next_cursor
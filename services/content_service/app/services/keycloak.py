@@ -1,25 +1,24 @@
-import requests
+import threading
+import time
 
 from fastapi import HTTPException, status
 
 from app.core.config import settings
+from app.core.http import keycloak_client
 from app.core.logger import logger
 
 
-def get_keycloak_admin_token() -> str:
+def _request_admin_token() -> dict:
     """
-    Возвращает keycloak admin token для регистрации пользователей через API
-
-    Args:
-        None
+    Запрашивает у Keycloak admin token (password grant в realm master)
 
     Returns:
-        str - admin access token из Keycloak
+        dict - ответ Keycloak с access_token и expires_in
 
     Raises:
         HTTPException 500 - если не удалось получить токен от Keycloak
     """
-    url = f"{settings.KEYCLOAK_URL}/realms/master/protocol/openid-connect/token"
+    url = "/realms/master/protocol/openid-connect/token"
     data = {
         "grant_type": "password",
         "client_id": "admin-cli",
@@ -28,7 +27,10 @@ def get_keycloak_admin_token() -> str:
     }
     headers = {"Content-Type": "application/x-www-form-urlencoded"}
     try:
-        response = requests.post(url, data=data, headers=headers)
+        # выдача токена не меняет состояние Keycloak, поэтому запрос можно повторять
+        response = keycloak_client.post(
+            url, endpoint="admin_token", data=data, headers=headers, retries=settings.HTTP_RETRIES
+        )
     except Exception:
         logger.exception("keycloak_admintoken_failed")
         raise
@@ -38,16 +40,74 @@ def get_keycloak_admin_token() -> str:
             detail=f"Unable to obtain admin token from Keycloak: {response.text}",
         )
     logger.debug("keycloak_admintoken")
-    return response.json()["access_token"]
+    return response.json()
+
+
+class AdminTokenManager:
+    """
+    Хранит admin token Keycloak и обновляет его за KEYCLOAK_ADMIN_TOKEN_LEEWAY секунд до истечения.
+    Обновление single-flight: при истекшем токене параллельные регистрации ждут один запрос к Keycloak.
+    """
+
+    def __init__(self):
+        self._token: str | None = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def _valid(self) -> bool:
+        return self._token is not None and time.monotonic() < self._expires_at
+
+    def get_token(self) -> str:
+        if self._valid():
+            return self._token
+        with self._lock:
+            if not self._valid():
+                data = _request_admin_token()
+                expires_in = data.get("expires_in") or 60
+                self._token = data["access_token"]
+                self._expires_at = time.monotonic() + max(expires_in - settings.KEYCLOAK_ADMIN_TOKEN_LEEWAY, 0)
+            return self._token
+
+    def invalidate(self, token: str | None = None) -> None:
+        """
+        Сбрасывает токен (например, после 401 от Keycloak). Если передан token,
+        сбрасывает только его - токен, уже обновленный другим потоком, остается
+        """
+        with self._lock:
+            if token is None or token == self._token:
+                self._token = None
+                self._expires_at = 0.0
+
+
+admin_token_manager = AdminTokenManager()
+
 
+def get_keycloak_admin_token() -> str:
+    """
+    Возвращает keycloak admin token для регистрации пользователей через API.
+    Токен кэшируется до истечения и не запрашивается на каждую регистрацию
+
+    Args:
+        None
 
-def register_user_in_keycloak(user_data: dict, admin_token: str) -> str:
+    Returns:
+        str - admin access token из Keycloak
+
+    Raises:
+        HTTPException 500 - если не удалось получить токен от Keycloak
+    """
+    return admin_token_manager.get_token()
+
+
+def register_user_in_keycloak(user_data: dict, admin_token: str | None = None) -> str:
     """
-    Регистрирует пользователя в Keycloak и возвращает его keycloak_id
+    Регистрирует пользователя в Keycloak и возвращает его keycloak_id.
+    Без admin_token берется кэшированный токен; если Keycloak его отклонил (401),
+    токен обновляется и запрос повторяется один раз
 
     Args:
         user_data (dict): регистрационные данные пользователя для Keycloak
-        admin_token (str): токен доступа администратора Keycloak
+        admin_token (str | None): токен доступа администратора Keycloak
 
     Returns:
         str - keycloak_id зарегистрированного пользователя
@@ -55,16 +115,23 @@ def register_user_in_keycloak(user_data: dict, admin_token: str) -> str:
     Raises:
         HTTPException 500 - если регистрация в Keycloak не удалась или отсутствует заголовок Location
     """
-    url = f"{settings.KEYCLOAK_URL}/admin/realms/{settings.KEYCLOAK_REALM}/users"
-    headers = {
-        "Authorization": f"Bearer {admin_token}",
-        "Content-Type": "application/json",
-    }
-    try:
-        response = requests.post(url, json=user_data, headers=headers)
-    except Exception:
-        logger.exception("keycloak_registeruser_failed")
-        raise
+    url = f"/admin/realms/{settings.KEYCLOAK_REALM}/users"
+    cached = admin_token is None
+    for _ in range(2 if cached else 1):
+        token = get_keycloak_admin_token() if cached else admin_token
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        }
+        try:
+            response = keycloak_client.post(url, endpoint="register_user", json=user_data, headers=headers)
+        except Exception:
+            logger.exception("keycloak_registeruser_failed")
+            raise
+        if response.status_code != 401 or not cached:
+            break
+        # токен отозван раньше срока (например, завершена admin-сессия) - пользователь не создан
+        admin_token_manager.invalidate(token)
     if response.status_code not in (201, 204):
         logger.warning("keycloak_registeruser",
                        extra={'detail': 'wrong status code', 'status_code': response.status_code})
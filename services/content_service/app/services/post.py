@@ -1,11 +1,15 @@
-from sqlalchemy import case, func
-from sqlalchemy.orm import Session, joinedload
+from uuid import UUID
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from app.core.logger import logger
+from app.core.pagination import keyset_paginate, keyset_paginate_async, keyset_paginate_select
 from app.models.post import Post
-from app.models.reaction import Reaction, ReactionType
 from app.models.user import User
 from app.schemas.post import PostCreate
+from app.services.reaction import reaction_balance_subquery
 
 
 def create_post(db: Session, post_in: PostCreate, user_id: str) -> Post:
@@ -127,25 +131,29 @@ def delete_post(db: Session, post: Post) -> None:
                     extra={"post_id": str(post.id)})
 
 
-def list_posts(db: Session) -> list[Post]:
+def list_posts(db: Session, cursor: str | None = None, limit: int = 50) -> tuple[list[Post], str | None]:
     """
-    Возвращает список всех постов
+    Возвращает страницу постов от новых к старым
 
     Args:
         db (Session): объект сессии БД
+        cursor (str | None): курсор предыдущей страницы или None для первой
+        limit (int): размер страницы
 
     Returns:
-        list[Post] - список постов
+        tuple[list[Post], str | None] - посты страницы и курсор следующей страницы
     """
     try:
-        posts = db.query(Post).options(joinedload(Post.tags)).all()
+        posts, next_cursor = keyset_paginate(
+            db.query(Post).options(joinedload(Post.tags)), (Post.created_at, Post.id), cursor, limit
+        )
     except Exception:
         logger.exception("post_list_failed")
         raise
     else:
         logger.debug("post_list",
                      extra={'length': len(posts)})
-    return posts
+    return posts, next_cursor
 
 
 def list_posts_by_user(db: Session, keycloak_id: str) -> list[Post]:
@@ -232,79 +240,112 @@ def list_posts_by_tag(db: Session, tag_id: str) -> list[Post]:
     return posts
 
 
+def _enriched_posts_query(problem_id, tag_id, sort_by_rating: bool, sort_order: str) -> tuple[Select, dict]:
+    """
+    Запрос постов задачи с именем автора и балансом реакций и параметры его keyset-пагинации
+    (columns, descending, key) - общие для синхронной и асинхронной сессии
+    """
+    reaction_subq = reaction_balance_subquery("post")
+    stmt = (
+        select(Post, User.display_name, reaction_subq.c.balance)
+        .join(User, Post.created_by == User.keycloak_id)
+        .outerjoin(reaction_subq, Post.id == reaction_subq.c.target_id)
+        .where(Post.problem_id == problem_id)
+        .options(selectinload(Post.tags))
+    )
+    if tag_id:
+        stmt = stmt.where(Post.tags.any(id=tag_id))
+
+    if sort_by_rating:
+        order = {
+            "columns": (func.coalesce(reaction_subq.c.balance, 0), Post.id),
+            "descending": sort_order.lower() != "asc",
+            "key": lambda row: (row[2] or 0, row[0].id),
+        }
+    else:
+        order = {
+            "columns": (Post.created_at, Post.id),
+            "key": lambda row: (row[0].created_at, row[0].id),
+        }
+    return stmt, order
+
+
+def _enrich_posts(results: list, problem_id) -> list[Post]:
+    enriched = []
+    for post, display_name, balance in results:
+        setattr(post, "author_display_name", display_name)
+        setattr(post, "reaction_balance", balance if balance is not None else 0)
+        enriched.append(post)
+    logger.debug("post_listenrichedproblem",
+                 extra={"problem_id": str(problem_id), "length": len(enriched)})
+    return enriched
+
+
 def list_enriched_posts_by_problem(
     db: Session,
     problem_id: str,
-    offset: int = 0,
+    cursor: str | None = None,
     limit: int = 10,
     tag_id: str | None = None,
     sort_by_rating: bool = False,
     sort_order: str = "desc",  # "asc", "desc"
-) -> list[Post]:
+) -> tuple[list[Post], str | None]:
     """
     Возвращает список постов для указанной задачи problem_id с дополнительными полями author_display_name, ..
-    .. reaction_balance; с использованием пагинации, фильтрацией по сложности и тегу; сортировкой по рейтингу
+    .. reaction_balance; с keyset-пагинацией, фильтрацией по тегу; сортировкой по рейтингу или дате
 
     Args:
         db (Session): сессия базы данных
         problem_id (str): идентификатор данной задачи
-        offset (int): смещение для пагинации
+        cursor (str | None): курсор предыдущей страницы или None для первой
         limit (int): количество постов на страницу
         tag_id (Optional[str]): опционально, фильтрует посты, имеющие тег с данным Tag.id
-        sort_by_rating (bool): если True, сортирует результаты по рейтингу
-        sort_order (str): направление сортировки ("asc", "desc"), по умолчанию "desc".
+        sort_by_rating (bool): если True, сортирует результаты по рейтингу, иначе - от новых к старым
+        sort_order (str): направление сортировки по рейтингу ("asc", "desc"), по умолчанию "desc".
 
     Returns:
-        List[Post] - список постов к указанной задаче с указанными параметрами
+        tuple[list[Post], str | None] - посты к указанной задаче и курсор следующей страницы
     """
+    stmt, order = _enriched_posts_query(problem_id, tag_id, sort_by_rating, sort_order)
     try:
-        reaction_subq = (
-            db.query(
-                Reaction.target_id.label("post_id"),
-                func.sum(
-                    case(
-                        (Reaction.reaction_type == ReactionType.plus, 1),
-                        (Reaction.reaction_type == ReactionType.minus, -1),
-                        else_=0,
-                    )
-                ).label("balance"),
-            )
-            .filter(Reaction.target_type == "post")
-            .group_by(Reaction.target_id)
-            .subquery()
-        )
+        results, next_cursor = keyset_paginate_select(db, stmt, cursor=cursor, limit=limit, **order)
     except Exception:
         logger.exception("post_listenrichedproblem_failed",
-                         extra={'detail': 'could not compute reaction subquery',
-                                'problem_id': problem_id})
+                         extra={'problem_id': problem_id})
         raise
+    return _enrich_posts(results, problem_id), next_cursor
+
 
+async def list_enriched_posts_by_problem_async(
+    db: AsyncSession,
+    problem_id: UUID,
+    cursor: str | None = None,
+    limit: int = 10,
+    tag_id: UUID | None = None,
+    sort_by_rating: bool = False,
+    sort_order: str = "desc",  # "asc", "desc"
+) -> tuple[list[Post], str | None]:
+    """
+    list_enriched_posts_by_problem для асинхронной сессии: тот же запрос (_enriched_posts_query),
+    теги страницы загружаются одним дополнительным запросом (selectinload)
+
+    Args:
+        db (AsyncSession): асинхронная сессия БД
+        problem_id (UUID): идентификатор данной задачи
+        cursor (str | None): курсор предыдущей страницы или None для первой
+        limit (int): количество постов на страницу
+        tag_id (Optional[UUID]): опционально, фильтрует посты, имеющие тег с данным Tag.id
+        sort_by_rating (bool): если True, сортирует результаты по рейтингу, иначе - от новых к старым
+        sort_order (str): направление сортировки по рейтингу ("asc", "desc"), по умолчанию "desc".
+
+    Returns:
+        tuple[list[Post], str | None] - посты к указанной задаче и курсор следующей страницы
+    """
+    stmt, order = _enriched_posts_query(problem_id, tag_id, sort_by_rating, sort_order)
     try:
-        query = (
-            db.query(Post, User.display_name, reaction_subq.c.balance)
-            .join(User, Post.created_by == User.keycloak_id)
-            .outerjoin(reaction_subq, Post.id == reaction_subq.c.post_id)
-            .filter(Post.problem_id == problem_id)
-        )
-        if tag_id:
-            query = query.filter(Post.tags.any(id=tag_id))
-        if sort_by_rating:
-            if sort_order.lower() == "asc":
-                query = query.order_by(func.coalesce(reaction_subq.c.balance, 0).asc())
-            else:
-                query = query.order_by(func.coalesce(reaction_subq.c.balance, 0).desc())
-        query = query.offset(offset).limit(limit)
-        results = query.all()
+        results, next_cursor = await keyset_paginate_async(db, stmt, cursor=cursor, limit=limit, **order)
     except Exception:
         logger.exception("post_listenrichedproblem_failed",
-                         extra={'problem_id': problem_id})
+                         extra={'problem_id': str(problem_id)})
         raise
-
-    enriched = []
-    for post, display_name, balance in results:
-        setattr(post, "author_display_name", display_name)
-        setattr(post, "reaction_balance", balance if balance is not None else 0)
-        enriched.append(post)
-    logger.debug("post_listenrichedproblem",
-                 extra={"problem_id": problem_id, "length": len(enriched)})
-    return enriched
+    return _enrich_posts(results, problem_id), next_cursor
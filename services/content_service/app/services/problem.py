@@ -1,11 +1,21 @@
-from sqlalchemy import case, func
-from sqlalchemy.orm import Session, joinedload
+from uuid import UUID
 
+from sqlalchemy import Select, String, cast, func, literal, null, select, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.core.cache import CACHE_PROBLEMS, invalidate_responses
 from app.core.logger import logger
+from app.core.pagination import keyset_paginate, keyset_paginate_async, keyset_paginate_select
+from app.models.contest import Contest
 from app.models.problem import Problem
-from app.models.reaction import Reaction, ReactionType
+from app.models.solved_problems import solved_problems
+from app.models.tag import Tag, problem_tags
 from app.models.user import User
-from app.schemas.problem import ProblemCreate
+from app.schemas.problem import ProblemCreate, ProblemSolvedItem, SolvedMarkStatus, TagMatch
+from app.services.reaction import reaction_balance_subquery
+from app.services.tester import invalidate_contest_cache
 
 
 def create_problem(db: Session, problem_in: ProblemCreate, creator_id: str) -> Problem:
@@ -48,6 +58,8 @@ def create_problem(db: Session, problem_in: ProblemCreate, creator_id: str) -> P
     else:
         logger.debug("problem_create",
                      extra={'problem_id': str(problem.id)})
+    invalidate_responses(CACHE_PROBLEMS)
+    invalidate_contest_cache(problem.contest_id)
     return problem
 
 
@@ -83,6 +95,45 @@ def get_problem(db: Session, problem_id: str) -> Problem | None:
     return result
 
 
+def problem_read_options() -> tuple:
+    """
+    Опции загрузки связей, которые читает ProblemRead (tags, contest для dedupe_submissions):
+    в асинхронной сессии ленивая загрузка при сериализации невозможна
+    """
+    return (
+        selectinload(Problem.tags),
+        selectinload(Problem.contest).raiseload(Contest.participants),
+    )
+
+
+async def get_problem_async(db: AsyncSession, problem_id: UUID) -> Problem | None:
+    """
+    get_problem для асинхронной сессии, связи для ProblemRead загружаются заранее
+
+    Args:
+        db (AsyncSession): асинхронная сессия БД
+        problem_id (UUID): идентификатор задачи
+
+    Returns:
+        Problem | None - найденная задача или None, если задача не существует
+    """
+    try:
+        result = await db.scalar(
+            select(Problem).where(Problem.id == problem_id).options(*problem_read_options())
+        )
+    except Exception:
+        logger.exception("problem_get_failed",
+                         extra={'problem_id': str(problem_id)})
+        raise
+    if result is None:
+        logger.warning("problem_get_notfound",
+                       extra={'problem_id': str(problem_id)})
+    else:
+        logger.debug("problem_get",
+                     extra={'problem_id': str(problem_id)})
+    return result
+
+
 def update_problem(db: Session, problem: Problem, update_data: dict) -> Problem:
     """
     Обновляет данные задачи и возвращает обновленный объект задачи.
@@ -95,6 +146,7 @@ def update_problem(db: Session, problem: Problem, update_data: dict) -> Problem:
     Returns:
         Problem - обновленная задача
     """
+    previous_contest_id = problem.contest_id
     for key, value in update_data.items():
         if key != 'tags':
             setattr(problem, key, value)
@@ -109,6 +161,10 @@ def update_problem(db: Session, problem: Problem, update_data: dict) -> Problem:
     else:
         logger.debug("problem_update",
                      extra={'problem_id': str(problem.id)})
+    invalidate_responses(CACHE_PROBLEMS)
+    if previous_contest_id != problem.contest_id:
+        invalidate_contest_cache(previous_contest_id)
+        invalidate_contest_cache(problem.contest_id)
     return problem
 
 
@@ -123,6 +179,7 @@ def delete_problem(db: Session, problem: Problem) -> None:
     Returns:
         None - функция ничего не возвращает
     """
+    contest_id = problem.contest_id
     try:
         db.delete(problem)
         db.commit()
@@ -134,27 +191,91 @@ def delete_problem(db: Session, problem: Problem) -> None:
     else:
         logger.debug("problem_delete",
                      extra={'problem_id': str(problem.id)})
+        invalidate_responses(CACHE_PROBLEMS)
+        invalidate_contest_cache(contest_id)
+
+
+def mark_problems_solved(db: Session, items: list[ProblemSolvedItem]) -> list[dict]:
+    """
+    Отмечает задачи решенными для пар (пользователь, задача) одним
+    INSERT ... ON CONFLICT DO NOTHING в solved_problems. Повторная отметка ничего не меняет,
+    поэтому повтор всей пачки после сбоя доставки безопасен.
+
+    Args:
+        db (Session): объект сессии БД
+        items (list[ProblemSolvedItem]): пары (задача, пользователь)
+
+    Returns:
+        list[dict]: результат по каждой уникальной паре в порядке запроса
+            {problem_id, user_id, status}, status - SolvedMarkStatus
+    """
+    pairs = list(dict.fromkeys((item.user_id, item.problem_id) for item in items))
+    user_ids = {user_id for user_id, _ in pairs}
+    problem_ids = {problem_id for _, problem_id in pairs}
+    known_users = {row[0] for row in db.query(User.keycloak_id).filter(User.keycloak_id.in_(user_ids)).all()}
+    known_problems = {row[0] for row in db.query(Problem.id).filter(Problem.id.in_(problem_ids)).all()}
+
+    rows = [
+        {"user_keycloak_id": user_id, "problem_id": problem_id}
+        for user_id, problem_id in pairs
+        if user_id in known_users and problem_id in known_problems
+    ]
+    inserted = set()
+    if rows:
+        stmt = (
+            insert(solved_problems)
+            .values(rows)
+            .on_conflict_do_nothing()
+            .returning(solved_problems.c.user_keycloak_id, solved_problems.c.problem_id)
+        )
+        try:
+            inserted = {(row[0], row[1]) for row in db.execute(stmt)}
+            db.commit()
+        except Exception:
+            logger.exception("problem_marksolved_failed", extra={'items': len(rows)})
+            db.rollback()
+            raise
+
+    results = []
+    for user_id, problem_id in pairs:
+        if user_id not in known_users:
+            status = SolvedMarkStatus.USER_NOT_FOUND
+        elif problem_id not in known_problems:
+            status = SolvedMarkStatus.PROBLEM_NOT_FOUND
+        elif (user_id, problem_id) in inserted:
+            status = SolvedMarkStatus.CREATED
+        else:
+            status = SolvedMarkStatus.ALREADY_SOLVED
+        results.append({"problem_id": problem_id, "user_id": user_id, "status": status})
+    logger.debug("problem_marksolved", extra={'items': len(pairs), 'inserted': len(inserted)})
+    return results
 
 
-def list_problems(db: Session) -> list[Problem]:
+def list_problems(
+    db: Session, cursor: str | None = None, limit: int = 50
+) -> tuple[list[Problem], str | None]:
     """
-    Возвращает список всех задач
+    Возвращает страницу задач от новых к старым
 
     Args:
         db (Session): объект сессии БД
+        cursor (str | None): курсор предыдущей страницы или None для первой
+        limit (int): размер страницы
 
     Returns:
-        list[Problem] - список задач
+        tuple[list[Problem], str | None] - задачи страницы и курсор следующей страницы
     """
     try:
-        problems = db.query(Problem).options(joinedload(Problem.tags)).all()
+        problems, next_cursor = keyset_paginate(
+            db.query(Problem).options(joinedload(Problem.tags)), (Problem.created_at, Problem.id), cursor, limit
+        )
     except Exception:
         logger.exception("problem_list_failed")
         raise
     else:
         logger.debug("problem_list",
                      extra={'length': len(problems)})
-    return problems
+    return problems, next_cursor
 
 
 def list_problems_by_tag(db: Session, tag_id: str) -> list[Problem]:
@@ -241,82 +362,211 @@ def list_problems_by_difficulty(db: Session, difficulty: str) -> list[Problem]:
     return problems
 
 
+def problem_tags_filter(tag_ids: list, match: TagMatch = TagMatch.all):
+    """
+    Условие на Problem.id по выбранным тегам: один некоррелированный подзапрос к problem_tags
+    (tag_id IN (...), для all - GROUP BY problem_id HAVING count = числу тегов) вместо EXISTS
+    на каждую строку и каждый тег
+
+    Args:
+        tag_ids (list): Tag.id выбранных тегов
+        match (TagMatch): все теги (all) или хотя бы один (any)
+    """
+    tag_ids = list(dict.fromkeys(tag_ids))
+    matched = select(problem_tags.c.problem_id).where(problem_tags.c.tag_id.in_(tag_ids))
+    if match == TagMatch.all and len(tag_ids) > 1:
+        matched = matched.group_by(problem_tags.c.problem_id).having(func.count() == len(tag_ids))
+    return Problem.id.in_(matched)
+
+
+def _enriched_problems_query(
+    difficulty: str | None,
+    tag_ids: list | None,
+    sort_by_rating: bool,
+    sort_order: str,
+    tag_match: TagMatch,
+) -> tuple[Select, dict]:
+    """
+    Запрос каталога задач с именем автора и балансом реакций и параметры его keyset-пагинации
+    (columns, descending, key) - общие для синхронной и асинхронной сессии
+    """
+    reaction_subq = reaction_balance_subquery("problem")
+    stmt = (
+        select(Problem, User.display_name, reaction_subq.c.balance)
+        .join(User, Problem.created_by == User.keycloak_id)
+        .outerjoin(reaction_subq, Problem.id == reaction_subq.c.target_id)
+        .where(Problem.contest_id.is_(None))
+        .options(*problem_read_options())
+    )
+    if difficulty:
+        stmt = stmt.where(Problem.difficulty == difficulty)
+    if tag_ids:
+        stmt = stmt.where(problem_tags_filter(tag_ids, tag_match))
+
+    if sort_by_rating:
+        order = {
+            "columns": (func.coalesce(reaction_subq.c.balance, 0), Problem.id),
+            "descending": sort_order != "asc",
+            "key": lambda row: (row[2] or 0, row[0].id),
+        }
+    else:
+        order = {
+            "columns": (Problem.created_at, Problem.id),
+            "key": lambda row: (row[0].created_at, row[0].id),
+        }
+    return stmt, order
+
+
+def _enrich_problems(results: list) -> list[Problem]:
+    enriched = []
+    for problem, display_name, balance in results:
+        setattr(problem, "author_display_name", display_name)
+        setattr(problem, "reaction_balance", balance if balance is not None else 0)
+        enriched.append(problem)
+    logger.debug("problem_listenriched",
+                 extra={'length': len(enriched)})
+    return enriched
+
+
 def list_enriched_problems_filtered(
     db: Session,
-    offset: int = 0,
+    cursor: str | None = None,
     limit: int = 10,
     difficulty: str | None = None,
-    tag_id: str | None = None,
+    tag_ids: list[str] | None = None,
     sort_by_rating: bool = False,
     sort_order: str = "desc",  # "asc", "desc"
-) -> list[Problem]:
+    tag_match: TagMatch = TagMatch.all,
+) -> tuple[list[Problem], str | None]:
     """
     Возвращает список задач с дополнительными полями author_display_name, reaction_balance; ..
-    .. с использованием пагинации, фильтрацией по сложности и тегу; сортировкой по рейтингу
+    .. с keyset-пагинацией, фильтрацией по сложности и тегам; сортировкой по рейтингу или дате
 
     Args:
         db (Session): сессия базы данных
-        offset (int): смещение для пагинации
+        cursor (str | None): курсор предыдущей страницы или None для первой
         limit (int): количество задач на страницу
         difficulty (Optional[str]): опционально, фильтрует задачи по сложности ("EASY", "MEDIUM", "HARD")
-        tag_id (Optional[str]): опционально, фильтрует задачи, имеющие тег с данным Tag.id
-        sort_by_rating (bool): если True, сортирует результаты по рейтингу
-        sort_order (str): направление сортировки ("asc", "desc"), по умолчанию "desc".
+        tag_ids (Optional[list[str]]): опционально, фильтрует задачи по тегам с данными Tag.id
+        sort_by_rating (bool): если True, сортирует результаты по рейтингу, иначе - от новых к старым
+        sort_order (str): направление сортировки по рейтингу ("asc", "desc"), по умолчанию "desc".
+        tag_match (TagMatch): все теги из tag_ids (all) или хотя бы один (any)
 
     Returns:
-        List[Problem] - список задач с указанными параметрами
+        tuple[list[Problem], str | None] - задачи страницы и курсор следующей страницы
     """
+    stmt, order = _enriched_problems_query(difficulty, tag_ids, sort_by_rating, sort_order, tag_match)
     try:
-        reaction_subq = (
-            db.query(
-                Reaction.target_id.label("problem_id"),
-                func.sum(
-                    case(
-                        (Reaction.reaction_type == ReactionType.plus, 1),
-                        (Reaction.reaction_type == ReactionType.minus, -1),
-                        else_=0,
-                    )
-                ).label("balance"),
-            )
-            .filter(Reaction.target_type == "problem")
-            .group_by(Reaction.target_id)
-            .subquery()
-        )
+        results, next_cursor = keyset_paginate_select(db, stmt, cursor=cursor, limit=limit, **order)
     except Exception:
-        logger.exception("problem_listenriched_failed",
-                     extra={'detail': 'could not compute reaction subquery'})
+        logger.exception("problem_listenriched_failed")
         raise
+    return _enrich_problems(results), next_cursor
 
-    try:
-        query = (
-            db.query(Problem, User.display_name, reaction_subq.c.balance)
-            .join(User, Problem.created_by == User.keycloak_id)
-            .outerjoin(reaction_subq, Problem.id == reaction_subq.c.problem_id)
-        )
 
-        if difficulty:
-            query = query.filter(Problem.difficulty == difficulty)
-        if tag_id:
-            query = query.filter(Problem.tags.any(id=tag_id))
-        query = query.filter(Problem.contest_id.is_(None))
+async def list_enriched_problems_filtered_async(
+    db: AsyncSession,
+    cursor: str | None = None,
+    limit: int = 10,
+    difficulty: str | None = None,
+    tag_ids: list[UUID] | None = None,
+    sort_by_rating: bool = False,
+    sort_order: str = "desc",  # "asc", "desc"
+    tag_match: TagMatch = TagMatch.all,
+) -> tuple[list[Problem], str | None]:
+    """
+    list_enriched_problems_filtered для асинхронной сессии: тот же запрос (_enriched_problems_query),
+    теги страницы загружаются одним дополнительным запросом (selectinload)
 
-        if sort_by_rating:
-            if sort_order == "asc":
-                query = query.order_by(func.coalesce(reaction_subq.c.balance, 0).asc())
-            else:
-                query = query.order_by(func.coalesce(reaction_subq.c.balance, 0).desc())
+    Args:
+        db (AsyncSession): асинхронная сессия БД
+        cursor (str | None): курсор предыдущей страницы или None для первой
+        limit (int): количество задач на страницу
+        difficulty (Optional[str]): опционально, фильтрует задачи по сложности ("EASY", "MEDIUM", "HARD")
+        tag_ids (Optional[list[UUID]]): опционально, фильтрует задачи по тегам с данными Tag.id
+        sort_by_rating (bool): если True, сортирует результаты по рейтингу, иначе - от новых к старым
+        sort_order (str): направление сортировки по рейтингу ("asc", "desc"), по умолчанию "desc".
+        tag_match (TagMatch): все теги из tag_ids (all) или хотя бы один (any)
 
-        query = query.offset(offset).limit(limit)
-        results = query.all()
+    Returns:
+        tuple[list[Problem], str | None] - задачи страницы и курсор следующей страницы
+    """
+    stmt, order = _enriched_problems_query(difficulty, tag_ids, sort_by_rating, sort_order, tag_match)
+    try:
+        results, next_cursor = await keyset_paginate_async(db, stmt, cursor=cursor, limit=limit, **order)
     except Exception:
         logger.exception("problem_listenriched_failed")
         raise
+    return _enrich_problems(results), next_cursor
 
-    enriched = []
-    for problem, display_name, balance in results:
-        setattr(problem, "author_display_name", display_name)
-        setattr(problem, "reaction_balance", balance if balance is not None else 0)
-        enriched.append(problem)
-    logger.debug("problem_listenriched",
-                 extra={'length': len(enriched)})
-    return enriched
+
+async def problem_facets_async(
+    db: AsyncSession,
+    difficulty: str | None = None,
+    tag_ids: list[UUID] | None = None,
+    tag_match: TagMatch = TagMatch.all,
+) -> dict:
+    """
+    Число задач каталога (вне контестов) по сложности и по тегам для текущего фильтра
+    /problems/enriched - одним агрегирующим запросом (UNION ALL двух GROUP BY).
+    Фасет сложности не учитывает выбранную сложность, чтобы было видно, сколько задач с другой;
+    фасет тегов при tag_match=any не учитывает выбранные теги (каждый тег расширяет выдачу),
+    при all - учитывает (сколько задач останется, если добавить тег)
+
+    Args:
+        db (AsyncSession): асинхронная сессия БД
+        difficulty (str | None): фильтр по сложности
+        tag_ids (list[UUID] | None): выбранные теги
+        tag_match (TagMatch): все теги (all) или хотя бы один (any)
+
+    Returns:
+        dict - {"difficulty": [...], "tags": [...]} со значениями FacetCount
+    """
+    difficulty_filters = [Problem.contest_id.is_(None)]
+    tag_filters = [Problem.contest_id.is_(None)]
+    if tag_ids:
+        difficulty_filters.append(problem_tags_filter(tag_ids, tag_match))
+        if tag_match == TagMatch.all:
+            tag_filters.append(problem_tags_filter(tag_ids, tag_match))
+    if difficulty:
+        tag_filters.append(Problem.difficulty == difficulty)
+
+    by_difficulty = (
+        select(
+            literal("difficulty").label("facet"),
+            cast(Problem.difficulty, String).label("value"),
+            cast(null(), String).label("label"),
+            func.count().label("count"),
+        )
+        .where(*difficulty_filters)
+        .group_by(Problem.difficulty)
+    )
+    by_tag = (
+        select(
+            literal("tags").label("facet"),
+            cast(Tag.id, String).label("value"),
+            Tag.name.label("label"),
+            func.count().label("count"),
+        )
+        .join(problem_tags, problem_tags.c.tag_id == Tag.id)
+        .join(Problem, Problem.id == problem_tags.c.problem_id)
+        .where(*tag_filters)
+        .group_by(Tag.id, Tag.name)
+    )
+    try:
+        rows = (await db.execute(union_all(by_difficulty, by_tag))).all()
+    except Exception:
+        logger.exception("problem_facets_failed")
+        raise
+
+    facets = {"difficulty": [], "tags": []}
+    for facet, value, label, count in rows:
+        if facet == "tags":
+            facets["tags"].append({"value": str(UUID(value)), "label": label, "count": count})
+        else:
+            facets["difficulty"].append({"value": value, "count": count})
+    facets["difficulty"].sort(key=lambda item: -item["count"])
+    facets["tags"].sort(key=lambda item: (-item["count"], item["label"]))
+    logger.debug("problem_facets",
+                 extra={'length': len(facets["tags"])})
+    return facets
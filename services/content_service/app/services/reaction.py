@@ -1,10 +1,21 @@
+from sqlalchemy import Select, case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.cache import CACHE_PROBLEMS, invalidate_responses
 from app.core.logger import logger
 from app.models.reaction import Reaction
 from app.schemas.reaction import ReactionCreate, ReactionType, TargetType
 
 
+def invalidate_target_responses(target_type: str) -> None:
+    """
+    Сбрасывает кэш ответов, в которые входит баланс реакций на объект типа target_type
+    """
+    if target_type == TargetType.problem:
+        invalidate_responses(CACHE_PROBLEMS)
+
+
 def create_reaction(db: Session, reaction_in: ReactionCreate) -> Reaction:
     """
     Создает и возвращает объект реакции, используя переданные данные
@@ -34,6 +45,7 @@ def create_reaction(db: Session, reaction_in: ReactionCreate) -> Reaction:
         logger.debug('reaction_create',
                      extra={'reaction_type': reaction.target_type, 'created_by': str(reaction.created_by)}
         )
+    invalidate_target_responses(reaction.target_type)
     return reaction
 
 
@@ -83,6 +95,7 @@ def delete_reaction(db: Session, reaction: Reaction) -> None:
         raise
     else:
         logger.info(f"Successfully deleted reaction with id: {reaction.id}")
+    invalidate_target_responses(reaction.target_type)
 
 
 def set_reaction(
@@ -133,6 +146,7 @@ def set_reaction(
                                  extra={'detail': 'could not remove existing reaction',
                                         'target_id': target_id, "target_type": target_type, "user_id": user_id})
                 raise
+            invalidate_target_responses(target_type)
             return None
 
         elif existing_reaction.reaction_type != reaction_type:
@@ -159,6 +173,7 @@ def set_reaction(
                                  extra={'detail': 'could not create new reaction',
                                         'target_id': target_id, "target_type": target_type, "user_id": user_id})
                 raise
+            invalidate_target_responses(target_type)
             return new_reaction
 
     # create
@@ -179,6 +194,7 @@ def set_reaction(
     else:
         logger.debug("reaction_set",
                      extra={'target_id': target_id, "target_type": target_type, "user_id": user_id})
+    invalidate_target_responses(target_type)
     return new_reaction
 
 
@@ -282,3 +298,124 @@ def get_user_reaction(
         logger.debug("reaction_getuser",
                      extra={'user_id': user_id, 'target_type': target_type, 'target_id': target_id})
     return reaction
+
+
+def reaction_balance_subquery(target_type: str, target_ids=None):
+    """
+    Подзапрос (target_id, balance) с балансом реакций объектов типа target_type
+    для outer join к списку задач или постов; target_ids (select идентификаторов) ..
+    .. ограничивает агрегацию нужными объектами
+    """
+    stmt = (
+        select(
+            Reaction.target_id.label("target_id"),
+            func.sum(
+                case(
+                    (Reaction.reaction_type == ReactionType.plus, 1),
+                    (Reaction.reaction_type == ReactionType.minus, -1),
+                    else_=0,
+                )
+            ).label("balance"),
+        )
+        .where(Reaction.target_type == target_type)
+        .group_by(Reaction.target_id)
+    )
+    if target_ids is not None:
+        stmt = stmt.where(Reaction.target_id.in_(target_ids))
+    return stmt.subquery()
+
+
+def _reaction_balances_query(target_ids: list, target_type: str) -> Select:
+    subq = reaction_balance_subquery(target_type)
+    return select(subq.c.target_id, subq.c.balance).where(subq.c.target_id.in_(target_ids))
+
+
+def _balances_by_target(target_ids: list, rows) -> dict:
+    balances = {target_id: 0 for target_id in target_ids}
+    balances.update({target_id: balance for target_id, balance in rows})
+    return balances
+
+
+def compute_reaction_balances(db: Session, target_ids: list, target_type: str) -> dict:
+    """
+    Вычисляет балансы реакций для нескольких объектов одним запросом
+
+    Args:
+        db (Session): объект сессии БД
+        target_ids (list): идентификаторы объектов
+        target_type (str): тип объектов ("post", "comment" или "problem")
+
+    Returns:
+        dict - target_id -> баланс реакций; для объектов без реакций 0
+    """
+    if not target_ids:
+        return {}
+    try:
+        rows = db.execute(_reaction_balances_query(target_ids, target_type))
+    except Exception:
+        logger.exception("reaction_computemany_failed",
+                         extra={'target_type': target_type, 'length': len(target_ids)})
+        raise
+    logger.debug("reaction_computemany",
+                 extra={'target_type': target_type, 'length': len(target_ids)})
+    return _balances_by_target(target_ids, rows)
+
+
+async def compute_reaction_balances_async(db: AsyncSession, target_ids: list, target_type: str) -> dict:
+    """
+    compute_reaction_balances для асинхронной сессии
+
+    Args:
+        db (AsyncSession): асинхронная сессия БД
+        target_ids (list): идентификаторы объектов
+        target_type (str): тип объектов ("post", "comment" или "problem")
+
+    Returns:
+        dict - target_id -> баланс реакций; для объектов без реакций 0
+    """
+    if not target_ids:
+        return {}
+    try:
+        rows = await db.execute(_reaction_balances_query(target_ids, target_type))
+    except Exception:
+        logger.exception("reaction_computemany_failed",
+                         extra={'target_type': target_type, 'length': len(target_ids)})
+        raise
+    logger.debug("reaction_computemany",
+                 extra={'target_type': target_type, 'length': len(target_ids)})
+    return _balances_by_target(target_ids, rows)
+
+
+async def get_user_reactions_async(
+    db: AsyncSession, target_ids: list, target_type: str, user_id: str
+) -> dict:
+    """
+    Возвращает реакции пользователя на несколько объектов одним запросом
+
+    Args:
+        db (AsyncSession): асинхронная сессия БД
+        target_ids (list): идентификаторы объектов
+        target_type (str): тип объектов ("problem", "post", "comment")
+        user_id (str): User.keycloak_id пользователя
+
+    Returns:
+        dict - target_id -> ReactionType только для объектов, на которые пользователь реагировал
+    """
+    if not target_ids:
+        return {}
+    try:
+        rows = await db.execute(
+            select(Reaction.target_id, Reaction.reaction_type).where(
+                Reaction.target_id.in_(target_ids),
+                Reaction.target_type == target_type,
+                Reaction.created_by == user_id,
+            )
+        )
+    except Exception:
+        logger.exception("reaction_getusermany_failed",
+                         extra={'target_type': target_type, 'user_id': user_id})
+        raise
+    reactions = {target_id: reaction_type for target_id, reaction_type in rows}
+    logger.debug("reaction_getusermany",
+                 extra={'user_id': user_id, 'target_type': target_type, 'length': len(reactions)})
+    return reactions
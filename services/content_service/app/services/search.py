@@ -0,0 +1,172 @@
+from uuid import UUID
+
+from sqlalchemy import cast, func, select
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logger import logger
+from app.core.pagination import keyset_paginate_async
+from app.models.blog_post import BlogPost
+from app.models.post import Post
+from app.models.problem import Problem
+from app.models.tag import Tag, post_tags, problem_tags
+from app.schemas.search import SearchTarget
+
+# конфигурация текстового поиска search_vector (миграция full_text_search): русская морфология,
+# латиница стеммится английским словарем
+SEARCH_CONFIG = "russian"
+
+# не больше стольких значений в фасете тегов
+TAG_FACET_LIMIT = 20
+
+SEARCH_MODELS = {
+    SearchTarget.problem: Problem,
+    SearchTarget.post: Post,
+    SearchTarget.blog_post: BlogPost,
+}
+
+# таблица связи с тегами и ее колонка-ссылка на объект
+TAG_LINKS = {
+    SearchTarget.problem: (problem_tags, problem_tags.c.problem_id),
+    SearchTarget.post: (post_tags, post_tags.c.post_id),
+}
+
+
+def search_query(q: str):
+    """
+    tsquery из пользовательской строки в синтаксисе веб-поиска: слова через пробел (AND),
+    "фраза", or, -исключение. Некорректный ввод не приводит к ошибке
+    """
+    return func.websearch_to_tsquery(SEARCH_CONFIG, q)
+
+
+def _search_filters(
+    target: SearchTarget,
+    q: str,
+    difficulty: str | None = None,
+    tag_id: UUID | None = None,
+    skip: str | None = None,
+) -> list:
+    # skip - фильтр фасета, который не применяется к его собственным значениям
+    model = SEARCH_MODELS[target]
+    filters = [model.search_vector.op("@@")(search_query(q))]
+    if target == SearchTarget.problem:
+        # задачи контестов в общий поиск не попадают, как и в /problems/enriched
+        filters.append(Problem.contest_id.is_(None))
+        if difficulty and skip != "difficulty":
+            filters.append(Problem.difficulty == difficulty)
+    if tag_id and skip != "tags" and target in TAG_LINKS:
+        filters.append(model.tags.any(Tag.id == tag_id))
+    return filters
+
+
+async def search_async(
+    db: AsyncSession,
+    q: str,
+    target: SearchTarget = SearchTarget.problem,
+    cursor: str | None = None,
+    limit: int = 20,
+    difficulty: str | None = None,
+    tag_id: UUID | None = None,
+) -> tuple[list[dict], str | None]:
+    """
+    Полнотекстовый поиск по задачам, постам или блог постам (GIN-индекс по search_vector).
+    Результаты упорядочены по релевантности ts_rank_cd (совпадения в заголовке весят больше),
+    при равной релевантности - по id; пагинация keyset по (rank, id)
+
+    Args:
+        db (AsyncSession): асинхронная сессия БД
+        q (str): поисковая строка
+        target (SearchTarget): где искать
+        cursor (str | None): курсор предыдущей страницы или None для первой
+        limit (int): размер страницы
+        difficulty (str | None): фильтр по сложности (только задачи)
+        tag_id (UUID | None): фильтр по тегу (задачи и посты)
+
+    Returns:
+        tuple[list[dict], str | None] - найденные объекты (поля SearchHit) и курсор следующей страницы
+
+    Raises:
+        InvalidCursorError: курсор поврежден
+    """
+    model = SEARCH_MODELS[target]
+    # real -> double precision: значение ранга в курсоре сравнивается с тем же выражением без потери точности
+    rank = cast(func.ts_rank_cd(model.search_vector, search_query(q)), DOUBLE_PRECISION)
+    columns = [model.id, model.title, model.created_at, rank.label("rank")]
+    if target == SearchTarget.problem:
+        columns.append(Problem.difficulty)
+    elif target == SearchTarget.post:
+        columns.append(Post.problem_id)
+    stmt = select(*columns).where(*_search_filters(target, q, difficulty, tag_id))
+
+    try:
+        rows, next_cursor = await keyset_paginate_async(
+            db, stmt, (rank, model.id), cursor, limit, key=lambda row: (row.rank, row.id)
+        )
+    except Exception:
+        logger.exception("search_failed", extra={'target': target.value})
+        raise
+
+    hits = []
+    for row in rows:
+        hit = {"id": row.id, "type": target, "title": row.title, "rank": row.rank, "created_at": row.created_at}
+        if target == SearchTarget.problem:
+            hit["difficulty"] = getattr(row.difficulty, "value", row.difficulty)
+        elif target == SearchTarget.post:
+            hit["problem_id"] = row.problem_id
+        hits.append(hit)
+    logger.debug("search", extra={'target': target.value, 'length': len(hits)})
+    return hits, next_cursor
+
+
+async def search_facets_async(
+    db: AsyncSession,
+    q: str,
+    target: SearchTarget = SearchTarget.problem,
+    difficulty: str | None = None,
+    tag_id: UUID | None = None,
+) -> dict:
+    """
+    Число найденных объектов по сложности и по тегам. Каждый фасет учитывает остальные фильтры,
+    но не собственный: при выбранной сложности видно, сколько найдется с другой
+
+    Args:
+        db (AsyncSession): асинхронная сессия БД
+        q (str): поисковая строка
+        target (SearchTarget): где искать
+        difficulty (str | None): фильтр по сложности (только задачи)
+        tag_id (UUID | None): фильтр по тегу
+
+    Returns:
+        dict - {"difficulty": [...], "tags": [...]} со значениями FacetCount
+    """
+    facets = {"difficulty": [], "tags": []}
+    try:
+        if target == SearchTarget.problem:
+            rows = await db.execute(
+                select(Problem.difficulty, func.count())
+                .where(*_search_filters(target, q, difficulty, tag_id, skip="difficulty"))
+                .group_by(Problem.difficulty)
+                .order_by(func.count().desc())
+            )
+            facets["difficulty"] = [
+                {"value": getattr(value, "value", value), "count": count} for value, count in rows
+            ]
+
+        if target in TAG_LINKS:
+            link, object_id = TAG_LINKS[target]
+            model = SEARCH_MODELS[target]
+            rows = await db.execute(
+                select(Tag.id, Tag.name, func.count())
+                .join(link, link.c.tag_id == Tag.id)
+                .join(model, model.id == object_id)
+                .where(*_search_filters(target, q, difficulty, tag_id, skip="tags"))
+                .group_by(Tag.id, Tag.name)
+                .order_by(func.count().desc(), Tag.name)
+                .limit(TAG_FACET_LIMIT)
+            )
+            facets["tags"] = [{"value": str(id_), "label": name, "count": count} for id_, name, count in rows]
+    except Exception:
+        logger.exception("search_facets_failed", extra={'target': target.value})
+        raise
+    return facets
@@ -1,6 +1,8 @@
 from sqlalchemy.orm import Session
 
+from app.core.cache import CACHE_PROBLEMS, CACHE_TAGS, invalidate_responses
 from app.core.logger import logger
+from app.core.pagination import keyset_paginate
 from app.models.tag import Tag
 from app.schemas.tag import TagCreate
 
@@ -30,6 +32,7 @@ def create_tag(db: Session, tag_in: TagCreate) -> Tag:
     else:
         logger.debug("tag_create",
                      extra={'tag_name': tag_in.name})
+    invalidate_responses(CACHE_TAGS)
     return tag
 
 
@@ -75,6 +78,8 @@ def update_tag(db: Session, tag: Tag, update_data: dict) -> Tag:
         raise
     else:
         logger.debug("tag_update", extra={'tag_id': str(tag.id)})
+    # теги входят в ответы задач
+    invalidate_responses(CACHE_TAGS, CACHE_PROBLEMS)
     return tag
 
 
@@ -97,23 +102,28 @@ def delete_tag(db: Session, tag: Tag) -> None:
         raise
     else:
         logger.debug("tag_delete", extra={"tag_name": tag.name})
+    invalidate_responses(CACHE_TAGS, CACHE_PROBLEMS)
 
 
-def get_tags(db: Session) -> list[Tag]:
+def get_tags(
+    db: Session, cursor: str | None = None, limit: int = 200
+) -> tuple[list[Tag], str | None]:
     """
-    Возвращает список всех тегов
+    Возвращает страницу тегов, упорядоченных по имени
 
     Args:
         db (Session): объект сессии БД
+        cursor (str | None): курсор предыдущей страницы или None для первой
+        limit (int): размер страницы
 
     Returns:
-        list[Tag] - список тегов
+        tuple[list[Tag], str | None] - теги страницы и курсор следующей страницы
     """
     try:
-        tags = db.query(Tag).all()
+        tags, next_cursor = keyset_paginate(db.query(Tag), (Tag.name,), cursor, limit, descending=False)
     except Exception:
         logger.exception("tag_list_failed")
         raise
     else:
         logger.debug("tag_list", extra={'length': len(tags)})
-    return tags
+    return tags, next_cursor
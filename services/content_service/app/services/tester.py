@@ -0,0 +1,24 @@
+from app.core.http import tester_client
+from app.core.logger import logger
+
+
+def invalidate_contest_cache(contest_id) -> None:
+    """
+    Сообщает tester_service, что задачи или участники контеста изменились,
+    чтобы список решений контеста не отдавался по устаревшему составу.
+    Ошибки не пробрасываются: в худшем случае кэш tester_service истечет по TTL.
+
+    Args:
+        contest_id: идентификатор контеста
+    """
+    if not contest_id:
+        return
+    try:
+        response = tester_client.post(
+            f"/solutions/contests/{contest_id}/cache/invalidate", endpoint="invalidate_contest_cache", timeout=2
+        )
+        if not response.ok:
+            logger.warning("tester_invalidatecontest_failed",
+                           extra={'contest_id': str(contest_id), 'status_code': response.status_code})
+    except Exception:
+        logger.warning("tester_invalidatecontest_failed", extra={'contest_id': str(contest_id)})
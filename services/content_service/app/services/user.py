@@ -1,6 +1,10 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.cache import CACHE_PROBLEMS, invalidate_responses
 from app.core.logger import logger
+from app.core.pagination import keyset_paginate
 from app.models.comment import Comment
 from app.models.post import Post
 from app.models.problem import Problem
@@ -61,6 +65,25 @@ def get_user(db: Session, keycloak_id: str) -> User | None:
     return result
 
 
+async def get_user_async(db: AsyncSession, keycloak_id: str) -> User | None:
+    """
+    get_user для асинхронной сессии
+
+    Args:
+        db (AsyncSession): асинхронная сессия БД,
+        keycloak_id (str): User.keycloak_id,
+
+    Returns:
+        User | None
+    """
+    result = await db.scalar(select(User).where(User.keycloak_id == keycloak_id))
+    if result is None:
+        logger.warning("user_get_notfound", extra={'user_id': keycloak_id})
+    else:
+        logger.debug("user_get", extra={"user_id": keycloak_id})
+    return result
+
+
 def get_user_by_username(db: Session, username: str) -> User | None:
     user = db.query(User).filter(User.username == username).first()
     if not user:
@@ -91,6 +114,8 @@ def update_user(db: Session, user: User, update_data: dict) -> User:
         raise
     else:
         logger.debug("user_update", extra={"user_id": str(user.keycloak_id)})
+    # display_name автора входит в ответы задач
+    invalidate_responses(CACHE_PROBLEMS)
     return user
 
 
@@ -113,26 +138,33 @@ def delete_user(db: Session, user: User) -> None:
         raise
     else:
         logger.debug("user_delete", extra={"user_id": str(user.keycloak_id)})
+    invalidate_responses(CACHE_PROBLEMS)
 
 
-def get_users(db: Session) -> list[User]:
+def get_users(
+    db: Session, cursor: str | None = None, limit: int = 50
+) -> tuple[list[User], str | None]:
     """
-    Возвращает список всех пользователей
+    Возвращает страницу пользователей, упорядоченных по username
 
     Args:
         db (Session): объект сессии БД
+        cursor (str | None): курсор предыдущей страницы или None для первой
+        limit (int): размер страницы
 
     Returns:
-        list[User] - список всех пользователей
+        tuple[list[User], str | None] - пользователи страницы и курсор следующей страницы
     """
     try:
-        users = db.query(User).all()
+        users, next_cursor = keyset_paginate(
+            db.query(User), (User.username,), cursor, limit, descending=False
+        )
     except Exception:
         logger.exception("user_list_failed")
         raise
     else:
         logger.debug("user_list", extra={'length': len(users)})
-    return users
+    return users, next_cursor
 
 def compute_user_rating(db: Session, keycloak_id: str) -> int:
     """
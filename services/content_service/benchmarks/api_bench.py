@@ -0,0 +1,345 @@
+"""
+Бенчмарк пропускной способности горячих read-эндпоинтов content_service:
+sync (def-обработчик в threadpool + Session/psycopg2) против async (async def + AsyncSession/asyncpg).
+
+Поднимает uvicorn (один процесс) с приложением из двух наборов маршрутов:
+    /sync/...  - синхронные обработчики поверх синхронных сервисов (запросы общие с async, различается
+                 только исполнение: Session в threadpool против AsyncSession)
+    /async/... - роутеры приложения с асинхронными обработчиками
+и нагружает каждый эндпоинт --concurrency одновременными клиентами в течение --duration секунд.
+
+Эндпоинты: problem (просмотр задачи с реакцией пользователя), problems (обогащенный список задач),
+comments (обогащенные комментарии поста).
+
+Запуск (из services/content_service, нужна PostgreSQL БД; данные бенчмарка создаются в ней же,
+поэтому используйте отдельную БД):
+    python -m benchmarks.api_bench run --database-url postgresql://... --output bench.json
+    python -m benchmarks.api_bench compare base.json bench.json --threshold 0.15
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+ENDPOINTS = ("problem", "problems", "comments")
+MODES = ("sync", "async")
+
+# фиксированные id - повторный запуск на той же БД не создает данные заново
+BENCH_NS = uuid.UUID("6f1c1d2e-7d2a-4a55-9a43-0b2f7f3d9a10")
+BENCH_USER = str(uuid.uuid5(BENCH_NS, "user"))
+BENCH_PROBLEM = uuid.uuid5(BENCH_NS, "problem-0")
+BENCH_POST = uuid.uuid5(BENCH_NS, "post")
+
+
+def endpoint_path(endpoint: str, mode: str) -> str:
+    if endpoint == "problem":
+        return f"/{mode}/problems/{BENCH_PROBLEM}?user_id={BENCH_USER}"
+    if endpoint == "problems":
+        return f"/{mode}/problems/enriched?limit=20&sort_by_rating=true"
+    if endpoint == "comments":
+        return f"/{mode}/comments/post/enriched/{BENCH_POST}?limit=20&current_user_id={BENCH_USER}"
+    raise ValueError(f"Unknown endpoint: {endpoint}")
+
+
+def create_app():
+    """
+    Приложение для uvicorn --factory: sync-версии эндпоинтов и роутеры приложения под /async
+    """
+    from fastapi import Depends, FastAPI, Query
+    from sqlalchemy.orm import Session
+
+    from app.api.endpoints import comments, problems
+    from app.core.database import get_db
+    from app.schemas.comment import CommentReadWithReaction
+    from app.schemas.problem import ProblemReadExtended, ProblemReadWithReaction
+    from app.services.comment import list_enriched_comments_by_post
+    from app.services.problem import get_problem, list_enriched_problems_filtered
+    from app.services.reaction import compute_reaction_balance, get_user_reaction
+    from app.services.user import get_user
+
+    bench_app = FastAPI()
+    bench_app.include_router(problems.router, prefix="/async")
+    bench_app.include_router(comments.router, prefix="/async")
+
+    @bench_app.get("/sync/problems/enriched", response_model=list[ProblemReadExtended])
+    def sync_problems(
+        limit: int = 10, sort_by_rating: bool = False, db: Session = Depends(get_db)
+    ):
+        result, _ = list_enriched_problems_filtered(db, None, limit, sort_by_rating=sort_by_rating)
+        return result
+
+    @bench_app.get("/sync/problems/{problem_id}", response_model=ProblemReadWithReaction)
+    def sync_problem(problem_id: str, user_id: str | None = Query(None), db: Session = Depends(get_db)):
+        problem = get_problem(db, problem_id)
+        user_obj = get_user(db, problem.created_by)
+        response = ProblemReadWithReaction.from_orm(problem)
+        response.author_display_name = user_obj.display_name if user_obj else None
+        response.reaction_balance = compute_reaction_balance(db, problem_id, "problem")
+        if user_id:
+            reaction = get_user_reaction(db, problem_id, "problem", user_id)
+            response.user_reaction = reaction.reaction_type if reaction else None
+        return response
+
+    @bench_app.get("/sync/comments/post/enriched/{post_id}", response_model=list[CommentReadWithReaction])
+    def sync_comments(
+        post_id: str, limit: int = 10, current_user_id: str | None = Query(None), db: Session = Depends(get_db)
+    ):
+        result, _ = list_enriched_comments_by_post(db, post_id, None, limit)
+        for comment in result:
+            reaction = get_user_reaction(db, str(comment.id), "comment", current_user_id) if current_user_id else None
+            setattr(comment, "user_reaction", reaction.reaction_type if reaction else None)
+        return [CommentReadWithReaction.from_orm(comment) for comment in result]
+
+    return bench_app
+
+
+def seed(problems: int, comments: int) -> None:
+    """
+    Создает таблицы и данные бенчмарка: задачи с тегом и реакциями, пост с комментариями
+    """
+    from app.core.database import SessionLocal, engine
+    from app.models.base import Base
+    from app.models.comment import Comment
+    from app.models.post import Post
+    from app.models.problem import Problem
+    from app.models.reaction import Reaction
+    from app.models.tag import Tag
+    from app.models.user import User
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        if db.get(User, BENCH_USER) is not None:
+            return
+        tag = Tag(name=f"bench-{BENCH_NS.hex[:8]}")
+        db.add_all([User(keycloak_id=BENCH_USER, username="bench", email="bench@example.com", display_name="Bench"), tag])
+        for i in range(problems):
+            problem_id = uuid.uuid5(BENCH_NS, f"problem-{i}")
+            db.add(Problem(id=problem_id, title=f"Bench {i}", description="x" * 500, difficulty="EASY",
+                           created_by=BENCH_USER, test_cases=[], tags=[tag]))
+            db.add(Reaction(created_by=BENCH_USER, target_id=problem_id, target_type="problem",
+                            reaction_type="plus" if i % 3 else "minus"))
+        db.flush()
+        db.add(Post(id=BENCH_POST, title="Bench", content="x", problem_id=BENCH_PROBLEM, created_by=BENCH_USER))
+        db.flush()
+        for i in range(comments):
+            comment_id = uuid.uuid5(BENCH_NS, f"comment-{i}")
+            db.add(Comment(id=comment_id, content=f"comment {i}", post_id=BENCH_POST, created_by=BENCH_USER))
+            db.add(Reaction(created_by=BENCH_USER, target_id=comment_id, target_type="comment", reaction_type="plus"))
+        db.commit()
+    finally:
+        db.close()
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(int(round(q * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[idx]
+
+
+def summarize(values: list[float]) -> dict:
+    return {
+        "count": len(values),
+        "mean": statistics.fmean(values) if values else 0.0,
+        "p50": percentile(values, 0.5),
+        "p95": percentile(values, 0.95),
+        "p99": percentile(values, 0.99),
+        "max": max(values) if values else 0.0,
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+async def load(url: str, concurrency: int, duration: float) -> dict:
+    """
+    concurrency клиентов в цикле запрашивают url в течение duration секунд
+    """
+    import httpx
+
+    latencies: list[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "latency": summarize(latencies),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(port: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.api_bench:create_app", "--factory",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        env=os.environ.copy(),
+    )
+    base = f"http://127.0.0.1:{port}"
+    import httpx
+
+    for _ in range(100):
+        if server.poll() is not None:
+            raise SystemExit("uvicorn exited during startup")
+        try:
+            if httpx.get(base + endpoint_path("problems", "sync"), timeout=2).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise SystemExit("uvicorn did not become ready")
+
+
+def run_benchmark(args) -> dict:
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    if not os.environ.get("DATABASE_URL", "").startswith("postgresql"):
+        raise SystemExit("api benchmark needs a PostgreSQL DATABASE_URL (--database-url)")
+    os.environ.setdefault("TRACING_EXPORTER", "none")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    seed(args.problems, args.comments)
+    port = _free_port()
+    server = _start_server(port)
+    results = []
+    try:
+        for endpoint in args.endpoints:
+            for mode in MODES:
+                url = f"http://127.0.0.1:{port}{endpoint_path(endpoint, mode)}"
+                if args.warmup:
+                    asyncio.run(load(url, min(args.concurrency, 50), args.warmup))
+                stats = asyncio.run(load(url, args.concurrency, args.duration))
+                entry = {"endpoint": endpoint, "mode": mode, "concurrency": args.concurrency, **stats}
+                results.append(entry)
+                print(
+                    f"{endpoint:9} {mode:5} rps={stats['rps']:8.1f} "
+                    f"p50={stats['latency']['p50']:.3f}s p99={stats['latency']['p99']:.3f}s "
+                    f"errors={stats['errors']}",
+                    file=sys.stderr,
+                )
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    return {
+        "meta": {
+            "git_commit": git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "problems": args.problems,
+            "comments": args.comments,
+        },
+        "results": results,
+    }
+
+
+def compare(base: dict, new: dict, threshold: float) -> int:
+    """
+    Сравнивает rps и p99 двух прогонов.
+    Возвращает 1, если rps хотя бы одного эндпоинта упал больше чем на threshold.
+    """
+    def key(entry):
+        return entry["endpoint"], entry["mode"]
+
+    base_index = {key(e): e for e in base["results"]}
+    regressed = False
+    print(f"base={base['meta'].get('git_commit')} new={new['meta'].get('git_commit')}")
+    for entry in new["results"]:
+        old = base_index.get(key(entry))
+        if old is None:
+            continue
+        change = (entry["rps"] - old["rps"]) / old["rps"] if old["rps"] else 0.0
+        mark = ""
+        if change < -threshold:
+            regressed = True
+            mark = "  REGRESSION"
+        print(
+            f"{'/'.join(key(entry)):16} rps {old['rps']:8.1f} -> {entry['rps']:8.1f} ({change:+.1%}) "
+            f"p99 {old['latency']['p99']:.3f}s -> {entry['latency']['p99']:.3f}s{mark}"
+        )
+    return 1 if regressed else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="прогнать бенчмарк")
+    run_p.add_argument("--endpoints", nargs="*", choices=ENDPOINTS, default=list(ENDPOINTS))
+    run_p.add_argument("--concurrency", type=int, default=500)
+    run_p.add_argument("--duration", type=float, default=20.0, help="секунд нагрузки на каждый эндпоинт")
+    run_p.add_argument("--warmup", type=float, default=3.0)
+    run_p.add_argument("--problems", type=int, default=200, help="задач в тестовых данных")
+    run_p.add_argument("--comments", type=int, default=50, help="комментариев к тестовому посту")
+    run_p.add_argument("--database-url", help="PostgreSQL БД (по умолчанию DATABASE_URL)")
+    run_p.add_argument("--output", help="файл для JSON-результата (по умолчанию stdout)")
+
+    cmp_p = sub.add_parser("compare", help="сравнить два JSON-результата")
+    cmp_p.add_argument("base")
+    cmp_p.add_argument("new")
+    cmp_p.add_argument("--threshold", type=float, default=0.15)
+
+    args = parser.parse_args(argv)
+    if args.command == "compare":
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.new, encoding="utf-8") as f:
+            new = json.load(f)
+        return compare(base, new, args.threshold)
+
+    report = run_benchmark(args)
+    payload = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
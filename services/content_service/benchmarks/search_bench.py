@@ -0,0 +1,279 @@
+"""
+Бенчмарк полнотекстового поиска content_service (GET /search): задержка search_async и
+search_facets_async на --documents задачах, постах и блог постах.
+
+Схема создается миграциями (alembic upgrade head): search_vector заполняется триггерами,
+GIN-индексы те же, что в проде. Тексты генерируются детерминированно: словарь предметных слов
+и хвост редких слов с распределением Ципфа, чтобы в запросах были и частые, и редкие термины.
+
+Запуск (из services/content_service, нужна отдельная PostgreSQL БД - данные создаются в ней):
+    python -m benchmarks.search_bench run --database-url postgresql://... --output bench_search.json
+    python -m benchmarks.search_bench compare base.json bench_search.json --threshold 0.15
+
+Код возврата run - 1, если p95 хотя бы одного запроса больше --target-ms (по умолчанию 50 мс).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.api_bench import git_commit, summarize
+
+BENCH_NS = uuid.UUID("0d8f5b8c-2a7e-4c1b-9f64-5e3a7c9b1d20")
+BENCH_USER = str(uuid.uuid5(BENCH_NS, "user"))
+SEED = 20261019
+CHUNK = 5000
+
+TOPIC_WORDS = (
+    "граф дерево массив строка отрезок сумма число матрица путь вершина ребро поиск сортировка "
+    "очередь стек куча хеш подстрока палиндром перестановка подпоследовательность префикс "
+    "бинарный динамика жадный интервал точка многоугольник окружность простое делитель модуль "
+    "graph tree array string segment sum matrix path query heap stack queue hash prefix binary"
+).split()
+DIFFICULTIES = ("EASY", "MEDIUM", "HARD")
+TAGS = ("dp", "graphs", "greedy", "math", "strings", "geometry", "trees", "sorting", "binary search",
+        "data structures", "number theory", "implementation", "bitmasks", "two pointers", "hashing")
+
+# (название, target, q, фильтры): частые и редкие термины, фразы, исключения и фильтры фасетов
+QUERIES = (
+    ("problem_common", "problem", "сумма", {}),
+    ("problem_two_words", "problem", "граф путь", {}),
+    ("problem_phrase", "problem", '"бинарный поиск"', {}),
+    ("problem_rare", "problem", "w1931", {}),
+    ("problem_or_not", "problem", "дерево or куча -матрица", {}),
+    ("problem_difficulty", "problem", "строка", {"difficulty": "HARD"}),
+    ("problem_tag", "problem", "массив", {"tag": "dp"}),
+    ("post_common", "post", "очередь", {}),
+    ("post_english", "post", "queries on trees", {}),
+    ("blog_post_common", "blog_post", "число", {}),
+)
+
+
+class TextGenerator:
+    def __init__(self, seed: int):
+        self.random = random.Random(seed)
+        rare = [f"w{i}" for i in range(1, 20001)]
+        self.words = list(TOPIC_WORDS) + rare
+        # Ципф: вес слова обратно пропорционален его номеру
+        self.weights = [1 / (i + 1) for i in range(len(self.words))]
+
+    def text(self, length: int) -> str:
+        return " ".join(self.random.choices(self.words, weights=self.weights, k=length))
+
+
+def migrate() -> None:
+    from alembic import command
+    from alembic.config import Config
+
+    os.environ["ALEMBIC_DB_URL"] = os.environ["DATABASE_URL"]
+    command.upgrade(Config("alembic.ini"), "head")
+
+
+def seed(documents: int) -> dict:
+    """
+    Создает documents задач, постов и блог постов (повторный запуск данные не пересоздает)
+
+    Returns:
+        dict: название тега -> id
+    """
+    from sqlalchemy import func, insert, select
+
+    from app.core.database import SessionLocal
+    from app.models.blog_post import BlogPost
+    from app.models.post import Post
+    from app.models.problem import Problem
+    from app.models.tag import Tag, problem_tags
+    from app.models.user import User
+
+    tag_ids = {name: uuid.uuid5(BENCH_NS, f"tag-{name}") for name in TAGS}
+    db = SessionLocal()
+    try:
+        if db.get(User, BENCH_USER) is not None:
+            count = db.scalar(select(func.count()).select_from(Problem).where(Problem.created_by == BENCH_USER))
+            if count != documents:
+                raise SystemExit(f"bench database already has {count} documents, use a fresh database")
+            return tag_ids
+
+        gen = TextGenerator(SEED)
+        started = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        db.add(User(keycloak_id=BENCH_USER, username="search-bench", email="search-bench@example.com",
+                    display_name="Search bench"))
+        db.flush()
+        db.execute(insert(Tag), [{"id": tag_id, "name": f"bench {name}"} for name, tag_id in tag_ids.items()])
+
+        problem_ids = [uuid.uuid5(BENCH_NS, f"problem-{i}") for i in range(documents)]
+        for start in range(0, documents, CHUNK):
+            chunk = range(start, min(start + CHUNK, documents))
+            db.execute(insert(Problem), [
+                {"id": problem_ids[i], "title": gen.text(5), "description": gen.text(gen.random.randint(60, 200)),
+                 "difficulty": DIFFICULTIES[i % 3], "created_by": BENCH_USER, "test_cases": [],
+                 "created_at": started + timedelta(minutes=i)}
+                for i in chunk
+            ])
+            db.execute(insert(problem_tags), [
+                {"problem_id": problem_ids[i], "tag_id": tag_id}
+                for i in chunk
+                for tag_id in gen.random.sample(list(tag_ids.values()), k=gen.random.randint(1, 3))
+            ])
+            db.execute(insert(Post), [
+                {"id": uuid.uuid5(BENCH_NS, f"post-{i}"), "problem_id": problem_ids[i], "created_by": BENCH_USER,
+                 "title": gen.text(6), "content": gen.text(gen.random.randint(80, 300)),
+                 "created_at": started + timedelta(minutes=i)}
+                for i in chunk
+            ])
+            db.execute(insert(BlogPost), [
+                {"id": uuid.uuid5(BENCH_NS, f"blog-{i}"), "title": gen.text(6),
+                 "description": gen.text(gen.random.randint(100, 400)), "created_at": started + timedelta(minutes=i)}
+                for i in chunk
+            ])
+            db.commit()
+            print(f"seeded {min(start + CHUNK, documents)}/{documents}", file=sys.stderr)
+    finally:
+        db.close()
+
+    from app.core.database import engine
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("ANALYZE problems, posts, blog_posts, problem_tags, post_tags, tags")
+    return tag_ids
+
+
+async def measure(tag_ids: dict, iterations: int, warmup: int) -> list[dict]:
+    from app.core.database import AsyncSessionLocal, async_engine
+    from app.schemas.search import SearchTarget
+    from app.services.search import search_async, search_facets_async
+
+    results = []
+    try:
+        for name, target, q, filters in QUERIES:
+            target = SearchTarget(target)
+            kwargs = {"difficulty": filters.get("difficulty"), "tag_id": tag_ids.get(filters.get("tag"))}
+            page, facets, found = [], [], 0
+            for i in range(warmup + iterations):
+                async with AsyncSessionLocal() as db:
+                    start = time.perf_counter()
+                    hits, _ = await search_async(db, q, target, limit=20, **kwargs)
+                    page_seconds = time.perf_counter() - start
+                    start = time.perf_counter()
+                    await search_facets_async(db, q, target, **kwargs)
+                    facet_seconds = time.perf_counter() - start
+                if i >= warmup:
+                    page.append(page_seconds)
+                    facets.append(facet_seconds)
+                found = len(hits)
+            entry = {"query": name, "target": target.value, "q": q, "hits": found,
+                     "page": summarize(page), "facets": summarize(facets)}
+            results.append(entry)
+            print(
+                f"{name:20} page p50={entry['page']['p50'] * 1000:6.1f}ms p95={entry['page']['p95'] * 1000:6.1f}ms "
+                f"facets p95={entry['facets']['p95'] * 1000:6.1f}ms hits={found}",
+                file=sys.stderr,
+            )
+    finally:
+        await async_engine.dispose()
+    return results
+
+
+def run_benchmark(args) -> dict:
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    if not os.environ.get("DATABASE_URL", "").startswith("postgresql"):
+        raise SystemExit("search benchmark needs a PostgreSQL DATABASE_URL (--database-url)")
+    os.environ.setdefault("TRACING_EXPORTER", "none")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    migrate()
+    tag_ids = seed(args.documents)
+    results = asyncio.run(measure(tag_ids, args.iterations, args.warmup))
+    return {
+        "meta": {
+            "git_commit": git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "documents": args.documents,
+            "iterations": args.iterations,
+            "target_ms": args.target_ms,
+        },
+        "results": results,
+    }
+
+
+def slow_queries(report: dict, target_ms: float) -> list[str]:
+    return [
+        f"{entry['query']}/{part}"
+        for entry in report["results"]
+        for part in ("page", "facets")
+        if entry[part]["p95"] * 1000 > target_ms
+    ]
+
+
+def compare(base: dict, new: dict, threshold: float) -> int:
+    """
+    Сравнивает p95 поиска двух прогонов.
+    Возвращает 1, если p95 хотя бы одного запроса вырос больше чем на threshold.
+    """
+    base_index = {e["query"]: e for e in base["results"]}
+    regressed = False
+    print(f"base={base['meta'].get('git_commit')} new={new['meta'].get('git_commit')}")
+    for entry in new["results"]:
+        old = base_index.get(entry["query"])
+        if old is None:
+            continue
+        for part in ("page", "facets"):
+            before, after = old[part]["p95"], entry[part]["p95"]
+            change = (after - before) / before if before else 0.0
+            mark = ""
+            if change > threshold:
+                regressed = True
+                mark = "  REGRESSION"
+            print(f"{entry['query'] + '/' + part:28} p95 {before * 1000:7.1f}ms -> {after * 1000:7.1f}ms "
+                  f"({change:+.1%}){mark}")
+    return 1 if regressed else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="прогнать бенчмарк")
+    run_p.add_argument("--documents", type=int, default=100_000, help="задач, постов и блог постов каждого")
+    run_p.add_argument("--iterations", type=int, default=50, help="замеров на запрос")
+    run_p.add_argument("--warmup", type=int, default=5)
+    run_p.add_argument("--target-ms", type=float, default=50.0, help="допустимый p95 запроса")
+    run_p.add_argument("--database-url", help="PostgreSQL БД (по умолчанию DATABASE_URL)")
+    run_p.add_argument("--output", help="файл для JSON-результата (по умолчанию stdout)")
+
+    cmp_p = sub.add_parser("compare", help="сравнить два JSON-результата")
+    cmp_p.add_argument("base")
+    cmp_p.add_argument("new")
+    cmp_p.add_argument("--threshold", type=float, default=0.15)
+
+    args = parser.parse_args(argv)
+    if args.command == "compare":
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.new, encoding="utf-8") as f:
+            new = json.load(f)
+        return compare(base, new, args.threshold)
+
+    report = run_benchmark(args)
+    payload = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+    slow = slow_queries(report, args.target_ms)
+    if slow:
+        print(f"p95 above {args.target_ms:.0f}ms: {', '.join(slow)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,28 @@
+"""contest dedupe_submissions
+
+Revision ID: 5d2b7e4f9a31
+Revises: 2a5edd9c981f
+Create Date: 2026-10-19 14:05:12.904417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2b7e4f9a31'
+down_revision: Union[str, Sequence[str], None] = '2a5edd9c981f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('contests', sa.Column('dedupe_submissions', sa.Boolean(), server_default='true', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('contests', 'dedupe_submissions')
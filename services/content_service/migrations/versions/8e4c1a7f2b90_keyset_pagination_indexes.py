@@ -0,0 +1,37 @@
+"""keyset pagination indexes
+
+Revision ID: 8e4c1a7f2b90
+Revises: 5d2b7e4f9a31
+Create Date: 2026-10-19 18:42:37.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4c1a7f2b90'
+down_revision: Union[str, Sequence[str], None] = '5d2b7e4f9a31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_problems_created', 'problems', ['created_at', 'id'], unique=False)
+    op.create_index('ix_posts_created', 'posts', ['created_at', 'id'], unique=False)
+    op.create_index('ix_posts_problem_created', 'posts', ['problem_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_comments_post_created', 'comments', ['post_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_blog_posts_created', 'blog_posts', ['created_at', 'id'], unique=False)
+    op.create_index('ix_contests_public_created', 'contests', ['is_public', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_contests_public_created', table_name='contests')
+    op.drop_index('ix_blog_posts_created', table_name='blog_posts')
+    op.drop_index('ix_comments_post_created', table_name='comments')
+    op.drop_index('ix_posts_problem_created', table_name='posts')
+    op.drop_index('ix_posts_created', table_name='posts')
+    op.drop_index('ix_problems_created', table_name='problems')
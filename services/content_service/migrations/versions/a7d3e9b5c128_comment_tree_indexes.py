@@ -0,0 +1,35 @@
+"""comment tree indexes
+
+Revision ID: a7d3e9b5c128
+Revises: f1a6c2d8e347
+Create Date: 2026-10-19 22:41:53.207416
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e9b5c128'
+down_revision: Union[str, Sequence[str], None] = 'f1a6c2d8e347'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_comments_post_roots', 'comments', ['post_id', 'created_at', 'id'], unique=False,
+        postgresql_where=sa.text('parent_comment_id IS NULL'),
+    )
+    op.create_index('ix_comments_parent', 'comments', ['parent_comment_id'], unique=False)
+    op.create_index('ix_reactions_target', 'reactions', ['target_type', 'target_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reactions_target', table_name='reactions')
+    op.drop_index('ix_comments_parent', table_name='comments')
+    op.drop_index('ix_comments_post_roots', table_name='comments')
@@ -0,0 +1,35 @@
+"""contest participants indexes
+
+Revision ID: b8e2f4a6d901
+Revises: a7d3e9b5c128
+Create Date: 2026-10-19 23:12:08.519374
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e2f4a6d901'
+down_revision: Union[str, Sequence[str], None] = 'a7d3e9b5c128'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_contest_participants_contest_joined', 'contest_participants',
+        ['contest_id', 'joined_at', 'user_keycloak_id'], unique=False,
+    )
+    op.create_index(
+        'ix_contest_participants_user_joined', 'contest_participants',
+        ['user_keycloak_id', 'joined_at', 'contest_id'], unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_contest_participants_user_joined', table_name='contest_participants')
+    op.drop_index('ix_contest_participants_contest_joined', table_name='contest_participants')
@@ -0,0 +1,67 @@
+"""full text search
+
+Revision ID: c3f9d7a2e614
+Revises: 8e4c1a7f2b90
+Create Date: 2026-10-19 21:17:45.302861
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f9d7a2e614'
+down_revision: Union[str, Sequence[str], None] = '8e4c1a7f2b90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# конфигурация должна совпадать с app.services.search.SEARCH_CONFIG
+SEARCH_CONFIG = 'russian'
+
+# таблица -> (заголовок с весом A, текст с весом B)
+SEARCH_TABLES = {
+    'problems': ('title', 'description'),
+    'posts': ('title', 'content'),
+    'blog_posts': ('title', 'description'),
+}
+
+
+def _vector(title: str, body: str, row: str = '') -> str:
+    return (
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({row}{title}, '')), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({row}{body}, '')), 'B')"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, (title, body) in SEARCH_TABLES.items():
+        op.add_column(table, sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+        # search_vector поддерживается триггером: приложение его не пишет
+        op.execute(f"""
+            CREATE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {_vector(title, body, 'NEW.')};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_search_vector_update
+            BEFORE INSERT OR UPDATE OF {title}, {body} ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update()
+        """)
+        op.execute(f"UPDATE {table} SET search_vector = {_vector(title, body)}")
+        op.create_index(f'ix_{table}_search', table, ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in reversed(list(SEARCH_TABLES)):
+        op.drop_index(f'ix_{table}_search', table_name=table, postgresql_using='gin')
+        op.execute(f"DROP TRIGGER {table}_search_vector_update ON {table}")
+        op.execute(f"DROP FUNCTION {table}_search_vector_update()")
+        op.drop_column(table, 'search_vector')
@@ -0,0 +1,27 @@
+"""problem tags tag index
+
+Revision ID: f1a6c2d8e347
+Revises: c3f9d7a2e614
+Create Date: 2026-10-19 22:05:12.640193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a6c2d8e347'
+down_revision: Union[str, Sequence[str], None] = 'c3f9d7a2e614'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_problem_tags_tag', 'problem_tags', ['tag_id', 'problem_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_problem_tags_tag', table_name='problem_tags')
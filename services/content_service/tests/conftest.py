@@ -1,8 +1,10 @@
+import asyncio
 import sys
 import types
 from unittest.mock import MagicMock
 
 import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 
 
 @pytest.fixture
@@ -11,6 +13,49 @@ def db_session():
     return db
 
 
+@pytest.fixture
+def run_async_db():
+    """
+    Запускает async-сценарий scenario(db) с AsyncSession на чистой in-memory SQLite
+    """
+    from app.models.base import Base
+    import app.models  # noqa: F401 - регистрирует все модели в Base.metadata
+
+    def _run(scenario):
+        async def main():
+            engine = create_async_engine("sqlite+aiosqlite://")
+            try:
+                async with engine.begin() as conn:
+                    await conn.run_sync(Base.metadata.create_all)
+                async with AsyncSession(engine, expire_on_commit=False) as db:
+                    return await scenario(db)
+            finally:
+                await engine.dispose()
+
+        return asyncio.run(main())
+    return _run
+
+
+@pytest.fixture
+def sqlite_db():
+    """
+    Синхронная сессия на in-memory SQLite и список выполненных ею SQL-запросов
+    """
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import Session
+
+    from app.models.base import Base
+    import app.models  # noqa: F401 - регистрирует все модели в Base.metadata
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, stmt, *args: statements.append(stmt))
+    with Session(engine) as db:
+        yield db, statements
+    engine.dispose()
+
+
 @pytest.fixture
 def logger_mock():
     return MagicMock(name="logger")
@@ -23,6 +68,17 @@ def simple_obj():
     return _factory
 
 
+@pytest.fixture(autouse=True)
+def no_tester_invalidation(monkeypatch):
+    # unit-тесты не ходят в tester_service: сброс кэша контестов подменяется
+    import app.services.contest as contest_service
+    import app.services.problem as problem_service
+    invalidate = MagicMock(name="invalidate_contest_cache")
+    monkeypatch.setattr(contest_service, "invalidate_contest_cache", invalidate)
+    monkeypatch.setattr(problem_service, "invalidate_contest_cache", invalidate)
+    return invalidate
+
+
 def pytest_sessionstart(session):
     fake_db = types.ModuleType("app.core.database")
     fake_db.SessionLocal = MagicMock(name="SessionLocal")
@@ -1,7 +1,11 @@
+import uuid
+from datetime import datetime, timezone
+
 import pytest
 from unittest.mock import MagicMock
 
 import app.services.blog_post as blog_post_service
+from app.core.pagination import decode_cursor
 
 
 def _make_query_chain(first_result=None, all_result=None):
@@ -141,15 +145,29 @@ def test_list_blog_posts_success(db_session, logger_mock, monkeypatch):
     q, chain = _make_query_chain(all_result=posts)
     db_session.query.return_value = q
 
-    res = blog_post_service.list_blog_posts(db_session, offset=5, limit=2)
+    res, next_cursor = blog_post_service.list_blog_posts(db_session, limit=2)
 
     assert res == posts
+    assert next_cursor is None
     q.order_by.assert_called_once()
-    chain.offset.assert_called_once_with(5)
-    chain.limit.assert_called_once_with(2)
+    chain.limit.assert_called_once_with(3)
     chain.all.assert_called_once()
 
 
+def test_list_blog_posts_returns_cursor_when_more_rows(db_session, logger_mock, simple_obj):
+    posts = [
+        simple_obj(id=uuid.uuid4(), created_at=datetime(2024, 1, day, tzinfo=timezone.utc))
+        for day in (3, 2, 1)
+    ]
+    q, chain = _make_query_chain(all_result=posts)
+    db_session.query.return_value = q
+
+    res, next_cursor = blog_post_service.list_blog_posts(db_session, limit=2)
+
+    assert res == posts[:2]
+    assert decode_cursor(next_cursor, 2) == [posts[1].created_at, posts[1].id]
+
+
 def test_list_blog_posts_query_error_raises(db_session, logger_mock, monkeypatch):
     q = MagicMock()
     q.order_by.side_effect = Exception("boom")
@@ -0,0 +1,189 @@
+import re
+import sys
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.testclient import TestClient
+
+import app.core.cache as cache
+import app.services.reaction as reaction_service
+from app.schemas.reaction import ReactionType, TargetType
+
+PROBLEM_ID = "0b5c6a7e-3f51-4a8e-9a52-1f0e2f7a3c11"
+
+
+@pytest.fixture
+def response_cache(monkeypatch):
+    response_cache = cache.ResponseCache(cache.MemoryCacheBackend(max_entries=100))
+    monkeypatch.setattr(cache, "response_cache", response_cache)
+    return response_cache
+
+
+@pytest.fixture
+def calls():
+    return MagicMock(name="endpoint_calls")
+
+
+@pytest.fixture
+def client(response_cache, calls):
+    app = FastAPI()
+    app.middleware("http")(cache.response_cache_middleware)
+
+    @app.get("/problems/enriched")
+    def list_problems(response: Response, limit: int = 10, sort_order: str = "desc"):
+        calls("list", limit, sort_order)
+        response.headers["X-Next-Cursor"] = "next"
+        return [{"limit": limit, "sort_order": sort_order}]
+
+    @app.get("/problems/{problem_id}")
+    def read_problem(problem_id: str, user_id: str | None = None):
+        calls("read", problem_id)
+        if problem_id == PROBLEM_ID:
+            return {"id": problem_id, "n": calls.call_count}
+        raise HTTPException(status_code=404)
+
+    return TestClient(app)
+
+
+def test_second_request_is_served_from_cache(client, calls):
+    first = client.get("/problems/enriched")
+    second = client.get("/problems/enriched")
+
+    assert calls.call_count == 1
+    assert first.json() == second.json()
+    assert first.headers["x-cache"] == "MISS" and second.headers["x-cache"] == "HIT"
+    assert second.headers["etag"] == first.headers["etag"]
+    assert second.headers["x-next-cursor"] == "next"
+
+
+def test_if_none_match_returns_304(client):
+    etag = client.get("/problems/enriched").headers["etag"]
+
+    response = client.get("/problems/enriched", headers={"If-None-Match": f'W/"other", {etag}'})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+def test_if_none_match_on_miss_returns_304(client, response_cache):
+    etag = client.get("/problems/enriched").headers["etag"]
+    response_cache.clear()
+
+    response = client.get("/problems/enriched", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+
+
+def test_query_params_are_normalised(client, calls):
+    client.get("/problems/enriched?sort_order=asc&limit=20")
+    client.get("/problems/enriched?limit=20&sort_order=asc&utm_source=mail")
+    client.get("/problems/enriched?limit=10&sort_order=desc")
+    client.get("/problems/enriched")
+
+    assert calls.call_count == 2
+
+
+def test_personal_requests_bypass_cache(client, calls):
+    client.get(f"/problems/{PROBLEM_ID}?user_id=u1")
+    client.get(f"/problems/{PROBLEM_ID}?user_id=u1")
+    client.get("/problems/enriched", headers={"Authorization": "Bearer t"})
+    client.get("/problems/enriched", headers={"Authorization": "Bearer t"})
+
+    assert calls.call_count == 4
+
+
+def test_error_responses_are_not_cached(client, calls):
+    missing = "1b5c6a7e-3f51-4a8e-9a52-1f0e2f7a3c11"
+
+    assert client.get(f"/problems/{missing}").status_code == 404
+    assert client.get(f"/problems/{missing}").status_code == 404
+    assert calls.call_count == 2
+
+
+def test_invalidation_drops_group(client, calls):
+    client.get("/problems/enriched")
+    client.get(f"/problems/{PROBLEM_ID}")
+
+    cache.invalidate_responses(cache.CACHE_TAGS)
+    client.get("/problems/enriched")
+    assert calls.call_count == 2
+
+    cache.invalidate_responses(cache.CACHE_PROBLEMS)
+    client.get("/problems/enriched")
+    client.get(f"/problems/{PROBLEM_ID}")
+    assert calls.call_count == 4
+
+
+def test_backend_failure_falls_through(client, response_cache, calls, monkeypatch):
+    monkeypatch.setattr(response_cache.backend, "get", MagicMock(side_effect=ConnectionError("down")))
+
+    assert client.get("/problems/enriched").status_code == 200
+    assert client.get("/problems/enriched").status_code == 200
+    assert calls.call_count == 2
+
+
+def test_memory_backend_evicts_lru_and_expired():
+    backend = cache.MemoryCacheBackend(max_entries=2)
+    backend.set("a", b"1", ttl=60)
+    backend.set("b", b"2", ttl=60)
+    backend.get("a")
+    backend.set("c", b"3", ttl=60)
+    backend.set("d", b"4", ttl=0.01)
+    time.sleep(0.02)
+
+    assert backend.get("a") is None  # вытеснен записью d
+    assert backend.get("b") is None
+    assert backend.get("c") == b"3"
+    assert backend.get("d") is None
+
+
+def test_problem_reaction_invalidates_problem_responses(db_session, monkeypatch):
+    invalidate = MagicMock()
+    monkeypatch.setattr(reaction_service, "invalidate_responses", invalidate)
+    db_session.query.return_value.filter.return_value.first.return_value = None
+
+    reaction_service.set_reaction(db_session, PROBLEM_ID, TargetType.problem, ReactionType.plus, "u1")
+    reaction_service.set_reaction(db_session, PROBLEM_ID, TargetType.post, ReactionType.plus, "u1")
+
+    invalidate.assert_called_once_with(cache.CACHE_PROBLEMS)
+
+
+def test_multi_value_params_are_part_of_key():
+    rule = cache.CACHE_RULES[0]
+    a, b = "0b5c6a7e-3f51-4a8e-9a52-1f0e2f7a3c11", "1b5c6a7e-3f51-4a8e-9a52-1f0e2f7a3c11"
+
+    def key(query):
+        return rule.cache_key(Request({"type": "http", "path": "/problems/enriched", "query_string": query.encode(),
+                                       "headers": []}))
+
+    assert key(f"tag_id={a}&tag_id={b}") == key(f"tag_id={b}&tag_id={a.upper()}&tag_match=all&tag_id={b}")
+    assert key(f"tag_id={a}&tag_id={b}") != key(f"tag_id={a}")
+    assert key(f"tag_id={a}&tag_id={b}") != key(f"tag_id={a}&tag_id={b}&tag_match=any")
+
+
+def test_every_cache_rule_matches_a_real_route(monkeypatch):
+    # эндпоинты импортируют зависимости сессий, которых нет в подмененном app.core.database
+    fake_db = sys.modules["app.core.database"]
+    for name in ("get_db", "get_read_db", "get_async_read_db"):
+        monkeypatch.setattr(fake_db, name, MagicMock(name=name), raising=False)
+    from app.main import app
+
+    sample_id = "0b5c6a7e-3f51-4a8e-9a52-1f0e2f7a3c11"
+    get_paths = [
+        re.sub(r"{[^}]+}", sample_id, path)
+        for path, operations in app.openapi()["paths"].items()
+        if "get" in operations
+    ]
+    for rule in cache.CACHE_RULES:
+        assert any(rule.path.fullmatch(path) for path in get_paths), f"{rule.name}: no GET route matches"
+
+
+def test_judging_bundle_route_is_not_cached(response_cache):
+    def request(path):
+        return Request({"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []})
+
+    assert response_cache.match(request(f"/problems/{PROBLEM_ID}")) is not None
+    assert response_cache.match(request(f"/problems/{PROBLEM_ID}/judging")) is None
@@ -1,3 +1,6 @@
+import uuid
+from datetime import datetime
+
 import pytest
 from unittest.mock import MagicMock
 
@@ -148,39 +151,134 @@ def test_list_comments_by_user_success(db_session, logger_mock, monkeypatch):
     assert len(res) == 1
 
 
-def test_list_enriched_comments_by_post_sets_fields_and_calls_balance(db_session, logger_mock, monkeypatch):
-    q = MagicMock(name="query")
-    chain = MagicMock(name="chain")
-    db_session.query.return_value = q
-
-    q.join.return_value = chain
-    chain.filter.return_value = chain
-    chain.offset.return_value = chain
-    chain.limit.return_value = chain
-
-    c1, c2 = MagicMock(), MagicMock()
-    c1.id, c2.id = "c1", "c2"
-    chain.all.return_value = [(c1, "Alice"), (c2, "Bob")]
-
-    balance_fn = MagicMock(side_effect=[10, -2])
-    monkeypatch.setattr(comment_service, "compute_reaction_balance", balance_fn)
-
-    res = comment_service.list_enriched_comments_by_post(db_session, "pid", offset=0, limit=10)
-
-    assert res == [c1, c2]
-    assert getattr(c1, "author_display_name") == "Alice"
-    assert getattr(c1, "reaction_balance") == 10
-    assert getattr(c2, "author_display_name") == "Bob"
-    assert getattr(c2, "reaction_balance") == -2
-
-    balance_fn.assert_any_call(db_session, "c1", "comment")
-    balance_fn.assert_any_call(db_session, "c2", "comment")
+def test_list_enriched_comments_by_post_pages_with_batched_balances(sqlite_db):
+    from app.models.comment import Comment
+    from app.models.post import Post
+    from app.models.problem import Problem
+    from app.models.reaction import Reaction
+    from app.models.user import User
+
+    db, statements = sqlite_db
+    author = str(uuid.uuid4())
+    problem = Problem(id=uuid.uuid4(), title="P", description="d", difficulty="EASY", created_by=author)
+    post = Post(id=uuid.uuid4(), title="T", content="c", problem_id=problem.id, created_by=author)
+    db.add_all([User(keycloak_id=author, username="bob", email="b@x.io", display_name="Bob"), problem, post])
+    comments = [
+        Comment(content=str(i), post_id=post.id, created_by=author, created_at=datetime(2024, 1, 1, 10, i))
+        for i in range(3)
+    ]
+    db.add_all(comments)
+    db.flush()
+    db.add_all([
+        Reaction(created_by=author, target_id=comments[0].id, target_type="comment", reaction_type="plus"),
+        Reaction(created_by=author, target_id=comments[2].id, target_type="comment", reaction_type="minus"),
+    ])
+    post_id = post.id
+    db.commit()
+    statements.clear()
+
+    first, cursor = comment_service.list_enriched_comments_by_post(db, post_id, limit=2)
+    rest, last_cursor = comment_service.list_enriched_comments_by_post(db, post_id, cursor, limit=2)
+
+    assert [(c.content, c.reaction_balance) for c in first + rest] == [("0", 1), ("1", 0), ("2", -1)]
+    assert first[0].author_display_name == "Bob"
+    assert last_cursor is None
+    # страница и балансы всей страницы - по одному запросу
+    assert len(statements) == 4
 
 
 def test_list_enriched_comments_by_post_query_error_raises(db_session, logger_mock, monkeypatch):
-    q = MagicMock()
-    q.join.side_effect = Exception("boom")
-    db_session.query.return_value = q
+    db_session.execute.side_effect = Exception("boom")
 
     with pytest.raises(Exception):
         comment_service.list_enriched_comments_by_post(db_session, "pid")
+
+
+def test_list_enriched_comments_by_post_async_pages_with_batched_balances(run_async_db):
+    from app.models.comment import Comment
+    from app.models.post import Post
+    from app.models.problem import Problem
+    from app.models.reaction import Reaction
+    from app.models.user import User
+
+    async def scenario(db):
+        author = str(uuid.uuid4())
+        problem = Problem(id=uuid.uuid4(), title="P", description="d", difficulty="EASY", created_by=author)
+        post = Post(id=uuid.uuid4(), title="T", content="c", problem_id=problem.id, created_by=author)
+        db.add_all([User(keycloak_id=author, username="bob", email="b@x.io", display_name="Bob"), problem, post])
+        comments = [
+            Comment(content=str(i), post_id=post.id, created_by=author, created_at=datetime(2024, 1, 1, 10, i))
+            for i in range(3)
+        ]
+        db.add_all(comments)
+        await db.flush()
+        db.add_all([
+            Reaction(created_by=author, target_id=comments[0].id, target_type="comment", reaction_type="plus"),
+            Reaction(created_by=author, target_id=comments[2].id, target_type="comment", reaction_type="minus"),
+        ])
+        await db.commit()
+
+        first, cursor = await comment_service.list_enriched_comments_by_post_async(db, post.id, limit=2)
+        rest, last_cursor = await comment_service.list_enriched_comments_by_post_async(db, post.id, cursor, limit=2)
+        return first, rest, last_cursor
+
+    first, rest, last_cursor = run_async_db(scenario)
+
+    assert [(c.content, c.reaction_balance) for c in first + rest] == [("0", 1), ("1", 0), ("2", -1)]
+    assert first[0].author_display_name == "Bob"
+    assert last_cursor is None
+
+
+def test_list_comment_tree_async_builds_threads(run_async_db):
+    from datetime import timedelta, timezone
+
+    from app.models.comment import Comment
+    from app.models.post import Post
+    from app.models.problem import Problem
+    from app.models.reaction import Reaction
+    from app.models.user import User
+
+    async def scenario(db):
+        author = str(uuid.uuid4())
+        problem = Problem(title="P", description="d", difficulty="EASY", created_by=author)
+        db.add_all([User(keycloak_id=author, username="alice", email="a@x.io", display_name="Alice"), problem])
+        await db.flush()
+        post = Post(problem_id=problem.id, created_by=author, title="t", content="c")
+        db.add(post)
+        await db.flush()
+        started = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+        def comment(n, parent=None):
+            c = Comment(id=uuid.uuid4(), post_id=post.id, created_by=author, content=f"c{n}",
+                        parent_comment_id=parent.id if parent else None, created_at=started + timedelta(minutes=n))
+            db.add(c)
+            return c
+
+        first, second, third = comment(0), comment(5), comment(6)
+        reply = comment(1, first)
+        deep = comment(2, reply)
+        comment(3, deep)
+        late_reply = comment(7, first)
+        await db.flush()
+        db.add_all([
+            Reaction(created_by=author, target_id=reply.id, target_type="comment", reaction_type="plus"),
+            Reaction(created_by=author, target_id=first.id, target_type="comment", reaction_type="minus"),
+        ])
+        await db.commit()
+
+        page, cursor = await comment_service.list_comment_tree_async(db, post.id, limit=2, max_depth=2, user_id=author)
+        rest, last_cursor = await comment_service.list_comment_tree_async(db, post.id, cursor=cursor, limit=2)
+        return (first, second, third, reply, deep, late_reply), page, rest, last_cursor
+
+    (first, second, third, reply, deep, late_reply), page, rest, last_cursor = run_async_db(scenario)
+
+    assert [c.id for c in page] == [first.id, second.id]
+    assert [c.id for c in page[0].replies] == [reply.id, late_reply.id]
+    assert [c.id for c in page[0].replies[0].replies] == [deep.id]
+    assert page[0].replies[0].replies[0].replies == []
+    assert page[0].replies[0].replies[0].has_more_replies is True
+    assert page[0].replies[1].has_more_replies is False
+    assert (page[0].reaction_balance, page[0].user_reaction) == (-1, "minus")
+    assert (page[0].replies[0].reaction_balance, page[0].replies[0].depth) == (1, 1)
+    assert page[1].author_display_name == "Alice" and page[1].user_reaction is None
+    assert [c.id for c in rest] == [third.id] and last_cursor is None
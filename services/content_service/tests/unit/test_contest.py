@@ -1,17 +1,23 @@
+import uuid
+from datetime import datetime, timezone
+
 import pytest
 from unittest.mock import MagicMock
 
+from sqlalchemy.dialects import postgresql
+
 import app.services.contest as contest_service
 
 
 def test_create_contest_success(db_session, simple_obj, logger_mock, monkeypatch):
-    data = simple_obj(name="C1", description="D", is_public=True)
+    data = simple_obj(name="C1", description="D", is_public=True, dedupe_submissions=True)
 
     contest_obj = MagicMock(name="ContestInstance")
     def fake_contest_ctor(**kwargs):
         assert kwargs["name"] == "C1"
         assert kwargs["description"] == "D"
         assert kwargs["is_public"] is True
+        assert kwargs["dedupe_submissions"] is True
         assert kwargs["created_by"] == "owner1"
         return contest_obj
 
@@ -27,7 +33,7 @@ def test_create_contest_success(db_session, simple_obj, logger_mock, monkeypatch
 
 
 def test_create_contest_commit_error_rolls_back(db_session, simple_obj, logger_mock, monkeypatch):
-    data = simple_obj(name="C1", description="D", is_public=True)
+    data = simple_obj(name="C1", description="D", is_public=True, dedupe_submissions=True)
     contest_obj = MagicMock()
     monkeypatch.setattr(contest_service, "Contest", lambda **kwargs: contest_obj)
 
@@ -109,27 +115,27 @@ def test_delete_contest_error_rolls_back(db_session, logger_mock, monkeypatch):
     db_session.commit.assert_not_called()
 
 
-def test_list_public_contests_success(db_session, logger_mock, monkeypatch):
-    q = MagicMock()
-    chain = MagicMock()
-    db_session.query.return_value = q
+def test_list_public_contests_pages_public_only(sqlite_db):
+    from app.models.contest import Contest
 
-    q.filter.return_value = chain
-    chain.order_by.return_value = chain
-    chain.offset.return_value = chain
-    chain.limit.return_value = chain
-    chain.all.return_value = [MagicMock(), MagicMock(), MagicMock()]
+    db, statements = sqlite_db
+    db.add_all([
+        Contest(name=f"open{i}", created_by="owner", is_public=True, created_at=datetime(2024, 1, 1, 10, i))
+        for i in range(3)
+    ] + [Contest(name="closed", created_by="owner", is_public=False)])
+    db.commit()
+    statements.clear()
 
-    res = contest_service.list_public_contests(db_session, offset=2, limit=3)
-    assert len(res) == 3
-    chain.offset.assert_called_once_with(2)
-    chain.limit.assert_called_once_with(3)
+    first, cursor = contest_service.list_public_contests(db, limit=2)
+    rest, last_cursor = contest_service.list_public_contests(db, cursor=cursor, limit=2)
+
+    assert [c.name for c in first + rest] == ["open2", "open1", "open0"]
+    assert last_cursor is None
+    assert len(statements) == 2
 
 
 def test_list_public_contests_query_error_raises(db_session, logger_mock, monkeypatch):
-    q = MagicMock()
-    q.filter.side_effect = Exception("boom")
-    db_session.query.return_value = q
+    db_session.execute.side_effect = Exception("boom")
 
     with pytest.raises(Exception):
         contest_service.list_public_contests(db_session)
@@ -160,48 +166,52 @@ def test_join_public_contest_private_contest_no_commit(db_session, logger_mock,
 
 
 def test_join_public_contest_already_participant_no_commit(db_session, logger_mock, monkeypatch):
-    u = MagicMock()
-    u.keycloak_id = "uid"
-
     contest = MagicMock()
     contest.is_public = True
-    contest.participants = [u]
 
     monkeypatch.setattr(contest_service, "get_contest", lambda db, cid: contest)
+    db_session.query.return_value.scalar.return_value = True
 
     contest_service.join_public_contest(db_session, "cid", "uid")
 
+    db_session.execute.assert_not_called()
     db_session.commit.assert_not_called()
 
 
-def test_join_public_contest_success_appends_and_commits(db_session, logger_mock, monkeypatch):
+def test_join_public_contest_success_inserts_and_commits(db_session, logger_mock, monkeypatch):
     contest = MagicMock()
     contest.is_public = True
-    contest.participants = []
-
-    user = MagicMock()
-    user.keycloak_id = "uid"
 
     monkeypatch.setattr(contest_service, "get_contest", lambda db, cid: contest)
-    monkeypatch.setattr(contest_service, "get_user", lambda db, uid: user)
+    db_session.query.return_value.scalar.return_value = False
 
     contest_service.join_public_contest(db_session, "cid", "uid")
 
-    assert contest.participants == [user]
+    # членство проверяется EXISTS, список участников не читается
+    exists_query = str(db_session.query.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "EXISTS (SELECT *" in exists_query and "contest_participants.user_keycloak_id" in exists_query
+    insert = str(db_session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "INSERT INTO contest_participants" in insert and "ON CONFLICT DO NOTHING" in insert
     db_session.commit.assert_called_once()
     db_session.rollback.assert_not_called()
 
 
+def test_join_public_contest_invalidates_tester_cache(db_session, logger_mock, monkeypatch, no_tester_invalidation):
+    contest = MagicMock(is_public=True)
+    monkeypatch.setattr(contest_service, "get_contest", lambda db, cid: contest)
+    db_session.query.return_value.scalar.return_value = False
+
+    contest_service.join_public_contest(db_session, "cid", "uid")
+
+    no_tester_invalidation.assert_called_once_with("cid")
+
+
 def test_join_public_contest_commit_error_rolls_back(db_session, logger_mock, monkeypatch):
     contest = MagicMock()
     contest.is_public = True
-    contest.participants = []
-
-    user = MagicMock()
-    user.keycloak_id = "uid"
 
     monkeypatch.setattr(contest_service, "get_contest", lambda db, cid: contest)
-    monkeypatch.setattr(contest_service, "get_user", lambda db, uid: user)
+    db_session.query.return_value.scalar.return_value = False
     db_session.commit.side_effect = RuntimeError("fail")
 
     with pytest.raises(RuntimeError):
@@ -211,66 +221,170 @@ def test_join_public_contest_commit_error_rolls_back(db_session, logger_mock, mo
 
 
 def test_add_user_to_contest_by_username_success(db_session, logger_mock, monkeypatch):
-    contest = MagicMock()
-    contest.participants = []
-
     user = MagicMock()
     user.keycloak_id = "kid"
     user.username = "bob"
 
-    monkeypatch.setattr(contest_service, "get_contest", lambda db, cid: contest)
     monkeypatch.setattr(contest_service, "get_user_by_username", lambda db, uname: user)
+    db_session.query.return_value.scalar.return_value = False
 
     contest_service.add_user_to_contest_by_username(db_session, "cid", "bob")
 
-    assert contest.participants == [user]
+    db_session.execute.assert_called_once()
     db_session.commit.assert_called_once()
 
 
-def test_list_contest_participants(db_session, monkeypatch):
-    contest = MagicMock()
-    contest.participants = ["u1", "u2"]
-    monkeypatch.setattr(contest_service, "get_contest", lambda db, cid: contest)
+def test_add_user_to_contest_by_username_existing_or_unknown_no_commit(db_session, logger_mock, monkeypatch):
+    users = {"bob": MagicMock(keycloak_id="kid")}
+    monkeypatch.setattr(contest_service, "get_user_by_username", lambda db, uname: users.get(uname))
+    db_session.query.return_value.scalar.return_value = True
 
-    res = contest_service.list_contest_participants(db_session, "cid")
-    assert res == ["u1", "u2"]
+    contest_service.add_user_to_contest_by_username(db_session, "cid", "bob")
+    contest_service.add_user_to_contest_by_username(db_session, "cid", "ghost")
 
+    db_session.execute.assert_not_called()
+    db_session.commit.assert_not_called()
 
-def test_list_contest_tasks_success(db_session, logger_mock, monkeypatch):
-    q = MagicMock()
-    chain = MagicMock()
-    db_session.query.return_value = q
-    q.filter.return_value = chain
-    chain.all.return_value = ["p1", "p2"]
 
-    res = contest_service.list_contest_tasks(db_session, "cid")
-    assert res == ["p1", "p2"]
+def test_add_users_to_contest_bulk_reports_each_username(db_session, logger_mock, no_tester_invalidation):
+    db_session.query.return_value.filter.return_value.all.return_value = [("alice", "k1"), ("bob", "k2")]
+    # bob уже участвует - ON CONFLICT DO NOTHING вернет только alice
+    db_session.execute.return_value = [("k1",)]
 
+    res = contest_service.add_users_to_contest_bulk(db_session, "cid", ["alice", "ghost", "bob", "alice"])
 
-def test_list_contest_tasks_query_error_raises(db_session, logger_mock, monkeypatch):
-    q = MagicMock()
-    q.filter.side_effect = Exception("boom")
-    db_session.query.return_value = q
+    assert res == {"added": ["alice"], "already_joined": ["bob"], "unknown": ["ghost"]}
+    db_session.execute.assert_called_once()
+    stmt = str(db_session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT DO NOTHING RETURNING contest_participants.user_keycloak_id" in stmt
+    db_session.commit.assert_called_once()
+    no_tester_invalidation.assert_called_once_with("cid")
 
-    with pytest.raises(Exception):
-        contest_service.list_contest_tasks(db_session, "cid")
 
+def test_add_users_to_contest_bulk_unknown_only_skips_insert(db_session, logger_mock, no_tester_invalidation):
+    db_session.query.return_value.filter.return_value.all.return_value = []
 
-def test_list_user_contests_success(db_session, logger_mock, monkeypatch):
-    user = MagicMock()
-    user.contests_joined = ["c1", "c2"]
+    res = contest_service.add_users_to_contest_bulk(db_session, "cid", ["ghost"])
 
-    monkeypatch.setattr(contest_service, "get_user", lambda db, uid: user)
+    assert res == {"added": [], "already_joined": [], "unknown": ["ghost"]}
+    db_session.execute.assert_not_called()
+    no_tester_invalidation.assert_not_called()
 
-    res = contest_service.list_user_contests(db_session, "uid")
-    assert res == ["c1", "c2"]
 
+def test_list_contest_tasks_preloads_contest(sqlite_db):
+    from app.models.contest import Contest
+    from app.models.problem import Problem
 
-def test_list_user_contests_get_user_error_raises(db_session, logger_mock, monkeypatch):
-    def boom(db, uid):
-        raise RuntimeError("no user")
+    db, _ = sqlite_db
+    contest = Contest(id=uuid.uuid4(), name="c", created_by="owner")
+    db.add_all([
+        contest,
+        Problem(title="T1", description="d", difficulty="EASY", created_by="owner", contest_id=contest.id),
+        Problem(title="free", description="d", difficulty="EASY", created_by="owner"),
+    ])
+    contest_id = contest.id
+    db.commit()
+    db.expunge_all()
 
-    monkeypatch.setattr(contest_service, "get_user", boom)
+    tasks = contest_service.list_contest_tasks(db, contest_id)
+    db.expunge_all()
 
-    with pytest.raises(RuntimeError):
-        contest_service.list_user_contests(db_session, "uid")
+    assert [t.title for t in tasks] == ["T1"]
+    assert tasks[0].dedupe_submissions is True
+
+
+def test_list_contest_tasks_query_error_raises(db_session, logger_mock, monkeypatch):
+    db_session.scalars.side_effect = Exception("boom")
+
+    with pytest.raises(Exception):
+        contest_service.list_contest_tasks(db_session, "cid")
+
+
+def test_contest_async_reads(run_async_db):
+    from app.models.contest import Contest
+    from app.models.problem import Problem
+    from app.models.user import User
+
+    async def scenario(db):
+        owner = str(uuid.uuid4())
+        public = Contest(id=uuid.uuid4(), name="open", created_by=owner, is_public=True)
+        private = Contest(id=uuid.uuid4(), name="closed", created_by=owner, is_public=False)
+        db.add_all([
+            User(keycloak_id=owner, username="owner", email="o@x.io"),
+            public,
+            private,
+            Problem(title="T1", description="d", difficulty="EASY", created_by=owner, contest_id=public.id),
+        ])
+        await db.commit()
+        db.expunge_all()
+
+        contest = await contest_service.get_contest_async(db, public.id)
+        listed, next_cursor = await contest_service.list_public_contests_async(db)
+        tasks = await contest_service.list_contest_tasks_async(db, public.id)
+        return contest, listed, next_cursor, tasks
+
+    contest, listed, next_cursor, tasks = run_async_db(scenario)
+
+    assert contest.name == "open"
+    assert [c.name for c in listed] == ["open"] and next_cursor is None
+    assert [t.title for t in tasks] == ["T1"]
+    assert tasks[0].dedupe_submissions is True
+
+
+def seed_participants(db, count):
+    from datetime import timedelta
+
+    from app.models.contest import Contest, contest_participants
+    from app.models.user import User
+
+    owner = User(keycloak_id="owner", username="owner", email="owner@x.io")
+    contest = Contest(id=uuid.uuid4(), name="big", created_by="owner")
+    other = Contest(id=uuid.uuid4(), name="other", created_by="owner")
+    users = [User(keycloak_id=f"u{i:03}", username=f"user{i}", email=f"u{i}@x.io") for i in range(count)]
+    db.add_all([owner, contest, other, *users])
+    db.flush()
+    started = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    db.execute(contest_participants.insert(), [
+        {"contest_id": contest.id, "user_keycloak_id": user.keycloak_id, "joined_at": started + timedelta(minutes=i)}
+        for i, user in enumerate(users)
+    ])
+    db.execute(contest_participants.insert(), [
+        {"contest_id": other.id, "user_keycloak_id": "u000", "joined_at": started + timedelta(days=1)}
+    ])
+    ids = contest.id, other.id
+    db.commit()
+    db.expunge_all()
+    return ids
+
+
+def test_contest_and_user_loads_do_not_join_participants(sqlite_db):
+    from app.services.user import get_user
+
+    db, statements = sqlite_db
+    contest_id, _ = seed_participants(db, 50)
+    statements.clear()
+
+    assert contest_service.get_contest(db, contest_id).name == "big"
+    assert get_user(db, "u001").username == "user1"
+
+    assert len(statements) == 2
+    assert not any("contest_participants" in stmt for stmt in statements)
+
+
+def test_participants_and_user_contests_are_paginated(sqlite_db):
+    db, statements = sqlite_db
+    contest_id, other_id = seed_participants(db, 25)
+    statements.clear()
+
+    first, cursor = contest_service.list_contest_participants(db, contest_id, limit=20)
+    rest, last_cursor = contest_service.list_contest_participants(db, contest_id, cursor=cursor, limit=20)
+    joined, joined_cursor = contest_service.list_user_contests(db, "u000", limit=1)
+    older, _ = contest_service.list_user_contests(db, "u000", cursor=joined_cursor, limit=1)
+
+    # одна страница - один запрос, независимо от числа участников
+    assert len(statements) == 4
+    assert [u.keycloak_id for u in first + rest] == [f"u{i:03}" for i in range(25)]
+    assert len(first) == 20 and last_cursor is None
+    assert [c.id for c in joined + older] == [other_id, contest_id]
+    assert contest_service.is_contest_participant(db, other_id, "u000") is True
+    assert contest_service.is_contest_participant(db, other_id, "u001") is False
@@ -0,0 +1,107 @@
+import asyncio
+import importlib.util
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.tag import Tag
+
+DATABASE_PATH = Path(__file__).resolve().parents[2] / "app" / "core" / "database.py"
+
+
+@pytest.fixture
+def load_database(monkeypatch, tmp_path):
+    # conftest подменяет app.core.database, поэтому настоящий модуль загружается из файла
+    # с двумя локальными SQLite: основной БД и репликой
+    modules = []
+
+    def _load(replica: bool = True):
+        monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{tmp_path / 'primary.db'}")
+        monkeypatch.setattr(settings, "ASYNC_DATABASE_URL", None)
+        monkeypatch.setattr(
+            settings, "DATABASE_REPLICA_URL", f"sqlite:///{tmp_path / 'replica.db'}" if replica else None
+        )
+        spec = importlib.util.spec_from_file_location("database_under_test", DATABASE_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        for engine in {module.engine, module.replica_engine}:
+            module.Base.metadata.create_all(engine)
+        modules.append(module)
+        return module
+
+    yield _load
+    for module in modules:
+        module.engine.dispose()
+        module.replica_engine.dispose()
+
+
+def add_tag(session_factory, name: str) -> None:
+    with session_factory() as db:
+        db.add(Tag(name=name))
+        db.commit()
+
+
+def read_names(dependency) -> list[str]:
+    gen = dependency()
+    db = next(gen)
+    try:
+        return [tag.name for tag in db.query(Tag).order_by(Tag.name)]
+    finally:
+        gen.close()
+
+
+def read_names_async(dependency) -> list[str]:
+    async def scenario():
+        gen = dependency()
+        db = await gen.__anext__()
+        try:
+            return list((await db.execute(select(Tag.name).order_by(Tag.name))).scalars())
+        finally:
+            await gen.aclose()
+
+    return asyncio.run(scenario())
+
+
+def test_engine_options(load_database, monkeypatch):
+    database = load_database()
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 1500)
+
+    options = database.engine_options("postgresql://u:p@db:5432/app")
+    async_options = database.engine_options("postgresql+asyncpg://u:p@db:5432/app")
+
+    assert options["pool_size"] == 7 and options["pool_recycle"] == settings.DB_POOL_RECYCLE
+    assert options["connect_args"] == {"options": "-c statement_timeout=1500"}
+    assert async_options["connect_args"] == {"server_settings": {"statement_timeout": "1500"}}
+    assert database.engine_options("sqlite:///local.db") == {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+
+
+def test_read_sessions_go_to_replica(load_database):
+    database = load_database()
+    add_tag(database.SessionLocal, "primary")
+    # реплика заполняется отдельно, как если бы до нее еще не дошла репликация
+    add_tag(database.sessionmaker(bind=database.replica_engine), "replica")
+
+    assert read_names(database.get_db) == ["primary"]
+    assert read_names(database.get_read_db) == ["replica"]
+    assert read_names_async(database.get_async_db) == ["primary"]
+    assert read_names_async(database.get_async_read_db) == ["replica"]
+
+
+def test_read_session_rejects_writes(load_database):
+    database = load_database()
+
+    with pytest.raises(RuntimeError):
+        add_tag(database.ReadSessionLocal, "write")
+    assert read_names(database.get_db) == []
+
+
+def test_read_sessions_fall_back_to_primary(load_database):
+    database = load_database(replica=False)
+    add_tag(database.SessionLocal, "primary")
+
+    assert database.replica_engine is database.engine
+    assert read_names(database.get_read_db) == ["primary"]
+    assert read_names_async(database.get_async_read_db) == ["primary"]
@@ -11,6 +11,22 @@ class DummySettings:
     KEYCLOAK_ADMIN = "admin"
     KEYCLOAK_ADMIN_PASSWORD = "pass"
     KEYCLOAK_REALM = "realm1"
+    HTTP_RETRIES = 2
+    KEYCLOAK_ADMIN_TOKEN_LEEWAY = 30
+
+
+@pytest.fixture(autouse=True)
+def reset_admin_token():
+    keycloak_service.admin_token_manager.invalidate()
+    yield
+    keycloak_service.admin_token_manager.invalidate()
+
+
+def token_response(token, expires_in=300):
+    resp = MagicMock()
+    resp.status_code = 200
+    resp.json.return_value = {"access_token": token, "expires_in": expires_in}
+    return resp
 
 
 def test_get_keycloak_admin_token_success(logger_mock, monkeypatch):
@@ -20,7 +36,7 @@ def test_get_keycloak_admin_token_success(logger_mock, monkeypatch):
     resp.status_code = 200
     resp.json.return_value = {"access_token": "TOKEN"}
     post = MagicMock(return_value=resp)
-    monkeypatch.setattr(keycloak_service.requests, "post", post)
+    monkeypatch.setattr(keycloak_service.keycloak_client, "post", post)
 
     token = keycloak_service.get_keycloak_admin_token()
 
@@ -34,7 +50,7 @@ def test_get_keycloak_admin_token_requests_error_raises(logger_mock, monkeypatch
     def boom(*args, **kwargs):
         raise RuntimeError("net")
 
-    monkeypatch.setattr(keycloak_service.requests, "post", boom)
+    monkeypatch.setattr(keycloak_service.keycloak_client, "post", boom)
 
     with pytest.raises(RuntimeError):
         keycloak_service.get_keycloak_admin_token()
@@ -46,7 +62,7 @@ def test_get_keycloak_admin_token_bad_status_raises_http_exception(logger_mock,
     resp = MagicMock()
     resp.status_code = 401
     resp.text = "unauthorized"
-    monkeypatch.setattr(keycloak_service.requests, "post", MagicMock(return_value=resp))
+    monkeypatch.setattr(keycloak_service.keycloak_client, "post", MagicMock(return_value=resp))
 
     with pytest.raises(HTTPException) as exc:
         keycloak_service.get_keycloak_admin_token()
@@ -54,6 +70,40 @@ def test_get_keycloak_admin_token_bad_status_raises_http_exception(logger_mock,
     assert exc.value.status_code == 500
 
 
+def test_get_keycloak_admin_token_is_cached_until_expiry(logger_mock, monkeypatch):
+    monkeypatch.setattr(keycloak_service, "settings", DummySettings)
+    post = MagicMock(return_value=token_response("TOKEN"))
+    monkeypatch.setattr(keycloak_service.keycloak_client, "post", post)
+
+    tokens = [keycloak_service.get_keycloak_admin_token() for _ in range(3)]
+
+    assert tokens == ["TOKEN"] * 3
+    post.assert_called_once()
+
+
+def test_get_keycloak_admin_token_refreshes_before_expiry(logger_mock, monkeypatch):
+    monkeypatch.setattr(keycloak_service, "settings", DummySettings)
+    # срок жизни не больше запаса - токен обновляется при следующем запросе
+    post = MagicMock(side_effect=[token_response("OLD", expires_in=20), token_response("NEW")])
+    monkeypatch.setattr(keycloak_service.keycloak_client, "post", post)
+
+    assert keycloak_service.get_keycloak_admin_token() == "OLD"
+    assert keycloak_service.get_keycloak_admin_token() == "NEW"
+
+
+def test_register_user_in_keycloak_refreshes_rejected_cached_token(logger_mock, monkeypatch):
+    monkeypatch.setattr(keycloak_service, "settings", DummySettings)
+    rejected = MagicMock(status_code=401, text="unauthorized")
+    created = MagicMock(status_code=201, headers={"Location": "http://kc/users/abc123"})
+    post = MagicMock(side_effect=[token_response("OLD"), rejected, token_response("NEW"), created])
+    monkeypatch.setattr(keycloak_service.keycloak_client, "post", post)
+
+    kid = keycloak_service.register_user_in_keycloak({"u": 1})
+
+    assert kid == "abc123"
+    assert post.call_args.kwargs["headers"]["Authorization"] == "Bearer NEW"
+
+
 def test_register_user_in_keycloak_success_201(logger_mock, monkeypatch):
     monkeypatch.setattr(keycloak_service, "settings", DummySettings)
 
@@ -62,7 +112,7 @@ def test_register_user_in_keycloak_success_201(logger_mock, monkeypatch):
     resp.text = "ok"
     resp.headers = {"Location": "http://kc/admin/realms/realm1/users/abc123"}
     post = MagicMock(return_value=resp)
-    monkeypatch.setattr(keycloak_service.requests, "post", post)
+    monkeypatch.setattr(keycloak_service.keycloak_client, "post", post)
 
     kid = keycloak_service.register_user_in_keycloak({"u": 1}, admin_token="T")
 
@@ -76,7 +126,7 @@ def test_register_user_in_keycloak_success_204(logger_mock, monkeypatch):
     resp.status_code = 204
     resp.text = ""
     resp.headers = {"Location": "http://kc/x/y/z/user-id-999/"}
-    monkeypatch.setattr(keycloak_service.requests, "post", MagicMock(return_value=resp))
+    monkeypatch.setattr(keycloak_service.keycloak_client, "post", MagicMock(return_value=resp))
 
     kid = keycloak_service.register_user_in_keycloak({"u": 1}, admin_token="T")
     assert kid == "user-id-999"
@@ -88,7 +138,7 @@ def test_register_user_in_keycloak_requests_error_raises(logger_mock, monkeypatc
     def boom(*args, **kwargs):
         raise RuntimeError("net")
 
-    monkeypatch.setattr(keycloak_service.requests, "post", boom)
+    monkeypatch.setattr(keycloak_service.keycloak_client, "post", boom)
 
     with pytest.raises(RuntimeError):
         keycloak_service.register_user_in_keycloak({"u": 1}, admin_token="T")
@@ -101,7 +151,7 @@ def test_register_user_in_keycloak_bad_status_raises_http_exception(logger_mock,
     resp.status_code = 400
     resp.text = "bad request"
     resp.headers = {}
-    monkeypatch.setattr(keycloak_service.requests, "post", MagicMock(return_value=resp))
+    monkeypatch.setattr(keycloak_service.keycloak_client, "post", MagicMock(return_value=resp))
 
     with pytest.raises(HTTPException) as exc:
         keycloak_service.register_user_in_keycloak({"u": 1}, admin_token="T")
@@ -116,7 +166,7 @@ def test_register_user_in_keycloak_missing_location_raises_http_exception(logger
     resp.status_code = 201
     resp.text = "ok"
     resp.headers = {}
-    monkeypatch.setattr(keycloak_service.requests, "post", MagicMock(return_value=resp))
+    monkeypatch.setattr(keycloak_service.keycloak_client, "post", MagicMock(return_value=resp))
 
     with pytest.raises(HTTPException) as exc:
         keycloak_service.register_user_in_keycloak({"u": 1}, admin_token="T")
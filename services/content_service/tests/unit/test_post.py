@@ -1,3 +1,5 @@
+import uuid
+
 import pytest
 from unittest.mock import MagicMock
 
@@ -145,11 +147,15 @@ def test_list_posts_success(db_session, logger_mock, monkeypatch):
     chain = MagicMock()
     db_session.query.return_value = q
     q.options.return_value = chain
+    chain.order_by.return_value = chain
+    chain.limit.return_value = chain
     chain.all.return_value = [MagicMock(), MagicMock()]
 
-    res = post_service.list_posts(db_session)
+    res, next_cursor = post_service.list_posts(db_session, limit=5)
     assert len(res) == 2
+    assert next_cursor is None
     q.options.assert_called_once()
+    chain.limit.assert_called_once_with(6)
 
 
 def test_list_posts_by_user_success(db_session, logger_mock, monkeypatch):
@@ -197,112 +203,69 @@ def test_list_posts_by_tag_success(db_session, logger_mock, monkeypatch):
     assert len(res) == 1
 
 
-def test_list_enriched_posts_by_problem_sets_fields_and_defaults_balance(db_session, logger_mock, monkeypatch):
-    subq = MagicMock(name="reaction_subq")
-    subq.c = MagicMock()
-    subq.c.balance = MagicMock(name="balance_col")
-    subq.c.post_id = MagicMock(name="post_id_col")
-
-    build_q = MagicMock(name="build_subq_query")
-    build_chain = MagicMock(name="build_subq_chain")
-    db_session.query.return_value = build_q
-    build_q.filter.return_value = build_chain
-    build_chain.group_by.return_value = build_chain
-    build_chain.subquery.return_value = subq
-
-    class _FakeOrder:
-        def __init__(self):
-            self.asc_called = False
-            self.desc_called = False
-        def asc(self):
-            self.asc_called = True
-            return "ASC_EXPR"
-        def desc(self):
-            self.desc_called = True
-            return "DESC_EXPR"
-
-    fake_order = _FakeOrder()
-    monkeypatch.setattr(post_service.func, "coalesce", lambda *args, **kwargs: fake_order)
-
-    main_q = MagicMock(name="main_query")
-    main_chain = MagicMock(name="main_chain")
-
-    def query_side_effect(*args, **kwargs):
-        if query_side_effect.calls == 0:
-            query_side_effect.calls += 1
-            return build_q
-        return main_q
-    query_side_effect.calls = 0
-    db_session.query.side_effect = query_side_effect
-
-    main_q.join.return_value = main_chain
-    main_chain.outerjoin.return_value = main_chain
-    main_chain.filter.return_value = main_chain
-    main_chain.order_by.return_value = main_chain
-    main_chain.offset.return_value = main_chain
-    main_chain.limit.return_value = main_chain
-
-    p1, p2 = MagicMock(), MagicMock()
-    p1.id, p2.id = "p1", "p2"
-    main_chain.all.return_value = [(p1, "Alice", None), (p2, "Bob", 5)]
-
-    res = post_service.list_enriched_posts_by_problem(
-        db_session,
-        problem_id="pr1",
-        offset=0,
-        limit=10,
-        tag_id=None,
-        sort_by_rating=True,
-        sort_order="desc",
-    )
-
-    assert res == [p1, p2]
-    assert p1.author_display_name == "Alice"
-    assert p1.reaction_balance == 0  # None -> 0
-    assert p2.author_display_name == "Bob"
-    assert p2.reaction_balance == 5
-
-    assert fake_order.desc_called is True
-
-
-def test_list_enriched_posts_by_problem_applies_tag_filter(db_session, logger_mock, monkeypatch):
-    subq = MagicMock()
-    subq.c = MagicMock()
-    subq.c.balance = MagicMock()
-    subq.c.post_id = MagicMock()
-
-    build_q = MagicMock()
-    build_chain = MagicMock()
-    build_q.filter.return_value = build_chain
-    build_chain.group_by.return_value = build_chain
-    build_chain.subquery.return_value = subq
-
-    main_q = MagicMock()
-    main_chain = MagicMock()
-    def query_side_effect(*args, **kwargs):
-        if query_side_effect.calls == 0:
-            query_side_effect.calls += 1
-            return build_q
-        return main_q
-    query_side_effect.calls = 0
-    db_session.query.side_effect = query_side_effect
-
-    main_q.join.return_value = main_chain
-    main_chain.outerjoin.return_value = main_chain
-    main_chain.filter.return_value = main_chain
-    main_chain.offset.return_value = main_chain
-    main_chain.limit.return_value = main_chain
-    main_chain.all.return_value = []
-
-    post_service.list_enriched_posts_by_problem(
-        db_session, "pr1", tag_id="tag1", sort_by_rating=False
+def test_list_enriched_posts_by_problem_filters_by_tag_and_sorts_by_rating(sqlite_db):
+    from app.models.post import Post
+    from app.models.problem import Problem
+    from app.models.reaction import Reaction
+    from app.models.tag import Tag
+    from app.models.user import User
+
+    db, _ = sqlite_db
+    author = str(uuid.uuid4())
+    tag = Tag(id=uuid.uuid4(), name="greedy")
+    problem = Problem(id=uuid.uuid4(), title="P", description="d", difficulty="EASY", created_by=author)
+    tagged = Post(title="tagged", content="c", problem_id=problem.id, created_by=author, tags=[tag])
+    plain = Post(title="plain", content="c", problem_id=problem.id, created_by=author)
+    db.add_all([User(keycloak_id=author, username="a", email="a@x.io", display_name="A"),
+                tag, problem, tagged, plain])
+    db.flush()
+    db.add(Reaction(created_by=author, target_id=tagged.id, target_type="post", reaction_type="plus"))
+    problem_id, tag_id = problem.id, tag.id
+    db.commit()
+
+    by_tag, _ = post_service.list_enriched_posts_by_problem(db, problem_id, tag_id=tag_id)
+    by_rating, next_cursor = post_service.list_enriched_posts_by_problem(
+        db, problem_id, sort_by_rating=True, sort_order="asc"
     )
 
-    assert main_chain.filter.call_count >= 2
+    assert [(p.title, p.author_display_name, p.reaction_balance) for p in by_tag] == [("tagged", "A", 1)]
+    assert [(p.title, p.reaction_balance) for p in by_rating] == [("plain", 0), ("tagged", 1)]
+    assert next_cursor is None
 
 
-def test_list_enriched_posts_by_problem_subquery_error_raises(db_session, logger_mock, monkeypatch):
-    db_session.query.side_effect = Exception("boom")
+def test_list_enriched_posts_by_problem_query_error_raises(db_session, logger_mock, monkeypatch):
+    db_session.execute.side_effect = Exception("boom")
 
     with pytest.raises(Exception):
         post_service.list_enriched_posts_by_problem(db_session, "pr1")
+
+
+def test_list_enriched_posts_by_problem_async_filters_by_tag(run_async_db):
+    from app.models.post import Post
+    from app.models.problem import Problem
+    from app.models.reaction import Reaction
+    from app.models.tag import Tag
+    from app.models.user import User
+
+    async def scenario(db):
+        author = str(uuid.uuid4())
+        tag = Tag(name="greedy")
+        problem = Problem(id=uuid.uuid4(), title="P", description="d", difficulty="EASY", created_by=author)
+        tagged = Post(title="tagged", content="c", problem_id=problem.id, created_by=author, tags=[tag])
+        plain = Post(title="plain", content="c", problem_id=problem.id, created_by=author)
+        db.add_all([User(keycloak_id=author, username="a", email="a@x.io", display_name="A"),
+                    tag, problem, tagged, plain])
+        await db.flush()
+        db.add(Reaction(created_by=author, target_id=tagged.id, target_type="post", reaction_type="plus"))
+        await db.commit()
+
+        by_tag, _ = await post_service.list_enriched_posts_by_problem_async(db, problem.id, tag_id=tag.id)
+        by_rating, _ = await post_service.list_enriched_posts_by_problem_async(
+            db, problem.id, sort_by_rating=True, sort_order="asc"
+        )
+        return by_tag, by_rating
+
+    by_tag, by_rating = run_async_db(scenario)
+
+    assert [(p.title, p.reaction_balance, [t.name for t in p.tags]) for p in by_tag] == [("tagged", 1, ["greedy"])]
+    assert [p.title for p in by_rating] == ["plain", "tagged"]
@@ -1,7 +1,11 @@
+import uuid
+
 import pytest
 from unittest.mock import MagicMock
+from sqlalchemy.dialects import postgresql
 
 import app.services.problem as problem_service
+from app.schemas.problem import SolvedMarkStatus
 
 
 def test_create_problem_converts_test_cases_to_dicts(db_session, logger_mock, monkeypatch, simple_obj):
@@ -81,6 +85,15 @@ def test_update_problem_skips_tags(db_session, logger_mock, monkeypatch):
     db_session.refresh.assert_called_once_with(p)
 
 
+def test_update_problem_moving_between_contests_invalidates_both(db_session, logger_mock, no_tester_invalidation):
+    p = MagicMock()
+    p.contest_id = "c1"
+
+    problem_service.update_problem(db_session, p, {"contest_id": "c2"})
+
+    assert [c.args for c in no_tester_invalidation.call_args_list] == [("c1",), ("c2",)]
+
+
 def test_delete_problem_success(db_session, logger_mock, monkeypatch):
     p = MagicMock()
     p.id = "pid"
@@ -149,75 +162,175 @@ def test_list_problems_by_difficulty_success(db_session, logger_mock, monkeypatc
     assert len(res) == 1
 
 
-def test_list_enriched_problems_filtered_sets_fields_and_filters_contest_none(db_session, logger_mock, monkeypatch):
-    subq = MagicMock()
-    subq.c = MagicMock()
-    subq.c.balance = MagicMock()
-    subq.c.problem_id = MagicMock()
-
-    build_q = MagicMock()
-    build_chain = MagicMock()
-    build_q.filter.return_value = build_chain
-    build_chain.group_by.return_value = build_chain
-    build_chain.subquery.return_value = subq
-
-    class _FakeOrder:
-        def __init__(self):
-            self.asc_called = False
-            self.desc_called = False
-        def asc(self):
-            self.asc_called = True
-            return "ASC"
-        def desc(self):
-            self.desc_called = True
-            return "DESC"
-    fake_order = _FakeOrder()
-    monkeypatch.setattr(problem_service.func, "coalesce", lambda *args, **kwargs: fake_order)
-
-    main_q = MagicMock()
-    main_chain = MagicMock()
-    def query_side_effect(*args, **kwargs):
-        if query_side_effect.calls == 0:
-            query_side_effect.calls += 1
-            return build_q
-        return main_q
-    query_side_effect.calls = 0
-    db_session.query.side_effect = query_side_effect
-
-    main_q.join.return_value = main_chain
-    main_chain.outerjoin.return_value = main_chain
-    main_chain.filter.return_value = main_chain
-    main_chain.order_by.return_value = main_chain
-    main_chain.offset.return_value = main_chain
-    main_chain.limit.return_value = main_chain
-
-    pr1, pr2 = MagicMock(), MagicMock()
-    pr1.id, pr2.id = "pr1", "pr2"
-    main_chain.all.return_value = [(pr1, "Alice", None), (pr2, "Bob", 2)]
-
-    res = problem_service.list_enriched_problems_filtered(
-        db_session,
-        offset=0,
-        limit=10,
-        difficulty="EASY",
-        tag_id="tag1",
-        sort_by_rating=True,
-        sort_order="asc",
+def test_list_enriched_problems_filtered_sorts_by_rating_and_skips_contest_tasks(sqlite_db):
+    db, _ = sqlite_db
+    author, tag, problems, in_contest, Reaction = seed_problems(db)
+    db.flush()
+    db.add_all([
+        Reaction(created_by=author, target_id=problems[1].id, target_type="problem", reaction_type="plus"),
+        Reaction(created_by=author, target_id=problems[2].id, target_type="problem", reaction_type="minus"),
+    ])
+    ids = [p.id for p in problems]
+    tag_id = tag.id
+    db.commit()
+
+    first, cursor = problem_service.list_enriched_problems_filtered(
+        db, limit=2, difficulty="EASY", sort_by_rating=True, sort_order="asc"
     )
+    rest, last_cursor = problem_service.list_enriched_problems_filtered(
+        db, cursor=cursor, limit=2, difficulty="EASY", sort_by_rating=True, sort_order="asc"
+    )
+    tagged, _ = problem_service.list_enriched_problems_filtered(db, tag_ids=[tag_id])
 
-    assert res == [pr1, pr2]
-    assert pr1.author_display_name == "Alice"
-    assert pr1.reaction_balance == 0
-    assert pr2.author_display_name == "Bob"
-    assert pr2.reaction_balance == 2
-
-    assert fake_order.asc_called is True
-
-    assert main_chain.filter.call_count >= 2  # difficulty/tag/contest_id
+    assert [(p.id, p.reaction_balance) for p in first + rest] == [(ids[2], -1), (ids[0], 0), (ids[1], 1)]
+    assert first[0].author_display_name == "Alice"
+    assert last_cursor is None
+    assert {p.id for p in tagged} == {ids[1], ids[2]}
 
 
-def test_list_enriched_problems_filtered_subquery_error_raises(db_session, logger_mock, monkeypatch):
-    db_session.query.side_effect = Exception("boom")
+def test_list_enriched_problems_filtered_query_error_raises(db_session, logger_mock, monkeypatch):
+    db_session.execute.side_effect = Exception("boom")
 
     with pytest.raises(Exception):
         problem_service.list_enriched_problems_filtered(db_session)
+
+
+def test_mark_problems_solved_single_insert_with_per_pair_results(db_session, logger_mock, simple_obj):
+    pid1, pid2, missing = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    queries = iter([[("u1",)], [(pid1,), (pid2,)]])
+    db_session.query.return_value.filter.return_value.all.side_effect = lambda: next(queries)
+    # pid1 уже решена - ON CONFLICT DO NOTHING вернет только новую пару
+    db_session.execute.return_value = [("u1", pid2)]
+
+    items = [
+        simple_obj(user_id="u1", problem_id=pid1),
+        simple_obj(user_id="u1", problem_id=pid2),
+        simple_obj(user_id="u1", problem_id=pid2),
+        simple_obj(user_id="ghost", problem_id=pid1),
+        simple_obj(user_id="u1", problem_id=missing),
+    ]
+    res = problem_service.mark_problems_solved(db_session, items)
+
+    assert [(r["user_id"], r["problem_id"], r["status"]) for r in res] == [
+        ("u1", pid1, SolvedMarkStatus.ALREADY_SOLVED),
+        ("u1", pid2, SolvedMarkStatus.CREATED),
+        ("ghost", pid1, SolvedMarkStatus.USER_NOT_FOUND),
+        ("u1", missing, SolvedMarkStatus.PROBLEM_NOT_FOUND),
+    ]
+    db_session.execute.assert_called_once()
+    stmt = db_session.execute.call_args[0][0]
+    assert "ON CONFLICT DO NOTHING" in str(stmt.compile(dialect=postgresql.dialect()))
+    db_session.commit.assert_called_once()
+
+
+def test_mark_problems_solved_unknown_pairs_skip_insert(db_session, logger_mock, simple_obj):
+    db_session.query.return_value.filter.return_value.all.return_value = []
+
+    res = problem_service.mark_problems_solved(db_session, [simple_obj(user_id="u1", problem_id=uuid.uuid4())])
+
+    assert res[0]["status"] == SolvedMarkStatus.USER_NOT_FOUND
+    db_session.execute.assert_not_called()
+    db_session.commit.assert_not_called()
+
+
+def seed_problems(db):
+    from app.models.contest import Contest
+    from app.models.problem import Problem
+    from app.models.reaction import Reaction
+    from app.models.tag import Tag
+    from app.models.user import User
+
+    author = str(uuid.uuid4())
+    tag = Tag(name="dp")
+    contest = Contest(name="C", created_by=author)
+    db.add_all([User(keycloak_id=author, username="alice", email="a@x.io", display_name="Alice"), tag, contest])
+    problems = [
+        Problem(title=f"P{i}", description="d", difficulty="EASY", created_by=author, tags=[tag] if i else [])
+        for i in range(3)
+    ]
+    in_contest = Problem(title="C1", description="d", difficulty="EASY", created_by=author, contest=contest)
+    db.add_all([*problems, in_contest])
+    return author, tag, problems, in_contest, Reaction
+
+
+def test_list_enriched_problems_filtered_async_sorts_by_rating_and_loads_tags(run_async_db):
+    async def scenario(db):
+        author, tag, problems, _, Reaction = seed_problems(db)
+        await db.flush()
+        db.add_all([
+            Reaction(created_by=author, target_id=problems[1].id, target_type="problem", reaction_type="plus"),
+            Reaction(created_by=author, target_id=problems[2].id, target_type="problem", reaction_type="minus"),
+        ])
+        await db.commit()
+
+        first, cursor = await problem_service.list_enriched_problems_filtered_async(db, limit=2, sort_by_rating=True)
+        rest, last_cursor = await problem_service.list_enriched_problems_filtered_async(
+            db, cursor=cursor, limit=2, sort_by_rating=True
+        )
+        tagged, _ = await problem_service.list_enriched_problems_filtered_async(db, tag_ids=[tag.id])
+        return problems, first, rest, last_cursor, tagged
+
+    problems, first, rest, last_cursor, tagged = run_async_db(scenario)
+
+    assert [p.reaction_balance for p in first + rest] == [1, 0, -1]
+    assert [p.id for p in first + rest] == [problems[1].id, problems[0].id, problems[2].id]
+    assert last_cursor is None
+    assert first[0].author_display_name == "Alice"
+    # теги загружены заранее - доступны без ленивой загрузки
+    assert {p.id for p in tagged} == {problems[1].id, problems[2].id}
+    assert [t.name for t in tagged[0].tags] == ["dp"]
+
+
+def test_get_problem_async_preloads_contest_for_dedupe(run_async_db):
+    async def scenario(db):
+        _, _, _, in_contest, _ = seed_problems(db)
+        in_contest.contest.dedupe_submissions = False
+        await db.commit()
+        db.expunge_all()
+        problem = await problem_service.get_problem_async(db, in_contest.id)
+        missing = await problem_service.get_problem_async(db, uuid.uuid4())
+        return problem, missing
+
+    problem, missing = run_async_db(scenario)
+
+    assert problem.dedupe_submissions is False
+    assert problem.tags == []
+    assert missing is None
+
+
+def test_multi_tag_filter_and_facets(run_async_db):
+    from app.models.tag import Tag
+    from app.schemas.problem import TagMatch
+
+    async def scenario(db):
+        _, dp, problems, in_contest, _ = seed_problems(db)
+        graphs = Tag(name="graphs")
+        problems[0].tags = [graphs]
+        problems[1].tags.append(graphs)
+        problems[2].difficulty = "HARD"
+        in_contest.tags = [dp, graphs]
+        await db.commit()
+
+        both, _ = await problem_service.list_enriched_problems_filtered_async(db, tag_ids=[dp.id, graphs.id])
+        either, _ = await problem_service.list_enriched_problems_filtered_async(
+            db, tag_ids=[dp.id, graphs.id], tag_match=TagMatch.any
+        )
+        facets_all = await problem_service.problem_facets_async(db, "EASY", [dp.id])
+        facets_any = await problem_service.problem_facets_async(db, None, [dp.id], TagMatch.any)
+        return dp, graphs, problems, both, either, facets_all, facets_any
+
+    dp, graphs, problems, both, either, facets_all, facets_any = run_async_db(scenario)
+
+    assert [p.id for p in both] == [problems[1].id]
+    assert {p.id for p in either} == {p.id for p in problems}
+    # сложность считается без собственного фильтра, теги - среди задач с dp и сложностью EASY
+    assert facets_all["difficulty"] == [{"value": "EASY", "count": 1}, {"value": "HARD", "count": 1}]
+    assert facets_all["tags"] == [
+        {"value": str(dp.id), "label": "dp", "count": 1},
+        {"value": str(graphs.id), "label": "graphs", "count": 1},
+    ]
+    # any: выбранные теги не сужают фасет тегов, задача контеста не считается
+    assert facets_any["tags"] == [
+        {"value": str(dp.id), "label": "dp", "count": 2},
+        {"value": str(graphs.id), "label": "graphs", "count": 2},
+    ]
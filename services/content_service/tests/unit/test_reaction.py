@@ -1,3 +1,5 @@
+import uuid
+
 import pytest
 from unittest.mock import MagicMock
 
@@ -171,3 +173,25 @@ def test_get_user_reaction_success(db_session, logger_mock, monkeypatch):
 
     res = reaction_service.get_user_reaction(db_session, "t1", "post", "u1")
     assert res is r
+
+
+def test_reaction_async_batches(run_async_db):
+    from app.models.reaction import Reaction
+
+    async def scenario(db):
+        a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        db.add_all([
+            Reaction(created_by="u1", target_id=a, target_type="comment", reaction_type="plus"),
+            Reaction(created_by="u2", target_id=a, target_type="comment", reaction_type="plus"),
+            Reaction(created_by="u1", target_id=b, target_type="comment", reaction_type="minus"),
+            Reaction(created_by="u1", target_id=b, target_type="post", reaction_type="plus"),
+        ])
+        await db.commit()
+        balances = await reaction_service.compute_reaction_balances_async(db, [a, b, c], "comment")
+        mine = await reaction_service.get_user_reactions_async(db, [a, b, c], "comment", "u1")
+        return (a, b, c), balances, mine
+
+    (a, b, c), balances, mine = run_async_db(scenario)
+
+    assert balances == {a: 2, b: -1, c: 0}
+    assert mine == {a: reaction_service.ReactionType.plus, b: reaction_service.ReactionType.minus}
@@ -0,0 +1,88 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+import app.services.search as search_service
+from app.core.pagination import decode_cursor, encode_cursor
+from app.schemas.search import SearchTarget
+
+
+def sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def async_db(*results):
+    db = MagicMock(name="async_db")
+    db.execute = AsyncMock(side_effect=list(results))
+    return db
+
+
+def page_result(rows):
+    result = MagicMock()
+    result.unique.return_value.all.return_value = rows
+    return result
+
+
+def problem_row(rank):
+    return SimpleNamespace(id=uuid.uuid4(), title="Сумма", created_at=datetime.now(timezone.utc),
+                           rank=rank, difficulty="EASY")
+
+
+def test_search_problems_ranks_and_paginates():
+    rows = [problem_row(0.5), problem_row(0.3), problem_row(0.1)]
+    db = async_db(page_result(rows))
+
+    hits, next_cursor = asyncio.run(search_service.search_async(db, "сумма чисел", limit=2, difficulty="EASY"))
+
+    query = sql(db.execute.call_args.args[0])
+    assert "problems.search_vector @@ websearch_to_tsquery" in query
+    assert "problems.contest_id IS NULL" in query
+    assert "problems.difficulty =" in query
+    assert "ORDER BY CAST(ts_rank_cd(" in query
+    assert [hit["rank"] for hit in hits] == [0.5, 0.3]
+    assert hits[0]["type"] == SearchTarget.problem and hits[0]["difficulty"] == "EASY"
+    assert decode_cursor(next_cursor, 2) == [0.3, rows[1].id]
+
+
+def test_search_with_cursor_filters_by_rank_and_id():
+    db = async_db(page_result([]))
+    cursor = encode_cursor(0.3, uuid.uuid4())
+
+    hits, next_cursor = asyncio.run(
+        search_service.search_async(db, "граф", SearchTarget.blog_post, cursor=cursor)
+    )
+
+    query = sql(db.execute.call_args.args[0])
+    assert "blog_posts.search_vector @@" in query
+    assert "(CAST(ts_rank_cd(blog_posts.search_vector" in query and "blog_posts.id) <" in query
+    assert hits == [] and next_cursor is None
+
+
+def test_facets_skip_own_filter():
+    tag_id = uuid.uuid4()
+    db = async_db([("EASY", 3), ("HARD", 1)], [(tag_id, "dp", 2)])
+
+    facets = asyncio.run(
+        search_service.search_facets_async(db, "сумма", SearchTarget.problem, difficulty="EASY", tag_id=tag_id)
+    )
+
+    difficulty_query, tags_query = (sql(call.args[0]) for call in db.execute.call_args_list)
+    assert "problems.difficulty =" not in difficulty_query and "problem_tags" in difficulty_query
+    assert "problems.difficulty =" in tags_query and "GROUP BY tags.id, tags.name" in tags_query
+    assert facets == {
+        "difficulty": [{"value": "EASY", "count": 3}, {"value": "HARD", "count": 1}],
+        "tags": [{"value": str(tag_id), "label": "dp", "count": 2}],
+    }
+
+
+def test_blog_posts_have_no_facets():
+    db = async_db()
+
+    facets = asyncio.run(search_service.search_facets_async(db, "новости", SearchTarget.blog_post))
+
+    assert facets == {"difficulty": [], "tags": []}
+    db.execute.assert_not_called()
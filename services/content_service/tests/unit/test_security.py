@@ -0,0 +1,91 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from jose import JWTError
+
+import app.core.security as security
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = security.KeycloakService()
+    service._well_known = security.KeycloakWellKnown(issuer="iss", jwks_uri="http://kc/certs")
+    service._jwks = {"k1": {"kid": "k1"}}
+    service._jwks_requested_at = time.monotonic()
+    monkeypatch.setattr(security.jwt, "get_unverified_header", lambda token: {"kid": token.split(".")[0]})
+    return service
+
+
+def mock_decode(monkeypatch, exp_in=60):
+    decode = MagicMock(side_effect=lambda token, **kwargs: {"sub": token, "exp": time.time() + exp_in})
+    monkeypatch.setattr(security.jwt, "decode", decode)
+    return decode
+
+
+def test_decode_token_caches_verified_claims(service, monkeypatch):
+    decode = mock_decode(monkeypatch)
+
+    first = service.decode_token("k1.a")
+    second = service.decode_token("k1.a")
+
+    assert first == second and first["sub"] == "k1.a"
+    decode.assert_called_once()
+
+
+def test_decode_token_reverifies_expired_token(service, monkeypatch):
+    decode = mock_decode(monkeypatch, exp_in=-1)
+
+    service.decode_token("k1.a")
+    service.decode_token("k1.a")
+
+    assert decode.call_count == 2
+
+
+def test_claims_cache_is_bounded(service, monkeypatch):
+    decode = mock_decode(monkeypatch)
+    monkeypatch.setattr(security.settings, "JWT_CACHE_SIZE", 2)
+
+    for token in ("k1.a", "k1.b", "k1.a", "k1.c"):
+        service.decode_token(token)
+    service.decode_token("k1.b")
+
+    assert len(service._claims) == 2
+    # k1.a использовался позже k1.b и остался в кэше
+    assert [call.kwargs["token"] for call in decode.call_args_list] == ["k1.a", "k1.b", "k1.c", "k1.b"]
+
+
+def test_unknown_kid_refreshes_jwks(service, monkeypatch):
+    mock_decode(monkeypatch)
+    service._jwks_requested_at = None
+
+    def load_config():
+        service._jwks = {"k2": {"kid": "k2"}}
+
+    monkeypatch.setattr(service, "load_config", load_config)
+
+    claims = service.decode_token("k2.a")
+
+    assert claims["sub"] == "k2.a"
+
+
+def test_unknown_kid_refresh_is_rate_limited(service, monkeypatch):
+    mock_decode(monkeypatch)
+    load_config = MagicMock()
+    monkeypatch.setattr(service, "load_config", load_config)
+
+    with pytest.raises(JWTError):
+        service.decode_token("k9.a")
+
+    load_config.assert_not_called()
+
+
+def test_cached_claims_dropped_when_key_rotated_out(service, monkeypatch):
+    decode = mock_decode(monkeypatch)
+    service.decode_token("k1.a")
+
+    service._jwks = {"k2": {"kid": "k2"}}
+
+    with pytest.raises(JWTError):
+        service.decode_token("k1.a")
+    decode.assert_called_once()
@@ -54,7 +54,10 @@ def test_delete_tag_success(db_session, logger_mock, monkeypatch):
 def test_get_tags_success(db_session, logger_mock, monkeypatch):
     q = MagicMock()
     db_session.query.return_value = q
+    q.order_by.return_value = q
+    q.limit.return_value = q
     q.all.return_value = [MagicMock(), MagicMock(), MagicMock()]
 
-    res = tag_service.get_tags(db_session)
+    res, next_cursor = tag_service.get_tags(db_session)
     assert len(res) == 3
+    assert next_cursor is None
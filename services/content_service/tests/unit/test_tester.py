@@ -0,0 +1,27 @@
+from unittest.mock import MagicMock
+
+import app.services.tester as tester_service
+
+
+def test_invalidate_contest_cache_posts_to_tester(monkeypatch):
+    post = MagicMock(return_value=MagicMock(ok=True))
+    monkeypatch.setattr(tester_service.tester_client, "post", post)
+
+    tester_service.invalidate_contest_cache("c1")
+
+    assert post.call_args.args[0].endswith("/solutions/contests/c1/cache/invalidate")
+
+
+def test_invalidate_contest_cache_swallows_errors(monkeypatch):
+    monkeypatch.setattr(tester_service.tester_client, "post", MagicMock(side_effect=ConnectionError("down")))
+
+    tester_service.invalidate_contest_cache("c1")
+
+
+def test_invalidate_contest_cache_skips_problems_outside_contest(monkeypatch):
+    post = MagicMock()
+    monkeypatch.setattr(tester_service.tester_client, "post", post)
+
+    tester_service.invalidate_contest_cache(None)
+
+    post.assert_not_called()
@@ -73,6 +73,22 @@ def test_delete_user_success(db_session, logger_mock, monkeypatch):
     db_session.commit.assert_called_once()
 
 
+def test_get_users_pages_by_username(db_session, logger_mock, simple_obj):
+    users = [simple_obj(username=name) for name in ("alice", "bob", "carol")]
+    q = MagicMock()
+    db_session.query.return_value = q
+    q.filter.return_value = q
+    q.order_by.return_value = q
+    q.limit.return_value = q
+    q.all.return_value = users
+
+    res, next_cursor = user_service.get_users(db_session, limit=2)
+    assert res == users[:2]
+
+    user_service.get_users(db_session, cursor=next_cursor, limit=2)
+    q.filter.assert_called_once()
+
+
 def test_compute_user_rating_sums_balances(db_session, logger_mock, monkeypatch):
     balance = MagicMock(side_effect=[1, 2, 10, -1])  # posts(2) + problems(1) + comments(1)
     monkeypatch.setattr(user_service, "compute_reaction_balance", balance)
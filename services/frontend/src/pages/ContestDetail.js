@@ -28,6 +28,24 @@ import { Link, useNavigate, useParams } from 'react-router-dom';
 import config from '../config';
 import { AuthContext } from '../context/AuthContext';
 
+// участники отдаются страницами по X-Next-Cursor: список, проверке вступления и авторам решений нужны все
+async function fetchAllParticipants(contestId, accessToken) {
+    const participants = [];
+    let cursor = null;
+    do {
+        const params = new URLSearchParams();
+        if (cursor) params.append('cursor', cursor);
+        params.append('limit', 200);
+        const resp = await axios.get(
+            `${config.GATEWAY_URL}/contests/${contestId}/participants?${params.toString()}`,
+            { headers: { Authorization: `Bearer ${accessToken}` } }
+        );
+        participants.push(...resp.data);
+        cursor = resp.headers['x-next-cursor'] || null;
+    } while (cursor);
+    return participants;
+}
+
 export default function ContestDetail() {
     const { contestId } = useParams();
     const { auth } = useContext(AuthContext);
@@ -43,7 +61,9 @@ export default function ContestDetail() {
     const [notify, setNotify] = useState({ open: false, severity: 'info', message: '' });
 
     const [solutions, setSolutions] = useState([]);
-    const [solOffset, setSolOffset] = useState(0);
+    // курсоры начала просмотренных страниц решений: последний - текущая страница
+    const [solCursors, setSolCursors] = useState([null]);
+    const [solNextCursor, setSolNextCursor] = useState(null);
     const solLimit = 10;
     const [solLoading, setSolLoading] = useState(false);
     const [solError, setSolError] = useState('');
@@ -70,11 +90,8 @@ export default function ContestDetail() {
                 );
                 setContest(contestResp.data);
 
-                const partResp = await axios.get(
-                    `${config.GATEWAY_URL}/contests/${contestId}/participants`,
-                    { headers: { Authorization: `Bearer ${auth.access_token}` } }
-                );
-                setParticipants(partResp.data);
+                const allParticipants = await fetchAllParticipants(contestId, auth.access_token);
+                setParticipants(allParticipants);
 
                 const taskResp = await axios.get(
                     `${config.GATEWAY_URL}/contests/${contestId}/tasks`,
@@ -83,7 +100,7 @@ export default function ContestDetail() {
                 setTasks(taskResp.data);
 
                 const me = auth.currentUser?.keycloak_id;
-                if (me && partResp.data.some((p) => p.keycloak_id === me)) {
+                if (me && allParticipants.some((p) => p.keycloak_id === me)) {
                     setJoined(true);
                 }
             } catch (err) {
@@ -114,7 +131,8 @@ export default function ContestDetail() {
 
         setSolLoading(true);
         const params = new URLSearchParams();
-        params.append('offset', solOffset);
+        const solCursor = solCursors[solCursors.length - 1];
+        if (solCursor) params.append('cursor', solCursor);
         params.append('limit', solLimit);
         if (solUserFilter) params.append('user_id', solUserFilter);
         if (solTaskFilter) params.append('problem_id', solTaskFilter);
@@ -125,6 +143,7 @@ export default function ContestDetail() {
         )
             .then(resp => {
                 setSolutions(resp.data);
+                setSolNextCursor(resp.headers['x-next-cursor'] || null);
                 setSolError('');
             })
             .catch(() => setSolError('Ошибка загрузки решений.'))
@@ -132,7 +151,7 @@ export default function ContestDetail() {
     }, [
         contest,
         contestId,
-        solOffset,
+        solCursors,
         solUserFilter,
         solTaskFilter,
         auth.access_token,
@@ -151,11 +170,7 @@ export default function ContestDetail() {
                 { headers: { Authorization: `Bearer ${auth.access_token}` } }
             );
             setNotify({ open: true, severity: 'success', message: 'Вы вступили в контест!' });
-            const partResp = await axios.get(
-                `${config.GATEWAY_URL}/contests/${contestId}/participants`,
-                { headers: { Authorization: `Bearer ${auth.access_token}` } }
-            );
-            setParticipants(partResp.data);
+            setParticipants(await fetchAllParticipants(contestId, auth.access_token));
             setJoined(true);
         } catch (err) {
             console.error(err);
@@ -326,11 +341,7 @@ export default function ContestDetail() {
                                     { username: newParticipantUsername },
                                     { headers: { Authorization: `Bearer ${auth.access_token}` } }
                                 );
-                                const resp = await axios.get(
-                                    `${config.GATEWAY_URL}/contests/${contestId}/participants`,
-                                    { headers: { Authorization: `Bearer ${auth.access_token}` } }
-                                );
-                                setParticipants(resp.data);
+                                setParticipants(await fetchAllParticipants(contestId, auth.access_token));
                                 setNewParticipantUsername('');
                                 setNotify({
                                     open: true,
@@ -432,7 +443,7 @@ export default function ContestDetail() {
                                 labelId="sol-user-filter-label"
                                 value={solUserFilter}
                                 label="Пользователь"
-                                onChange={e => { setSolUserFilter(e.target.value); setSolOffset(0); }}
+                                onChange={e => { setSolUserFilter(e.target.value); setSolCursors([null]); }}
                             >
                                 <MenuItem value=""><em>Все</em></MenuItem>
                                 {participants.map(p => (
@@ -448,7 +459,7 @@ export default function ContestDetail() {
                                 labelId="sol-task-filter-label"
                                 value={solTaskFilter}
                                 label="Задача"
-                                onChange={e => { setSolTaskFilter(e.target.value); setSolOffset(0); }}
+                                onChange={e => { setSolTaskFilter(e.target.value); setSolCursors([null]); }}
                             >
                                 <MenuItem value=""><em>Все</em></MenuItem>
                                 {tasks.map(t => (
@@ -510,17 +521,17 @@ export default function ContestDetail() {
                                     <Button
                                         variant="outlined"
                                         size="small"
-                                        onClick={() => setSolOffset(o => Math.max(0, o - solLimit))}
-                                        disabled={solOffset === 0}
+                                        onClick={() => setSolCursors(c => (c.length > 1 ? c.slice(0, -1) : c))}
+                                        disabled={solCursors.length === 1}
                                     >
                                         Предыдущие
                                     </Button>
-                                    <Typography>Стр. {(solOffset / solLimit) + 1}</Typography>
+                                    <Typography>Стр. {solCursors.length}</Typography>
                                     <Button
                                         variant="outlined"
                                         size="small"
-                                        onClick={() => setSolOffset(o => o + solLimit)}
-                                        disabled={solutions.length < solLimit}
+                                        onClick={() => setSolCursors(c => [...c, solNextCursor])}
+                                        disabled={!solNextCursor}
                                     >
                                         Следующие
                                     </Button>
@@ -22,7 +22,9 @@ export default function ContestsPage() {
     const [loading, setLoading] = useState(false);
     const [error, setError] = useState('');
 
-    const [offset, setOffset] = useState(0);
+    // курсоры начала просмотренных страниц: последний - текущая страница
+    const [cursors, setCursors] = useState([null]);
+    const [nextCursor, setNextCursor] = useState(null);
     const limit = 10;
 
     const fetchContests = async () => {
@@ -33,7 +35,9 @@ export default function ContestsPage() {
             let opts = {};
             if (mode === 'public') {
                 url = `${config.GATEWAY_URL}/contests/`;
-                const params = new URLSearchParams({ offset, limit });
+                const params = new URLSearchParams({ limit });
+                const cursor = cursors[cursors.length - 1];
+                if (cursor) params.append('cursor', cursor);
                 url += `?${params.toString()}`;
             } else if (mode === 'my') {
                 url = `${config.GATEWAY_URL}/contests/my`;
@@ -44,6 +48,7 @@ export default function ContestsPage() {
             }
             const resp = await axios.get(url, opts);
             setContests(resp.data);
+            setNextCursor(resp.headers['x-next-cursor'] || null);
         } catch (err) {
             console.error(err);
             setError('Не удалось загрузить контесты.');
@@ -54,19 +59,19 @@ export default function ContestsPage() {
 
     useEffect(() => {
         fetchContests();
-    }, [mode, offset]);
+    }, [mode, cursors]);
 
     const handlePrev = () => {
-        if (offset >= limit) setOffset(offset - limit);
+        if (cursors.length > 1) setCursors(cursors.slice(0, -1));
     };
     const handleNext = () => {
-        if (contests.length === limit) setOffset(offset + limit);
+        if (nextCursor) setCursors([...cursors, nextCursor]);
     };
 
     const switchMode = (newMode) => {
         if (newMode !== mode) {
             setMode(newMode);
-            setOffset(0);
+            setCursors([null]);
         }
     };
 
@@ -151,15 +156,15 @@ export default function ContestsPage() {
                         <Button
                             variant="outlined"
                             onClick={handlePrev}
-                            disabled={offset === 0}
+                            disabled={cursors.length === 1}
                         >
                             Предыдущая
                         </Button>
-                        <Typography>Страница {(offset / limit) + 1}</Typography>
+                        <Typography>Страница {cursors.length}</Typography>
                         <Button
                             variant="outlined"
                             onClick={handleNext}
-                            disabled={contests.length < limit}
+                            disabled={!nextCursor}
                         >
                             Следующая
                         </Button>
@@ -21,7 +21,9 @@ export default function HomePage() {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
 
-  const [offset, setOffset] = useState(0);
+  // курсоры начала просмотренных страниц: последний - текущая страница
+  const [cursors, setCursors] = useState([null]);
+  const [nextCursor, setNextCursor] = useState(null);
   const limit = 10;
 
   // для inline‑редактирования
@@ -32,7 +34,9 @@ export default function HomePage() {
     setLoading(true);
     setError('');
     try {
-      const params = new URLSearchParams({ offset, limit });
+      const params = new URLSearchParams({ limit });
+      const cursor = cursors[cursors.length - 1];
+      if (cursor) params.append('cursor', cursor);
       const resp = await axios.get(
         `${config.GATEWAY_URL}/blogposts/?${params.toString()}`,
         {
@@ -42,6 +46,7 @@ export default function HomePage() {
         }
       );
       setPosts(resp.data);
+      setNextCursor(resp.headers['x-next-cursor'] || null);
     } catch (err) {
       console.error(err);
       setError('Не удалось загрузить блог‑посты.');
@@ -53,7 +58,7 @@ export default function HomePage() {
 
   useEffect(() => {
     fetchPosts();
-  }, [offset]);
+  }, [cursors]);
 
   const handleEditClick = (post) => {
     setEditingId(post.id);
@@ -81,10 +86,10 @@ export default function HomePage() {
   };
 
   const handlePrev = () => {
-    if (offset >= limit) setOffset(offset - limit);
+    if (cursors.length > 1) setCursors(cursors.slice(0, -1));
   };
   const handleNext = () => {
-    if (posts.length === limit) setOffset(offset + limit);
+    if (nextCursor) setCursors([...cursors, nextCursor]);
   };
 
   return (
@@ -181,15 +186,15 @@ export default function HomePage() {
             <Button
               variant="outlined"
               onClick={handlePrev}
-              disabled={offset === 0}
+              disabled={cursors.length === 1}
             >
               Предыдущая
             </Button>
-            <Typography>Страница {(offset / limit) + 1}</Typography>
+            <Typography>Страница {cursors.length}</Typography>
             <Button
               variant="outlined"
               onClick={handleNext}
-              disabled={posts.length < limit}
+              disabled={!nextCursor}
             >
               Следующая
             </Button>
@@ -271,7 +271,9 @@ export default function PostDetail() {
 
   const [comments, setComments] = useState([]);
   const [commentTree, setCommentTree] = useState([]);
-  const [commentOffset, setCommentOffset] = useState(0);
+  // курсоры начала просмотренных страниц комментариев: последний - текущая страница
+  const [commentCursors, setCommentCursors] = useState([null]);
+  const [commentNextCursor, setCommentNextCursor] = useState(null);
   const commentLimit = 10;
   const [commentsLoading, setCommentsLoading] = useState(false);
   const [commentsError, setCommentsError] = useState('');
@@ -283,11 +285,12 @@ export default function PostDetail() {
   const refreshComments = async () => {
     try {
       const resp = await axios.get(
-        `${config.GATEWAY_URL}/comments/post/enriched/${postId}?offset=0&limit=${commentLimit}`,
+        `${config.GATEWAY_URL}/comments/post/enriched/${postId}?limit=${commentLimit}`,
         { headers: { Authorization: `Bearer ${auth.access_token}` } }
       );
       setComments(resp.data);
-      setCommentOffset(0);
+      setCommentNextCursor(resp.headers['x-next-cursor'] || null);
+      setCommentCursors([null]);
     } catch (err) {
       setCommentsError('Ошибка загрузки комментариев.');
     }
@@ -361,17 +364,21 @@ export default function PostDetail() {
     const fetchComments = async () => {
       setCommentsLoading(true);
       try {
-        if (auth.currentUser) {
-          var url = `${config.GATEWAY_URL}/comments/post/enriched/${postId}?offset=${commentOffset}&limit=${commentLimit}&current_user_id=${auth.currentUser.keycloak_id}`
+        const params = new URLSearchParams({ limit: commentLimit });
+        const cursor = commentCursors[commentCursors.length - 1];
+        if (cursor) {
+          params.append('cursor', cursor);
         }
-        else {
-          var url = `${config.GATEWAY_URL}/comments/post/enriched/${postId}?offset=${commentOffset}&limit=${commentLimit}`
+        if (auth.currentUser) {
+          params.append('current_user_id', auth.currentUser.keycloak_id);
         }
+        const url = `${config.GATEWAY_URL}/comments/post/enriched/${postId}?${params.toString()}`;
         const resp = await axios.get(
           url,
           { headers: { Authorization: `Bearer ${auth.access_token}` } }
         );
         setComments(resp.data);
+        setCommentNextCursor(resp.headers['x-next-cursor'] || null);
       } catch (err) {
         setCommentsError('Ошибка загрузки комментариев.');
       } finally {
@@ -379,21 +386,21 @@ export default function PostDetail() {
       }
     };
     fetchComments();
-  }, [postId, commentOffset, auth.access_token]);
+  }, [postId, commentCursors, auth.access_token]);
 
   useEffect(() => {
     setCommentTree(buildCommentTree(comments));
   }, [comments]);
 
   const handleCommentPrev = () => {
-    if (commentOffset >= commentLimit) {
-      setCommentOffset(commentOffset - commentLimit);
+    if (commentCursors.length > 1) {
+      setCommentCursors(commentCursors.slice(0, -1));
     }
   };
 
   const handleCommentNext = () => {
-    if (comments.length === commentLimit) {
-      setCommentOffset(commentOffset + commentLimit);
+    if (commentNextCursor) {
+      setCommentCursors([...commentCursors, commentNextCursor]);
     }
   };
 
@@ -735,13 +742,13 @@ export default function PostDetail() {
                 mt: 2,
               }}
             >
-              <Button variant="outlined" onClick={handleCommentPrev} disabled={commentOffset === 0}>
+              <Button variant="outlined" onClick={handleCommentPrev} disabled={commentCursors.length === 1}>
                 Предыдущая
               </Button>
               <Typography variant="body2">
-                Страница {(commentOffset / commentLimit) + 1}
+                Страница {commentCursors.length}
               </Typography>
-              <Button variant="outlined" onClick={handleCommentNext} disabled={comments.length < commentLimit}>
+              <Button variant="outlined" onClick={handleCommentNext} disabled={!commentNextCursor}>
                 Следующая
               </Button>
             </Box>
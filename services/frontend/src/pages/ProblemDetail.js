@@ -94,7 +94,9 @@ export default function ProblemDetail() {
   const [code, setCode] = useState('');
 
   const [posts, setPosts] = useState([]);
-  const [postOffset, setPostOffset] = useState(0);
+  // курсоры начала просмотренных страниц постов: последний - текущая страница
+  const [postCursors, setPostCursors] = useState([null]);
+  const [postNextCursor, setPostNextCursor] = useState(null);
   const postLimit = 10;
   const [postsLoading, setPostsLoading] = useState(false);
   const [postsError, setPostsError] = useState('');
@@ -238,7 +240,10 @@ export default function ProblemDetail() {
       setPostsLoading(true);
       try {
         const params = new URLSearchParams();
-        params.append('offset', postOffset);
+        const cursor = postCursors[postCursors.length - 1];
+        if (cursor) {
+          params.append('cursor', cursor);
+        }
         params.append('limit', postLimit);
         const tagValue = postTagFilter.trim();
         if (tagValue) {
@@ -253,6 +258,7 @@ export default function ProblemDetail() {
           headers: { Authorization: `Bearer ${auth.access_token}` },
         });
         setPosts(resp.data);
+        setPostNextCursor(resp.headers['x-next-cursor'] || null);
         setPostsError('');
       } catch (err) {
         setPostsError('Ошибка загрузки постов.');
@@ -261,18 +267,18 @@ export default function ProblemDetail() {
       }
     };
     fetchPosts();
-  }, [problem?.id, postOffset, postTagFilter, sortPostsByRating, sortPostsOrder, auth.access_token]);
+  }, [problem?.id, postCursors, postTagFilter, sortPostsByRating, sortPostsOrder, auth.access_token]);
 
 
   const handlePostPrev = () => {
-    if (postOffset >= postLimit) {
-      setPostOffset(postOffset - postLimit);
+    if (postCursors.length > 1) {
+      setPostCursors(postCursors.slice(0, -1));
     }
   };
 
   const handlePostNext = () => {
-    if (posts.length === postLimit) {
-      setPostOffset(postOffset + postLimit);
+    if (postNextCursor) {
+      setPostCursors([...postCursors, postNextCursor]);
     }
   };
 
@@ -833,7 +839,7 @@ export default function ProblemDetail() {
             checked={sortPostsByRating}
             onChange={(e) => {
               setSortPostsByRating(e.target.checked);
-              setPostOffset(0);
+              setPostCursors([null]);
             }}
             color="primary"
           />
@@ -846,7 +852,7 @@ export default function ProblemDetail() {
                 label="Порядок"
                 onChange={(e) => {
                   setSortPostsOrder(e.target.value);
-                  setPostOffset(0);
+                  setPostCursors([null]);
                 }}
               >
                 <MenuItem value="asc">Возрастание</MenuItem>
@@ -866,7 +872,7 @@ export default function ProblemDetail() {
               label="Фильтр по тегу"
               onChange={(e) => {
                 setPostTagFilter(e.target.value);
-                setPostOffset(0);
+                setPostCursors([null]);
               }}
             >
               <MenuItem value="">
@@ -938,13 +944,13 @@ export default function ProblemDetail() {
                 mt: 2,
               }}
             >
-              <Button variant="outlined" onClick={handlePostPrev} disabled={postOffset === 0}>
+              <Button variant="outlined" onClick={handlePostPrev} disabled={postCursors.length === 1}>
                 Предыдущая
               </Button>
               <Typography variant="body2">
-                Страница {(postOffset / postLimit) + 1}
+                Страница {postCursors.length}
               </Typography>
-              <Button variant="outlined" onClick={handlePostNext} disabled={posts.length < postLimit}>
+              <Button variant="outlined" onClick={handlePostNext} disabled={!postNextCursor}>
                 Следующая
               </Button>
             </Box>
@@ -23,7 +23,9 @@ export default function ProblemsPage() {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
 
-  const [offset, setOffset] = useState(0);
+  // курсоры начала просмотренных страниц: последний - текущая страница
+  const [cursors, setCursors] = useState([null]);
+  const [nextCursor, setNextCursor] = useState(null);
   const limit = 10;
 
   const [difficultyFilter, setDifficultyFilter] = useState('');
@@ -68,7 +70,10 @@ export default function ProblemsPage() {
       setLoading(true);
       try {
         const params = new URLSearchParams();
-        params.append('offset', offset);
+        const cursor = cursors[cursors.length - 1];
+        if (cursor) {
+          params.append('cursor', cursor);
+        }
         params.append('limit', limit);
         if (difficultyFilter) {
           params.append('difficulty', difficultyFilter);
@@ -85,6 +90,7 @@ export default function ProblemsPage() {
           headers: { Authorization: `Bearer ${auth.access_token}` },
         });
         setProblems(resp.data);
+        setNextCursor(resp.headers['x-next-cursor'] || null);
       } catch (err) {
         setError('Ошибка загрузки задач');
       } finally {
@@ -93,7 +99,7 @@ export default function ProblemsPage() {
     };
 
     fetchProblems();
-  }, [offset, difficultyFilter, tagFilter, sortByRating, sortOrder, auth.access_token]);
+  }, [cursors, difficultyFilter, tagFilter, sortByRating, sortOrder, auth.access_token]);
 
 
   useEffect(() => {
@@ -101,14 +107,14 @@ export default function ProblemsPage() {
   }, [auth.access_token]);
 
   const handlePrev = () => {
-    if (offset >= limit) {
-      setOffset(offset - limit);
+    if (cursors.length > 1) {
+      setCursors(cursors.slice(0, -1));
     }
   };
 
   const handleNext = () => {
-    if (problems.length === limit) {
-      setOffset(offset + limit);
+    if (nextCursor) {
+      setCursors([...cursors, nextCursor]);
     }
   };
 
@@ -138,7 +144,7 @@ export default function ProblemsPage() {
             labelId="difficulty-filter-label"
             value={difficultyFilter}
             label="Сложность"
-            onChange={(e) => { setDifficultyFilter(e.target.value); setOffset(0); }}
+            onChange={(e) => { setDifficultyFilter(e.target.value); setCursors([null]); }}
           >
             <MenuItem value="">
               <em>Все</em>
@@ -154,7 +160,7 @@ export default function ProblemsPage() {
             labelId="tag-filter-label"
             value={tagFilter}
             label="Тег"
-            onChange={(e) => { setTagFilter(e.target.value); setOffset(0); }}
+            onChange={(e) => { setTagFilter(e.target.value); setCursors([null]); }}
           >
             <MenuItem value="">
               <em>Все</em>
@@ -172,7 +178,7 @@ export default function ProblemsPage() {
         <Typography variant="body1">Сортировать по рейтингу:</Typography>
         <Switch
           checked={sortByRating}
-          onChange={(e) => { setSortByRating(e.target.checked); setOffset(0); }}
+          onChange={(e) => { setSortByRating(e.target.checked); setCursors([null]); }}
           color="primary"
         />
         {sortByRating && (
@@ -182,7 +188,7 @@ export default function ProblemsPage() {
               labelId="sort-order-label"
               value={sortOrder}
               label="Порядок"
-              onChange={(e) => { setSortOrder(e.target.value); setOffset(0); }}
+              onChange={(e) => { setSortOrder(e.target.value); setCursors([null]); }}
             >
               <MenuItem value="asc">Возрастание</MenuItem>
               <MenuItem value="desc">Убывание</MenuItem>
@@ -218,13 +224,13 @@ export default function ProblemsPage() {
               mt: 4
             }}
           >
-            <Button variant="outlined" onClick={handlePrev} disabled={offset === 0}>
+            <Button variant="outlined" onClick={handlePrev} disabled={cursors.length === 1}>
               Предыдущая
             </Button>
             <Typography variant="body2">
-              Страница {(offset / limit) + 1}
+              Страница {cursors.length}
             </Typography>
-            <Button variant="outlined" onClick={handleNext} disabled={problems.length < limit}>
+            <Button variant="outlined" onClick={handleNext} disabled={!nextCursor}>
               Следующая
             </Button>
           </Box>
@@ -19,6 +19,7 @@ export default function SolutionDetail() {
   const [solution, setSolution] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
+  const [progress, setProgress] = useState(null);
 
   useEffect(() => {
     const fetchSolution = async () => {
@@ -37,6 +38,30 @@ export default function SolutionDetail() {
     fetchSolution();
   }, [solution_id, auth.access_token]);
 
+  const isPending = solution?.status === 'pending';
+
+  useEffect(() => {
+    if (!isPending) return undefined;
+    // EventSource не умеет передавать заголовки, поэтому токен идет в query
+    const url = `${config.GATEWAY_URL}/solutions/stream?token=${encodeURIComponent(auth.access_token)}`;
+    const source = new EventSource(url);
+    source.addEventListener('progress', (e) => {
+      const event = JSON.parse(e.data);
+      if (event.solution_id === solution_id) setProgress(event);
+    });
+    source.addEventListener('status', (e) => {
+      const event = JSON.parse(e.data);
+      if (event.solution_id !== solution_id || event.status === 'pending') return;
+      setSolution((prev) => ({
+        ...prev,
+        status: event.status,
+        time_used: event.time_used,
+        faster_than: event.faster_than,
+      }));
+    });
+    return () => source.close();
+  }, [isPending, solution_id, auth.access_token]);
+
   if (loading) {
     return (
       <Container component="main" sx={{ py: 4 }}>
@@ -76,6 +101,7 @@ export default function SolutionDetail() {
         </Typography>
         <Typography variant="body1">
           <strong>Статус:</strong> {solution.status}
+          {isPending && progress && ` (тест ${progress.done}/${progress.total}, пройдено ${progress.passed})`}
         </Typography>
         <Typography variant="body1">
           <strong>Время выполнения:</strong> {solution.time_used} с
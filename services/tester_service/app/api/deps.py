@@ -1,12 +1,13 @@
 from functools import wraps
 
-from fastapi import HTTPException, Security, status
+from fastapi import HTTPException, Query, Security, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError
 
 from app.core.security import keycloak_service
 
 bearer_scheme = HTTPBearer()
+optional_bearer_scheme = HTTPBearer(auto_error=False)
 
 
 def get_current_user(
@@ -36,6 +37,27 @@ def get_current_user(
     return payload
 
 
+def get_current_user_stream(
+    creds: HTTPAuthorizationCredentials | None = Security(optional_bearer_scheme),
+    token: str | None = Query(None, description="Токен доступа, если клиент не может передать заголовок (EventSource)"),
+) -> dict:
+    """
+    Валидирует токен для потоковых эндпоинтов: из заголовка Authorization
+    или из query-параметра token (браузерный EventSource не поддерживает заголовки)
+
+    Raises:
+        HTTPException: 401, если токена нет или он неверный.
+    """
+    raw_token = creds.credentials if creds else token
+    if not raw_token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=raw_token))
+
+
 def authorize(required_role: str, owner_param: str = None, owner_field: str = None):
     """
     Универсальный декоратор для авторизации
@@ -0,0 +1,93 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.api.deps import authorize, get_current_user
+from app.core.database import get_db
+from app.models.rejudge import RejudgeJob, RejudgeStatus
+from app.schemas.rejudge import RejudgeCreate, RejudgeRead
+from app.services.rejudge import cancel_rejudge_job, create_rejudge_job, get_rejudge_job
+from app.worker.tasks import enqueue_rejudge
+
+router = APIRouter(prefix="/rejudge", tags=["rejudge"])
+
+
+def get_rejudge_job_or_404(job_id: UUID, db: Session) -> RejudgeJob:
+    job = get_rejudge_job(db, str(job_id))
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rejudge job not found")
+    return job
+
+
+@router.post(
+    "/",
+    response_model=RejudgeRead,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Перепроверить решения",
+    description="Ставит в низкоприоритетную очередь перепроверку всех решений задачи, "
+    "контеста или пользователя. Прогресс доступен по GET /rejudge/{job_id}.",
+)
+@authorize(required_role="admin")
+def create_rejudge_endpoint(
+    rejudge_in: RejudgeCreate,
+    db: Session = Depends(get_db),
+    user_claims: dict = Depends(get_current_user),
+) -> RejudgeRead:
+    """
+    Создает задание перепроверки и ставит его в очередь judge.rejudge
+
+    Args:
+        rejudge_in (RejudgeCreate): фильтр решений
+        db (Session): сессия к БД
+        user_claims (dict): данные о пользователе из токена авторизации
+
+    Returns:
+        RejudgeRead: созданное задание
+    """
+    job = create_rejudge_job(db, rejudge_in, user_claims.get("sub"))
+    enqueue_rejudge(str(job.id))
+    return job
+
+
+@router.get(
+    "/{job_id}",
+    response_model=RejudgeRead,
+    summary="Прогресс перепроверки",
+)
+@authorize(required_role="admin")
+def get_rejudge_endpoint(
+    job_id: UUID,
+    db: Session = Depends(get_db),
+    user_claims: dict = Depends(get_current_user),
+) -> RejudgeRead:
+    """
+    Возвращает задание перепроверки со счетчиками processed/changed/failed
+
+    Raises:
+        HTTPException: 404, если задание не найдено
+    """
+    return get_rejudge_job_or_404(job_id, db)
+
+
+@router.post(
+    "/{job_id}/cancel",
+    response_model=RejudgeRead,
+    summary="Отменить перепроверку",
+)
+@authorize(required_role="admin")
+def cancel_rejudge_endpoint(
+    job_id: UUID,
+    db: Session = Depends(get_db),
+    user_claims: dict = Depends(get_current_user),
+) -> RejudgeRead:
+    """
+    Отменяет задание перепроверки. Уже обработанные решения сохраняют новые вердикты.
+
+    Raises:
+        HTTPException: 404, если задание не найдено; 409, если задание уже завершено
+    """
+    job = get_rejudge_job_or_404(job_id, db)
+    if job.status not in (RejudgeStatus.PENDING, RejudgeStatus.RUNNING):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Rejudge job already finished")
+    return cancel_rejudge_job(db, job)
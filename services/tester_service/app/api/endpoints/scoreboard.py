@@ -0,0 +1,123 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.orm import Session
+
+from app.api.deps import authorize, get_current_user
+from app.core.database import get_db, get_read_db
+from app.core.pagination import InvalidCursorError, set_next_cursor
+from app.schemas.scoreboard import ScoreboardRead, ScoreboardSettingsRead, ScoreboardSettingsUpdate
+from app.services.scoreboard import (
+    get_scoreboard,
+    get_standings,
+    rebuild_scoreboard,
+    standings_etag,
+    update_scoreboard_settings,
+)
+
+router = APIRouter(prefix="/scoreboard", tags=["scoreboard"])
+
+
+@router.get(
+    "/{contest_id}",
+    response_model=ScoreboardRead,
+    summary="Таблица результатов контеста",
+    description="Участники по числу решенных задач и штрафу (ICPC). Во время заморозки "
+    "отдается состояние на ее начало. Ответ с ETag: при совпадении If-None-Match - 304.",
+    responses={304: {"description": "Таблица не изменилась"}},
+)
+def get_scoreboard_endpoint(
+    contest_id: str,
+    request: Request,
+    response: Response,
+    cursor: str | None = Query(None, description="Курсор следующей страницы"),
+    limit: int = Query(50, ge=1, le=200, description="Размер страницы"),
+    unfrozen: bool = Query(False, description="Живая таблица во время заморозки (только admin)"),
+    db: Session = Depends(get_read_db),
+    user_claims: dict = Depends(get_current_user),
+):
+    """
+    Возвращает страницу таблицы результатов контеста
+
+    Args:
+        contest_id (str): id контеста
+        cursor: курсор следующей страницы
+        limit: размер страницы
+        unfrozen: отдать живую таблицу во время заморозки
+        db (Session): сессия к БД
+        user_claims (dict): данные о пользователе из токена авторизации
+
+    Returns:
+        ScoreboardRead: страница таблицы
+
+    Raises:
+        HTTPException: 400, если курсор поврежден; 403, если живую таблицу запрашивает не admin
+    """
+    if unfrozen and "admin" not in user_claims.get("realm_access", {}).get("roles", []):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough rights")
+
+    board = get_scoreboard(db, contest_id)
+    if board is None:
+        return ScoreboardRead(contest_id=contest_id, frozen=False, rows=[])
+
+    frozen = board.is_frozen() and not unfrozen
+    etag = standings_etag(board, frozen, cursor, limit)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    try:
+        rows, next_cursor = get_standings(db, board, cursor=cursor, limit=limit, frozen=frozen)
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    set_next_cursor(response, next_cursor)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return ScoreboardRead(
+        contest_id=contest_id,
+        frozen=frozen,
+        starts_at=board.starts_at,
+        freeze_at=board.freeze_at,
+        rows=rows,
+    )
+
+
+@router.put(
+    "/{contest_id}/settings",
+    response_model=ScoreboardSettingsRead,
+    summary="Настройки таблицы результатов",
+    description="Начало и окончание контеста, длительность заморозки, штраф за попытку. "
+    "unfrozen=true открывает таблицу после контеста. Таблица пересчитывается заново.",
+)
+@authorize(required_role="admin")
+def update_scoreboard_settings_endpoint(
+    contest_id: str,
+    settings_in: ScoreboardSettingsUpdate,
+    db: Session = Depends(get_db),
+    user_claims: dict = Depends(get_current_user),
+) -> ScoreboardSettingsRead:
+    """
+    Обновляет переданные поля настроек и пересчитывает таблицу
+
+    Returns:
+        ScoreboardSettingsRead: настройки и версии таблицы
+    """
+    return update_scoreboard_settings(db, contest_id, settings_in)
+
+
+@router.post(
+    "/{contest_id}/rebuild",
+    response_model=ScoreboardSettingsRead,
+    summary="Пересчитать таблицу результатов",
+    description="Пересчитывает таблицу контеста с нуля по вердиктам решений.",
+)
+@authorize(required_role="admin")
+def rebuild_scoreboard_endpoint(
+    contest_id: str,
+    db: Session = Depends(get_db),
+    user_claims: dict = Depends(get_current_user),
+) -> ScoreboardSettingsRead:
+    """
+    Пересчитывает таблицу контеста с нуля
+
+    Returns:
+        ScoreboardSettingsRead: настройки и новые версии таблицы
+    """
+    return rebuild_scoreboard(db, contest_id)
@@ -1,19 +1,37 @@
+import asyncio
 from uuid import UUID
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user
-from app.core.database import get_db
-from app.schemas.solution import SolutionCreate, SolutionRead
+from app.api.deps import get_current_user, get_current_user_stream
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
+from app.core.events import format_sse, solution_event_broker
+from app.core.pagination import NEXT_CURSOR_HEADER, InvalidCursorError, set_next_cursor
+from app.core.progress import progress_store
+from app.schemas.solution import (
+    SolutionCreate,
+    SolutionProgress,
+    SolutionRead,
+    SolutionStatus,
+    SolutionSummary,
+)
+from app.services.contest import invalidate_contest_scope
+from app.services.scoreboard import is_contest_live
 from app.services.solution import (
     create_solution,
+    get_problem_contest_id,
     get_solution,
     list_contest_solutions,
+    list_pending_solutions_by_user,
     list_solutions_by_problem,
     list_solutions_by_problem_and_user,
 )
-from app.worker.tasks import process_solution_task
+from app.worker.celery_app import QUEUE_CONTEST, QUEUE_PRACTICE
+from app.worker.tasks import enqueue_solution
 
 router = APIRouter(prefix="/solutions", tags=["solutions"])
 
@@ -34,7 +52,9 @@ def submit_solution(
     user_claims: dict = Depends(get_current_user),
 ) -> SolutionRead:
     """
-    Отправить новое решение на проверку к указанной проблеме
+    Отправить новое решение на проверку к указанной проблеме.
+    Решения к задачам идущих контестов попадают в очередь judge.contest,
+    остальные, в том числе к задачам завершенных контестов, - в judge.practice
 
     Args:
         solution_in (SolutionCreate): данные о создаваемом решении
@@ -46,20 +66,104 @@ def submit_solution(
         SolutionRead: созданное решение
     """
     user_id = user_claims.get("sub")
-    solution = create_solution(db, solution_in, user_id)
+    contest_id = get_problem_contest_id(solution_in.problem_id)
+    solution = create_solution(db, solution_in, user_id, contest_id=contest_id)
 
-    process_solution_task.delay(str(solution.id))
+    live = contest_id is not None and is_contest_live(db, contest_id)
+    enqueue_solution(str(solution.id), queue=QUEUE_CONTEST if live else QUEUE_PRACTICE)
 
     return solution
 
 
+@router.get(
+    "/stream",
+    summary="Поток событий о решениях пользователя (SSE)",
+    description="Server-Sent Events: сразу после подключения отправляет статусы решений "
+    "пользователя, которые еще проверяются, затем события смены статуса. "
+    "Одно соединение следит за всеми посылками пользователя.",
+    response_class=StreamingResponse,
+)
+async def stream_solution_events(
+    request: Request,
+    db: Session = Depends(get_db),
+    user_claims: dict = Depends(get_current_user_stream),
+):
+    """
+    Отдает text/event-stream с событиями о решениях текущего пользователя
+
+    Args:
+        request (Request): запрос, нужен для отслеживания отключения клиента
+        db (Session): сессия к БД
+        user_claims (dict): данные о пользователе из токена авторизации
+
+    Returns:
+        StreamingResponse: поток событий
+    """
+    user_id = user_claims.get("sub")
+    # подписка до чтения снимка: смена статуса между ними не потеряется
+    queue = solution_event_broker.subscribe(user_id)
+    pending = await run_in_threadpool(list_pending_solutions_by_user, db, user_id)
+    snapshot = [
+        {
+            "type": "status",
+            "solution_id": str(s.id),
+            "user_id": user_id,
+            "problem_id": s.problem_id,
+            "status": "pending",
+        }
+        for s in pending
+    ]
+
+    async def event_stream():
+        try:
+            for event in snapshot:
+                yield format_sse(event)
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            solution_event_broker.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post(
+    "/contests/{contest_id}/cache/invalidate",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Сбросить кэш задач и участников контеста",
+    description="Служебный эндпоинт: вызывается content_service после изменения "
+    "состава задач или участников контеста. Через gateway недоступен.",
+)
+def invalidate_contest_cache_endpoint(contest_id: str) -> Response:
+    """
+    Сбрасывает кэш задач и участников контеста, используемый списком решений контеста
+
+    Args:
+        contest_id: идентификатор контеста
+
+    Returns:
+        Response: пустой ответ 204
+    """
+    invalidate_contest_scope(contest_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
 @router.get(
     "/{contest_id}/solutions",
-    response_model=list[SolutionRead],
+    response_model=list[SolutionSummary],
     status_code=status.HTTP_200_OK,
 )
 def list_solutions_endpoint(
     contest_id: str,
+    response: Response,
     user_claims: dict = Depends(get_current_user),
     user_id: str | None = Query(
         None, description="Опциональный Keycloak ID участника для фильтра"
@@ -67,20 +171,25 @@ def list_solutions_endpoint(
     problem_id: str | None = Query(
         None, description="Опциональный ID задачи для фильтра"
     ),
-    offset: int = Query(0, ge=0, description="Смещение для пагинации"),
-    limit: int = Query(10, ge=1, description="Размер страницы"),
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(None, description="Курсор следующей страницы"),
+    limit: int = Query(10, ge=1, le=200, description="Размер страницы"),
+    db: Session = Depends(get_read_db),
 ):
     owner_id = user_claims["sub"]
-    return list_contest_solutions(
-        db,
-        contest_id=str(contest_id),
-        owner_id=owner_id,
-        user_id=user_id,
-        problem_id=problem_id,
-        offset=offset,
-        limit=limit,
-    )
+    try:
+        solutions, next_cursor = list_contest_solutions(
+            db,
+            contest_id=str(contest_id),
+            owner_id=owner_id,
+            user_id=user_id,
+            problem_id=problem_id,
+            cursor=cursor,
+            limit=limit,
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    set_next_cursor(response, next_cursor)
+    return solutions
 
 
 @router.get(
@@ -117,51 +226,129 @@ def get_solution_status(
     return solution
 
 
+@router.get(
+    "/{solution_id}/progress",
+    response_model=SolutionProgress,
+    summary="Прогресс проверки решения",
+    description="Сколько тестов уже пройдено. Прогресс берется из памяти сервиса, "
+    "в БД за ним идем только если событий о решении еще не было.",
+)
+def get_solution_progress(
+    solution_id: UUID,
+    db: Session = Depends(get_db),
+) -> SolutionProgress:
+    """
+    Возвращает прогресс проверки решения
+
+    Args:
+        solution_id (UUID): идентификатор решения
+        db (Session): сессия к БД
+
+    Returns:
+        SolutionProgress: прогресс проверки
+
+    Raises:
+        HTTPException: 404, если решение не найдено
+    """
+    entry = progress_store.get(str(solution_id))
+    if entry is not None:
+        return SolutionProgress(**entry)
+
+    solution = get_solution(db, str(solution_id))
+    if not solution:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Solution not found"
+        )
+    return SolutionProgress(solution_id=str(solution.id), status=str(solution.status.value))
+
+
 @router.get(
     "/by-problem/{problem_id}",
-    response_model=list[SolutionRead],
-    summary="Получить данные о всех решениях к проблеме",
+    response_model=list[SolutionSummary],
+    summary="Получить данные о решениях к проблеме",
+    description="Страница решений к задаче от новых к старым, без исходного кода. "
+    f"Курсор следующей страницы возвращается в заголовке {NEXT_CURSOR_HEADER}.",
 )
 def list_solutions_by_problem_endpoint(
-    problem_id: str, db: Session = Depends(get_db)
-) -> list[SolutionRead]:
+    problem_id: str,
+    response: Response,
+    status_filter: SolutionStatus | None = Query(None, alias="status", description="Фильтр по вердикту"),
+    language: str | None = Query(None, description="Фильтр по языку"),
+    cursor: str | None = Query(None, description="Курсор следующей страницы"),
+    limit: int = Query(50, ge=1, le=200, description="Размер страницы"),
+    db: Session = Depends(get_read_db),
+) -> list[SolutionSummary]:
     """
-    Возвращает список решений к задаче problem_id
+    Возвращает страницу решений к задаче problem_id
 
     Args:
         problem_id: идентификатор задачи
+        response: ответ, в заголовок которого пишется курсор следующей страницы
+        status_filter: фильтр по вердикту
+        language: фильтр по языку
+        cursor: курсор следующей страницы
+        limit: размер страницы
         db: объект к БД
 
     Returns:
-        list[SolutionRead]: список решений, отправленных к задаче problem_id
+        list[SolutionSummary]: решения, отправленные к задаче problem_id
+
+    Raises:
+        HTTPException: 400, если курсор поврежден
     """
-    solutions = list_solutions_by_problem(db, problem_id)
+    try:
+        solutions, next_cursor = list_solutions_by_problem(
+            db, problem_id, status=status_filter, language=language, cursor=cursor, limit=limit
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    set_next_cursor(response, next_cursor)
     return solutions
 
 
 @router.get(
     "/my/{problem_id}",
-    response_model=list[SolutionRead],
+    response_model=list[SolutionSummary],
     summary="Получить список решений задачи пользователем",
-    description="Позволяет получить список всех решений к данной задаче пользователем, "
-    "определяемым по его токену авторизации.",
+    description="Позволяет получить страницу решений к данной задаче пользователем, "
+    "определяемым по его токену авторизации. Исходный код не возвращается, "
+    f"курсор следующей страницы - в заголовке {NEXT_CURSOR_HEADER}.",
 )
 def list_my_solutions_for_problem_endpoint(
     problem_id: str,
-    db: Session = Depends(get_db),
+    response: Response,
+    status_filter: SolutionStatus | None = Query(None, alias="status", description="Фильтр по вердикту"),
+    language: str | None = Query(None, description="Фильтр по языку"),
+    cursor: str | None = Query(None, description="Курсор следующей страницы"),
+    limit: int = Query(50, ge=1, le=200, description="Размер страницы"),
+    db: Session = Depends(get_read_db),
     user_claims: dict = Depends(get_current_user),
-) -> list[SolutionRead]:
+) -> list[SolutionSummary]:
     """
-    Возвращает список решений, отправленных текущим пользователем к задаче problem_id
+    Возвращает страницу решений, отправленных текущим пользователем к задаче problem_id
 
     Args:
         problem_id: идентификатор задачи
+        response: ответ, в заголовок которого пишется курсор следующей страницы
+        status_filter: фильтр по вердикту
+        language: фильтр по языку
+        cursor: курсор следующей страницы
+        limit: размер страницы
         db: объект к БД
         user_claims: информация о текущем пользователе
 
     Returns:
-        list[SolutionRead]: список решений, отправленных к задаче problem_id
+        list[SolutionSummary]: решения, отправленные к задаче problem_id
+
+    Raises:
+        HTTPException: 400, если курсор поврежден
     """
     keycloak_id = user_claims.get("sub")
-    solutions = list_solutions_by_problem_and_user(db, problem_id, keycloak_id)
+    try:
+        solutions, next_cursor = list_solutions_by_problem_and_user(
+            db, problem_id, keycloak_id, status=status_filter, language=language, cursor=cursor, limit=limit
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    set_next_cursor(response, next_cursor)
     return solutions
@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class TTLCache:
+    """
+    Потокобезопасный in-memory кэш процесса (LRU + TTL).
+
+    get_or_load загружает отсутствующее значение один раз: параллельные запросы
+    того же ключа ждут первую загрузку, а не повторяют ее. Если ключ инвалидирован
+    во время загрузки, загруженное значение возвращается, но в кэш не попадает.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: dict[Hashable, threading.Lock] = {}
+        self._generations: dict[Hashable, int] = {}
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            if key in self._key_locks:
+                self._generations[key] = self._generations.get(key, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            for key in self._key_locks:
+                self._generations[key] = self._generations.get(key, 0) + 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Возвращает значение из кэша или загружает его loader'ом и кладет в кэш.
+        Исключения loader'а пробрасываются, в кэш ничего не пишется.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                value = self.get(key)
+                if value is None:
+                    with self._lock:
+                        generation = self._generations.get(key, 0)
+                    value = loader()
+                    with self._lock:
+                        fresh = self._generations.get(key, 0) == generation
+                    if fresh:
+                        self.set(key, value)
+        finally:
+            with self._lock:
+                if not key_lock.locked():
+                    self._key_locks.pop(key, None)
+                    self._generations.pop(key, None)
+        return value
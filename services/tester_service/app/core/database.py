@@ -1,14 +1,68 @@
 from typing import Generator
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
+from app.core.tracing import instrument_engine
 from app.models.solution import Base
 
-engine = create_engine(settings.DATABASE_URL, future=True, echo=False)
+
+def engine_options(url: str) -> dict:
+    """
+    Возвращает параметры пула соединений и statement_timeout для create_engine из настроек DB_*.
+    SQLite (локальный запуск, тесты) пул не настраивается.
+
+    Args:
+        url (str): URL базы данных
+
+    Returns:
+        dict: именованные аргументы create_engine
+    """
+    url = make_url(url)
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if url.get_backend_name() == "sqlite":
+        return options
+
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+class ReadOnlySession(Session):
+    """
+    Сессия к реплике: flush запрещен, запись идет только через SessionLocal
+    """
+
+
+@event.listens_for(ReadOnlySession, "before_flush")
+def _forbid_writes(session, flush_context, instances) -> None:
+    raise RuntimeError("Read-only session: writes must go through SessionLocal")
+
+
+engine = create_engine(settings.DATABASE_URL, future=True, echo=False, **engine_options(settings.DATABASE_URL))
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, future=True)
 
+# read-only запросы (списки, просмотр) идут в реплику; без DATABASE_REPLICA_URL - в основную БД
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_engine(
+        settings.DATABASE_REPLICA_URL, future=True, echo=False, **engine_options(settings.DATABASE_REPLICA_URL)
+    )
+    instrument_engine(replica_engine)
+else:
+    replica_engine = engine
+ReadSessionLocal = sessionmaker(
+    class_=ReadOnlySession, autocommit=False, autoflush=False, bind=replica_engine, future=True
+)
+
 
 def get_db() -> Generator:
     db = SessionLocal()
@@ -16,3 +70,15 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+
+def get_read_db() -> Generator:
+    """
+    Сессия для эндпоинтов, которые только читают: запросы уходят в реплику, запись запрещена.
+    Реплика может отставать, поэтому то, что читается сразу после записи, берется из get_db
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
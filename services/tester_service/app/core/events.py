@@ -0,0 +1,162 @@
+import asyncio
+import json
+import socket
+import threading
+import uuid
+from collections import defaultdict
+from typing import Callable
+
+from kombu import Connection, Exchange, Queue
+from kombu.pools import producers
+
+from app.core.config import settings
+from app.core.logger import logger
+
+# события о решениях (смена статуса, прогресс) рассылаются всем экземплярам API через fanout
+solution_events_exchange = Exchange(settings.SOLUTION_EVENTS_EXCHANGE, type="fanout", durable=False)
+
+_publish_connection: Connection | None = None
+_publish_lock = threading.Lock()
+
+
+def _get_publish_connection() -> Connection:
+    global _publish_connection
+    with _publish_lock:
+        if _publish_connection is None:
+            _publish_connection = Connection(settings.CELERY_BROKER_URL, connect_timeout=2)
+        return _publish_connection
+
+
+def publish_event(event: dict) -> bool:
+    """
+    Публикует событие о решении в fanout exchange. Ошибки брокера не пробрасываются:
+    потеря события не должна ломать проверку, клиент получит статус при переподключении.
+
+    Args:
+        event (dict): событие {type, solution_id, user_id, ...}
+
+    Returns:
+        bool: True, если событие опубликовано
+    """
+    try:
+        with producers[_get_publish_connection()].acquire(block=True, timeout=2) as producer:
+            producer.publish(
+                event,
+                exchange=solution_events_exchange,
+                declare=[solution_events_exchange],
+                serializer="json",
+                retry=False,
+            )
+    except Exception:
+        logger.warning("events_publish_failed", extra={'type': event.get("type"),
+                                                      'solution_id': event.get("solution_id")})
+        return False
+    return True
+
+
+def format_sse(event: dict) -> str:
+    """
+    Сериализует событие в формат text/event-stream
+    """
+    return f"event: {event.get('type', 'message')}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+class SolutionEventBroker:
+    """
+    Подписчик fanout exchange внутри процесса API.
+
+    Один фоновый поток читает события из эксклюзивной очереди процесса и раздает их
+    asyncio-очередям SSE-соединений пользователя (по user_id события)
+    и слушателям процесса (например, ProgressStore).
+    """
+
+    def __init__(self, broker_url: str, queue_size: int = 100):
+        self.broker_url = broker_url
+        self.queue_size = queue_size
+        self._subscribers: dict[str, set[tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = defaultdict(set)
+        self._listeners: list[Callable[[dict], None]] = []
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._consume, name="solution-events", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def add_listener(self, listener: Callable[[dict], None]) -> None:
+        """
+        Добавляет слушателя всех событий. Вызывается в потоке подписчика, должен быть быстрым.
+        """
+        self._listeners.append(listener)
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        """
+        Регистрирует SSE-соединение пользователя. Вызывается из event loop соединения.
+        """
+        self.start()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers[user_id].add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(user_id, set())
+            for item in [item for item in subscribers if item[1] is queue]:
+                subscribers.discard(item)
+            if not subscribers:
+                self._subscribers.pop(user_id, None)
+
+    def dispatch(self, event: dict) -> None:
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception:
+                logger.exception("events_listener_failed", extra={'type': event.get("type")})
+        user_id = event.get("user_id")
+        with self._lock:
+            targets = list(self._subscribers.get(user_id, ()))
+        for loop, queue in targets:
+            loop.call_soon_threadsafe(self._offer, queue, event)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, event: dict) -> None:
+        # медленный клиент теряет события, а не тормозит раздачу остальным
+        if not queue.full():
+            queue.put_nowait(event)
+
+    def _on_message(self, body, message) -> None:
+        if isinstance(body, dict):
+            self.dispatch(body)
+
+    def _consume(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                with Connection(self.broker_url, connect_timeout=5) as conn:
+                    queue = Queue(
+                        f"{solution_events_exchange.name}.{uuid.uuid4().hex}",
+                        exchange=solution_events_exchange,
+                        exclusive=True,
+                        auto_delete=True,
+                        durable=False,
+                    )
+                    with conn.Consumer(queue, callbacks=[self._on_message], accept=["json"], no_ack=True):
+                        logger.info("events_consumer_start", extra={'queue': queue.name})
+                        while not self._stopped.is_set():
+                            try:
+                                conn.drain_events(timeout=1)
+                            except socket.timeout:
+                                conn.heartbeat_check()
+            except Exception:
+                logger.exception("events_consumer_failed")
+                self._stopped.wait(2)
+
+
+solution_event_broker = SolutionEventBroker(settings.CELERY_BROKER_URL)
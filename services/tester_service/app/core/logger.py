@@ -5,6 +5,7 @@ from datetime import datetime, timezone
 from typing import Any, Dict
 
 from app.core.config import settings
+from app.core.tracing import current_trace_ids
 
 
 class JsonFormatter(logging.Formatter):
@@ -15,6 +16,7 @@ class JsonFormatter(logging.Formatter):
             "logger": record.name,
             "message": record.getMessage(),
         }
+        payload.update(current_trace_ids())
 
         for k, v in record.__dict__.items():
             if k.startswith("_"):
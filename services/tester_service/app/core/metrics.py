@@ -0,0 +1,158 @@
+import os
+import shutil
+from typing import Callable, Iterable
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    start_http_server,
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+from app.core.logger import logger
+
+PHASE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+QUEUE_WAIT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+SUBMISSIONS_IN_FLIGHT = Gauge(
+    "judge_submissions_in_flight",
+    "Решения, которые сейчас проверяет воркер",
+    ["queue"],
+    multiprocess_mode="livesum",
+)
+
+QUEUE_WAIT_SECONDS = Histogram(
+    "judge_queue_wait_seconds",
+    "Время от постановки решения в очередь до начала проверки",
+    ["queue"],
+    buckets=QUEUE_WAIT_BUCKETS,
+)
+
+PHASE_SECONDS = Histogram(
+    "judge_phase_seconds",
+    "Длительность фаз проверки решения",
+    ["phase", "language"],
+    buckets=PHASE_BUCKETS,
+)
+
+CONTAINER_FAILURES = Counter(
+    "judge_container_failures_total",
+    "Ошибки создания и удаления контейнеров",
+    ["operation", "language"],
+)
+
+# без problem_id: число задач не ограничено, статистика по задачам - в БД (solutions)
+VERDICTS = Counter(
+    "judge_verdicts_total",
+    "Вердикты проверенных решений",
+    ["language", "status"],
+)
+
+DEDUPE_HITS = Counter(
+    "judge_dedupe_hits_total",
+    "Посылки, не запускавшиеся в контейнере из-за идентичного решения (reused - взят готовый вердикт, "
+    "waited - отложены до окончания проверки идентичного)",
+    ["language", "kind"],
+)
+
+DIND_LATENCY_SECONDS = Histogram(
+    "judge_dind_latency_seconds",
+    "Задержка ответа docker daemon (docker version)",
+    buckets=PHASE_BUCKETS,
+)
+
+OUTBOX_EVENTS = Counter(
+    "outbox_events_total",
+    "События outbox: delivered - доставлены в content_service, failed - попытка доставки не удалась",
+    ["kind", "result"],
+)
+
+HTTP_CLIENT_SECONDS = Histogram(
+    "http_client_request_seconds",
+    "Задержка запросов к внутренним сервисам (outcome: 2xx..5xx, timeout, error, circuit_open)",
+    ["service", "endpoint", "outcome"],
+    buckets=PHASE_BUCKETS,
+)
+
+HTTP_CLIENT_RETRIES = Counter(
+    "http_client_retries_total",
+    "Повторы запросов к внутренним сервисам",
+    ["service", "endpoint"],
+)
+
+HTTP_CLIENT_CIRCUIT_OPENED = Counter(
+    "http_client_circuit_opened_total",
+    "Размыкания circuit breaker клиента внутреннего сервиса",
+    ["service"],
+)
+
+
+class QueueDepthCollector(Collector):
+    """
+    Отдает глубину очередей брокера на момент запроса метрик.
+    Глубина читается пассивным queue_declare, очередь при этом не создается.
+    """
+
+    def __init__(self, connection_factory: Callable, queues: Iterable[str]):
+        self.connection_factory = connection_factory
+        self.queues = list(queues)
+
+    def collect(self):
+        family = GaugeMetricFamily(
+            "judge_queue_depth", "Сообщения, ожидающие проверки в очереди", labels=["queue"]
+        )
+        try:
+            with self.connection_factory() as conn:
+                channel = conn.default_channel
+                for queue in self.queues:
+                    try:
+                        _, depth, _ = channel.queue_declare(queue=queue, passive=True)
+                    except Exception:
+                        logger.warning("metrics_queuedepth_failed", extra={"queue": queue})
+                        continue
+                    family.add_metric([queue], depth)
+        except Exception:
+            logger.warning("metrics_queuedepth_failed", extra={"detail": "broker unavailable"})
+        yield family
+
+
+def start_metrics_server(port: int, collectors: Iterable[Collector] = ()) -> None:
+    """
+    Поднимает HTTP-эндпоинт /metrics воркера.
+
+    Если задан PROMETHEUS_MULTIPROC_DIR, метрики собираются из файлов всех
+    дочерних процессов пула (prefork), иначе отдается реестр текущего процесса.
+
+    Args:
+        port (int): порт HTTP-сервера метрик,
+        collectors: дополнительные коллекторы (например, QueueDepthCollector)
+    """
+    from prometheus_client import REGISTRY, multiprocess
+
+    multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir, exist_ok=True)
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    for collector in collectors:
+        registry.register(collector)
+
+    start_http_server(port, registry=registry)
+    logger.info("metrics_server_start", extra={"port": port, "multiprocess": bool(multiproc_dir)})
+
+
+def mark_process_dead(pid: int) -> None:
+    """
+    Убирает live-метрики (gauge livesum) завершившегося дочернего процесса
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid)
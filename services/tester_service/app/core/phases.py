@@ -0,0 +1,72 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from app.core.metrics import PHASE_SECONDS
+from app.core.tracing import tracer
+
+_current_recorder: ContextVar["PhaseRecorder | None"] = ContextVar(
+    "phase_recorder", default=None
+)
+
+
+class PhaseRecorder:
+    """
+    Накапливает длительности фаз обработки решения (в секундах)
+    """
+
+    def __init__(self):
+        self.durations: dict[str, list[float]] = defaultdict(list)
+
+    def add(self, name: str, seconds: float) -> None:
+        self.durations[name].append(seconds)
+
+    def totals(self) -> dict[str, float]:
+        return {name: sum(values) for name, values in self.durations.items()}
+
+
+@contextmanager
+def record_phases() -> Iterator[PhaseRecorder]:
+    """
+    Включает сбор длительностей фаз для текущего контекста выполнения.
+    Все вызовы phase() внутри блока попадают в возвращаемый PhaseRecorder.
+    """
+    recorder = PhaseRecorder()
+    token = _current_recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current_recorder.reset(token)
+
+
+def record_phase(name: str, seconds: float, language: str | None = None) -> None:
+    """
+    Записывает уже измеренную длительность фазы (например, ожидание в очереди):
+    в гистограмму judge_phase_seconds всегда, в PhaseRecorder - внутри record_phases()
+    """
+    recorder = _current_recorder.get()
+    if recorder is not None:
+        recorder.add(name, seconds)
+    PHASE_SECONDS.labels(phase=name, language=language or "").observe(seconds)
+
+
+@contextmanager
+def phase(name: str, **attrs) -> Iterator[None]:
+    """
+    Замеряет длительность блока кода как фазы name и оборачивает его в спан трассы.
+    Длительность всегда попадает в гистограмму judge_phase_seconds,
+    в PhaseRecorder - только внутри record_phases().
+
+    Args:
+        name (str): имя фазы (fetch_problem, container_create, ...)
+        attrs: дополнительные атрибуты фазы (язык, id решения)
+    """
+    start = time.perf_counter()
+    try:
+        attributes = {k: v for k, v in attrs.items() if v is not None}
+        with tracer.start_as_current_span(name, attributes=attributes):
+            yield
+    finally:
+        record_phase(name, time.perf_counter() - start, attrs.get("language"))
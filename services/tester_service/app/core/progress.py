@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import OrderedDict
+
+from app.core import events
+from app.core.config import settings
+
+
+class ProgressReporter:
+    """
+    Колбэк прогресса для run_solution_in_container: публикует событие progress
+    не чаще раза в min_interval секунд (последний тест публикуется всегда).
+    После первой неудачной публикации прогресс решения больше не публикуется: при недоступном
+    брокере каждая попытка ждет таймаут подключения и замедляла бы проверку на каждом тесте.
+    В БД прогресс не пишется.
+    """
+
+    def __init__(self, solution_id: str, user_id: str, min_interval: float | None = None):
+        self.solution_id = solution_id
+        self.user_id = user_id
+        self.min_interval = settings.PROGRESS_MIN_INTERVAL if min_interval is None else min_interval
+        self.passed = 0
+        self._last_sent = float("-inf")
+        self._broken = False
+
+    def __call__(self, done: int, total: int, tc_status: str) -> None:
+        if tc_status == "AC":
+            self.passed += 1
+        now = time.monotonic()
+        if self._broken or (done < total and now - self._last_sent < self.min_interval):
+            return
+        self._last_sent = now
+        self._broken = not events.publish_event(
+            {
+                "type": "progress",
+                "solution_id": self.solution_id,
+                "user_id": self.user_id,
+                "done": done,
+                "total": total,
+                "passed": self.passed,
+                "last_status": tc_status,
+            }
+        )
+
+
+class ProgressStore:
+    """
+    In-memory хранилище последнего прогресса решений процесса API (LRU + TTL).
+    Наполняется событиями progress/status из fanout exchange.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def apply(self, event: dict) -> None:
+        solution_id = event.get("solution_id")
+        if not solution_id or event.get("type") not in ("progress", "status"):
+            return
+        with self._lock:
+            entry = self._entries.pop(solution_id, None) or {"solution_id": solution_id, "status": "pending"}
+            if event["type"] == "progress":
+                entry.update({k: event[k] for k in ("done", "total", "passed", "last_status") if k in event})
+            else:
+                entry["status"] = event.get("status", entry["status"])
+            entry["updated_at"] = time.time()
+            self._entries[solution_id] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, solution_id: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(solution_id)
+            if entry is None:
+                return None
+            if time.time() - entry["updated_at"] > self.ttl:
+                del self._entries[solution_id]
+                return None
+            return dict(entry)
+
+
+progress_store = ProgressStore()
@@ -2,13 +2,19 @@ import uvicorn
 from fastapi import FastAPI
 from prometheus_fastapi_instrumentator import Instrumentator
 
-from app.api.endpoints import solutions, languages as languages_endpoint
+from app.api.endpoints import rejudge, scoreboard, solutions, languages as languages_endpoint
 from app.core.config import settings
+from app.core.events import solution_event_broker
 from app.core.logger import logger
 from app.core.languages import required_images
+from app.core.progress import progress_store
+from app.core.tracing import setup_tracing, tracing_middleware
 from app.services.docker_runner import get_docker_client
 
+setup_tracing()
+
 app = FastAPI(title=settings.PROJECT_NAME)
+app.middleware("http")(tracing_middleware)
 
 Instrumentator(
     should_group_status_codes=False,
@@ -17,6 +23,15 @@ Instrumentator(
 
 app.include_router(solutions.router)
 app.include_router(languages_endpoint.router)
+app.include_router(rejudge.router)
+app.include_router(scoreboard.router)
+
+
+@app.on_event("startup")
+def start_solution_events():
+    # прогресс проверки хранится в памяти процесса, поэтому подписка нужна с самого старта
+    solution_event_broker.add_listener(progress_store.apply)
+    solution_event_broker.start()
 
 
 @app.on_event("startup")
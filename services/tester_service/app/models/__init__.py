@@ -1 +1,4 @@
-from .solution import Solution, SolutionStatus
\ No newline at end of file
+from .solution import Solution, SolutionStatus
+from .rejudge import RejudgeJob, RejudgeStatus
+from .scoreboard import Scoreboard, ScoreboardCell, ScoreboardEntry
+from .outbox import OutboxEvent
@@ -0,0 +1,25 @@
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String
+from sqlalchemy.sql import func
+
+from app.models.solution import Base
+
+
+class OutboxEvent(Base):
+    """
+    Событие для content_service, записанное в той же транзакции, что и вердикт.
+    Доставляется фоновым диспетчером и удаляется после успешной доставки.
+    """
+    __tablename__ = "outbox_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_outbox_events_kind_next_attempt", "kind", "next_attempt_at"),
+    )
@@ -0,0 +1,38 @@
+import enum
+import uuid
+
+from sqlalchemy import Column, DateTime, Enum, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from app.models.solution import Base
+
+
+class RejudgeStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+
+class RejudgeJob(Base):
+    __tablename__ = "rejudge_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    created_by = Column(String, nullable=False)
+
+    # фильтр перепроверяемых решений, заполнено хотя бы одно поле
+    problem_id = Column(String, nullable=True)
+    contest_id = Column(String, nullable=True)
+    user_id = Column(String, nullable=True)
+
+    status = Column(Enum(RejudgeStatus), default=RejudgeStatus.PENDING, nullable=False)
+    total = Column(Integer, default=0, nullable=False)
+    processed = Column(Integer, default=0, nullable=False)
+    changed = Column(Integer, default=0, nullable=False)
+    failed = Column(Integer, default=0, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
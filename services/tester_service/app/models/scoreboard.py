@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, Index, Integer, String
+from sqlalchemy.sql import func
+
+from app.models.solution import Base
+
+
+class Scoreboard(Base):
+    """
+    Настройки и версия таблицы результатов контеста. Строка блокируется (SELECT FOR UPDATE)
+    на время обновления ячеек, поэтому вердикты одного контеста применяются последовательно.
+    """
+    __tablename__ = "scoreboards"
+
+    contest_id = Column(String, primary_key=True)
+
+    # от starts_at считается штрафное время; заморозка начинается за freeze_minutes до ends_at
+    starts_at = Column(DateTime(timezone=True), nullable=True)
+    ends_at = Column(DateTime(timezone=True), nullable=True)
+    freeze_minutes = Column(Integer, nullable=False, default=60)
+    penalty_minutes = Column(Integer, nullable=False, default=20)
+    unfrozen = Column(Boolean, nullable=False, default=False)
+
+    # растут при каждом изменении живой и замороженной таблицы, из них строится ETag
+    version = Column(Integer, nullable=False, default=0)
+    frozen_version = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    @property
+    def freeze_at(self) -> datetime | None:
+        if self.ends_at is None or not self.freeze_minutes:
+            return None
+        return self.ends_at - timedelta(minutes=self.freeze_minutes)
+
+    def is_frozen(self, now: datetime | None = None) -> bool:
+        freeze_at = self.freeze_at
+        if freeze_at is None or self.unfrozen:
+            return False
+        now = now or datetime.now(timezone.utc)
+        if freeze_at.tzinfo is None:
+            freeze_at = freeze_at.replace(tzinfo=timezone.utc)
+        return now >= freeze_at
+
+
+class ScoreboardCell(Base):
+    """
+    Результат участника по задаче контеста. frozen_* - то же состояние только по посылкам
+    до начала заморозки, pending - число посылок после нее (показываются как "?").
+    """
+    __tablename__ = "scoreboard_cells"
+
+    contest_id = Column(String, primary_key=True)
+    user_id = Column(String, primary_key=True)
+    problem_id = Column(String, primary_key=True)
+
+    solved = Column(Boolean, nullable=False, default=False)
+    attempts = Column(Integer, nullable=False, default=0)  # неудачные посылки до первого AC
+    first_ac_at = Column(DateTime(timezone=True), nullable=True)
+    penalty = Column(Integer, nullable=False, default=0)  # минуты
+
+    frozen_solved = Column(Boolean, nullable=False, default=False)
+    frozen_attempts = Column(Integer, nullable=False, default=0)
+    frozen_first_ac_at = Column(DateTime(timezone=True), nullable=True)
+    frozen_penalty = Column(Integer, nullable=False, default=0)
+    pending = Column(Integer, nullable=False, default=0)
+
+
+class ScoreboardEntry(Base):
+    """
+    Итог участника контеста. score = solved * SCORE_BASE - penalty упорядочивает
+    по числу решенных задач, затем по штрафу, одной колонкой - страница таблицы
+    читается по индексу без сортировки всех участников.
+    """
+    __tablename__ = "scoreboard_entries"
+
+    contest_id = Column(String, primary_key=True)
+    user_id = Column(String, primary_key=True)
+
+    solved = Column(Integer, nullable=False, default=0)
+    penalty = Column(Integer, nullable=False, default=0)
+    score = Column(BigInteger, nullable=False, default=0)
+
+    frozen_solved = Column(Integer, nullable=False, default=0)
+    frozen_penalty = Column(Integer, nullable=False, default=0)
+    frozen_score = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_scoreboard_entries_rank", "contest_id", "score", "user_id"),
+        Index("ix_scoreboard_entries_frozen_rank", "contest_id", "frozen_score", "user_id"),
+    )
@@ -1,7 +1,7 @@
 import enum
 import uuid
 
-from sqlalchemy import Column, DateTime, Enum, Float, Integer, String
+from sqlalchemy import Column, DateTime, Enum, Float, Index, Integer, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.sql import func
@@ -24,6 +24,7 @@ class Solution(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     created_by = Column(String, nullable=False)
     problem_id = Column(String, nullable=False)
+    contest_id = Column(String, nullable=True, index=True)
     code = Column(String, nullable=False)
     language = Column(String, nullable=False)
 
@@ -33,3 +34,14 @@ class Solution(Base):
     faster_than = Column(Float, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # sha256 нормализованного кода и версии тестсета, на которой выставлен вердикт
+    source_hash = Column(String(64), nullable=True)
+    testset_hash = Column(String(64), nullable=True)
+
+    __table_args__ = (
+        Index("ix_solutions_dedupe", "problem_id", "language", "source_hash"),
+        # keyset-пагинация списков решений задачи и решений пользователя к задаче
+        Index("ix_solutions_problem_created", "problem_id", "created_at", "id"),
+        Index("ix_solutions_problem_user_created", "problem_id", "created_by", "created_at", "id"),
+    )
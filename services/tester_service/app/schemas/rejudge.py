@@ -0,0 +1,43 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, model_validator
+
+
+class RejudgeStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+
+class RejudgeCreate(BaseModel):
+    problem_id: Optional[str] = None
+    contest_id: Optional[str] = None
+    user_id: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_filter(self):
+        if not (self.problem_id or self.contest_id or self.user_id):
+            raise ValueError("problem_id, contest_id or user_id is required")
+        return self
+
+
+class RejudgeRead(BaseModel):
+    id: UUID
+    created_by: str
+    problem_id: Optional[str] = None
+    contest_id: Optional[str] = None
+    user_id: Optional[str] = None
+    status: RejudgeStatus
+    total: int
+    processed: int
+    changed: int
+    failed: int
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class ScoreboardCellRead(BaseModel):
+    problem_id: str
+    solved: bool
+    attempts: int  # неудачные посылки до первого AC
+    first_ac_minute: Optional[int] = None
+    pending: int = 0  # посылки после заморозки
+
+
+class StandingRead(BaseModel):
+    rank: int
+    user_id: str
+    solved: int
+    penalty: int
+    problems: List[ScoreboardCellRead]
+
+
+class ScoreboardRead(BaseModel):
+    contest_id: str
+    frozen: bool
+    starts_at: Optional[datetime] = None
+    freeze_at: Optional[datetime] = None
+    rows: List[StandingRead]
+
+
+class ScoreboardSettingsUpdate(BaseModel):
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
+    freeze_minutes: Optional[int] = Field(None, ge=0)
+    penalty_minutes: Optional[int] = Field(None, ge=0)
+    unfrozen: Optional[bool] = None
+
+
+class ScoreboardSettingsRead(BaseModel):
+    contest_id: str
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
+    freeze_minutes: int
+    penalty_minutes: int
+    unfrozen: bool
+    freeze_at: Optional[datetime] = None
+    version: int
+    frozen_version: int
+
+    model_config = {"from_attributes": True}
@@ -21,10 +21,27 @@ class SolutionCreate(BaseModel):
     language: str
 
 
+class SolutionSummary(BaseModel):
+    id: UUID
+    created_by: str
+    problem_id: str
+    contest_id: Optional[str] = None
+    language: str
+    status: SolutionStatus
+    time_used: Optional[float]
+    memory_used: Optional[int]
+    faster_than: Optional[float]
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
+
+
 class SolutionRead(BaseModel):
     id: UUID
     created_by: str
     problem_id: str
+    contest_id: Optional[str] = None
     code: str
     language: str
     status: SolutionStatus
@@ -35,3 +52,12 @@ class SolutionRead(BaseModel):
     updated_at: Optional[datetime] = None
 
     model_config = {"from_attributes": True}
+
+
+class SolutionProgress(BaseModel):
+    solution_id: str
+    status: str
+    done: int = 0
+    total: Optional[int] = None
+    passed: int = 0
+    last_status: Optional[str] = None
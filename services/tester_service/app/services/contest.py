@@ -0,0 +1,64 @@
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.http import content_client
+from app.core.logger import logger
+from app.core.pagination import NEXT_CURSOR_HEADER
+
+
+# задачи и участники контестов для списка решений и таблицы результатов;
+# сбрасывается content_service при изменениях
+contest_scope_cache = TTLCache(max_entries=1000, ttl=settings.CONTEST_CACHE_TTL)
+
+# максимальный размер страницы участников в content_service
+PARTICIPANTS_PAGE_LIMIT = 200
+
+
+def _fetch_contest_scope(contest_id: str) -> tuple[frozenset[str], frozenset[str]]:
+    try:
+        r = content_client.get(f"/contests/{contest_id}/tasks", endpoint="contest_tasks")
+        r.raise_for_status()
+    except Exception:
+        logger.exception("contest_fetchscope_failed", extra={'contest_id': contest_id})
+        raise
+    task_ids = frozenset(str(t["id"]) for t in r.json())
+
+    # участники отдаются страницами: идем по курсору из заголовка до последней
+    participant_ids = set()
+    params = {"limit": PARTICIPANTS_PAGE_LIMIT}
+    while True:
+        try:
+            r = content_client.get(f"/contests/{contest_id}/participants", endpoint="contest_participants",
+                                   params=params)
+            r.raise_for_status()
+        except Exception:
+            logger.exception("contest_fetchscope_failed",
+                             extra={'detail': 'failed to fetch participants for contest',
+                                    'contest_id': contest_id})
+            raise
+        participant_ids.update(u["keycloak_id"] for u in r.json())
+        next_cursor = r.headers.get(NEXT_CURSOR_HEADER)
+        if not next_cursor:
+            return task_ids, frozenset(participant_ids)
+        params = {"cursor": next_cursor, "limit": PARTICIPANTS_PAGE_LIMIT}
+
+
+def get_contest_scope(contest_id: str) -> tuple[frozenset[str], frozenset[str]]:
+    """
+    Возвращает id задач и участников контеста. Данные кэшируются на CONTEST_CACHE_TTL секунд,
+    параллельные промахи по одному контесту делают один запрос в content_service
+
+    Args:
+        contest_id (str): id контеста
+
+    Returns:
+        tuple[frozenset[str], frozenset[str]]: id задач и keycloak id участников
+    """
+    return contest_scope_cache.get_or_load(str(contest_id), lambda: _fetch_contest_scope(contest_id))
+
+
+def invalidate_contest_scope(contest_id: str) -> None:
+    """
+    Сбрасывает кэш задач и участников контеста
+    """
+    contest_scope_cache.invalidate(str(contest_id))
+    logger.debug("contest_invalidatescope", extra={'contest_id': contest_id})
@@ -1,14 +1,39 @@
 import os
 import shlex
 import shutil
+import threading
 import time
 import uuid
+from typing import Callable
 
 import docker
 
 from app.core.config import settings
 from app.core.languages import get_language
 from app.core.logger import logger
+from app.core.metrics import CONTAINER_FAILURES, DIND_LATENCY_SECONDS
+from app.core.phases import phase
+
+
+# порядок "тяжести" вердиктов: итоговый вердикт решения - самый тяжелый из вердиктов тестов
+_STATUS_SEVERITY = {"AC": 0, "WA": 1, "RE": 2, "MLE": 3, "TLE": 4}
+
+# код выхода coreutils timeout при превышении лимита и код процесса, убитого SIGKILL (OOM)
+_TIMEOUT_EXIT_CODE = 124
+_KILLED_EXIT_CODE = 137
+
+# в "теплом" контейнере решения запускаются от nobody: так kill -1 от этого же пользователя
+# добивает все процессы решения, не задевая sleep infinity, работающий от root
+_SANDBOX_USER = "65534:65534"
+
+# через сколько секунд после SIGTERM по лимиту времени timeout добивает группу процессов решения SIGKILL
+_KILL_AFTER_SECONDS = 1
+# запас сверх лимита времени, после которого exec в "теплом" контейнере считается зависшим
+_EXEC_GRACE_SECONDS = 5
+
+
+def _worse_status(current: str, new: str) -> str:
+    return new if _STATUS_SEVERITY[new] > _STATUS_SEVERITY[current] else current
 
 
 def get_docker_client(timeout: int = 30, interval: int = 2) -> docker.DockerClient:
@@ -16,7 +41,8 @@ def get_docker_client(timeout: int = 30, interval: int = 2) -> docker.DockerClie
     while time.time() < deadline:
         try:
             client = docker.DockerClient(base_url=settings.DOCKER_HOST)
-            client.version()
+            with DIND_LATENCY_SECONDS.time():
+                client.version()
             logger.info("get_docker_client")
             return client
         except Exception:
@@ -26,9 +52,29 @@ def get_docker_client(timeout: int = 30, interval: int = 2) -> docker.DockerClie
 
 
 def run_solution_in_container(
-    code: str, language: str, test_cases: list, time_limit: int, memory_limit: int
+    code: str,
+    language: str,
+    test_cases: list,
+    time_limit: int,
+    memory_limit: int,
+    on_progress: Callable[[int, int, str], None] | None = None,
 ) -> dict:
-    client = get_docker_client()
+    """
+    Запускает решение на каждом тест-кейсе в отдельном контейнере
+
+    Args:
+        code (str): исходный код решения,
+        language (str): ключ языка из languages.yaml,
+        test_cases (list): тест-кейсы {input, expected_output},
+        time_limit (int): лимит времени на тест, секунды,
+        memory_limit (int): лимит памяти, мегабайты,
+        on_progress: колбэк (пройдено тестов, всего тестов, вердикт теста) после каждого теста
+
+    Returns:
+        dict: {status, time_used, results}
+    """
+    with phase("docker_client", language=language):
+        client = get_docker_client()
 
     logger.info("run_solution", extra={'code': code, 'requested_language': language})
     overall_status = "AC"
@@ -59,54 +105,63 @@ def run_solution_in_container(
         start_time = time.time()
 
         try:
-            code_file_path = os.path.join(temp_dir, file_name)
-            with open(code_file_path, "w", encoding="utf-8") as f:
-                f.write(code)
+            with phase("prepare", language=language):
+                code_file_path = os.path.join(temp_dir, file_name)
+                with open(code_file_path, "w", encoding="utf-8") as f:
+                    f.write(code)
 
-            quoted_input = shlex.quote(tc_input)
-            command = ["sh", "-c", command_template.format(input=quoted_input, file=file_name)]
+                quoted_input = shlex.quote(tc_input)
+                command = ["sh", "-c", command_template.format(input=quoted_input, file=file_name)]
 
-            container = client.containers.run(
-                image=image,
-                command=command,
-                detach=True,
-                mem_limit=mem_lim,
-                memswap_limit=mem_lim,
-                oom_kill_disable=False,
-                cpu_quota=50000,
-                volumes={temp_dir: {"bind": "/app", "mode": "rw"}},
-            )
+            with phase("container_create", language=language):
+                try:
+                    container = client.containers.run(
+                        image=image,
+                        command=command,
+                        detach=True,
+                        mem_limit=mem_lim,
+                        memswap_limit=mem_lim,
+                        oom_kill_disable=False,
+                        cpu_quota=50000,
+                        volumes={temp_dir: {"bind": "/app", "mode": "rw"}},
+                    )
+                except Exception:
+                    CONTAINER_FAILURES.labels(operation="create", language=language).inc()
+                    raise
 
-            try:
-                wait_result = container.wait(timeout=time_limit)
-                exit_code = wait_result.get("StatusCode", 1)
-                elapsed = time.time() - start_time
-            except Exception:
-                elapsed = time.time() - start_time
+            with phase("container_run", language=language):
                 try:
-                    container.kill()
+                    wait_result = container.wait(timeout=time_limit)
+                    exit_code = wait_result.get("StatusCode", 1)
+                    elapsed = time.time() - start_time
                 except Exception:
-                    pass
-                exit_code = None
+                    elapsed = time.time() - start_time
+                    try:
+                        container.kill()
+                    except Exception:
+                        pass
+                    exit_code = None
 
             oom_killed = False
             state_exit_code = None
-            try:
-                container.reload()
-                state = container.attrs.get("State", {}) or {}
-                oom_killed = bool(state.get("OOMKilled", False))
-                state_exit_code = state.get("ExitCode", None)
-            except Exception as e:
-                logger.warning(f"Could not reload container state: {e}")
+            with phase("container_inspect", language=language):
+                try:
+                    container.reload()
+                    state = container.attrs.get("State", {}) or {}
+                    oom_killed = bool(state.get("OOMKilled", False))
+                    state_exit_code = state.get("ExitCode", None)
+                except Exception as e:
+                    logger.warning(f"Could not reload container state: {e}")
 
             if exit_code is None and state_exit_code is not None:
                 exit_code = state_exit_code
 
-            try:
-                logs = container.logs().decode("utf-8", errors="replace")
-            except Exception:
-                logger.error("run_solution_failed", extra={'detail': 'error reading container logs'})
-                logs = ""
+            with phase("read_logs", language=language):
+                try:
+                    logs = container.logs().decode("utf-8", errors="replace")
+                except Exception:
+                    logger.error("run_solution_failed", extra={'detail': 'error reading container logs'})
+                    logs = ""
 
             if exit_code is None:
                 tc_status = "TLE"
@@ -120,14 +175,7 @@ def run_solution_in_container(
 
             results.append({"status": tc_status, "time_used": elapsed, "output": logs})
 
-            if tc_status == "TLE":
-                overall_status = "TLE"
-            elif tc_status == "MLE" and overall_status not in ("TLE",):
-                overall_status = "MLE"
-            elif tc_status == "RE" and overall_status not in ("TLE", "MLE"):
-                overall_status = "RE"
-            elif tc_status == "WA" and overall_status not in ("TLE", "MLE", "RE"):
-                overall_status = "WA"
+            overall_status = _worse_status(overall_status, tc_status)
 
             if elapsed > max_time_used:
                 max_time_used = elapsed
@@ -138,11 +186,179 @@ def run_solution_in_container(
             overall_status = "RE"
 
         finally:
-            if container is not None:
-                try:
-                    container.remove(force=True)
-                except Exception:
-                    pass
-            shutil.rmtree(temp_dir, ignore_errors=True)
+            with phase("container_remove", language=language):
+                if container is not None:
+                    try:
+                        container.remove(force=True)
+                    except Exception:
+                        CONTAINER_FAILURES.labels(operation="remove", language=language).inc()
+                        logger.warning("run_solution_warning", extra={'detail': 'container remove failed'})
+                shutil.rmtree(temp_dir, ignore_errors=True)
+
+        if on_progress is not None:
+            on_progress(len(results), len(test_cases), results[-1]["status"])
 
     return {"status": overall_status, "time_used": max_time_used, "results": results}
+
+
+def run_batch_in_container(
+    solutions: list[tuple[str, str]], language: str, test_cases: list, time_limit: int, memory_limit: int
+) -> dict[str, dict]:
+    """
+    Проверяет несколько решений одного языка к одной задаче в одном "теплом" контейнере.
+    Контейнер создается один раз (sleep infinity под docker-init), решения запускаются в нем
+    последовательно через exec_run под coreutils timeout -k от непривилегированного пользователя;
+    exec, не вернувшийся вскоре после лимита времени, считается TLE, а контейнер пересоздается.
+    После каждого решения все его процессы, в том числе оставленные в фоне, убиваются.
+    Используется при массовой перепроверке.
+
+    Args:
+        solutions (list[tuple[str, str]]): пары (id решения, код),
+        language (str): ключ языка из languages.yaml,
+        test_cases (list): тест-кейсы задачи {input, expected_output},
+        time_limit (int): лимит времени на тест, секунды,
+        memory_limit (int): лимит памяти, мегабайты
+
+    Returns:
+        dict[str, dict]: id решения -> {status, time_used, results};
+            решения, которые не удалось проверить из-за ошибки docker, отсутствуют
+    """
+    spec = get_language(language)
+    if not spec:
+        unsupported = {"status": "RE", "time_used": 0.0, "results": [{"status": "RE", "time_used": 0, "output": f"Unsupported language: {language}"}]}
+        return {solution_id: dict(unsupported) for solution_id, _ in solutions}
+
+    with phase("docker_client", language=language):
+        client = get_docker_client()
+
+    mem_lim = f"{memory_limit}m"
+    temp_dir = os.path.join("/shared_tmp", str(uuid.uuid4()))
+    os.makedirs(temp_dir, exist_ok=True)
+    # компиляторы пишут артефакты в /app от имени _SANDBOX_USER
+    os.chmod(temp_dir, 0o777)
+
+    def start_container():
+        with phase("container_create", language=language):
+            try:
+                return client.containers.run(
+                    image=spec.image,
+                    command=["sleep", "infinity"],
+                    # init собирает зомби процессов, убитых после каждого решения
+                    init=True,
+                    detach=True,
+                    mem_limit=mem_lim,
+                    memswap_limit=mem_lim,
+                    oom_kill_disable=False,
+                    cpu_quota=50000,
+                    volumes={temp_dir: {"bind": "/app", "mode": "rw"}},
+                )
+            except Exception:
+                CONTAINER_FAILURES.labels(operation="create", language=language).inc()
+                raise
+
+    outcomes: dict[str, dict] = {}
+    container = None
+    try:
+        container = start_container()
+        for solution_id, code in solutions:
+            # артефакты предыдущего решения (скомпилированные файлы) не должны влиять на следующее
+            for name in os.listdir(temp_dir):
+                path = os.path.join(temp_dir, name)
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+            with open(os.path.join(temp_dir, spec.file_name), "w", encoding="utf-8") as f:
+                f.write(code)
+
+            overall_status = "AC"
+            max_time_used = 0.0
+            results = []
+            for tc in test_cases:
+                command = spec.command_template.format(input=shlex.quote(tc.get("input", "")), file=spec.file_name)
+                with phase("container_exec", language=language):
+                    started = time.perf_counter()
+                    finished = _exec_with_deadline(
+                        container,
+                        ["timeout", "-k", str(_KILL_AFTER_SECONDS), str(time_limit), "sh", "-c", command],
+                        time_limit + _KILL_AFTER_SECONDS + _EXEC_GRACE_SECONDS,
+                    )
+                    elapsed = time.perf_counter() - started
+                exit_code, output = finished or (None, b"")
+                logs = (output or b"").decode("utf-8", errors="replace")
+
+                if finished is None:
+                    # exec не вернулся (например, фоновый процесс держит stdout): контейнер пересоздается
+                    logger.warning("run_batch_warning", extra={'detail': 'exec deadline exceeded', 'language': language})
+                    _remove_container(container, language)
+                    container = start_container()
+                    tc_status = "TLE"
+                elif exit_code == _TIMEOUT_EXIT_CODE:
+                    tc_status = "TLE"
+                elif exit_code == _KILLED_EXIT_CODE:
+                    # SIGKILL от timeout -k (решение игнорировало SIGTERM) приходит только после лимита времени
+                    tc_status = "TLE" if elapsed >= time_limit else "MLE"
+                elif exit_code != 0:
+                    tc_status = "RE"
+                else:
+                    tc_status = "AC" if logs.strip() == tc.get("expected_output", "").strip() else "WA"
+
+                results.append({"status": tc_status, "time_used": elapsed, "output": logs})
+                overall_status = _worse_status(overall_status, tc_status)
+                max_time_used = max(max_time_used, elapsed)
+
+                if exit_code == _KILLED_EXIT_CODE:
+                    # контейнер мог быть убит вместе с решением - поднимаем новый для следующих запусков
+                    container.reload()
+                    if container.status != "running":
+                        _remove_container(container, language)
+                        container = start_container()
+
+            # timeout убивает только sh: фоновые процессы решения пережили бы его и мешали следующим
+            with phase("container_cleanup", language=language):
+                container.exec_run(["sh", "-c", "kill -9 -1"], user=_SANDBOX_USER)
+            outcomes[solution_id] = {"status": overall_status, "time_used": max_time_used, "results": results}
+    except Exception:
+        # ошибка инфраструктуры, а не решения: непроверенные решения не попадают в результат
+        logger.exception("run_batch_failed", extra={'detail': 'batch aborted', 'language': language})
+    finally:
+        if container is not None:
+            _remove_container(container, language)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    logger.info("run_batch", extra={'language': language, 'size': len(solutions)})
+    return outcomes
+
+
+def _exec_with_deadline(container, cmd: list[str], deadline: float) -> tuple | None:
+    """
+    exec_run от _SANDBOX_USER с ограничением времени ожидания ответа docker
+
+    Returns:
+        tuple | None: (код выхода, вывод) или None, если exec не завершился за deadline секунд
+    """
+    outcome = {}
+
+    def run():
+        try:
+            outcome["result"] = container.exec_run(cmd, user=_SANDBOX_USER)
+        except Exception as e:
+            outcome["error"] = e
+
+    worker = threading.Thread(target=run, daemon=True)
+    worker.start()
+    worker.join(deadline)
+    if worker.is_alive():
+        return None
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def _remove_container(container, language: str) -> None:
+    with phase("container_remove", language=language):
+        try:
+            container.remove(force=True)
+        except Exception:
+            CONTAINER_FAILURES.labels(operation="remove", language=language).inc()
+            logger.warning("run_solution_warning", extra={'detail': 'container remove failed'})
@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.http import content_client
+from app.core.logger import logger
+from app.core.metrics import OUTBOX_EVENTS
+from app.models.outbox import OutboxEvent
+
+EVENT_PROBLEM_SOLVED = "problem_solved"
+
+
+def enqueue_problem_solved(db: Session, problem_id: str, user_id: str) -> None:
+    """
+    Добавляет в сессию событие "задача решена". Коммит не делается: событие
+    сохраняется тем же commit, что и вердикт, и не теряется при недоступности content_service
+
+    Args:
+        db (Session): объект сессии БД,
+        problem_id (str): id задачи,
+        user_id (str): keycloak_id пользователя
+    """
+    db.add(
+        OutboxEvent(
+            kind=EVENT_PROBLEM_SOLVED,
+            payload={"problem_id": str(problem_id), "user_id": user_id},
+            attempts=0,
+        )
+    )
+
+
+def backoff_delay(attempts: int) -> timedelta:
+    """
+    Возвращает задержку до следующей попытки: OUTBOX_BACKOFF_BASE * 2^(attempts - 1), не больше OUTBOX_BACKOFF_MAX
+    """
+    seconds = settings.OUTBOX_BACKOFF_BASE * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(seconds, settings.OUTBOX_BACKOFF_MAX))
+
+
+def _deliver_problem_solved(events: list[OutboxEvent]) -> None:
+    # повторная отметка решенной задачи ничего не меняет, поэтому повтор пачки после сбоя безопасен
+    items = []
+    seen = set()
+    for event in events:
+        key = (event.payload["problem_id"], event.payload["user_id"])
+        if key not in seen:
+            seen.add(key)
+            items.append({"problem_id": key[0], "user_id": key[1]})
+
+    response = content_client.post(
+        "/problems/solved/bulk",
+        endpoint="mark_solved_bulk",
+        json={"items": items},
+        timeout=settings.OUTBOX_HTTP_TIMEOUT,
+    )
+    response.raise_for_status()
+    # пары с удаленным пользователем или задачей повторять бессмысленно - событие считается доставленным
+    skipped = [r for r in response.json() if r.get("status") in ("user_not_found", "problem_not_found")]
+    if skipped:
+        logger.warning("outbox_dispatch_skipped", extra={'items': len(skipped)})
+
+
+def dispatch_outbox(batch_size: int | None = None) -> int:
+    """
+    Background функция доставки outbox: выбирает готовые к отправке события пачками
+    (FOR UPDATE SKIP LOCKED - параллельные диспетчеры не берут одни и те же события),
+    отправляет пачку одним запросом в content_service и удаляет доставленные.
+    При ошибке пачка откладывается с экспоненциальной задержкой.
+
+    Args:
+        batch_size (int | None): размер пачки, по умолчанию OUTBOX_BATCH_SIZE
+
+    Returns:
+        int: число доставленных событий
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    delivered = 0
+    db = SessionLocal()
+    try:
+        while True:
+            now = datetime.now(timezone.utc)
+            events = (
+                db.query(OutboxEvent)
+                .filter(OutboxEvent.kind == EVENT_PROBLEM_SOLVED, OutboxEvent.next_attempt_at <= now)
+                .order_by(OutboxEvent.next_attempt_at, OutboxEvent.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            if not events:
+                break
+
+            try:
+                _deliver_problem_solved(events)
+            except Exception as e:
+                for event in events:
+                    event.attempts += 1
+                    event.next_attempt_at = now + backoff_delay(event.attempts)
+                    event.last_error = str(e)[:500]
+                db.commit()
+                OUTBOX_EVENTS.labels(kind=EVENT_PROBLEM_SOLVED, result="failed").inc(len(events))
+                logger.warning("outbox_dispatch_failed",
+                               extra={'events': len(events), 'attempts': max(event.attempts for event in events)})
+                break
+
+            for event in events:
+                db.delete(event)
+            db.commit()
+            delivered += len(events)
+            OUTBOX_EVENTS.labels(kind=EVENT_PROBLEM_SOLVED, result="delivered").inc(len(events))
+            if len(events) < batch_size:
+                break
+    finally:
+        db.close()
+
+    if delivered:
+        logger.debug("outbox_dispatch", extra={'delivered': delivered})
+    return delivered
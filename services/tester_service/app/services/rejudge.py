@@ -0,0 +1,253 @@
+from datetime import datetime, timezone
+from itertools import groupby
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.logger import logger
+from app.core.phases import phase
+from app.models.rejudge import RejudgeJob, RejudgeStatus
+from app.models.solution import Solution, SolutionStatus
+from app.schemas.rejudge import RejudgeCreate
+from app.services.analytics import compute_performance_percentile
+from app.services.docker_runner import run_batch_in_container
+from app.services.outbox import enqueue_problem_solved
+from app.services.scoreboard import rebuild_scoreboard
+from app.services.solution import compute_testset_hash, fetch_judging_bundle
+
+
+def _solutions_query(db: Session, job: RejudgeJob):
+    q = db.query(Solution).filter(Solution.status != SolutionStatus.PENDING)
+    if job.problem_id:
+        q = q.filter(Solution.problem_id == job.problem_id)
+    if job.contest_id:
+        q = q.filter(Solution.contest_id == job.contest_id)
+    if job.user_id:
+        q = q.filter(Solution.created_by == job.user_id)
+    return q
+
+
+def create_rejudge_job(db: Session, rejudge_in: RejudgeCreate, user_id: str) -> RejudgeJob:
+    """
+    Создает задание на перепроверку решений по фильтру (задача, контест, пользователь)
+
+    Args:
+        db (Session): объект сессии БД,
+        rejudge_in (RejudgeCreate): фильтр перепроверяемых решений,
+        user_id (str): id администратора, запустившего перепроверку
+
+    Returns:
+        RejudgeJob: orm объект задания со статусом pending
+    """
+    job = RejudgeJob(
+        created_by=user_id,
+        problem_id=rejudge_in.problem_id,
+        contest_id=rejudge_in.contest_id,
+        user_id=rejudge_in.user_id,
+        status=RejudgeStatus.PENDING,
+        processed=0,
+        changed=0,
+        failed=0,
+    )
+    job.total = _solutions_query(db, job).count()
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    logger.debug("rejudge_create", extra={'job_id': str(job.id), 'total': job.total})
+    return job
+
+
+def get_rejudge_job(db: Session, job_id: str) -> RejudgeJob | None:
+    """
+    Возвращает orm объект задания перепроверки по его id
+
+    Args:
+        db (Session): объект сессии БД,
+        job_id (str): id задания
+
+    Returns:
+        RejudgeJob | None: задание или None
+    """
+    job = db.query(RejudgeJob).filter(RejudgeJob.id == job_id).first()
+    if not job:
+        logger.warning("rejudge_get_notfound", extra={'job_id': job_id})
+    return job
+
+
+def cancel_rejudge_job(db: Session, job: RejudgeJob) -> RejudgeJob:
+    """
+    Отменяет задание перепроверки. Воркер проверяет статус перед каждой пачкой,
+    поэтому уже начатая пачка дописывается, а следующие не запускаются.
+
+    Args:
+        db (Session): объект сессии БД,
+        job (RejudgeJob): задание в статусе pending или running
+
+    Returns:
+        RejudgeJob: обновленное задание
+    """
+    job.status = RejudgeStatus.CANCELLED
+    job.finished_at = datetime.now(timezone.utc)
+    db.commit()
+    db.refresh(job)
+    logger.debug("rejudge_cancel", extra={'job_id': str(job.id), 'processed': job.processed})
+    return job
+
+
+def _rejudge_batch(
+    db: Session, job: RejudgeJob, problem_id: str, language: str, solution_ids: list, bundle: dict
+) -> None:
+    """
+    Перепроверяет пачку решений одного языка в одном контейнере и обновляет их одним запросом,
+    события "задача решена" для новых AC пишутся в outbox той же транзакцией
+    """
+    rows = (
+        db.query(Solution.id, Solution.code, Solution.status, Solution.created_by)
+        .filter(Solution.id.in_(solution_ids))
+        .all()
+    )
+    with phase("judge", language=language):
+        outcomes = run_batch_in_container(
+            [(str(row.id), row.code) for row in rows],
+            language,
+            bundle["test_cases"],
+            bundle["time_limit"],
+            bundle["memory_limit"],
+        )
+
+    bundle_hash = compute_testset_hash(bundle)
+    updates = []
+    newly_solved: set[str] = set()
+    for row in rows:
+        outcome = outcomes.get(str(row.id))
+        if outcome is None:
+            job.failed += 1
+            continue
+
+        new_status = SolutionStatus(outcome["status"])
+        faster_than = None
+        if new_status == SolutionStatus.AC and outcome["results"]:
+            faster_than = compute_performance_percentile(db, problem_id, outcome["results"][0]["time_used"])
+        updates.append(
+            {
+                "id": row.id,
+                "status": new_status,
+                "time_used": outcome["time_used"],
+                # пакетный прогон не замеряет память - старое значение относится к прошлому вердикту
+                "memory_used": outcome.get("memory_used"),
+                "faster_than": faster_than,
+                "testset_hash": bundle_hash,
+            }
+        )
+        if new_status != row.status:
+            job.changed += 1
+            if new_status == SolutionStatus.AC:
+                newly_solved.add(row.created_by)
+
+    with phase("db_update", language=language):
+        if updates:
+            db.execute(update(Solution), updates)
+        for user_id in newly_solved:
+            enqueue_problem_solved(db, problem_id, user_id)
+        job.processed += len(rows)
+        db.commit()
+
+
+def _rebuild_scoreboards(db: Session, contest_ids: set[str]) -> None:
+    for contest_id in contest_ids:
+        try:
+            rebuild_scoreboard(db, contest_id)
+        except Exception:
+            logger.exception("rejudge_rebuildscoreboard_failed", extra={'contest_id': contest_id})
+
+
+def run_rejudge(job_id: str) -> RejudgeJob | None:
+    """
+    Background функция перепроверки:
+    1. Выбирает решения по фильтру задания, группирует по задаче и языку
+    2. Для каждой задачи один раз получает тест-кейсы и лимиты
+    3. Проверяет решения пачками по REJUDGE_BATCH_SIZE в одном контейнере на пачку
+    4. После каждой пачки обновляет решения и прогресс задания, проверяет отмену
+    5. Пересчитывает таблицы результатов затронутых контестов
+
+    Задание в статусе running (воркер упал, и брокер доставил задачу повторно) продолжается
+    с сохраненного прогресса: первые processed решений в том же порядке пропускаются.
+
+    Args:
+        job_id (str): id задания перепроверки
+
+    Returns:
+        RejudgeJob | None: задание после обработки
+    """
+    db = SessionLocal()
+    try:
+        job = get_rejudge_job(db, job_id)
+        if job is None or job.status not in (RejudgeStatus.PENDING, RejudgeStatus.RUNNING):
+            return job
+        resumed = job.processed if job.status == RejudgeStatus.RUNNING else 0
+        job.status = RejudgeStatus.RUNNING
+        db.commit()
+
+        query = _solutions_query(db, job)
+        if job.created_at is not None:
+            # решения, отправленные после создания задания, не сдвигают порядок при продолжении
+            query = query.filter(Solution.created_at <= job.created_at)
+        targets = (
+            query
+            .with_entities(Solution.id, Solution.problem_id, Solution.language, Solution.contest_id)
+            .order_by(Solution.problem_id, Solution.language, Solution.created_at, Solution.id)
+            .all()
+        )
+        job.total = len(targets)
+        db.commit()
+        contest_ids = {row.contest_id for row in targets if row.contest_id}
+        if resumed:
+            logger.info("rejudge_resumed", extra={'job_id': job_id, 'processed': resumed})
+
+        try:
+            for problem_id, problem_rows in groupby(targets[resumed:], key=lambda r: r.problem_id):
+                problem_rows = list(problem_rows)
+                with phase("fetch_problem"):
+                    bundle = fetch_judging_bundle(problem_id)
+                if bundle is None:
+                    job.failed += len(problem_rows)
+                    job.processed += len(problem_rows)
+                    db.commit()
+                    continue
+
+                for language, language_rows in groupby(problem_rows, key=lambda r: r.language):
+                    ids = [row.id for row in language_rows]
+                    for start in range(0, len(ids), settings.REJUDGE_BATCH_SIZE):
+                        db.refresh(job)
+                        if job.status == RejudgeStatus.CANCELLED:
+                            logger.info("rejudge_cancelled", extra={'job_id': job_id, 'processed': job.processed})
+                            return job
+                        _rejudge_batch(
+                            db, job, problem_id, language, ids[start:start + settings.REJUDGE_BATCH_SIZE], bundle
+                        )
+        except Exception:
+            db.rollback()
+            logger.exception("rejudge_run_failed", extra={'job_id': job_id})
+            job.status = RejudgeStatus.FAILED
+            job.finished_at = datetime.now(timezone.utc)
+            db.commit()
+            return job
+        finally:
+            # уже записанные вердикты сохраняются и при отмене, и при ошибке
+            _rebuild_scoreboards(db, contest_ids)
+
+        # отмена могла прийти во время последней пачки - не перетираем ее статусом done
+        db.refresh(job)
+        if job.status == RejudgeStatus.CANCELLED:
+            logger.info("rejudge_cancelled", extra={'job_id': job_id, 'processed': job.processed})
+            return job
+        job.status = RejudgeStatus.DONE
+        job.finished_at = datetime.now(timezone.utc)
+        db.commit()
+        logger.info("rejudge_run", extra={'job_id': job_id, 'total': job.total,
+                                          'changed': job.changed, 'failed': job.failed})
+        return job
+    finally:
+        db.close()
@@ -0,0 +1,427 @@
+import hashlib
+from datetime import datetime, timezone
+from itertools import groupby
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.pagination import keyset_paginate
+from app.models.scoreboard import Scoreboard, ScoreboardCell, ScoreboardEntry
+from app.models.solution import Solution, SolutionStatus
+from app.schemas.scoreboard import ScoreboardSettingsUpdate
+from app.services.contest import get_contest_scope
+
+# штраф в минутах заведомо меньше, поэтому score сравнивает сначала число решенных задач
+SCORE_BASE = 10 ** 9
+
+LIVE_FIELDS = ("solved", "attempts", "first_ac_at", "penalty")
+FROZEN_FIELDS = ("frozen_solved", "frozen_attempts", "frozen_first_ac_at", "frozen_penalty", "pending")
+
+# начало и окончание контестов для выбора очереди посылок; сбрасывается при изменении настроек таблицы
+contest_window_cache = TTLCache(max_entries=1000, ttl=settings.CONTEST_CACHE_TTL)
+
+
+def _utc(value):
+    # SQLite возвращает naive datetime, Postgres - aware
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _minutes(since: datetime, moment: datetime) -> int:
+    return max(0, int((_utc(moment) - _utc(since)).total_seconds() // 60))
+
+
+def compute_cell(
+    submissions: list, starts_at: datetime, freeze_at: datetime | None, penalty_minutes: int
+) -> dict:
+    """
+    Считает ячейку таблицы по правилам ICPC: задача решена первой посылкой AC,
+    штраф - минуты от начала контеста до нее плюс penalty_minutes за каждую
+    неудачную посылку перед ней. Посылки после первой AC не учитываются.
+
+    Args:
+        submissions (list): пары (created_at, status) проверенных решений в порядке отправки,
+        starts_at (datetime): начало контеста,
+        freeze_at (datetime | None): начало заморозки таблицы,
+        penalty_minutes (int): штраф за неудачную посылку
+
+    Returns:
+        dict: значения колонок ScoreboardCell
+    """
+    def score(rows):
+        attempts = 0
+        for created_at, status in rows:
+            if status == SolutionStatus.AC:
+                return True, attempts, _utc(created_at), _minutes(starts_at, created_at) + attempts * penalty_minutes
+            attempts += 1
+        return False, attempts, None, 0
+
+    before = submissions
+    if freeze_at is not None:
+        before = [s for s in submissions if _utc(s[0]) < _utc(freeze_at)]
+
+    solved, attempts, first_ac_at, penalty = score(submissions)
+    frozen_solved, frozen_attempts, frozen_first_ac_at, frozen_penalty = score(before)
+    return {
+        "solved": solved,
+        "attempts": attempts,
+        "first_ac_at": first_ac_at,
+        "penalty": penalty,
+        "frozen_solved": frozen_solved,
+        "frozen_attempts": frozen_attempts,
+        "frozen_first_ac_at": frozen_first_ac_at,
+        "frozen_penalty": frozen_penalty,
+        "pending": 0 if frozen_solved else len(submissions) - len(before),
+    }
+
+
+def _entry_values(cells: list) -> dict:
+    solved = sum(1 for c in cells if c.solved)
+    penalty = sum(c.penalty for c in cells if c.solved)
+    frozen_solved = sum(1 for c in cells if c.frozen_solved)
+    frozen_penalty = sum(c.frozen_penalty for c in cells if c.frozen_solved)
+    return {
+        "solved": solved,
+        "penalty": penalty,
+        "score": solved * SCORE_BASE - penalty,
+        "frozen_solved": frozen_solved,
+        "frozen_penalty": frozen_penalty,
+        "frozen_score": frozen_solved * SCORE_BASE - frozen_penalty,
+    }
+
+
+def _lock_board(db: Session, contest_id: str) -> Scoreboard:
+    """
+    Возвращает таблицу контеста, заблокированную до конца транзакции, и создает ее при первом вердикте.
+    Начало контеста по умолчанию - первая посылка в нем.
+    """
+    board = db.query(Scoreboard).filter(Scoreboard.contest_id == contest_id).with_for_update().first()
+    if board is not None:
+        return board
+
+    starts_at = db.query(func.min(Solution.created_at)).filter(Solution.contest_id == contest_id).scalar()
+    db.add(
+        Scoreboard(
+            contest_id=contest_id,
+            starts_at=starts_at or datetime.now(timezone.utc),
+            freeze_minutes=settings.SCOREBOARD_FREEZE_MINUTES,
+            penalty_minutes=settings.SCOREBOARD_PENALTY_MINUTES,
+            unfrozen=False,
+            version=0,
+            frozen_version=0,
+        )
+    )
+    try:
+        db.commit()
+    except IntegrityError:
+        # таблицу одновременно создал другой воркер
+        db.rollback()
+    return db.query(Scoreboard).filter(Scoreboard.contest_id == contest_id).with_for_update().one()
+
+
+def _counted_solutions(db: Session, board: Scoreboard, *columns):
+    """
+    Проверенные посылки контеста, отправленные в [starts_at, ends_at): дорешивание после
+    окончания и посылки до начала в таблицу не попадают
+    """
+    q = db.query(*columns).filter(
+        Solution.contest_id == board.contest_id,
+        Solution.status != SolutionStatus.PENDING,
+        Solution.created_at >= board.starts_at,
+    )
+    if board.ends_at is not None:
+        q = q.filter(Solution.created_at < board.ends_at)
+    return q
+
+
+def _refresh_cell(db: Session, board: Scoreboard, user_id: str, problem_id: str) -> None:
+    """
+    Пересчитывает одну ячейку по посылкам участника к задаче и, если она изменилась,
+    итог участника и версии таблицы
+    """
+    rows = (
+        _counted_solutions(db, board, Solution.created_at, Solution.status)
+        .filter(Solution.created_by == user_id, Solution.problem_id == problem_id)
+        .order_by(Solution.created_at, Solution.id)
+        .all()
+    )
+    values = compute_cell([tuple(r) for r in rows], board.starts_at, board.freeze_at, board.penalty_minutes)
+
+    cell = db.get(ScoreboardCell, (board.contest_id, user_id, problem_id))
+    if cell is None:
+        cell = ScoreboardCell(contest_id=board.contest_id, user_id=user_id, problem_id=problem_id)
+        db.add(cell)
+        live_changed = frozen_changed = True
+    else:
+        live_changed = any(_utc(getattr(cell, f)) != values[f] for f in LIVE_FIELDS)
+        frozen_changed = any(_utc(getattr(cell, f)) != values[f] for f in FROZEN_FIELDS)
+    if not (live_changed or frozen_changed):
+        return
+
+    for field, value in values.items():
+        setattr(cell, field, value)
+    db.flush()
+
+    cells = (
+        db.query(ScoreboardCell)
+        .filter(ScoreboardCell.contest_id == board.contest_id, ScoreboardCell.user_id == user_id)
+        .all()
+    )
+    entry = db.get(ScoreboardEntry, (board.contest_id, user_id))
+    if entry is None:
+        entry = ScoreboardEntry(contest_id=board.contest_id, user_id=user_id)
+        db.add(entry)
+    for field, value in _entry_values(cells).items():
+        setattr(entry, field, value)
+
+    if live_changed:
+        board.version += 1
+    if frozen_changed:
+        board.frozen_version += 1
+
+
+def apply_verdict(db: Session, solution: Solution) -> None:
+    """
+    Применяет вердикт решения контеста к таблице результатов: пересчитывается
+    только ячейка (контест, участник, задача) и итог участника.
+    Решения пользователей, не участвующих в контесте, в таблицу не попадают
+
+    Args:
+        db (Session): объект сессии БД,
+        solution (Solution): решение с выставленным вердиктом
+    """
+    if not solution.contest_id:
+        return
+    try:
+        _, participant_ids = get_contest_scope(solution.contest_id)
+        if solution.created_by not in participant_ids:
+            logger.debug("scoreboard_apply", extra={'contest_id': solution.contest_id, 'solution_id': str(solution.id),
+                                                    'detail': 'not a participant'})
+            return
+        board = _lock_board(db, solution.contest_id)
+        _refresh_cell(db, board, solution.created_by, solution.problem_id)
+        db.commit()
+        logger.debug("scoreboard_apply", extra={'contest_id': solution.contest_id, 'solution_id': str(solution.id)})
+    except Exception:
+        db.rollback()
+        logger.exception("scoreboard_apply_failed",
+                         extra={'contest_id': solution.contest_id, 'solution_id': str(solution.id)})
+
+
+def rebuild_scoreboard(db: Session, contest_id: str) -> Scoreboard:
+    """
+    Пересчитывает таблицу контеста с нуля по проверенным решениям участников,
+    отправленным во время контеста, например после перепроверки или изменения настроек
+
+    Args:
+        db (Session): объект сессии БД,
+        contest_id (str): id контеста
+
+    Returns:
+        Scoreboard: таблица с новыми версиями
+    """
+    try:
+        _, participant_ids = get_contest_scope(contest_id)
+        board = _lock_board(db, contest_id)
+        db.query(ScoreboardCell).filter(ScoreboardCell.contest_id == contest_id).delete(synchronize_session=False)
+        db.query(ScoreboardEntry).filter(ScoreboardEntry.contest_id == contest_id).delete(synchronize_session=False)
+
+        rows = [
+            row
+            for row in (
+                _counted_solutions(db, board, Solution.created_by, Solution.problem_id,
+                                   Solution.created_at, Solution.status)
+                .order_by(Solution.created_by, Solution.problem_id, Solution.created_at, Solution.id)
+                .all()
+            )
+            if row.created_by in participant_ids
+        ]
+        cells = [
+            ScoreboardCell(
+                contest_id=contest_id,
+                user_id=user_id,
+                problem_id=problem_id,
+                **compute_cell(
+                    [(r.created_at, r.status) for r in cell_rows],
+                    board.starts_at,
+                    board.freeze_at,
+                    board.penalty_minutes,
+                ),
+            )
+            for (user_id, problem_id), cell_rows in groupby(rows, key=lambda r: (r.created_by, r.problem_id))
+        ]
+        entries = [
+            ScoreboardEntry(contest_id=contest_id, user_id=user_id, **_entry_values(list(user_cells)))
+            for user_id, user_cells in groupby(cells, key=lambda c: c.user_id)
+        ]
+        db.add_all(cells)
+        db.add_all(entries)
+        board.version += 1
+        board.frozen_version += 1
+        db.commit()
+        db.refresh(board)
+    except Exception:
+        db.rollback()
+        logger.exception("scoreboard_rebuild_failed", extra={'contest_id': contest_id})
+        raise
+    logger.info("scoreboard_rebuild", extra={'contest_id': contest_id, 'participants': len(entries)})
+    return board
+
+
+def get_scoreboard(db: Session, contest_id: str) -> Scoreboard | None:
+    """
+    Возвращает таблицу результатов контеста или None, если вердиктов в контесте еще не было
+
+    Args:
+        db (Session): объект сессии БД,
+        contest_id (str): id контеста
+
+    Returns:
+        Scoreboard | None: orm объект таблицы
+    """
+    return db.query(Scoreboard).filter(Scoreboard.contest_id == contest_id).first()
+
+
+def update_scoreboard_settings(db: Session, contest_id: str, settings_in: ScoreboardSettingsUpdate) -> Scoreboard:
+    """
+    Меняет начало, окончание, заморозку и штраф таблицы и пересчитывает ее
+
+    Args:
+        db (Session): объект сессии БД,
+        contest_id (str): id контеста,
+        settings_in (ScoreboardSettingsUpdate): заданные поля настроек
+
+    Returns:
+        Scoreboard: пересчитанная таблица
+    """
+    board = _lock_board(db, contest_id)
+    for field, value in settings_in.model_dump(exclude_unset=True).items():
+        setattr(board, field, value)
+    logger.debug("scoreboard_updatesettings", extra={'contest_id': contest_id})
+    board = rebuild_scoreboard(db, contest_id)
+    contest_window_cache.invalidate(str(contest_id))
+    return board
+
+
+def is_contest_live(db: Session, contest_id: str, now: datetime | None = None) -> bool:
+    """
+    Проверяет, идет ли контест: начало и окончание берутся из настроек его таблицы результатов
+    и кэшируются на CONTEST_CACHE_TTL секунд. Контест без таблицы или без заданного окончания
+    идущим не считается.
+
+    Args:
+        db (Session): объект сессии БД,
+        contest_id (str): id контеста,
+        now (datetime | None): момент проверки, по умолчанию текущий
+
+    Returns:
+        bool: True, если now попадает в [starts_at, ends_at)
+    """
+    def load():
+        row = db.query(Scoreboard.starts_at, Scoreboard.ends_at).filter(Scoreboard.contest_id == contest_id).first()
+        return (row.starts_at, row.ends_at) if row else (None, None)
+
+    starts_at, ends_at = contest_window_cache.get_or_load(str(contest_id), load)
+    if starts_at is None or ends_at is None:
+        return False
+    now = now or datetime.now(timezone.utc)
+    return _utc(starts_at) <= now < _utc(ends_at)
+
+
+def standings_etag(board: Scoreboard, frozen: bool, cursor: str | None, limit: int) -> str:
+    """
+    Возвращает ETag страницы таблицы: меняется только с версией отдаваемого представления
+
+    Args:
+        board (Scoreboard): таблица контеста,
+        frozen (bool): отдается замороженная таблица,
+        cursor (str | None): курсор страницы,
+        limit (int): размер страницы
+
+    Returns:
+        str: слабый ETag
+    """
+    version = f"frozen:{board.frozen_version}" if frozen else f"live:{board.version}"
+    digest = hashlib.sha1(f"{board.contest_id}:{version}:{cursor}:{limit}".encode()).hexdigest()[:16]
+    return f'W/"{digest}"'
+
+
+def get_standings(
+    db: Session, board: Scoreboard, cursor: str | None = None, limit: int = 50, frozen: bool = False
+) -> tuple[list[dict], str | None]:
+    """
+    Возвращает страницу таблицы результатов: участники по убыванию числа решенных задач,
+    затем по возрастанию штрафа. Страница читается по индексу (contest_id, score, user_id),
+    место первой строки - двумя count по тому же индексу, ячейки - только участников страницы.
+
+    Args:
+        db (Session): объект сессии БД,
+        board (Scoreboard): таблица контеста,
+        cursor (str | None): курсор предыдущей страницы,
+        limit (int): размер страницы,
+        frozen (bool): отдать состояние на момент заморозки
+
+    Returns:
+        tuple[list[dict], str | None]: строки таблицы (StandingRead) и курсор следующей страницы
+
+    Raises:
+        InvalidCursorError: курсор поврежден
+    """
+    score_column = ScoreboardEntry.frozen_score if frozen else ScoreboardEntry.score
+    q = db.query(ScoreboardEntry).filter(ScoreboardEntry.contest_id == board.contest_id)
+    entries, next_cursor = keyset_paginate(q, (score_column, ScoreboardEntry.user_id), cursor, limit)
+    if not entries:
+        return [], None
+
+    # одинаковый score - одно место; при обходе страниц равные идут по убыванию user_id
+    first_score = getattr(entries[0], score_column.key)
+    better = q.filter(score_column > first_score).count()
+    ties_before = q.filter(score_column == first_score, ScoreboardEntry.user_id > entries[0].user_id).count()
+
+    cells = (
+        db.query(ScoreboardCell)
+        .filter(
+            ScoreboardCell.contest_id == board.contest_id,
+            ScoreboardCell.user_id.in_([e.user_id for e in entries]),
+        )
+        .order_by(ScoreboardCell.problem_id)
+        .all()
+    )
+    cells_by_user: dict[str, list] = {}
+    for cell in cells:
+        cells_by_user.setdefault(cell.user_id, []).append(cell)
+
+    rows = []
+    rank, prev_score = better + 1, first_score
+    for position, entry in enumerate(entries, start=better + ties_before + 1):
+        score = getattr(entry, score_column.key)
+        if score != prev_score:
+            rank, prev_score = position, score
+        problems = []
+        for cell in cells_by_user.get(entry.user_id, []):
+            first_ac_at = cell.frozen_first_ac_at if frozen else cell.first_ac_at
+            problems.append(
+                {
+                    "problem_id": cell.problem_id,
+                    "solved": cell.frozen_solved if frozen else cell.solved,
+                    "attempts": cell.frozen_attempts if frozen else cell.attempts,
+                    "first_ac_minute": _minutes(board.starts_at, first_ac_at) if first_ac_at else None,
+                    "pending": cell.pending if frozen else 0,
+                }
+            )
+        rows.append(
+            {
+                "rank": rank,
+                "user_id": entry.user_id,
+                "solved": entry.frozen_solved if frozen else entry.solved,
+                "penalty": entry.frozen_penalty if frozen else entry.penalty,
+                "problems": problems,
+            }
+        )
+    logger.debug("scoreboard_standings", extra={'contest_id': board.contest_id, 'frozen': frozen})
+    return rows, next_cursor
@@ -1,23 +1,132 @@
+import hashlib
+import json
+
 import requests
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, defer
 
+from app.core import events
 from app.core.config import settings
 from app.core.database import SessionLocal
+from app.core.http import content_client
 from app.core.logger import logger
+from app.core.metrics import DEDUPE_HITS, VERDICTS
+from app.core.pagination import keyset_paginate
+from app.core.phases import phase
+from app.core.progress import ProgressReporter
 from app.models.solution import Solution, SolutionStatus
 from app.schemas.solution import SolutionCreate
 from app.services.analytics import compute_performance_percentile
+from app.services.contest import get_contest_scope
 from app.services.docker_runner import run_solution_in_container
+from app.services.outbox import enqueue_problem_solved
+from app.services.scoreboard import apply_verdict
+
+
+def get_problem_contest_id(problem_id: str) -> str | None:
+    """
+    Возвращает id контеста, к которому относится задача (Problem.contest_id в content_service).
+    При недоступности content_service решение считается тренировочным.
+
+    Args:
+        problem_id (str): id задачи
+
+    Returns:
+        str | None: id контеста или None
+    """
+    try:
+        response = content_client.get(f"/problems/{problem_id}", endpoint="get_problem", timeout=2)
+    except Exception:
+        logger.warning("solution_getcontest_failed", extra={'problem_id': problem_id})
+        return None
+    if response.status_code != 200:
+        logger.warning("solution_getcontest_failed",
+                       extra={'problem_id': problem_id, 'status_code': response.status_code})
+        return None
+    contest_id = response.json().get("contest_id")
+    return str(contest_id) if contest_id else None
 
 
-def create_solution(db: Session, solution_in: SolutionCreate, user_id: str) -> Solution:
+# вердикты, которые можно переиспользовать для идентичного кода:
+# RE не переиспользуется, так как им же отмечаются ошибки docker при проверке
+REUSABLE_STATUSES = (SolutionStatus.AC, SolutionStatus.WA, SolutionStatus.TLE, SolutionStatus.MLE)
+
+
+def compute_source_hash(code: str) -> str:
+    """
+    Возвращает sha256 нормализованного кода: единые переводы строк,
+    без хвостовых пробелов в строках и пустых строк в конце
+
+    Args:
+        code (str): исходный код решения
+
+    Returns:
+        str: hex-дайджест
+    """
+    lines = code.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    normalized = "\n".join(line.rstrip() for line in lines).rstrip("\n")
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def compute_testset_hash(bundle: dict) -> str:
+    """
+    Возвращает sha256 версии тестсета: тест-кейсы и лимиты задачи
+
+    Args:
+        bundle (dict): результат fetch_judging_bundle
+
+    Returns:
+        str: hex-дайджест
+    """
+    payload = json.dumps(
+        [bundle["test_cases"], bundle["time_limit"], bundle["memory_limit"]],
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def find_duplicate(db: Session, solution: Solution, testset_hash: str) -> Solution | None:
+    """
+    Ищет идентичное решение (задача, язык, хеш кода), проверенное на той же версии тестсета.
+    Готовый вердикт предпочитается решению, которое проверяется прямо сейчас
+    (pending с выставленным testset_hash).
+
+    Args:
+        db (Session): объект сессии БД,
+        solution (Solution): проверяемое решение,
+        testset_hash (str): хеш текущей версии тестсета
+
+    Returns:
+        Solution | None: идентичное решение или None
+    """
+    q = db.query(Solution).filter(
+        Solution.problem_id == solution.problem_id,
+        Solution.language == solution.language,
+        Solution.source_hash == solution.source_hash,
+        Solution.testset_hash == testset_hash,
+        Solution.id != solution.id,
+    )
+    judged = (
+        q.filter(Solution.status.in_(REUSABLE_STATUSES))
+        .order_by(Solution.updated_at.desc())
+        .first()
+    )
+    if judged is not None:
+        return judged
+    return q.filter(Solution.status == SolutionStatus.PENDING).first()
+
+
+def create_solution(
+    db: Session, solution_in: SolutionCreate, user_id: str, contest_id: str | None = None
+) -> Solution:
     """
     Создает и  сохраняет в БД запись решения со статусом pending
 
     Args:
         db: объект сессии БД,
         solution_in (SolutionCreate): заполненная схема для создания решения,
-        user_id (str): str(user.keycloak_id)
+        user_id (str): str(user.keycloak_id),
+        contest_id (str | None): id контеста задачи, определяет очередь проверки
 
     Returns:
         Solution: orm объект решения
@@ -25,9 +134,11 @@ def create_solution(db: Session, solution_in: SolutionCreate, user_id: str) -> S
     solution = Solution(
         created_by=user_id,
         problem_id=solution_in.problem_id,
+        contest_id=contest_id,
         code=solution_in.code,
         language=solution_in.language,
         status=SolutionStatus.PENDING,
+        source_hash=compute_source_hash(solution_in.code),
     )
     db.add(solution)
     db.commit()
@@ -59,7 +170,8 @@ def update_solution_status(
     db: Session, solution_id: str, result: dict
 ) -> Solution | None:
     """
-    Обновляет запись решения после его обработки
+    Обновляет запись решения после его обработки. Для AC в той же транзакции
+    записывается событие outbox "задача решена" для content_service
 
     Args:
         db (Session): объект сессии БД,
@@ -77,6 +189,8 @@ def update_solution_status(
     solution.time_used = result.get("time_used")
     solution.memory_used = result.get("memory_used")
     solution.faster_than = result.get("faster_than")
+    if solution.status == SolutionStatus.AC:
+        enqueue_problem_solved(db, solution.problem_id, solution.created_by)
 
     try:
         db.commit()
@@ -90,81 +204,162 @@ def update_solution_status(
     return solution
 
 
-def process_solution(solution_id: str) -> dict:
+def fetch_judging_bundle(problem_id: str) -> dict | None:
+    """
+    Получает из content_service все, что нужно для проверки решений задачи
+
+    Args:
+        problem_id (str): id задачи
+
+    Returns:
+        dict | None: {test_cases, time_limit, memory_limit, dedupe} или None, если задача не найдена
+
+    Raises:
+        requests.RequestException: content_service недоступен или ответил 5xx
+            (в т.ч. CircuitOpenError при разомкнутой цепи)
+    """
+    # отдельный эндпоинт читает основную БД мимо кэша ответов: правка тестов сразу видна проверке
+    response = content_client.get(f"/problems/{problem_id}/judging", endpoint="problem_judging")
+    if response.status_code >= 500:
+        response.raise_for_status()
+    if response.status_code != 200:
+        logger.warning("solution_fetchbundle_failed",
+                       extra={'problem_id': problem_id, 'status_code': response.status_code})
+        return None
+
+    problem_data = response.json()
+    test_cases = [
+        {
+            "input": tc.get("input_data", ""),
+            "expected_output": tc.get("output_data", ""),
+        }
+        for tc in problem_data.get("test_cases", []) or []
+    ]
+    return {
+        "test_cases": test_cases,
+        "time_limit": problem_data.get("time_limit", 10),
+        "memory_limit": problem_data.get("memory_limit", 128),
+        "dedupe": problem_data.get("dedupe_submissions", True),
+    }
+
+
+def process_solution(solution_id: str, wait_for_duplicates: bool = True, retry_unavailable: bool = True) -> dict:
     """
     Background функция для обработки пользовательского решения:
     1. Получает тест-кейсы, лимит задачи от solution.problem_id
-    2. Запускает решение на тест-кейсах задачи через docker_runner/run_solution_in_container
-    3. Выставляет вердикт решению
-    4. Обновляет запись решения
+    2. Если идентичное решение уже проверено на этом тестсете - берет его вердикт,
+       если проверяется прямо сейчас - возвращает {"deferred": True} для повтора задачи
+       Если content_service недоступен - возвращает {"retry": True} для повтора задачи
+    3. Иначе запускает решение на тест-кейсах задачи через docker_runner/run_solution_in_container
+    4. Выставляет вердикт решению
+    5. Обновляет запись решения и ячейку таблицы результатов контеста
 
     Args:
-        db (Session): сессия БД,
         solution_id (str): id решения,
+        wait_for_duplicates (bool): ждать окончания проверки идентичного решения,
+        retry_unavailable (bool): повторять задачу при недоступности content_service, иначе выставить RE
 
     Returns:
         dict: результат обработки решения {status, faster_than, memory_used, time_used}
     """
     db = SessionLocal()
     try:
-        solution = get_solution(db, solution_id)
+        with phase("load_solution"):
+            solution = get_solution(db, solution_id)
         if not solution:
             update_solution_status(
                 db, solution_id, {"status": SolutionStatus.RE, "time_used": 0}
             )
             return {"error": "Solution not found"}
 
-        problem_url = f"{settings.CONTENT_SERVICE_URL}/problems/{solution.problem_id}"
-        response = requests.get(problem_url)
-        if response.status_code != 200:
+        language = solution.language
+        try:
+            with phase("fetch_problem", language=language):
+                bundle = fetch_judging_bundle(solution.problem_id)
+        except requests.RequestException as exc:
+            if retry_unavailable:
+                logger.warning("solution_fetchbundle_failed",
+                               extra={'solution_id': solution_id, 'detail': 'retrying', 'error': str(exc)})
+                return {"retry": True}
+            logger.error("solution_fetchbundle_failed",
+                         extra={'solution_id': solution_id, 'detail': 'retries exhausted', 'error': str(exc)})
             update_solution_status(
                 db, solution_id, {"status": SolutionStatus.RE, "time_used": 0}
             )
-            return {"error": "Problem not found"}
-
-        problem_data = response.json()
-        test_cases_raw = problem_data.get("test_cases", [])
-        test_cases = []
-        for tc in test_cases_raw:
-            test_cases.append(
-                {
-                    "input": tc.get("input_data", ""),
-                    "expected_output": tc.get("output_data", ""),
-                }
+            return {"error": "Content service unavailable"}
+        if bundle is None:
+            update_solution_status(
+                db, solution_id, {"status": SolutionStatus.RE, "time_used": 0}
             )
-        time_limit = problem_data.get("time_limit", 10)
-        memory_limit = problem_data.get("memory_limit", 128)
+            return {"error": "Problem not found"}
 
-        result = run_solution_in_container(
-            solution.code, solution.language, test_cases, time_limit, memory_limit
-        )
+        testset_hash = compute_testset_hash(bundle)
+        duplicate = None
+        if bundle["dedupe"] and solution.source_hash:
+            with phase("dedupe_lookup", language=language):
+                duplicate = find_duplicate(db, solution, testset_hash)
+            if duplicate is not None and duplicate.status == SolutionStatus.PENDING:
+                if wait_for_duplicates:
+                    DEDUPE_HITS.labels(language=language, kind="waited").inc()
+                    logger.debug("solution_process_deferred",
+                                 extra={'solution_id': solution_id, 'duplicate_of': str(duplicate.id)})
+                    return {"deferred": True, "duplicate_of": str(duplicate.id)}
+                duplicate = None
+
+        if duplicate is not None:
+            DEDUPE_HITS.labels(language=language, kind="reused").inc()
+            status_value = SolutionStatus(duplicate.status).value
+            result = {
+                "status": status_value,
+                "time_used": duplicate.time_used,
+                "memory_used": duplicate.memory_used,
+                "results": [{"status": status_value, "time_used": duplicate.time_used or 0.0, "output": None}],
+                "reused_from": str(duplicate.id),
+            }
+            solution.testset_hash = testset_hash
+        else:
+            # testset_hash у pending-решения означает "проверяется": идентичные посылки будут ждать его
+            solution.testset_hash = testset_hash
+            db.commit()
+            with phase("judge", language=language):
+                result = run_solution_in_container(
+                    solution.code,
+                    solution.language,
+                    bundle["test_cases"],
+                    bundle["time_limit"],
+                    bundle["memory_limit"],
+                    on_progress=ProgressReporter(solution_id, solution.created_by),
+                )
+        VERDICTS.labels(language=language, status=str(result.get("status"))).inc()
 
         if result.get("status") == "AC" and result.get("results"):
-            mark_url = (
-                f"{settings.CONTENT_SERVICE_URL}/problems/solved/{solution.problem_id}"
-            )
-            params = {"user_id": solution.created_by}
-            try:
-                resp = requests.post(mark_url, params=params)
-                if not resp.ok:
-                    logger.warning("solution_process_warning",
-                                   extra={'detail': 'marking solution as solved failed'})
-            except Exception:
-                logger.exception("solution_process_failed",
-                                 extra={"detail": 'post failed for marking problem solved',
-                                        'solution_id': solution_id})
-
             current_time = result["results"][0]["time_used"]
-            percentile = compute_performance_percentile(
-                db, solution.problem_id, current_time
-            )
+            with phase("percentile", language=language):
+                percentile = compute_performance_percentile(
+                    db, solution.problem_id, current_time
+                )
             result["faster_than"] = percentile
         else:
             result["faster_than"] = None
 
-        updated_solution = update_solution_status(db, solution_id, result)
+        with phase("db_update", language=language):
+            updated_solution = update_solution_status(db, solution_id, result)
         if updated_solution:
             logger.debug('solution_process', extra={'solution_id': solution_id})
+            if updated_solution.contest_id:
+                with phase("scoreboard", language=language):
+                    apply_verdict(db, updated_solution)
+            events.publish_event(
+                {
+                    "type": "status",
+                    "solution_id": solution_id,
+                    "user_id": solution.created_by,
+                    "problem_id": solution.problem_id,
+                    "status": str(result.get("status")),
+                    "time_used": result.get("time_used"),
+                    "faster_than": result.get("faster_than"),
+                }
+            )
         else:
             logger.error("solution_process_failed",
                          extra={'detail': 'failed to update status', 'solution_id': solution_id})
@@ -174,44 +369,102 @@ def process_solution(solution_id: str) -> dict:
         db.close()
 
 
-def list_solutions_by_problem(db: Session, problem_id: str) -> list[Solution]:
+def list_pending_solutions_by_user(db: Session, user_id: str) -> list[Solution]:
     """
-    Возвращает список всех решений к задаче problem_id
+    Возвращает решения пользователя, которые еще проверяются
 
     Args:
         db (Session): объект БД,
-        problem_id (str): id задачи
+        user_id (str): id пользователя
 
     Returns:
-        list[Solution]: список пользовательских решений к задаче
+        list[Solution]: решения со статусом pending
     """
-    solutions = db.query(Solution).filter(Solution.problem_id == problem_id).all()
-    logger.debug("solution_listproblem", extra={'problem_id': problem_id, 'length': len(solutions)})
+    solutions = (
+        _summary_query(db)
+        .filter(Solution.created_by == user_id, Solution.status == SolutionStatus.PENDING)
+        .all()
+    )
+    logger.debug("solution_listpending", extra={'user_id': user_id, 'length': len(solutions)})
     return solutions
 
 
+def _summary_query(db: Session):
+    # код решения нужен только при просмотре одного решения: в списках колонка не читается
+    return db.query(Solution).options(defer(Solution.code))
+
+
+def _apply_summary_filters(q, status: SolutionStatus | None, language: str | None):
+    if status:
+        q = q.filter(Solution.status == status)
+    if language:
+        q = q.filter(Solution.language == language)
+    return q
+
+
+def list_solutions_by_problem(
+    db: Session,
+    problem_id: str,
+    status: SolutionStatus | None = None,
+    language: str | None = None,
+    cursor: str | None = None,
+    limit: int = 50,
+) -> tuple[list[Solution], str | None]:
+    """
+    Возвращает страницу решений к задаче problem_id, от новых к старым, без кода
+
+    Args:
+        db (Session): объект БД,
+        problem_id (str): id задачи,
+        status (SolutionStatus | None): фильтр по вердикту,
+        language (str | None): фильтр по языку,
+        cursor (str | None): курсор следующей страницы из предыдущего ответа,
+        limit (int): размер страницы
+
+    Returns:
+        tuple[list[Solution], str | None]: решения и курсор следующей страницы
+    """
+    q = _apply_summary_filters(
+        _summary_query(db).filter(Solution.problem_id == problem_id), status, language
+    )
+    solutions, next_cursor = keyset_paginate(q, (Solution.created_at, Solution.id), cursor, limit)
+    logger.debug("solution_listproblem", extra={'problem_id': problem_id, 'length': len(solutions)})
+    return solutions, next_cursor
+
+
 def list_solutions_by_problem_and_user(
-    db, problem_id: str, user_id: str
-) -> list[Solution]:
+    db: Session,
+    problem_id: str,
+    user_id: str,
+    status: SolutionStatus | None = None,
+    language: str | None = None,
+    cursor: str | None = None,
+    limit: int = 50,
+) -> tuple[list[Solution], str | None]:
     """
-    Возвращает список всех решений пользователя user_id к задаче problem_id
+    Возвращает страницу решений пользователя user_id к задаче problem_id, от новых к старым, без кода
 
     Args:
         db (Session): объект БД,
         problem_id (str): id проблемы,
-        user_id (str): id пользователя
+        user_id (str): id пользователя,
+        status (SolutionStatus | None): фильтр по вердикту,
+        language (str | None): фильтр по языку,
+        cursor (str | None): курсор следующей страницы из предыдущего ответа,
+        limit (int): размер страницы
 
     Returns:
-        list[Solution]: список решений пользователя user_id к задаче problem_id
+        tuple[list[Solution], str | None]: решения и курсор следующей страницы
     """
-    solutions = (
-        db.query(Solution)
-        .filter(Solution.problem_id == problem_id, Solution.created_by == user_id)
-        .all()
+    q = _apply_summary_filters(
+        _summary_query(db).filter(Solution.problem_id == problem_id, Solution.created_by == user_id),
+        status,
+        language,
     )
+    solutions, next_cursor = keyset_paginate(q, (Solution.created_at, Solution.id), cursor, limit)
     logger.debug('solution_listproblemuser',
                  extra={"problem_id": problem_id, "user_id": user_id, "length": len(solutions)})
-    return solutions
+    return solutions, next_cursor
 
 
 def list_contest_solutions(
@@ -220,42 +473,27 @@ def list_contest_solutions(
     owner_id: str,
     user_id: str | None = None,
     problem_id: str | None = None,
-    offset: int = 0,
+    cursor: str | None = None,
     limit: int = 10,
-) -> list[Solution]:
-    tasks_url = f"{settings.CONTENT_SERVICE_URL}/contests/{contest_id}/tasks"
-    try:
-        r = requests.get(tasks_url, timeout=5)
-        r.raise_for_status()
-    except Exception:
-        logger.exception("solution_listcontest_failed", extra={'contest_id': contest_id})
-        raise
-    tasks = r.json()
-    task_ids = [str(t["id"]) for t in tasks]
+) -> tuple[list[Solution], str | None]:
+    task_ids, participant_ids = get_contest_scope(contest_id)
 
-    parts_url = f"{settings.CONTENT_SERVICE_URL}/contests/{contest_id}/participants"
-    try:
-        r = requests.get(parts_url, timeout=5)
-        r.raise_for_status()
-    except Exception:
-        logger.exception("solution_listcontest_failed",
-                         extra={'detail': 'failed to fetch participants for contest',
-                                'contest_id': contest_id})
-        raise
-    participants = r.json()
-    participant_ids = [u["keycloak_id"] for u in participants]
+    # фильтр по конкретному участнику/задаче проверяется по кэшу, без IN по всему контесту
+    if (user_id and user_id not in participant_ids) or (problem_id and problem_id not in task_ids):
+        return [], None
 
-    q = db.query(Solution).filter(
-        Solution.problem_id.in_(task_ids),
-        Solution.created_by.in_(participant_ids),
-    )
-    if user_id:
-        q = q.filter(Solution.created_by == user_id)
+    q = _summary_query(db)
     if problem_id:
         q = q.filter(Solution.problem_id == problem_id)
+    else:
+        q = q.filter(Solution.problem_id.in_(task_ids))
+    if user_id:
+        q = q.filter(Solution.created_by == user_id)
+    else:
+        q = q.filter(Solution.created_by.in_(participant_ids))
 
-    solutions = q.offset(offset).limit(limit).all()
+    solutions, next_cursor = keyset_paginate(q, (Solution.created_at, Solution.id), cursor, limit)
     logger.debug('solutions_listcontest',
                  extra={'contest_id': contest_id, 'user_id': user_id, 'problem_id': problem_id,
-                        'offset': offset, 'limit': limit, 'length': len(solutions)})
-    return solutions
+                        'limit': limit, 'length': len(solutions)})
+    return solutions, next_cursor
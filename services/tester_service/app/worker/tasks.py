@@ -1,8 +1,93 @@
-from app.worker.celery_app import celery_app
+import time
+
+from opentelemetry import trace
+
+from app.worker.celery_app import QUEUE_PRACTICE, QUEUE_REJUDGE, celery_app
+from app.services.outbox import dispatch_outbox
+from app.services.rejudge import run_rejudge
 from app.services.solution import process_solution
+from app.core.config import settings
 from app.core.logger import logger
+from app.core.metrics import QUEUE_WAIT_SECONDS, SUBMISSIONS_IN_FLIGHT
+from app.core.phases import record_phase
+from app.core.tracing import TRACE_HEADERS, extract_context, inject_headers, tracer
+
+
+def enqueue_solution(solution_id: str, queue: str = QUEUE_PRACTICE) -> None:
+    """
+    Ставит решение в очередь проверки queue, передавая контекст трассы в заголовках задачи
+    """
+    with tracer.start_as_current_span(
+        "enqueue_solution",
+        kind=trace.SpanKind.PRODUCER,
+        attributes={"solution.id": solution_id, "messaging.destination": queue},
+    ):
+        process_solution_task.apply_async(
+            args=[solution_id],
+            kwargs={"enqueued_at": time.time()},
+            queue=queue,
+            headers=inject_headers(),
+        )
+
+
+def _trace_carrier(request) -> dict:
+    headers = getattr(request, "headers", None) or {}
+    carrier = {}
+    for key in TRACE_HEADERS:
+        value = request.get(key) or headers.get(key)
+        if value:
+            carrier[key] = value
+    return carrier
+
+
+@celery_app.task(name="process_solution_task", bind=True)
+def process_solution_task(self, solution_id: str, enqueued_at: float | None = None) -> None:
+    queue = (self.request.delivery_info or {}).get("routing_key") or QUEUE_PRACTICE
+    with tracer.start_as_current_span(
+        "process_solution_task",
+        context=extract_context(_trace_carrier(self.request)),
+        kind=trace.SpanKind.CONSUMER,
+        attributes={"solution.id": solution_id, "messaging.destination": queue},
+    ), SUBMISSIONS_IN_FLIGHT.labels(queue=queue).track_inprogress():
+        logger.info("worker_fetchsolution", extra={'solution_id': solution_id, 'queue': queue})
+        if enqueued_at is not None:
+            queue_wait = max(time.time() - enqueued_at, 0.0)
+            record_phase("queue_wait", queue_wait)
+            QUEUE_WAIT_SECONDS.labels(queue=queue).observe(queue_wait)
+        retries = self.request.retries
+        result = process_solution(
+            solution_id,
+            wait_for_duplicates=retries < settings.DEDUPE_MAX_RETRIES,
+            retry_unavailable=retries < settings.CONTENT_MAX_RETRIES,
+        )
+        if result.get("deferred"):
+            # идентичное решение проверяется другим воркером - повторяем позже и берем его вердикт
+            raise self.retry(countdown=settings.DEDUPE_RETRY_DELAY, max_retries=settings.DEDUPE_MAX_RETRIES)
+        if result.get("retry"):
+            # content_service недоступен - решение остается pending до повтора с удвоением задержки
+            countdown = min(settings.CONTENT_RETRY_BASE * 2 ** retries, settings.CONTENT_RETRY_MAX_DELAY)
+            raise self.retry(countdown=countdown, max_retries=settings.CONTENT_MAX_RETRIES)
+
+
+def enqueue_rejudge(job_id: str) -> None:
+    """
+    Ставит задание перепроверки в низкоприоритетную очередь judge.rejudge
+    """
+    rejudge_task.apply_async(args=[job_id], queue=QUEUE_REJUDGE, headers=inject_headers())
+
+
+@celery_app.task(name="rejudge_task", bind=True)
+def rejudge_task(self, job_id: str) -> None:
+    with tracer.start_as_current_span(
+        "rejudge_task",
+        context=extract_context(_trace_carrier(self.request)),
+        kind=trace.SpanKind.CONSUMER,
+        attributes={"rejudge.job_id": job_id},
+    ):
+        logger.info("worker_rejudge", extra={'job_id': job_id})
+        run_rejudge(job_id)
+
 
-@celery_app.task(name="process_solution_task")
-def process_solution_task(solution_id: str) -> None:
-    logger.info("worker_fetchsolution", extra={'solution_id': solution_id})
-    process_solution(solution_id)
+@celery_app.task(name="dispatch_outbox_task")
+def dispatch_outbox_task() -> None:
+    dispatch_outbox()
@@ -0,0 +1,327 @@
+"""
+Бенчмарк пропускной способности и задержек проверки решений.
+
+Прогоняет эталонные решения (benchmarks/reference/<language>.*) для каждого языка
+из languages.yaml на трех сценариях (small, large, many) и собирает длительности
+фаз обработки (docker_client, container_create, container_run, read_logs, ...).
+
+Режимы:
+    runner   - прямой вызов run_solution_in_container
+    pipeline - полный process_solution: БД решений (PostgreSQL, --database-url или DATABASE_URL)
+               + заглушка content_service по HTTP
+
+Запуск (из services/tester_service, нужен доступный DOCKER_HOST):
+    python -m benchmarks.judge_bench run --output bench.json
+    python -m benchmarks.judge_bench compare base.json bench.json --threshold 0.15
+
+Ожидание в очереди (queue_wait) измеряется только воркером Celery
+и в этом бенчмарке не участвует: решения передаются в process_solution напрямую.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+REFERENCE_DIR = Path(__file__).resolve().parent / "reference"
+
+SCENARIOS = ("small", "large", "many")
+
+
+def build_test_cases(scenario: str, seed: int = 42) -> list[dict]:
+    """
+    Генерирует тест-кейсы задачи "сумма чисел" для сценария
+
+    small - один короткий тест
+    large - три теста по 5000 чисел
+    many  - 50 коротких тестов
+    """
+    rnd = random.Random(seed)
+
+    def make(count: int) -> dict:
+        numbers = [rnd.randint(-10**6, 10**6) for _ in range(count)]
+        return {
+            "input": " ".join(map(str, numbers)),
+            "expected_output": str(sum(numbers)),
+        }
+
+    if scenario == "small":
+        return [make(2)]
+    if scenario == "large":
+        return [make(5000) for _ in range(3)]
+    if scenario == "many":
+        return [make(2) for _ in range(50)]
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+def load_reference(language: str) -> str | None:
+    for path in REFERENCE_DIR.glob(f"{language}.*"):
+        return path.read_text(encoding="utf-8")
+    return None
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(int(round(q * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[idx]
+
+
+def summarize(values: list[float]) -> dict:
+    return {
+        "count": len(values),
+        "mean": statistics.fmean(values) if values else 0.0,
+        "p50": percentile(values, 0.5),
+        "p95": percentile(values, 0.95),
+        "max": max(values) if values else 0.0,
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+class _ContentStub:
+    """
+    Минимальная заглушка content_service: отдает задачу и принимает отметку о решении
+    """
+
+    def __init__(self):
+        self.problems: dict[str, dict] = {}
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                problem_id = self.path.rstrip("/").split("/")[-1]
+                problem = stub.problems.get(problem_id)
+                if problem is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = json.dumps(problem).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def add_problem(self, problem_id: str, test_cases: list[dict], time_limit: int, memory_limit: int):
+        self.problems[problem_id] = {
+            "id": problem_id,
+            "test_cases": [
+                {"input_data": tc["input"], "output_data": tc["expected_output"]}
+                for tc in test_cases
+            ],
+            "time_limit": time_limit,
+            "memory_limit": memory_limit,
+        }
+
+    def close(self):
+        self.server.shutdown()
+
+
+def run_benchmark(args) -> dict:
+    modes = ["runner", "pipeline"] if args.mode == "both" else [args.mode]
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    if "pipeline" in modes and not os.environ.get("DATABASE_URL", "").startswith("postgresql"):
+        raise SystemExit("pipeline mode needs a PostgreSQL DATABASE_URL (--database-url)")
+
+    stub = _ContentStub()
+    os.environ["CONTENT_SERVICE_URL"] = stub.url
+
+    # настройки читаются при импорте, поэтому модули приложения импортируются после env
+    from app.core.database import SessionLocal, engine
+    from app.core.languages import LANGUAGES
+    from app.core.phases import record_phases
+    from app.models.solution import Base, Solution, SolutionStatus
+    from app.services.docker_runner import run_solution_in_container
+    from app.services.solution import process_solution
+
+    Base.metadata.create_all(engine)
+
+    languages = args.languages or list(LANGUAGES)
+    results = []
+
+    for language in languages:
+        code = load_reference(language)
+        if code is None:
+            print(f"[skip] no reference solution for '{language}'", file=sys.stderr)
+            continue
+        for scenario in args.scenarios:
+            test_cases = build_test_cases(scenario)
+            problem_id = f"bench-{scenario}"
+            stub.add_problem(problem_id, test_cases, args.time_limit, args.memory_limit)
+
+            for mode in modes:
+                walls: list[float] = []
+                phase_totals: dict[str, list[float]] = {}
+                phase_calls: dict[str, list[float]] = {}
+                verdicts: dict[str, int] = {}
+
+                for _ in range(args.repeat):
+                    with record_phases() as recorder:
+                        start = time.perf_counter()
+                        if mode == "runner":
+                            result = run_solution_in_container(
+                                code, language, test_cases, args.time_limit, args.memory_limit
+                            )
+                        else:
+                            db = SessionLocal()
+                            try:
+                                solution = Solution(
+                                    created_by="bench",
+                                    problem_id=problem_id,
+                                    code=code,
+                                    language=language,
+                                    status=SolutionStatus.PENDING,
+                                )
+                                db.add(solution)
+                                db.commit()
+                                solution_id = str(solution.id)
+                            finally:
+                                db.close()
+                            result = process_solution(solution_id)
+                        walls.append(time.perf_counter() - start)
+
+                    status = str(result.get("status", result.get("error")))
+                    verdicts[status] = verdicts.get(status, 0) + 1
+                    for name, values in recorder.durations.items():
+                        phase_totals.setdefault(name, []).append(sum(values))
+                        phase_calls.setdefault(name, []).extend(values)
+
+                entry = {
+                    "mode": mode,
+                    "language": language,
+                    "scenario": scenario,
+                    "tests": len(test_cases),
+                    "runs": args.repeat,
+                    "verdicts": verdicts,
+                    "wall": summarize(walls),
+                    "phases": {
+                        name: {
+                            "per_run": summarize(values),
+                            "per_call": summarize(phase_calls[name]),
+                        }
+                        for name, values in sorted(phase_totals.items())
+                    },
+                }
+                results.append(entry)
+                print(
+                    f"{mode:8} {language:10} {scenario:6} "
+                    f"p50={entry['wall']['p50']:.3f}s p95={entry['wall']['p95']:.3f}s "
+                    f"verdicts={verdicts}",
+                    file=sys.stderr,
+                )
+
+    stub.close()
+    return {
+        "meta": {
+            "git_commit": git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "docker_host": os.environ.get("DOCKER_HOST"),
+            "repeat": args.repeat,
+            "time_limit": args.time_limit,
+            "memory_limit": args.memory_limit,
+        },
+        "results": results,
+    }
+
+
+def compare(base: dict, new: dict, threshold: float) -> int:
+    """
+    Сравнивает p50 общего времени и фаз двух прогонов.
+    Возвращает 1, если общее время хотя бы одного прогона выросло больше чем на threshold.
+    """
+
+    def key(entry):
+        return entry["mode"], entry["language"], entry["scenario"]
+
+    base_index = {key(e): e for e in base["results"]}
+    regressed = False
+    print(f"base={base['meta'].get('git_commit')} new={new['meta'].get('git_commit')}")
+    for entry in new["results"]:
+        old = base_index.get(key(entry))
+        if old is None:
+            continue
+        rows = [("wall", old["wall"]["p50"], entry["wall"]["p50"])]
+        for name, stats in entry["phases"].items():
+            if name in old["phases"]:
+                rows.append((name, old["phases"][name]["per_run"]["p50"], stats["per_run"]["p50"]))
+        print("/".join(key(entry)))
+        for name, before, after in rows:
+            change = (after - before) / before if before else 0.0
+            mark = ""
+            if name == "wall" and change > threshold:
+                regressed = True
+                mark = "  REGRESSION"
+            print(f"  {name:18} {before:9.4f}s -> {after:9.4f}s ({change:+.1%}){mark}")
+    return 1 if regressed else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="прогнать бенчмарк")
+    run_p.add_argument("--mode", choices=("runner", "pipeline", "both"), default="runner")
+    run_p.add_argument("--languages", nargs="*", help="ключи языков (по умолчанию все из languages.yaml)")
+    run_p.add_argument("--scenarios", nargs="*", choices=SCENARIOS, default=list(SCENARIOS))
+    run_p.add_argument("--repeat", type=int, default=3)
+    run_p.add_argument("--time-limit", type=int, default=10)
+    run_p.add_argument("--memory-limit", type=int, default=256)
+    run_p.add_argument("--database-url", help="PostgreSQL БД решений для режима pipeline (по умолчанию DATABASE_URL)")
+    run_p.add_argument("--output", help="файл для JSON-результата (по умолчанию stdout)")
+
+    cmp_p = sub.add_parser("compare", help="сравнить два JSON-результата")
+    cmp_p.add_argument("base")
+    cmp_p.add_argument("new")
+    cmp_p.add_argument("--threshold", type=float, default=0.15)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.new, encoding="utf-8") as f:
+            new = json.load(f)
+        return compare(base, new, args.threshold)
+
+    report = run_benchmark(args)
+    payload = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
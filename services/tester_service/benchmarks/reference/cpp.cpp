@@ -0,0 +1,11 @@
+#include <iostream>
+
+int main() {
+    std::ios::sync_with_stdio(false);
+    long long total = 0, x;
+    while (std::cin >> x) {
+        total += x;
+    }
+    std::cout << total << std::endl;
+    return 0;
+}
@@ -0,0 +1,6 @@
+const data = require("fs").readFileSync(0, "utf8").split(/\s+/).filter(Boolean);
+let total = 0n;
+for (const x of data) {
+  total += BigInt(x);
+}
+console.log(total.toString());
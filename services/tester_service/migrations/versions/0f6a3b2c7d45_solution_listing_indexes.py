@@ -0,0 +1,30 @@
+"""solution listing indexes
+
+Revision ID: 0f6a3b2c7d45
+Revises: e91a4c6b8d23
+Create Date: 2026-10-19 16:48:09.118734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0f6a3b2c7d45'
+down_revision: Union[str, Sequence[str], None] = 'e91a4c6b8d23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_solutions_problem_created', 'solutions', ['problem_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_solutions_problem_user_created', 'solutions', ['problem_id', 'created_by', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_solutions_problem_user_created', table_name='solutions')
+    op.drop_index('ix_solutions_problem_created', table_name='solutions')
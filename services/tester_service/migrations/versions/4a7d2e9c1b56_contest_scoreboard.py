@@ -0,0 +1,71 @@
+"""contest scoreboard
+
+Revision ID: 4a7d2e9c1b56
+Revises: 0f6a3b2c7d45
+Create Date: 2026-10-19 18:05:41.270318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a7d2e9c1b56'
+down_revision: Union[str, Sequence[str], None] = '0f6a3b2c7d45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('scoreboards',
+    sa.Column('contest_id', sa.String(), nullable=False),
+    sa.Column('starts_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('ends_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('freeze_minutes', sa.Integer(), nullable=False),
+    sa.Column('penalty_minutes', sa.Integer(), nullable=False),
+    sa.Column('unfrozen', sa.Boolean(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('frozen_version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('contest_id')
+    )
+    op.create_table('scoreboard_cells',
+    sa.Column('contest_id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('problem_id', sa.String(), nullable=False),
+    sa.Column('solved', sa.Boolean(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('first_ac_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('penalty', sa.Integer(), nullable=False),
+    sa.Column('frozen_solved', sa.Boolean(), nullable=False),
+    sa.Column('frozen_attempts', sa.Integer(), nullable=False),
+    sa.Column('frozen_first_ac_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('frozen_penalty', sa.Integer(), nullable=False),
+    sa.Column('pending', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('contest_id', 'user_id', 'problem_id')
+    )
+    op.create_table('scoreboard_entries',
+    sa.Column('contest_id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('solved', sa.Integer(), nullable=False),
+    sa.Column('penalty', sa.Integer(), nullable=False),
+    sa.Column('score', sa.BigInteger(), nullable=False),
+    sa.Column('frozen_solved', sa.Integer(), nullable=False),
+    sa.Column('frozen_penalty', sa.Integer(), nullable=False),
+    sa.Column('frozen_score', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('contest_id', 'user_id')
+    )
+    op.create_index('ix_scoreboard_entries_rank', 'scoreboard_entries', ['contest_id', 'score', 'user_id'], unique=False)
+    op.create_index('ix_scoreboard_entries_frozen_rank', 'scoreboard_entries', ['contest_id', 'frozen_score', 'user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_scoreboard_entries_frozen_rank', table_name='scoreboard_entries')
+    op.drop_index('ix_scoreboard_entries_rank', table_name='scoreboard_entries')
+    op.drop_table('scoreboard_entries')
+    op.drop_table('scoreboard_cells')
+    op.drop_table('scoreboards')
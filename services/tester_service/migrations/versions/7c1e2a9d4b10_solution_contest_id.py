@@ -0,0 +1,30 @@
+"""solution contest_id
+
+Revision ID: 7c1e2a9d4b10
+Revises: 54c19bd4ed29
+Create Date: 2026-10-19 10:12:41.228310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e2a9d4b10'
+down_revision: Union[str, Sequence[str], None] = '54c19bd4ed29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('solutions', sa.Column('contest_id', sa.String(), nullable=True))
+    op.create_index(op.f('ix_solutions_contest_id'), 'solutions', ['contest_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_solutions_contest_id'), table_name='solutions')
+    op.drop_column('solutions', 'contest_id')
@@ -0,0 +1,44 @@
+"""rejudge jobs
+
+Revision ID: b3f8d5e1c2a7
+Revises: 7c1e2a9d4b10
+Create Date: 2026-10-19 12:40:03.511942
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f8d5e1c2a7'
+down_revision: Union[str, Sequence[str], None] = '7c1e2a9d4b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('rejudge_jobs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_by', sa.String(), nullable=False),
+    sa.Column('problem_id', sa.String(), nullable=True),
+    sa.Column('contest_id', sa.String(), nullable=True),
+    sa.Column('user_id', sa.String(), nullable=True),
+    sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'DONE', 'CANCELLED', 'FAILED', name='rejudgestatus'), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('processed', sa.Integer(), nullable=False),
+    sa.Column('changed', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('rejudge_jobs')
+    sa.Enum(name='rejudgestatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,32 @@
+"""solution dedupe hashes
+
+Revision ID: e91a4c6b8d23
+Revises: b3f8d5e1c2a7
+Create Date: 2026-10-19 14:21:37.660128
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e91a4c6b8d23'
+down_revision: Union[str, Sequence[str], None] = 'b3f8d5e1c2a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('solutions', sa.Column('source_hash', sa.String(length=64), nullable=True))
+    op.add_column('solutions', sa.Column('testset_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_solutions_dedupe', 'solutions', ['problem_id', 'language', 'source_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_solutions_dedupe', table_name='solutions')
+    op.drop_column('solutions', 'testset_hash')
+    op.drop_column('solutions', 'source_hash')
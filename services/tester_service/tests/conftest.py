@@ -22,7 +22,34 @@ def simple_obj():
     return _factory
 
 
+@pytest.fixture(autouse=True)
+def no_event_publishing(monkeypatch):
+    # unit-тесты не ходят в брокер: публикация событий о решениях подменяется
+    import app.core.events as events
+    publish = MagicMock(name="publish_event")
+    monkeypatch.setattr(events, "publish_event", publish)
+    return publish
+
+
 def pytest_sessionstart(session):
     fake_db = types.ModuleType("app.core.database")
     fake_db.SessionLocal = MagicMock(name="SessionLocal")
-    sys.modules["app.core.database"] = fake_db
\ No newline at end of file
+    sys.modules["app.core.database"] = fake_db
+
+@pytest.fixture(autouse=True)
+def no_scoreboard_updates(monkeypatch):
+    # таблица результатов проверяется отдельно в test_scoreboard
+    import app.services.solution as solution_service
+    apply = MagicMock(name="apply_verdict")
+    monkeypatch.setattr(solution_service, "apply_verdict", apply)
+    return apply
+
+
+@pytest.fixture
+def contest_scope_cache(monkeypatch):
+    # пустой кэш задач и участников контестов на каждый тест
+    import app.services.contest as contest_service
+    from app.core.cache import TTLCache
+    cache = TTLCache(ttl=60)
+    monkeypatch.setattr(contest_service, "contest_scope_cache", cache)
+    return cache
@@ -0,0 +1,65 @@
+import threading
+from types import SimpleNamespace
+
+from app.core import cache as cache_module
+from app.core.cache import TTLCache
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    cache = TTLCache(ttl=10)
+
+    cache.set("k", 1)
+    now[0] += 9
+    assert cache.get("k") == 1
+    now[0] += 2
+    assert cache.get("k") is None
+
+
+def test_lru_eviction():
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+
+def test_get_or_load_loads_once_for_concurrent_misses():
+    cache = TTLCache()
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def loader():
+        calls.append(1)
+        started.set()
+        release.wait(2)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader))) for _ in range(5)]
+    threads[0].start()
+    started.wait(2)
+    for t in threads[1:]:
+        t.start()
+    release.set()
+    for t in threads:
+        t.join(2)
+
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+
+
+def test_invalidate_during_load_does_not_store_stale_value():
+    cache = TTLCache()
+
+    def loader():
+        cache.invalidate("k")
+        return "stale"
+
+    assert cache.get_or_load("k", loader) == "stale"
+    assert cache.get("k") is None
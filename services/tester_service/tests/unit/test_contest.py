@@ -0,0 +1,28 @@
+from unittest.mock import MagicMock
+
+import app.services.contest as contest_service
+
+
+def test_get_contest_scope_follows_participant_pages(monkeypatch, contest_scope_cache):
+    participants = [f"u{i}" for i in range(450)]
+    tasks_resp = MagicMock()
+    tasks_resp.json.return_value = [{"id": "t1"}]
+    requested = []
+
+    def get(url, **kwargs):
+        if url.endswith("/tasks"):
+            return tasks_resp
+        params = kwargs["params"]
+        requested.append(params.get("cursor"))
+        start = int(params.get("cursor") or 0)
+        end = start + params["limit"]
+        resp = MagicMock(headers={"X-Next-Cursor": str(end)} if end < len(participants) else {})
+        resp.json.return_value = [{"keycloak_id": u} for u in participants[start:end]]
+        return resp
+    monkeypatch.setattr(contest_service.content_client, "get", get)
+
+    task_ids, participant_ids = contest_service.get_contest_scope("c1")
+
+    assert task_ids == {"t1"}
+    assert participant_ids == set(participants)
+    assert requested == [None, "200", "400"]
@@ -0,0 +1,91 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from app.core.config import settings
+from app.models.outbox import OutboxEvent
+
+DATABASE_PATH = Path(__file__).resolve().parents[2] / "app" / "core" / "database.py"
+
+
+@pytest.fixture
+def load_database(monkeypatch, tmp_path):
+    # conftest подменяет app.core.database, поэтому настоящий модуль загружается из файла
+    # с двумя локальными SQLite: основной БД и репликой
+    modules = []
+
+    def _load(replica: bool = True):
+        monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{tmp_path / 'primary.db'}")
+        monkeypatch.setattr(
+            settings, "DATABASE_REPLICA_URL", f"sqlite:///{tmp_path / 'replica.db'}" if replica else None
+        )
+        spec = importlib.util.spec_from_file_location("database_under_test", DATABASE_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        for engine in {module.engine, module.replica_engine}:
+            module.Base.metadata.create_all(engine)
+        modules.append(module)
+        return module
+
+    yield _load
+    for module in modules:
+        module.engine.dispose()
+        module.replica_engine.dispose()
+
+
+def add_event(session_factory, kind: str) -> None:
+    with session_factory() as db:
+        db.add(OutboxEvent(kind=kind, payload={}, attempts=0))
+        db.commit()
+
+
+def read_kinds(dependency) -> list[str]:
+    gen = dependency()
+    db = next(gen)
+    try:
+        return [event.kind for event in db.query(OutboxEvent).order_by(OutboxEvent.id)]
+    finally:
+        gen.close()
+
+
+def test_engine_options_for_postgres(load_database, monkeypatch):
+    database = load_database()
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 3)
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 1500)
+
+    options = database.engine_options("postgresql://u:p@db:5432/app")
+
+    assert options["pool_size"] == 7 and options["max_overflow"] == 3
+    assert options["pool_pre_ping"] is settings.DB_POOL_PRE_PING
+    assert options["pool_recycle"] == settings.DB_POOL_RECYCLE
+    assert options["connect_args"] == {"options": "-c statement_timeout=1500"}
+    assert database.engine_options("sqlite:///local.db") == {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+
+
+def test_read_session_goes_to_replica(load_database):
+    database = load_database()
+    add_event(database.SessionLocal, "primary")
+    # реплика заполняется отдельно, как если бы до нее еще не дошла репликация
+    with database.replica_engine.begin() as conn:
+        conn.execute(OutboxEvent.__table__.insert().values(kind="replica", payload={}, attempts=0))
+
+    assert read_kinds(database.get_db) == ["primary"]
+    assert read_kinds(database.get_read_db) == ["replica"]
+
+
+def test_read_session_rejects_writes(load_database):
+    database = load_database()
+
+    with pytest.raises(RuntimeError):
+        add_event(database.ReadSessionLocal, "write")
+    assert read_kinds(database.get_db) == []
+
+
+def test_read_session_falls_back_to_primary(load_database):
+    database = load_database(replica=False)
+    add_event(database.SessionLocal, "primary")
+
+    assert database.replica_engine is database.engine
+    assert read_kinds(database.get_read_db) == ["primary"]
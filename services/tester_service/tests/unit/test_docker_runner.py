@@ -1,8 +1,10 @@
 import builtins
+from types import SimpleNamespace
 from unittest.mock import MagicMock, mock_open
 import pytest
 
 import app.services.docker_runner as docker_runner
+from app.core.phases import record_phases
 
 
 class DummySettings:
@@ -42,8 +44,7 @@ def test_get_docker_client_times_out(logger_mock, monkeypatch):
         t["now"] += 1.0
         return t["now"]
 
-    monkeypatch.setattr(docker_runner.time, "time", fake_time)
-    monkeypatch.setattr(docker_runner.time, "sleep", lambda *_: None)
+    monkeypatch.setattr(docker_runner, "time", SimpleNamespace(time=fake_time, sleep=lambda *_: None))
 
     with pytest.raises(Exception, match="Timed out waiting for Docker daemon"):
         docker_runner.get_docker_client(timeout=2, interval=0)
@@ -81,7 +82,7 @@ def test_run_solution_single_tc_AC(logger_mock, monkeypatch, tmp_path):
     monkeypatch.setattr(docker_runner.shutil, "rmtree", lambda *a, **k: None)
 
     times = iter([10.0, 10.5])
-    monkeypatch.setattr(docker_runner.time, "time", lambda: next(times))
+    monkeypatch.setattr(docker_runner, "time", SimpleNamespace(time=lambda: next(times)))
 
     # контейнер: exit 0, не OOM, logs == expected_output
     container = MagicMock()
@@ -125,7 +126,7 @@ def test_run_solution_TLE_when_wait_raises(logger_mock, monkeypatch, tmp_path):
     monkeypatch.setattr(docker_runner.shutil, "rmtree", lambda *a, **k: None)
 
     times = iter([10.0, 12.0])
-    monkeypatch.setattr(docker_runner.time, "time", lambda: next(times))
+    monkeypatch.setattr(docker_runner, "time", SimpleNamespace(time=lambda: next(times)))
 
     container = MagicMock()
     container.wait.side_effect = Exception("timeout")
@@ -166,7 +167,7 @@ def test_run_solution_MLE_when_oom_killed(logger_mock, monkeypatch, tmp_path):
     monkeypatch.setattr(docker_runner.shutil, "rmtree", lambda *a, **k: None)
 
     times = iter([10.0, 10.2])
-    monkeypatch.setattr(docker_runner.time, "time", lambda: next(times))
+    monkeypatch.setattr(docker_runner, "time", SimpleNamespace(time=lambda: next(times)))
 
     container = MagicMock()
     container.wait.return_value = {"StatusCode": 0}
@@ -189,3 +190,258 @@ def test_run_solution_MLE_when_oom_killed(logger_mock, monkeypatch, tmp_path):
     )
     assert res["status"] == "MLE"
     assert res["results"][0]["status"] == "MLE"
+
+
+def test_run_solution_records_phases(logger_mock, monkeypatch, tmp_path):
+    monkeypatch.setattr(docker_runner, "get_language", lambda lang: DummySpec())
+    monkeypatch.setattr(docker_runner.uuid, "uuid4", lambda: "fixed-uuid")
+    monkeypatch.setattr(docker_runner.os, "makedirs", lambda *a, **k: None)
+    monkeypatch.setattr(docker_runner.shutil, "rmtree", lambda *a, **k: None)
+
+    times = iter([10.0, 10.1, 20.0, 20.3])
+    monkeypatch.setattr(docker_runner, "time", SimpleNamespace(time=lambda: next(times)))
+
+    container = MagicMock()
+    container.wait.return_value = {"StatusCode": 0}
+    container.attrs = {"State": {"OOMKilled": False, "ExitCode": 0}}
+    container.logs.return_value = b"OK\n"
+
+    client = MagicMock()
+    client.containers.run.return_value = container
+    monkeypatch.setattr(docker_runner, "get_docker_client", lambda: client)
+    monkeypatch.setattr(builtins, "open", mock_open())
+
+    with record_phases() as recorder:
+        docker_runner.run_solution_in_container(
+            code="print('OK')",
+            language="python",
+            test_cases=[{"input": "", "expected_output": "OK"}] * 2,
+            time_limit=1,
+            memory_limit=128,
+        )
+
+    assert len(recorder.durations["docker_client"]) == 1
+    for name in ("container_create", "container_run", "read_logs", "container_remove"):
+        assert len(recorder.durations[name]) == 2
+
+
+def test_run_solution_counts_container_create_failures(logger_mock, monkeypatch):
+    from prometheus_client import REGISTRY
+
+    monkeypatch.setattr(docker_runner, "get_language", lambda lang: DummySpec())
+    monkeypatch.setattr(docker_runner.uuid, "uuid4", lambda: "fixed-uuid")
+    monkeypatch.setattr(docker_runner.os, "makedirs", lambda *a, **k: None)
+    monkeypatch.setattr(docker_runner.shutil, "rmtree", lambda *a, **k: None)
+    monkeypatch.setattr(docker_runner, "time", SimpleNamespace(time=lambda: 10.0))
+
+    client = MagicMock()
+    client.containers.run.side_effect = Exception("daemon error")
+    monkeypatch.setattr(docker_runner, "get_docker_client", lambda: client)
+
+    labels = {"operation": "create", "language": "python"}
+    before = REGISTRY.get_sample_value("judge_container_failures_total", labels) or 0.0
+
+    monkeypatch.setattr(builtins, "open", mock_open())
+    res = docker_runner.run_solution_in_container(
+        code="",
+        language="python",
+        test_cases=[{"input": "", "expected_output": ""}],
+        time_limit=1,
+        memory_limit=128,
+    )
+
+    monkeypatch.undo()
+    assert res["status"] == "RE"
+    assert REGISTRY.get_sample_value("judge_container_failures_total", labels) == before + 1
+
+
+def test_run_batch_in_container_reuses_one_container(logger_mock, monkeypatch, tmp_path):
+    monkeypatch.setattr(docker_runner, "get_language", lambda lang: DummySpec())
+
+    real_join = docker_runner.os.path.join
+    def fake_join(*parts):
+        if parts and parts[0] == "/shared_tmp":
+            parts = (str(tmp_path / "shared_tmp"),) + tuple(parts[1:])
+        return real_join(*parts)
+    monkeypatch.setattr(docker_runner.os.path, "join", fake_join)
+
+    container = MagicMock()
+    container.exec_run.side_effect = [(0, b"3\n"), (1, b""), (124, b""), (1, b"")]
+
+    client = MagicMock()
+    client.containers.run.return_value = container
+    monkeypatch.setattr(docker_runner, "get_docker_client", lambda: client)
+
+    res = docker_runner.run_batch_in_container(
+        [("s1", "print(3)"), ("s2", "while True: pass")],
+        language="python",
+        test_cases=[{"input": "1 2", "expected_output": "3"}],
+        time_limit=2,
+        memory_limit=128,
+    )
+
+    assert res["s1"]["status"] == "AC"
+    assert res["s2"]["status"] == "TLE"
+    client.containers.run.assert_called_once()
+    assert client.containers.run.call_args.kwargs["init"] is True
+    solution_call = container.exec_run.call_args_list[2]
+    assert solution_call.args[0][:4] == ["timeout", "-k", "1", "2"]
+    assert solution_call.kwargs["user"] == docker_runner._SANDBOX_USER
+    container.remove.assert_called_once()
+
+
+def test_run_batch_in_container_kills_background_processes_between_solutions(logger_mock, monkeypatch, tmp_path):
+    monkeypatch.setattr(docker_runner, "get_language", lambda lang: DummySpec())
+
+    real_join = docker_runner.os.path.join
+    def fake_join(*parts):
+        if parts and parts[0] == "/shared_tmp":
+            parts = (str(tmp_path / "shared_tmp"),) + tuple(parts[1:])
+        return real_join(*parts)
+    monkeypatch.setattr(docker_runner.os.path, "join", fake_join)
+
+    class FakeContainer:
+        """Контейнер, в котором первое решение оставляет фоновый процесс"""
+        def __init__(self):
+            self.background = []
+            self.seen_by_solution = {}
+
+        def exec_run(self, cmd, user=None):
+            if cmd == ["sh", "-c", "kill -9 -1"]:
+                assert user == docker_runner._SANDBOX_USER
+                self.background.clear()
+                return 1, b""
+            code = open(real_join(str(tmp_path / "shared_tmp"), "fixed-uuid", DummySpec().file_name)).read()
+            self.seen_by_solution[code] = list(self.background)
+            if code == "fork":
+                self.background.append("orphan")
+            return 0, b"3\n"
+
+        def remove(self, force=False):
+            pass
+
+    container = FakeContainer()
+    client = MagicMock()
+    client.containers.run.return_value = container
+    monkeypatch.setattr(docker_runner, "get_docker_client", lambda: client)
+    monkeypatch.setattr(docker_runner.uuid, "uuid4", lambda: "fixed-uuid")
+
+    res = docker_runner.run_batch_in_container(
+        [("s1", "fork"), ("s2", "print(3)")],
+        language="python",
+        test_cases=[{"input": "1 2", "expected_output": "3"}],
+        time_limit=2,
+        memory_limit=128,
+    )
+
+    assert res["s1"]["status"] == "AC" and res["s2"]["status"] == "AC"
+    assert container.seen_by_solution["print(3)"] == []
+    assert container.background == []
+
+
+def test_run_batch_in_container_recreates_container_after_hung_exec(logger_mock, monkeypatch, tmp_path):
+    import threading
+
+    monkeypatch.setattr(docker_runner, "get_language", lambda lang: DummySpec())
+    monkeypatch.setattr(docker_runner, "_EXEC_GRACE_SECONDS", 0.05)
+    monkeypatch.setattr(docker_runner, "_KILL_AFTER_SECONDS", 0)
+
+    real_join = docker_runner.os.path.join
+    def fake_join(*parts):
+        if parts and parts[0] == "/shared_tmp":
+            parts = (str(tmp_path / "shared_tmp"),) + tuple(parts[1:])
+        return real_join(*parts)
+    monkeypatch.setattr(docker_runner.os.path, "join", fake_join)
+
+    # первый контейнер "зависает" на exec: фоновый процесс решения держит stdout открытым
+    released = threading.Event()
+    hung = MagicMock(name="hung")
+    hung.exec_run.side_effect = lambda *a, **k: released.wait() and (0, b"")
+    fresh = MagicMock(name="fresh")
+    fresh.exec_run.side_effect = [(1, b""), (0, b"3\n"), (1, b"")]
+
+    client = MagicMock()
+    client.containers.run.side_effect = [hung, fresh]
+    monkeypatch.setattr(docker_runner, "get_docker_client", lambda: client)
+
+    try:
+        res = docker_runner.run_batch_in_container(
+            [("s1", "fork"), ("s2", "print(3)")],
+            language="python",
+            test_cases=[{"input": "1 2", "expected_output": "3"}],
+            time_limit=0,
+            memory_limit=128,
+        )
+    finally:
+        released.set()
+
+    assert res["s1"]["status"] == "TLE"
+    assert res["s2"]["status"] == "AC"
+    hung.remove.assert_called_once_with(force=True)
+    assert client.containers.run.call_count == 2
+
+
+def test_run_batch_in_container_sigkill_after_time_limit_is_tle(logger_mock, monkeypatch, tmp_path):
+    monkeypatch.setattr(docker_runner, "get_language", lambda lang: DummySpec())
+
+    real_join = docker_runner.os.path.join
+    def fake_join(*parts):
+        if parts and parts[0] == "/shared_tmp":
+            parts = (str(tmp_path / "shared_tmp"),) + tuple(parts[1:])
+        return real_join(*parts)
+    monkeypatch.setattr(docker_runner.os.path, "join", fake_join)
+    clock = [0.0]
+    monkeypatch.setattr(docker_runner.time, "perf_counter", lambda: clock[0])
+    # решение игнорирует SIGTERM и добивается SIGKILL после лимита; второе убито OOM раньше лимита
+    runs = iter([(3.0, (137, b"")), (0.0, (1, b"")), (0.5, (137, b"")), (0.0, (1, b""))])
+    def exec_run(*args, **kwargs):
+        spent, result = next(runs)
+        clock[0] += spent
+        return result
+
+    container = MagicMock()
+    container.status = "running"
+    container.exec_run.side_effect = exec_run
+    client = MagicMock()
+    client.containers.run.return_value = container
+    monkeypatch.setattr(docker_runner, "get_docker_client", lambda: client)
+
+    res = docker_runner.run_batch_in_container(
+        [("s1", "ignore sigterm"), ("s2", "alloc")],
+        language="python",
+        test_cases=[{"input": "", "expected_output": ""}],
+        time_limit=2,
+        memory_limit=128,
+    )
+
+    assert res["s1"]["status"] == "TLE"
+    assert res["s2"]["status"] == "MLE"
+
+
+def test_run_batch_in_container_skips_solutions_on_docker_error(logger_mock, monkeypatch, tmp_path):
+    monkeypatch.setattr(docker_runner, "get_language", lambda lang: DummySpec())
+
+    real_join = docker_runner.os.path.join
+    def fake_join(*parts):
+        if parts and parts[0] == "/shared_tmp":
+            parts = (str(tmp_path / "shared_tmp"),) + tuple(parts[1:])
+        return real_join(*parts)
+    monkeypatch.setattr(docker_runner.os.path, "join", fake_join)
+
+    container = MagicMock()
+    container.exec_run.side_effect = [(0, b"3\n"), (1, b""), Exception("daemon gone")]
+
+    client = MagicMock()
+    client.containers.run.return_value = container
+    monkeypatch.setattr(docker_runner, "get_docker_client", lambda: client)
+
+    res = docker_runner.run_batch_in_container(
+        [("s1", "print(3)"), ("s2", "print(3)")],
+        language="python",
+        test_cases=[{"input": "1 2", "expected_output": "3"}],
+        time_limit=2,
+        memory_limit=128,
+    )
+
+    assert res["s1"]["status"] == "AC"
+    assert "s2" not in res
@@ -0,0 +1,95 @@
+import asyncio
+import json
+
+import app.core.events as events
+
+
+def test_format_sse():
+    payload = events.format_sse({"type": "status", "solution_id": "s1", "status": "AC"})
+    assert payload.startswith("event: status\n")
+    assert json.loads(payload.split("data: ", 1)[1]) == {"type": "status", "solution_id": "s1", "status": "AC"}
+    assert payload.endswith("\n\n")
+
+
+def test_broker_dispatches_only_to_event_owner(monkeypatch):
+    broker = events.SolutionEventBroker("memory://")
+    monkeypatch.setattr(broker, "start", lambda: None)
+
+    async def scenario():
+        mine = broker.subscribe("u1")
+        other = broker.subscribe("u2")
+        broker.dispatch({"type": "status", "user_id": "u1", "solution_id": "s1"})
+        event = await asyncio.wait_for(mine.get(), timeout=1)
+        await asyncio.sleep(0)
+        assert other.empty()
+
+        broker.unsubscribe("u1", mine)
+        broker.dispatch({"type": "status", "user_id": "u1", "solution_id": "s2"})
+        await asyncio.sleep(0)
+        assert mine.empty()
+        return event
+
+    event = asyncio.run(scenario())
+    assert event["solution_id"] == "s1"
+
+
+def test_broker_drops_events_for_slow_subscriber(monkeypatch):
+    broker = events.SolutionEventBroker("memory://", queue_size=1)
+    monkeypatch.setattr(broker, "start", lambda: None)
+
+    async def scenario():
+        queue = broker.subscribe("u1")
+        broker.dispatch({"type": "progress", "user_id": "u1", "passed": 1})
+        broker.dispatch({"type": "progress", "user_id": "u1", "passed": 2})
+        await asyncio.sleep(0)
+        return queue.qsize(), queue.get_nowait()
+
+    size, first = asyncio.run(scenario())
+    assert size == 1
+    assert first["passed"] == 1
+
+
+def test_progress_reporter_throttles_but_always_sends_last_test(no_event_publishing, monkeypatch):
+    from app.core import progress
+
+    clock = iter([0.0, 0.1, 0.2, 0.7, 0.8])
+    monkeypatch.setattr(progress, "time", type("T", (), {"monotonic": staticmethod(lambda: next(clock))}))
+
+    reporter = progress.ProgressReporter("s1", "u1", min_interval=0.5)
+    for done, tc_status in enumerate(["AC", "AC", "WA", "AC", "AC"], start=1):
+        reporter(done, 5, tc_status)
+
+    sent = [call[0][0] for call in no_event_publishing.call_args_list]
+    assert [e["done"] for e in sent] == [1, 4, 5]
+    assert sent[-1]["passed"] == 4
+    assert sent[-1]["type"] == "progress" and sent[-1]["user_id"] == "u1"
+
+
+def test_progress_reporter_stops_publishing_after_broker_failure(no_event_publishing):
+    from app.core import progress
+
+    no_event_publishing.return_value = False
+
+    reporter = progress.ProgressReporter("s1", "u1", min_interval=0)
+    for done in range(1, 6):
+        reporter(done, 5, "AC")
+
+    no_event_publishing.assert_called_once()
+
+
+def test_progress_store_tracks_progress_and_final_status():
+    from app.core.progress import ProgressStore
+
+    store = ProgressStore(max_entries=2)
+    store.apply({"type": "progress", "solution_id": "s1", "done": 3, "total": 10, "passed": 3, "last_status": "AC"})
+    assert store.get("s1")["done"] == 3
+    assert store.get("s1")["status"] == "pending"
+
+    store.apply({"type": "status", "solution_id": "s1", "status": "WA"})
+    entry = store.get("s1")
+    assert entry["status"] == "WA" and entry["done"] == 3
+
+    store.apply({"type": "progress", "solution_id": "s2", "done": 1, "total": 1})
+    store.apply({"type": "progress", "solution_id": "s3", "done": 1, "total": 1})
+    assert store.get("s1") is None
+    assert store.get("missing") is None
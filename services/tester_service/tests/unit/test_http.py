@@ -0,0 +1,83 @@
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+import app.core.http as http
+
+
+def make_client(monkeypatch, responses, retries=2, failures=2):
+    monkeypatch.setattr(http.time, "sleep", lambda s: None)
+    client = http.ServiceClient("svc", "http://svc", retries=retries)
+    client.breaker = http.CircuitBreaker(failure_threshold=failures, reset_timeout=10)
+    client.session = MagicMock()
+    client.session.request.side_effect = responses
+    return client
+
+
+def response(status_code):
+    return MagicMock(status_code=status_code)
+
+
+def test_get_retries_unavailable_and_connection_errors(monkeypatch):
+    client = make_client(monkeypatch, [requests.ConnectionError("refused"), response(503), response(200)], failures=5)
+
+    res = client.get("/problems/p1", endpoint="get_problem", timeout=2)
+
+    assert res.status_code == 200
+    assert client.session.request.call_count == 3
+    args, kwargs = client.session.request.call_args
+    assert args == ("GET", "http://svc/problems/p1")
+    assert kwargs["timeout"] == (http.settings.HTTP_CONNECT_TIMEOUT, 2)
+
+
+def test_post_is_not_retried_by_default(monkeypatch):
+    client = make_client(monkeypatch, [response(503), response(200)], failures=5)
+
+    res = client.post("/problems/solved/bulk", endpoint="mark_solved_bulk", json={})
+
+    assert res.status_code == 503
+    assert client.session.request.call_count == 1
+
+
+def test_client_errors_are_returned_without_retry(monkeypatch):
+    client = make_client(monkeypatch, [response(404)])
+
+    assert client.get("/problems/p1", endpoint="get_problem").status_code == 404
+    assert not client.breaker.is_open
+
+
+def test_last_error_is_raised_after_retries(monkeypatch):
+    client = make_client(monkeypatch, [requests.Timeout("slow")] * 3, failures=5)
+
+    with pytest.raises(requests.Timeout):
+        client.get("/x", endpoint="x")
+
+
+def test_circuit_opens_and_probes_after_reset(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(http.time, "monotonic", lambda: now[0])
+    client = make_client(monkeypatch, [response(503), response(503), response(200)], retries=0)
+
+    client.get("/x", endpoint="x")
+    client.get("/x", endpoint="x")
+    with pytest.raises(http.CircuitOpenError):
+        client.get("/x", endpoint="x")
+    assert client.session.request.call_count == 2
+
+    now[0] += 10
+    assert client.get("/x", endpoint="x").status_code == 200
+    assert not client.breaker.is_open
+
+
+def test_breaker_allows_single_probe_while_half_open(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(http.time, "monotonic", lambda: now[0])
+    breaker = http.CircuitBreaker(failure_threshold=1, reset_timeout=5)
+    assert breaker.record_failure() is True
+
+    now[0] = 5
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+    assert breaker.record_failure() is False
+    assert breaker.allow() is False
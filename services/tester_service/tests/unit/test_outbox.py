@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+import app.services.outbox as outbox_service
+from app.models.outbox import OutboxEvent
+from app.models.solution import Base
+
+
+class DummySettings:
+    CONTENT_SERVICE_URL = "http://content"
+    OUTBOX_BATCH_SIZE = 2
+    OUTBOX_HTTP_TIMEOUT = 1
+    OUTBOX_BACKOFF_BASE = 5
+    OUTBOX_BACKOFF_MAX = 60
+
+
+@pytest.fixture
+def sqlite_session(monkeypatch):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(outbox_service, "settings", DummySettings)
+    with Session(engine) as session:
+        # dispatch_outbox закрывает сессию в конце - тест продолжает работать с той же
+        monkeypatch.setattr(session, "close", lambda: None)
+        monkeypatch.setattr(outbox_service, "SessionLocal", lambda: session)
+        yield session
+
+
+def add_events(db, pairs):
+    for problem_id, user_id in pairs:
+        outbox_service.enqueue_problem_solved(db, problem_id, user_id)
+    db.commit()
+
+
+def test_dispatch_outbox_delivers_in_batches_and_deletes(sqlite_session, monkeypatch):
+    add_events(sqlite_session, [("p1", "u1"), ("p1", "u1"), ("p2", "u2")])
+    post = MagicMock()
+    monkeypatch.setattr(outbox_service.content_client, "post", post)
+
+    delivered = outbox_service.dispatch_outbox()
+
+    assert delivered == 3
+    assert sqlite_session.query(OutboxEvent).count() == 0
+    assert [c.kwargs["json"]["items"] for c in post.call_args_list] == [
+        [{"problem_id": "p1", "user_id": "u1"}],
+        [{"problem_id": "p2", "user_id": "u2"}],
+    ]
+
+
+def test_dispatch_outbox_backs_off_on_failure(sqlite_session, monkeypatch):
+    add_events(sqlite_session, [("p1", "u1")])
+    monkeypatch.setattr(outbox_service.content_client, "post", MagicMock(side_effect=ConnectionError("down")))
+
+    assert outbox_service.dispatch_outbox() == 0
+
+    event = sqlite_session.query(OutboxEvent).one()
+    assert event.attempts == 1
+    assert event.last_error == "down"
+    next_attempt = event.next_attempt_at.replace(tzinfo=timezone.utc)
+    assert next_attempt > datetime.now(timezone.utc) + timedelta(seconds=3)
+
+    # до next_attempt_at событие не отправляется повторно
+    post = MagicMock()
+    monkeypatch.setattr(outbox_service.content_client, "post", post)
+    assert outbox_service.dispatch_outbox() == 0
+    post.assert_not_called()
+
+
+def test_backoff_delay_doubles_up_to_max(monkeypatch):
+    monkeypatch.setattr(outbox_service, "settings", DummySettings)
+
+    assert [outbox_service.backoff_delay(n).total_seconds() for n in (1, 2, 3, 5)] == [5, 10, 20, 60]
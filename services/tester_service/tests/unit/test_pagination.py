@@ -0,0 +1,71 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, create_engine
+from sqlalchemy.orm import Session, declarative_base
+
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor, keyset_paginate
+
+Base = declarative_base()
+
+
+class Item(Base):
+    __tablename__ = "items"
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, nullable=False)
+
+
+@pytest.fixture
+def sqlite_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    start = datetime(2024, 1, 1)
+    with Session(engine) as session:
+        # у пар записей одинаковый created_at - порядок держится на id
+        session.add_all(Item(id=i, created_at=start + timedelta(minutes=i // 2)) for i in range(1, 8))
+        session.commit()
+        yield session
+
+
+def test_cursor_roundtrip_keeps_types():
+    ts = datetime(2024, 5, 1, 12, 30)
+    uid = uuid.uuid4()
+    assert decode_cursor(encode_cursor(ts, uid, 3), 3) == [ts, uid, 3]
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor(1)])
+def test_decode_cursor_rejects_broken_or_foreign_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, 2)
+
+
+def test_keyset_paginate_walks_all_pages_without_gaps(sqlite_session):
+    columns = (Item.created_at, Item.id)
+    seen, cursor, pages = [], None, 0
+    while True:
+        items, cursor = keyset_paginate(sqlite_session.query(Item), columns, cursor, limit=3)
+        seen.extend(item.id for item in items)
+        pages += 1
+        if cursor is None:
+            break
+
+    assert seen == [7, 6, 5, 4, 3, 2, 1]
+    assert pages == 3
+
+
+def test_keyset_paginate_ascending(sqlite_session):
+    items, cursor = keyset_paginate(
+        sqlite_session.query(Item), (Item.created_at, Item.id), None, limit=10, descending=False
+    )
+    assert [item.id for item in items] == [1, 2, 3, 4, 5, 6, 7]
+    assert cursor is None
+
+
+def test_keyset_paginate_with_key_for_multi_entity_rows(sqlite_session):
+    query = sqlite_session.query(Item, (Item.id * 2).label("doubled"))
+    items, cursor = keyset_paginate(query, (Item.id,), None, limit=2, key=lambda row: (row[0].id,))
+    assert [row[0].id for row in items] == [7, 6]
+
+    items, _ = keyset_paginate(query, (Item.id,), cursor, limit=2, key=lambda row: (row[0].id,))
+    assert [row[0].id for row in items] == [5, 4]
@@ -0,0 +1,194 @@
+from unittest.mock import MagicMock
+
+import app.services.rejudge as rejudge_service
+from app.models.rejudge import RejudgeStatus
+from app.models.solution import SolutionStatus
+
+
+class DummySettings:
+    CONTENT_SERVICE_URL = "http://content"
+    REJUDGE_BATCH_SIZE = 2
+
+
+def make_job(simple_obj, **kwargs):
+    defaults = dict(id="j1", status=RejudgeStatus.PENDING, total=0, processed=0, changed=0, failed=0,
+                    created_at=None, finished_at=None, problem_id="p1", contest_id=None, user_id=None)
+    defaults.update(kwargs)
+    return simple_obj(**defaults)
+
+
+def setup_run(monkeypatch, job, targets, bundle):
+    monkeypatch.setattr(rejudge_service, "settings", DummySettings)
+    db = MagicMock()
+    monkeypatch.setattr(rejudge_service, "SessionLocal", lambda: db)
+    monkeypatch.setattr(rejudge_service, "get_rejudge_job", lambda db, jid: job)
+
+    q = MagicMock()
+    q.with_entities.return_value.order_by.return_value.all.return_value = targets
+    q.filter.return_value = q
+    monkeypatch.setattr(rejudge_service, "_solutions_query", lambda db, j: q)
+    monkeypatch.setattr(rejudge_service, "fetch_judging_bundle", lambda pid: bundle)
+
+    batches = []
+    monkeypatch.setattr(
+        rejudge_service, "_rejudge_batch",
+        lambda db, job, problem_id, language, ids, bundle: batches.append((problem_id, language, ids)),
+    )
+    return db, batches
+
+
+def test_run_rejudge_groups_by_problem_and_language_in_batches(monkeypatch, simple_obj):
+    job = make_job(simple_obj)
+    targets = [
+        simple_obj(id=i, problem_id="p1", language=lang, contest_id=None)
+        for i, lang in [(1, "cpp"), (2, "python"), (3, "python"), (4, "python")]
+    ]
+    db, batches = setup_run(monkeypatch, job, targets, {"test_cases": [], "time_limit": 1, "memory_limit": 64})
+
+    res = rejudge_service.run_rejudge("j1")
+
+    assert batches == [("p1", "cpp", [1]), ("p1", "python", [2, 3]), ("p1", "python", [4])]
+    assert res.status == RejudgeStatus.DONE
+    assert res.total == 4
+    assert res.finished_at is not None
+    db.close.assert_called_once()
+
+
+def test_run_rejudge_stops_when_cancelled(monkeypatch, simple_obj):
+    job = make_job(simple_obj)
+    targets = [simple_obj(id=i, problem_id="p1", language="python", contest_id=None) for i in range(1, 6)]
+    db, batches = setup_run(monkeypatch, job, targets, {"test_cases": [], "time_limit": 1, "memory_limit": 64})
+
+    def refresh(obj):
+        if len(batches) == 1:
+            obj.status = RejudgeStatus.CANCELLED
+    db.refresh.side_effect = refresh
+
+    res = rejudge_service.run_rejudge("j1")
+
+    assert len(batches) == 1
+    assert res.status == RejudgeStatus.CANCELLED
+
+
+def test_run_rejudge_keeps_cancel_that_arrived_during_last_batch(monkeypatch, simple_obj):
+    job = make_job(simple_obj)
+    targets = [simple_obj(id=i, problem_id="p1", language="python", contest_id=None) for i in range(1, 3)]
+    db, batches = setup_run(monkeypatch, job, targets, {"test_cases": [], "time_limit": 1, "memory_limit": 64})
+    cancelled_at = object()
+
+    def refresh(obj):
+        if batches:
+            obj.status = RejudgeStatus.CANCELLED
+            obj.finished_at = cancelled_at
+    db.refresh.side_effect = refresh
+
+    res = rejudge_service.run_rejudge("j1")
+
+    assert len(batches) == 1
+    assert res.status == RejudgeStatus.CANCELLED
+    assert res.finished_at is cancelled_at
+
+
+def test_run_rejudge_counts_missing_problem_as_failed(monkeypatch, simple_obj):
+    job = make_job(simple_obj)
+    targets = [simple_obj(id=1, problem_id="p1", language="python", contest_id=None)]
+    db, batches = setup_run(monkeypatch, job, targets, None)
+
+    res = rejudge_service.run_rejudge("j1")
+
+    assert batches == []
+    assert res.failed == 1 and res.processed == 1
+    assert res.status == RejudgeStatus.DONE
+
+
+def test_run_rejudge_rebuilds_scoreboards_of_touched_contests(monkeypatch, simple_obj):
+    job = make_job(simple_obj)
+    targets = [
+        simple_obj(id=1, problem_id="p1", language="python", contest_id="c1"),
+        simple_obj(id=2, problem_id="p1", language="python", contest_id=None),
+        simple_obj(id=3, problem_id="p2", language="python", contest_id="c1"),
+    ]
+    db, batches = setup_run(monkeypatch, job, targets, {"test_cases": [], "time_limit": 1, "memory_limit": 64})
+    rebuilt = []
+    monkeypatch.setattr(rejudge_service, "rebuild_scoreboard", lambda db, cid: rebuilt.append(cid))
+
+    rejudge_service.run_rejudge("j1")
+
+    assert rebuilt == ["c1"]
+
+
+def test_run_rejudge_rebuilds_scoreboards_after_cancel(monkeypatch, simple_obj):
+    job = make_job(simple_obj)
+    targets = [simple_obj(id=i, problem_id="p1", language="python", contest_id="c1") for i in range(1, 6)]
+    db, batches = setup_run(monkeypatch, job, targets, {"test_cases": [], "time_limit": 1, "memory_limit": 64})
+    db.refresh.side_effect = lambda obj: setattr(obj, "status", RejudgeStatus.CANCELLED) if batches else None
+    rebuilt = []
+    monkeypatch.setattr(rejudge_service, "rebuild_scoreboard", lambda db, cid: rebuilt.append(cid))
+
+    res = rejudge_service.run_rejudge("j1")
+
+    assert res.status == RejudgeStatus.CANCELLED
+    assert rebuilt == ["c1"]
+
+
+def test_run_rejudge_resumes_running_job_from_saved_progress(monkeypatch, simple_obj):
+    job = make_job(simple_obj, status=RejudgeStatus.RUNNING, processed=3, changed=1, failed=1)
+    targets = [
+        simple_obj(id=1, problem_id="p0", language="cpp", contest_id=None),
+        simple_obj(id=2, problem_id="p0", language="cpp", contest_id=None),
+        simple_obj(id=3, problem_id="p1", language="python", contest_id=None),
+        simple_obj(id=4, problem_id="p1", language="python", contest_id=None),
+        simple_obj(id=5, problem_id="p1", language="python", contest_id=None),
+    ]
+    db, batches = setup_run(monkeypatch, job, targets, {"test_cases": [], "time_limit": 1, "memory_limit": 64})
+
+    res = rejudge_service.run_rejudge("j1")
+
+    assert batches == [("p1", "python", [4, 5])]
+    assert res.status == RejudgeStatus.DONE
+    assert (res.processed, res.changed, res.failed) == (3, 1, 1)
+
+
+def test_run_rejudge_skips_jobs_not_pending(monkeypatch, simple_obj):
+    job = make_job(simple_obj, status=RejudgeStatus.CANCELLED)
+    db, batches = setup_run(monkeypatch, job, [], None)
+
+    res = rejudge_service.run_rejudge("j1")
+
+    assert res is job
+    db.commit.assert_not_called()
+
+
+def test_rejudge_batch_bulk_updates_and_counts_changes(monkeypatch, simple_obj):
+    monkeypatch.setattr(rejudge_service, "settings", DummySettings)
+    job = make_job(simple_obj)
+    rows = [
+        simple_obj(id="s1", code="a", status=SolutionStatus.WA, created_by="u1"),
+        simple_obj(id="s2", code="b", status=SolutionStatus.AC, created_by="u2"),
+        simple_obj(id="s3", code="c", status=SolutionStatus.AC, created_by="u3"),
+    ]
+    db = MagicMock()
+    db.query.return_value.filter.return_value.all.return_value = rows
+
+    outcomes = {
+        "s1": {"status": "AC", "time_used": 0.2, "results": [{"status": "AC", "time_used": 0.2}]},
+        "s2": {"status": "AC", "time_used": 0.1, "results": [{"status": "AC", "time_used": 0.1}]},
+    }
+    monkeypatch.setattr(rejudge_service, "run_batch_in_container", lambda *a, **k: outcomes)
+    monkeypatch.setattr(rejudge_service, "compute_performance_percentile", lambda db, pid, t: 50.0)
+    marked = []
+    monkeypatch.setattr(rejudge_service, "enqueue_problem_solved", lambda db, pid, user: marked.append((pid, user)))
+
+    rejudge_service._rejudge_batch(db, job, "p1", "python", ["s1", "s2", "s3"], {
+        "test_cases": [], "time_limit": 1, "memory_limit": 64,
+    })
+
+    db.execute.assert_called_once()
+    updates = db.execute.call_args[0][1]
+    assert [u["id"] for u in updates] == ["s1", "s2"]
+    assert all(u["memory_used"] is None for u in updates)
+    assert job.processed == 3
+    assert job.changed == 1
+    assert job.failed == 1
+    assert marked == [("p1", "u1")]
+    db.commit.assert_called_once()
@@ -0,0 +1,247 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+import app.services.scoreboard as scoreboard_service
+from app.models.scoreboard import Scoreboard, ScoreboardEntry
+from app.models.solution import Base, Solution, SolutionStatus
+
+START = datetime(2024, 1, 1, 10, 0)
+
+
+@pytest.fixture
+def sqlite_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Scoreboard(contest_id="c1", starts_at=START, freeze_minutes=60, penalty_minutes=20,
+                               unfrozen=False, version=0, frozen_version=0))
+        session.commit()
+        yield session
+
+
+@pytest.fixture(autouse=True)
+def participants(monkeypatch):
+    # участники контеста берутся из content_service - подменяем их списком
+    participant_ids = {"alice", "bob", "carol"}
+    monkeypatch.setattr(scoreboard_service, "get_contest_scope",
+                        lambda contest_id: (frozenset(), frozenset(participant_ids)))
+    return participant_ids
+
+
+def submit(db, user, problem, minute, status, contest_id="c1"):
+    solution = Solution(
+        created_by=user, problem_id=problem, contest_id=contest_id, code="x", language="python",
+        status=status, created_at=START + timedelta(minutes=minute),
+    )
+    db.add(solution)
+    db.commit()
+    return solution
+
+
+def judge(db, user, problem, minute, status):
+    solution = submit(db, user, problem, minute, status)
+    scoreboard_service.apply_verdict(db, solution)
+    return solution
+
+
+def standings(db, frozen=False, limit=50):
+    board = scoreboard_service.get_scoreboard(db, "c1")
+    rows, _ = scoreboard_service.get_standings(db, board, limit=limit, frozen=frozen)
+    return [(r["rank"], r["user_id"], r["solved"], r["penalty"]) for r in rows]
+
+
+def test_compute_cell_counts_failed_attempts_before_first_ac():
+    subs = [
+        (START + timedelta(minutes=5), SolutionStatus.WA),
+        (START + timedelta(minutes=10), SolutionStatus.TLE),
+        (START + timedelta(minutes=30), SolutionStatus.AC),
+        (START + timedelta(minutes=40), SolutionStatus.WA),
+    ]
+
+    cell = scoreboard_service.compute_cell(subs, START, None, 20)
+
+    assert cell["solved"] is True
+    assert cell["attempts"] == 2
+    assert cell["penalty"] == 30 + 2 * 20
+    assert cell == {**cell, "frozen_solved": True, "frozen_penalty": 70, "pending": 0}
+
+
+def test_compute_cell_hides_submissions_after_freeze():
+    subs = [
+        (START + timedelta(minutes=5), SolutionStatus.WA),
+        (START + timedelta(minutes=250), SolutionStatus.WA),
+        (START + timedelta(minutes=260), SolutionStatus.AC),
+    ]
+
+    cell = scoreboard_service.compute_cell(subs, START, START + timedelta(minutes=240), 20)
+
+    assert cell["solved"] is True and cell["penalty"] == 260 + 40
+    assert cell["frozen_solved"] is False
+    assert cell["frozen_attempts"] == 1
+    assert cell["pending"] == 2
+
+
+def test_apply_verdict_ranks_by_solved_then_penalty(sqlite_session):
+    db = sqlite_session
+    judge(db, "alice", "A", 10, SolutionStatus.AC)
+    judge(db, "alice", "B", 50, SolutionStatus.AC)
+    judge(db, "bob", "A", 5, SolutionStatus.WA)
+    judge(db, "bob", "A", 20, SolutionStatus.AC)
+    judge(db, "carol", "A", 30, SolutionStatus.WA)
+
+    assert standings(db) == [(1, "alice", 2, 60), (2, "bob", 1, 40), (3, "carol", 0, 0)]
+
+
+def test_apply_verdict_creates_board_starting_at_first_submission(sqlite_session):
+    db = sqlite_session
+    submit(db, "alice", "A", 7, SolutionStatus.WA, contest_id="c2")
+    solution = submit(db, "bob", "A", 12, SolutionStatus.AC, contest_id="c2")
+
+    scoreboard_service.apply_verdict(db, solution)
+
+    board = scoreboard_service.get_scoreboard(db, "c2")
+    assert board.starts_at == START + timedelta(minutes=7)
+    assert db.get(ScoreboardEntry, ("c2", "bob")).penalty == 5
+
+
+def test_apply_verdict_handles_out_of_order_verdicts(sqlite_session):
+    db = sqlite_session
+    # ранняя WA проверена позже AC - штраф за нее все равно учитывается
+    late_wa = submit(db, "alice", "A", 5, SolutionStatus.PENDING)
+    judge(db, "alice", "A", 10, SolutionStatus.AC)
+    late_wa.status = SolutionStatus.WA
+    db.commit()
+    scoreboard_service.apply_verdict(db, late_wa)
+
+    assert standings(db) == [(1, "alice", 1, 30)]
+
+
+def test_apply_verdict_after_ac_does_not_bump_version(sqlite_session):
+    db = sqlite_session
+    judge(db, "alice", "A", 10, SolutionStatus.AC)
+    version = scoreboard_service.get_scoreboard(db, "c1").version
+
+    judge(db, "alice", "A", 20, SolutionStatus.WA)
+
+    assert scoreboard_service.get_scoreboard(db, "c1").version == version
+
+
+def test_get_standings_pages_share_rank_on_ties(sqlite_session, participants):
+    db = sqlite_session
+    participants.update({"u1", "u2", "u3", "u4"})
+    for user in ("u1", "u2", "u3"):
+        judge(db, user, "A", 10, SolutionStatus.AC)
+    judge(db, "u4", "A", 5, SolutionStatus.AC)
+
+    board = scoreboard_service.get_scoreboard(db, "c1")
+    first, cursor = scoreboard_service.get_standings(db, board, limit=2)
+    second, cursor_after = scoreboard_service.get_standings(db, board, cursor=cursor, limit=2)
+
+    assert [(r["rank"], r["user_id"]) for r in first] == [(1, "u4"), (2, "u3")]
+    assert [(r["rank"], r["user_id"]) for r in second] == [(2, "u2"), (2, "u1")]
+    assert cursor_after is None
+
+
+def test_frozen_board_hides_late_verdicts(sqlite_session):
+    db = sqlite_session
+    judge(db, "alice", "A", 10, SolutionStatus.AC)
+    board = scoreboard_service.get_scoreboard(db, "c1")
+    board.ends_at = START + timedelta(minutes=300)
+    db.commit()
+    frozen_version = board.frozen_version
+
+    judge(db, "bob", "A", 250, SolutionStatus.AC)
+
+    assert board.frozen_version == frozen_version + 1  # новый участник с "?" в замороженной таблице
+    assert standings(db, frozen=True) == [(1, "alice", 1, 10), (2, "bob", 0, 0)]
+    assert standings(db) == [(1, "alice", 1, 10), (2, "bob", 1, 250)]
+    rows, _ = scoreboard_service.get_standings(db, board, frozen=True)
+    assert rows[1]["problems"][0]["pending"] == 1
+
+
+def test_rebuild_matches_incremental_state(sqlite_session):
+    db = sqlite_session
+    judge(db, "alice", "A", 10, SolutionStatus.WA)
+    judge(db, "alice", "A", 15, SolutionStatus.AC)
+    judge(db, "bob", "B", 20, SolutionStatus.AC)
+    incremental = standings(db)
+
+    board = scoreboard_service.rebuild_scoreboard(db, "c1")
+
+    assert standings(db) == incremental
+    assert db.query(ScoreboardEntry).count() == 2
+    assert board.version > 0
+
+
+def test_update_settings_recomputes_penalty(sqlite_session):
+    db = sqlite_session
+    judge(db, "alice", "A", 5, SolutionStatus.WA)
+    judge(db, "alice", "A", 10, SolutionStatus.AC)
+
+    scoreboard_service.update_scoreboard_settings(
+        db, "c1", scoreboard_service.ScoreboardSettingsUpdate(penalty_minutes=10)
+    )
+
+    assert standings(db) == [(1, "alice", 1, 20)]
+
+
+def test_contest_is_live_only_inside_configured_window(sqlite_session):
+    db = sqlite_session
+    scoreboard_service.contest_window_cache.clear()
+    during = START.replace(tzinfo=timezone.utc) + timedelta(hours=1)
+
+    # окончание не задано - посылки идут в обычную очередь
+    assert not scoreboard_service.is_contest_live(db, "c1", now=during)
+    assert not scoreboard_service.is_contest_live(db, "unknown", now=during)
+
+    scoreboard_service.update_scoreboard_settings(
+        db, "c1", scoreboard_service.ScoreboardSettingsUpdate(ends_at=START + timedelta(hours=2))
+    )
+
+    assert scoreboard_service.is_contest_live(db, "c1", now=during)
+    assert not scoreboard_service.is_contest_live(db, "c1", now=during + timedelta(hours=1))
+    assert not scoreboard_service.is_contest_live(db, "c1", now=during - timedelta(hours=2))
+
+
+def test_submissions_outside_contest_window_are_not_counted(sqlite_session):
+    db = sqlite_session
+    scoreboard_service.update_scoreboard_settings(
+        db, "c1", scoreboard_service.ScoreboardSettingsUpdate(ends_at=START + timedelta(hours=2))
+    )
+    judge(db, "alice", "A", 10, SolutionStatus.WA)
+    judge(db, "alice", "A", 150, SolutionStatus.AC)
+    judge(db, "bob", "A", -5, SolutionStatus.AC)
+    judge(db, "bob", "B", 30, SolutionStatus.AC)
+
+    assert standings(db) == [(1, "bob", 1, 30), (2, "alice", 0, 0)]
+
+    scoreboard_service.rebuild_scoreboard(db, "c1")
+
+    assert standings(db) == [(1, "bob", 1, 30), (2, "alice", 0, 0)]
+
+
+def test_non_participant_submissions_get_no_row(sqlite_session, participants):
+    db = sqlite_session
+    judge(db, "alice", "A", 10, SolutionStatus.AC)
+    judge(db, "mallory", "A", 5, SolutionStatus.AC)
+
+    assert standings(db) == [(1, "alice", 1, 10)]
+
+    scoreboard_service.rebuild_scoreboard(db, "c1")
+
+    assert standings(db) == [(1, "alice", 1, 10)]
+    assert db.query(ScoreboardEntry).count() == 1
+
+
+def test_standings_etag_changes_with_version():
+    board = Scoreboard(contest_id="c1", version=1, frozen_version=1)
+    etag = scoreboard_service.standings_etag(board, False, None, 50)
+
+    board.version = 2
+
+    assert scoreboard_service.standings_etag(board, False, None, 50) != etag
+    assert scoreboard_service.standings_etag(board, True, None, 50) == \
+        scoreboard_service.standings_etag(Scoreboard(contest_id="c1", version=7, frozen_version=1), True, None, 50)
@@ -1,7 +1,10 @@
 import pytest
+import requests
 from unittest.mock import MagicMock
 
+import app.services.contest as contest_service
 import app.services.solution as solution_service
+from app.core.http import CircuitOpenError
 
 
 class DummySettings:
@@ -27,6 +30,34 @@ def test_create_solution_sets_pending(db_session, logger_mock, monkeypatch, simp
     db_session.refresh.assert_called_once_with(created)
 
 
+def test_get_problem_contest_id_returns_contest(monkeypatch):
+    monkeypatch.setattr(solution_service, "settings", DummySettings)
+
+    resp = MagicMock()
+    resp.status_code = 200
+    resp.json.return_value = {"id": "p1", "contest_id": "c1"}
+    calls = []
+    def fake_get(url, **kwargs):
+        calls.append(url)
+        return resp
+    monkeypatch.setattr(solution_service.content_client, "get", fake_get)
+
+    assert solution_service.get_problem_contest_id("p1") == "c1"
+    assert calls == ["/problems/p1"]
+
+
+def test_get_problem_contest_id_falls_back_to_practice(monkeypatch, logger_mock):
+    monkeypatch.setattr(solution_service, "settings", DummySettings)
+    monkeypatch.setattr(solution_service, "logger", logger_mock)
+
+    def fake_get(url, **kwargs):
+        raise ConnectionError("content_service is down")
+    monkeypatch.setattr(solution_service.content_client, "get", fake_get)
+
+    assert solution_service.get_problem_contest_id("p1") is None
+    logger_mock.warning.assert_called_once()
+
+
 def test_get_solution_not_found_logs_warning(db_session, logger_mock, monkeypatch):
     q = MagicMock()
     chain = MagicMock()
@@ -45,6 +76,28 @@ def test_update_solution_status_missing_solution_returns_none(db_session, monkey
     assert res is None
 
 
+def test_update_solution_status_ac_writes_outbox_event_before_commit(db_session, monkeypatch):
+    sol = MagicMock(problem_id="p1", created_by="u1")
+    monkeypatch.setattr(solution_service, "get_solution", lambda db, sid: sol)
+    enqueue = MagicMock()
+    monkeypatch.setattr(solution_service, "enqueue_problem_solved", enqueue)
+    db_session.commit.side_effect = lambda: enqueue.assert_called_once_with(db_session, "p1", "u1")
+
+    solution_service.update_solution_status(db_session, "sid", {"status": solution_service.SolutionStatus.AC})
+
+    db_session.commit.assert_called_once()
+
+
+def test_update_solution_status_wa_skips_outbox(db_session, monkeypatch):
+    monkeypatch.setattr(solution_service, "get_solution", lambda db, sid: MagicMock())
+    enqueue = MagicMock()
+    monkeypatch.setattr(solution_service, "enqueue_problem_solved", enqueue)
+
+    solution_service.update_solution_status(db_session, "sid", {"status": solution_service.SolutionStatus.WA})
+
+    enqueue.assert_not_called()
+
+
 def test_update_solution_status_commit_error_rolls_back_and_returns_none(db_session, logger_mock, monkeypatch):
     sol = MagicMock()
     sol.id = "sid"
@@ -89,7 +142,7 @@ def test_process_solution_problem_not_found(monkeypatch, logger_mock):
 
     resp = MagicMock()
     resp.status_code = 404
-    monkeypatch.setattr(solution_service.requests, "get", lambda url: resp)
+    monkeypatch.setattr(solution_service.content_client, "get", lambda url, **kwargs: resp)
 
     upd = MagicMock()
     monkeypatch.setattr(solution_service, "update_solution_status", upd)
@@ -100,7 +153,65 @@ def test_process_solution_problem_not_found(monkeypatch, logger_mock):
     db.close.assert_called_once()
 
 
-def test_process_solution_AC_sets_faster_than_and_marks_solved(monkeypatch, logger_mock):
+def _unavailable_content_case(monkeypatch):
+    monkeypatch.setattr(solution_service, "settings", DummySettings)
+    db = MagicMock()
+    monkeypatch.setattr(solution_service, "SessionLocal", lambda: db)
+    sol = MagicMock(problem_id="p1", created_by="u1", code="code", language="python")
+    monkeypatch.setattr(solution_service, "get_solution", lambda db, sid: sol)
+
+    def circuit_open(url, **kwargs):
+        raise CircuitOpenError("content_service circuit is open")
+    monkeypatch.setattr(solution_service.content_client, "get", circuit_open)
+
+    upd = MagicMock()
+    monkeypatch.setattr(solution_service, "update_solution_status", upd)
+    return db, upd
+
+
+def test_process_solution_content_unavailable_asks_for_retry(monkeypatch, logger_mock):
+    db, upd = _unavailable_content_case(monkeypatch)
+
+    res = solution_service.process_solution("sid")
+
+    assert res == {"retry": True}
+    upd.assert_not_called()
+    db.close.assert_called_once()
+
+
+def test_process_solution_content_unavailable_after_retries_sets_re(monkeypatch, logger_mock):
+    db, upd = _unavailable_content_case(monkeypatch)
+
+    res = solution_service.process_solution("sid", retry_unavailable=False)
+
+    assert res == {"error": "Content service unavailable"}
+    upd.assert_called_once_with(db, "sid", {"status": solution_service.SolutionStatus.RE, "time_used": 0})
+
+
+def test_fetch_judging_bundle_uses_uncached_judging_endpoint(monkeypatch):
+    calls = []
+    resp = MagicMock(status_code=200)
+    resp.json.return_value = {"test_cases": [{"input_data": "1", "output_data": "2"}], "time_limit": 3,
+                              "memory_limit": 64, "dedupe_submissions": False}
+    monkeypatch.setattr(solution_service.content_client, "get", lambda url, **kwargs: calls.append(url) or resp)
+
+    bundle = solution_service.fetch_judging_bundle("p1")
+
+    assert calls == ["/problems/p1/judging"]
+    assert bundle == {"test_cases": [{"input": "1", "expected_output": "2"}], "time_limit": 3,
+                      "memory_limit": 64, "dedupe": False}
+
+
+def test_fetch_judging_bundle_raises_on_server_error(monkeypatch):
+    resp = MagicMock(status_code=503)
+    resp.raise_for_status.side_effect = requests.HTTPError("503")
+    monkeypatch.setattr(solution_service.content_client, "get", lambda url, **kwargs: resp)
+
+    with pytest.raises(requests.HTTPError):
+        solution_service.fetch_judging_bundle("p1")
+
+
+def test_process_solution_AC_sets_faster_than_without_blocking_http_call(monkeypatch, logger_mock, no_event_publishing):
     monkeypatch.setattr(solution_service, "settings", DummySettings)
 
     db = MagicMock()
@@ -120,18 +231,19 @@ def test_process_solution_AC_sets_faster_than_and_marks_solved(monkeypatch, logg
         "time_limit": 3,
         "memory_limit": 64,
     }
-    monkeypatch.setattr(solution_service.requests, "get", lambda url: get_resp)
+    monkeypatch.setattr(solution_service.content_client, "get", lambda url, **kwargs: get_resp)
+    monkeypatch.setattr(solution_service, "find_duplicate", lambda db, solution, testset_hash: None)
 
     monkeypatch.setattr(
         solution_service,
         "run_solution_in_container",
-        lambda code, lang, tcs, tl, ml: {"status": "AC", "results": [{"time_used": 0.42}], "time_used": 0.42},
+        lambda code, lang, tcs, tl, ml, **kwargs: {"status": "AC", "results": [{"time_used": 0.42}], "time_used": 0.42},
     )
 
     post_resp = MagicMock()
     post_resp.ok = True
     post_mock = MagicMock(return_value=post_resp)
-    monkeypatch.setattr(solution_service.requests, "post", post_mock)
+    monkeypatch.setattr(solution_service.content_client, "post", post_mock)
 
     perf = MagicMock(return_value=88.0)
     monkeypatch.setattr(solution_service, "compute_performance_percentile", perf)
@@ -143,8 +255,10 @@ def test_process_solution_AC_sets_faster_than_and_marks_solved(monkeypatch, logg
 
     assert res["status"] == "AC"
     assert res["faster_than"] == 88.0
+    event = no_event_publishing.call_args[0][0]
+    assert event["type"] == "status" and event["user_id"] == "u1" and event["status"] == "AC"
     perf.assert_called_once_with(db, "p1", 0.42)
-    post_mock.assert_called_once()
+    post_mock.assert_not_called()  # отметка решенной задачи уходит через outbox
     upd.assert_called_once()
     db.close.assert_called_once()
 
@@ -165,7 +279,8 @@ def test_process_solution_non_AC_sets_faster_than_none(monkeypatch, logger_mock)
     get_resp = MagicMock()
     get_resp.status_code = 200
     get_resp.json.return_value = {"test_cases": [], "time_limit": 1, "memory_limit": 64}
-    monkeypatch.setattr(solution_service.requests, "get", lambda url: get_resp)
+    monkeypatch.setattr(solution_service.content_client, "get", lambda url, **kwargs: get_resp)
+    monkeypatch.setattr(solution_service, "find_duplicate", lambda db, solution, testset_hash: None)
 
     monkeypatch.setattr(
         solution_service,
@@ -185,62 +300,199 @@ def test_process_solution_non_AC_sets_faster_than_none(monkeypatch, logger_mock)
     db.close.assert_called_once()
 
 
+def test_compute_source_hash_ignores_line_endings_and_trailing_whitespace():
+    a = solution_service.compute_source_hash("print(1)\r\nprint(2)   \r\n\r\n")
+    b = solution_service.compute_source_hash("print(1)\nprint(2)")
+    c = solution_service.compute_source_hash("print(1)\n  print(2)")
+    assert a == b
+    assert a != c
+
+
+def make_dedupe_case(monkeypatch, duplicate, dedupe=True):
+    monkeypatch.setattr(solution_service, "settings", DummySettings)
+    db = MagicMock()
+    monkeypatch.setattr(solution_service, "SessionLocal", lambda: db)
+
+    sol = MagicMock()
+    sol.problem_id = "p1"
+    sol.created_by = "u1"
+    sol.language = "python"
+    sol.source_hash = "h"
+    monkeypatch.setattr(solution_service, "get_solution", lambda db, sid: sol)
+
+    get_resp = MagicMock()
+    get_resp.status_code = 200
+    get_resp.json.return_value = {"test_cases": [], "time_limit": 1, "memory_limit": 64,
+                                  "dedupe_submissions": dedupe}
+    monkeypatch.setattr(solution_service.content_client, "get", lambda url, **kwargs: get_resp)
+    monkeypatch.setattr(solution_service, "find_duplicate", lambda db, solution, testset_hash: duplicate)
+
+    runner = MagicMock(return_value={"status": "WA", "results": [], "time_used": 0.1})
+    monkeypatch.setattr(solution_service, "run_solution_in_container", runner)
+    upd = MagicMock(return_value=MagicMock())
+    monkeypatch.setattr(solution_service, "update_solution_status", upd)
+    return sol, runner, upd
+
+
+def test_process_solution_reuses_judged_duplicate(monkeypatch, logger_mock, simple_obj):
+    duplicate = simple_obj(id="d1", status=solution_service.SolutionStatus.WA, time_used=0.3, memory_used=None)
+    sol, runner, upd = make_dedupe_case(monkeypatch, duplicate)
+
+    res = solution_service.process_solution("sid")
+
+    runner.assert_not_called()
+    assert res["status"] == "WA"
+    assert res["time_used"] == 0.3
+    assert res["reused_from"] == "d1"
+    upd.assert_called_once()
+
+
+def test_process_solution_defers_while_duplicate_in_flight(monkeypatch, logger_mock, simple_obj):
+    duplicate = simple_obj(id="d1", status=solution_service.SolutionStatus.PENDING, time_used=None, memory_used=None)
+    sol, runner, upd = make_dedupe_case(monkeypatch, duplicate)
+
+    res = solution_service.process_solution("sid")
+    assert res == {"deferred": True, "duplicate_of": "d1"}
+    runner.assert_not_called()
+    upd.assert_not_called()
+
+    res = solution_service.process_solution("sid", wait_for_duplicates=False)
+    runner.assert_called_once()
+    assert res["status"] == "WA"
+
+
+def test_process_solution_dedupe_disabled_for_contest(monkeypatch, logger_mock, simple_obj):
+    duplicate = simple_obj(id="d1", status=solution_service.SolutionStatus.AC, time_used=0.3, memory_used=None)
+    sol, runner, upd = make_dedupe_case(monkeypatch, duplicate, dedupe=False)
+
+    solution_service.process_solution("sid")
+
+    runner.assert_called_once()
+
+
+def test_process_solution_updates_contest_scoreboard(monkeypatch, logger_mock, no_scoreboard_updates):
+    sol, runner, upd = make_dedupe_case(monkeypatch, None)
+    updated = MagicMock(contest_id="c1")
+    upd.return_value = updated
+
+    solution_service.process_solution("sid")
+
+    no_scoreboard_updates.assert_called_once()
+    assert no_scoreboard_updates.call_args[0][1] is updated
+
+
+def test_process_solution_practice_skips_scoreboard(monkeypatch, logger_mock, no_scoreboard_updates):
+    sol, runner, upd = make_dedupe_case(monkeypatch, None)
+    upd.return_value = MagicMock(contest_id=None)
+
+    solution_service.process_solution("sid")
+
+    no_scoreboard_updates.assert_not_called()
+
+
 def test_list_solutions_by_problem(db_session, logger_mock, monkeypatch):
     q = MagicMock()
-    chain = MagicMock()
-    db_session.query.return_value = q
-    q.filter.return_value = chain
-    chain.all.return_value = [MagicMock(), MagicMock()]
+    db_session.query.return_value.options.return_value = q
+    q.filter.return_value = q
+    paginate = MagicMock(return_value=([MagicMock(), MagicMock()], "next"))
+    monkeypatch.setattr(solution_service, "keyset_paginate", paginate)
 
-    res = solution_service.list_solutions_by_problem(db_session, "p1")
+    res, next_cursor = solution_service.list_solutions_by_problem(
+        db_session, "p1", status=solution_service.SolutionStatus.AC, cursor="c", limit=2
+    )
     assert len(res) == 2
+    assert next_cursor == "next"
+    assert q.filter.call_count == 2
+    args = paginate.call_args.args
+    assert args[0] is q
+    assert args[2:] == ("c", 2)
 
 
 def test_list_solutions_by_problem_and_user(db_session, logger_mock, monkeypatch):
     q = MagicMock()
-    chain = MagicMock()
-    db_session.query.return_value = q
-    q.filter.return_value = chain
-    chain.all.return_value = [MagicMock()]
+    db_session.query.return_value.options.return_value = q
+    q.filter.return_value = q
+    monkeypatch.setattr(solution_service, "keyset_paginate", MagicMock(return_value=([MagicMock()], None)))
 
-    res = solution_service.list_solutions_by_problem_and_user(db_session, "p1", "u1")
+    res, next_cursor = solution_service.list_solutions_by_problem_and_user(db_session, "p1", "u1")
     assert len(res) == 1
+    assert next_cursor is None
+
+
+def _contest_scope_responses(monkeypatch, tasks, participants):
+    tasks_resp = MagicMock()
+    tasks_resp.json.return_value = [{"id": t} for t in tasks]
+    parts_resp = MagicMock(headers={})
+    parts_resp.json.return_value = [{"keycloak_id": u} for u in participants]
+    get_mock = MagicMock(side_effect=lambda url, **kwargs: tasks_resp if url.endswith("/tasks") else parts_resp)
+    monkeypatch.setattr(solution_service.content_client, "get", get_mock)
+    return get_mock
 
 
-def test_list_contest_solutions_happy_path_with_filters(db_session, logger_mock, monkeypatch):
+def test_list_contest_solutions_happy_path_with_filters(db_session, logger_mock, monkeypatch, contest_scope_cache):
     monkeypatch.setattr(solution_service, "settings", DummySettings)
 
     tasks_resp = MagicMock()
     tasks_resp.raise_for_status.return_value = None
     tasks_resp.json.return_value = [{"id": "t1"}, {"id": "t2"}]
 
-    parts_resp = MagicMock()
+    parts_resp = MagicMock(headers={})
     parts_resp.raise_for_status.return_value = None
     parts_resp.json.return_value = [{"keycloak_id": "u1"}, {"keycloak_id": "u2"}]
 
     get_mock = MagicMock(side_effect=[tasks_resp, parts_resp])
-    monkeypatch.setattr(solution_service.requests, "get", get_mock)
+    monkeypatch.setattr(solution_service.content_client, "get", get_mock)
 
     q = MagicMock()
     chain = MagicMock()
-    db_session.query.return_value = q
+    db_session.query.return_value.options.return_value = q
     q.filter.return_value = chain
     chain.filter.return_value = chain
-    chain.offset.return_value = chain
-    chain.limit.return_value = chain
-    chain.all.return_value = [MagicMock(), MagicMock(), MagicMock()]
+    paginate = MagicMock(return_value=([MagicMock(), MagicMock(), MagicMock()], "next"))
+    monkeypatch.setattr(solution_service, "keyset_paginate", paginate)
 
-    res = solution_service.list_contest_solutions(
+    res, next_cursor = solution_service.list_contest_solutions(
         db_session,
         contest_id="c1",
         owner_id="owner",
         user_id="u1",
         problem_id="t1",
-        offset=5,
+        cursor="c",
         limit=3,
     )
 
     assert len(res) == 3
+    assert next_cursor == "next"
+    assert get_mock.call_count == 2
+    assert chain.filter.call_count == 1
+    assert paginate.call_args.args[0] is chain
+    assert paginate.call_args.args[2:] == ("c", 3)
+
+
+def test_list_contest_solutions_reuses_cached_scope_until_invalidated(
+    db_session, logger_mock, monkeypatch, contest_scope_cache
+):
+    monkeypatch.setattr(solution_service, "settings", DummySettings)
+    get_mock = _contest_scope_responses(monkeypatch, ["t1"], ["u1"])
+    monkeypatch.setattr(solution_service, "keyset_paginate", MagicMock(return_value=([], None)))
+
+    solution_service.list_contest_solutions(db_session, "c1", "owner")
+    solution_service.list_contest_solutions(db_session, "c1", "owner")
     assert get_mock.call_count == 2
-    chain.offset.assert_called_once_with(5)
-    chain.limit.assert_called_once_with(3)
+
+    contest_service.invalidate_contest_scope("c1")
+    solution_service.list_contest_solutions(db_session, "c1", "owner")
+    assert get_mock.call_count == 4
+
+
+def test_list_contest_solutions_unknown_participant_skips_query(
+    db_session, logger_mock, monkeypatch, contest_scope_cache
+):
+    monkeypatch.setattr(solution_service, "settings", DummySettings)
+    _contest_scope_responses(monkeypatch, ["t1"], ["u1"])
+
+    res, next_cursor = solution_service.list_contest_solutions(db_session, "c1", "owner", user_id="stranger")
+
+    assert (res, next_cursor) == ([], None)
+    db_session.query.assert_not_called()
+
@@ -0,0 +1,57 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from prometheus_client import REGISTRY
+
+import app.worker.tasks as tasks
+
+
+def test_process_solution_task_observes_queue_wait_phase(monkeypatch):
+    monkeypatch.setattr(tasks, "process_solution", lambda solution_id, **kwargs: {"status": "AC"})
+    labels = {"phase": "queue_wait", "language": ""}
+    count_before = REGISTRY.get_sample_value("judge_phase_seconds_count", labels) or 0.0
+    sum_before = REGISTRY.get_sample_value("judge_phase_seconds_sum", labels) or 0.0
+
+    tasks.process_solution_task.run("s1", enqueued_at=time.time() - 5)
+
+    assert REGISTRY.get_sample_value("judge_phase_seconds_count", labels) == count_before + 1
+    assert REGISTRY.get_sample_value("judge_phase_seconds_sum", labels) - sum_before >= 5
+
+
+def test_process_solution_task_retries_with_backoff_while_content_unavailable(monkeypatch):
+    calls = []
+    def fake_process(solution_id, **kwargs):
+        calls.append(kwargs)
+        return {"retry": True}
+    monkeypatch.setattr(tasks, "process_solution", fake_process)
+    retry = MagicMock(return_value=RuntimeError("retry"))
+    monkeypatch.setattr(tasks.process_solution_task, "retry", retry)
+    monkeypatch.setattr(tasks.settings, "CONTENT_RETRY_BASE", 5)
+    monkeypatch.setattr(tasks.settings, "CONTENT_RETRY_MAX_DELAY", 300)
+    monkeypatch.setattr(tasks.settings, "CONTENT_MAX_RETRIES", 6)
+    tasks.process_solution_task.push_request(retries=3)
+    try:
+        with pytest.raises(RuntimeError):
+            tasks.process_solution_task.run("s1")
+    finally:
+        tasks.process_solution_task.pop_request()
+
+    assert calls[0]["retry_unavailable"] is True
+    retry.assert_called_once_with(countdown=40, max_retries=6)
+
+
+def test_process_solution_task_gives_up_after_content_max_retries(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        tasks, "process_solution",
+        lambda solution_id, **kwargs: calls.append(kwargs) or {"error": "Content service unavailable"},
+    )
+    monkeypatch.setattr(tasks.settings, "CONTENT_MAX_RETRIES", 2)
+    tasks.process_solution_task.push_request(retries=2)
+    try:
+        tasks.process_solution_task.run("s1")
+    finally:
+        tasks.process_solution_task.pop_request()
+
+    assert calls[0]["retry_unavailable"] is False